@@ -1,15 +1,44 @@
 from __future__ import annotations
-from typing import Callable, Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List, Dict, Iterator, AsyncIterator, Union
+from array import array
 from enum import Enum, Flag, auto
 from threading import Thread
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import bisect
 import datetime
+import fnmatch
+import itertools
 import json
+import math
+import operator
+import random
+import re
+import sys
 import websocket
 import cbor2
 import io
 import asyncio
 import threading
+import time
 from bleak import BleakScanner, BleakClient
+from bleak.exc import BleakError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
 
 
 class SIStatus(Enum):
@@ -231,6 +260,41 @@ class SIExtensionStatus(Enum):
         return ordinals.get(ordinal, SIExtensionStatus.ERROR)
 
 
+class SIJsonCodec(Enum):
+    """
+    JSON implementation used to decode the JSON bodies of the frames received from the gateway.
+
+    - **SIJsonCodec.AUTO**: Use the fastest installed implementation, orjson, then ujson, then the standard library.
+    - **SIJsonCodec.STDLIB**: Use the json module of the standard library.
+    - **SIJsonCodec.ORJSON**: Use orjson, has to be installed.
+    - **SIJsonCodec.UJSON**: Use ujson, has to be installed.
+    """
+
+    AUTO = auto()
+    STDLIB = auto()
+    ORJSON = auto()
+    UJSON = auto()
+
+    def loads(self) -> Callable[[str], any]:
+        """
+        Returns the function to use to decode JSON documents.
+
+        :return: JSON decoding function.
+        :raises SIProtocolError: If the requested JSON implementation is not installed.
+        """
+
+        if self == SIJsonCodec.ORJSON or (self == SIJsonCodec.AUTO and orjson is not None):
+            if orjson is None:
+                raise SIProtocolError('JSON codec orjson is not installed')
+            return orjson.loads
+        elif self == SIJsonCodec.UJSON or (self == SIJsonCodec.AUTO and ujson is not None):
+            if ujson is None:
+                raise SIProtocolError('JSON codec ujson is not installed')
+            return ujson.loads
+        else:
+            return json.loads
+
+
 class SIProtocolError(IOError):
     """
     Class for reporting all OpenStuder protocol errors.
@@ -248,11 +312,23 @@ class SIProtocolError(IOError):
         return super(SIProtocolError, self).args[0]
 
 
+class SITimeoutError(SIProtocolError):
+    """
+    Class for reporting that the gateway did not respond in time. As this is a subclass of SIProtocolError, existing
+    error handling continues to catch timeouts.
+    """
+
+    def __init__(self, message):
+        super(SITimeoutError, self).__init__(message)
+
+
 class SIDeviceMessage:
     """
     The SIDeviceMessage class represents a message a device connected to the OpenStuder gateway has broadcast.
     """
 
+    __slots__ = ('timestamp', 'access_id', 'device_id', 'message_id', 'message')
+
     def __init__(self, access_id: str, device_id: str, message_id: str, message: str, timestamp: datetime.datetime):
         self.timestamp = timestamp
         """
@@ -282,14 +358,15 @@ class SIDeviceMessage:
     @staticmethod
     def from_dict(d: dict) -> SIDeviceMessage:
         try:
-            return SIDeviceMessage(d['access_id'], d['device_id'], d['message_id'], d['message'],
-                                   datetime.datetime.fromisoformat(d['timestamp'].replace("Z", "+00:00")))
+            return SIDeviceMessage(_si_intern(d['access_id']), _si_intern(d['device_id']), d['message_id'],
+                                   d['message'], datetime.datetime.fromisoformat(d['timestamp'].replace("Z", "+00:00")))
         except KeyError:
             raise SIProtocolError('invalid json body')
 
     @staticmethod
     def from_list(lst: list) -> SIDeviceMessage:
-        return SIDeviceMessage(lst[1], lst[2], lst[3], lst[4], datetime.datetime.fromtimestamp(lst[0]))
+        return SIDeviceMessage(_si_intern(lst[1]), _si_intern(lst[2]), lst[3], lst[4],
+                               datetime.datetime.fromtimestamp(lst[0]))
 
 
 class SIPropertyReadResult:
@@ -297,6 +374,8 @@ class SIPropertyReadResult:
     The SIDPropertyReadResult class represents the status of a property read result.
     """
 
+    __slots__ = ('status', 'id', 'value')
+
     def __init__(self, status: SIStatus, id_: str, value: Optional[any]):
         self.status = status
         """
@@ -317,30 +396,390 @@ class SIPropertyReadResult:
         return self.status, self.id, self.value
 
     @staticmethod
-    def from_dict(d: dict) -> SIPropertyReadResult:
+    def from_dict(d: dict, schema: Optional[SIPropertySchema] = None) -> SIPropertyReadResult:
         try:
             result = SIPropertyReadResult(SIStatus.from_string(d['status']), d['id'], None)
             if 'value' in d and d['value'] is not None:
-                try:
-                    result.value = float(d['value'])
-                except ValueError:
-                    string = d['value'].lower()
-                    if string == 'true':
-                        result.value = True
-                    elif string == 'false':
-                        result.value = False
-                    else:
-                        result.value = string
+                if schema is None:
+                    result.value = _si_decode_value(d['value'])
+                else:
+                    result.value = schema.decode(result.id, d['value'])
             return result
         except KeyError:
             raise SIProtocolError('invalid json body')
 
 
+class SIPropertyReadBatch:
+    """
+    The SIPropertyReadBatch class is a compact, column oriented alternative to a list of SIPropertyReadResult objects.
+
+    The IDs of the properties are stored in a tuple, the status ordinals (SIStatus values) in an array of signed chars
+    and the values as floats in an array of doubles, NaN where a property has no numeric value. Iterating or indexing
+    the batch creates SIPropertyReadResult objects on demand, so existing code working with the list of results
+    continues to work.
+    """
+
+    __slots__ = ('ids', 'statuses', 'values', '__others')
+
+    def __init__(self, ids: Tuple[str, ...], statuses: array, values: array, others: Optional[Dict[int, any]] = None):
+        self.ids = ids
+        """
+        IDs of the properties read.
+        """
+
+        self.statuses = statuses
+        """
+        Status ordinals (values of SIStatus) of the property read operations as array('b').
+        """
+
+        self.values = values
+        """
+        Values read as array('d'), NaN if the property has no value or the value is not numeric.
+        """
+
+        self.__others = others if others is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SIPropertyReadResult, List[SIPropertyReadResult]]:
+        if isinstance(index, slice):
+            return [self[index] for index in range(len(self.ids))[index]]
+        index = range(len(self.ids))[index]
+        if index in self.__others:
+            value = self.__others[index]
+        else:
+            value = self.values[index]
+            if value != value:
+                value = None
+        return SIPropertyReadResult(SIStatus(self.statuses[index]), self.ids[index], value)
+
+    def __iter__(self) -> Iterator[SIPropertyReadResult]:
+        for index in range(len(self.ids)):
+            yield self[index]
+
+    def to_list(self) -> List[SIPropertyReadResult]:
+        """
+        Converts the batch to the list of results read_properties() returns without batch=True.
+
+        :return: List of SIPropertyReadResult objects in the order of the batch.
+        """
+
+        return list(self)
+
+    @staticmethod
+    def from_dicts(results: List[dict], schema: Optional[SIPropertySchema] = None) -> SIPropertyReadBatch:
+        """
+        Creates a batch from the decoded JSON body of a PROPERTIES READ response.
+
+        :param results: List of dictionaries with the keys 'status', 'id' and optionally 'value'.
+        :param schema: Optional property schema used to decode the values.
+        :return: New batch holding the results.
+        :raises SIProtocolError: If a result has no status or ID.
+        """
+
+        try:
+            ids = tuple([result['id'] for result in results])
+            statuses = array('b', [_SI_STATUS_ORDINALS.get(result['status'], -1) for result in results])
+        except KeyError:
+            raise SIProtocolError('invalid json body')
+
+        # Decode the values and keep the ones that can not be represented by a float in a dictionary on the side.
+        values = array('d', [_SI_NAN]) * len(ids)
+        others = {}
+        for index, result in enumerate(results):
+            value = result.get('value')
+            if value is None:
+                continue
+            value = _si_decode_value(value) if schema is None else schema.decode(ids[index], value)
+            if type(value) is float and value == value:
+                values[index] = value
+            else:
+                if isinstance(value, (bool, int)):
+                    values[index] = float(value)
+                others[index] = value
+        return SIPropertyReadBatch(ids, statuses, values, others)
+
+    @staticmethod
+    def from_results(results: List[SIPropertyReadResult]) -> SIPropertyReadBatch:
+        ids = tuple([result.id for result in results])
+        statuses = array('b', [result.status.value for result in results])
+        values = array('d', [_SI_NAN]) * len(ids)
+        others = {}
+        for index, result in enumerate(results):
+            value = result.value
+            if value is None:
+                continue
+            if type(value) is float and value == value:
+                values[index] = value
+            else:
+                if isinstance(value, (bool, int)):
+                    values[index] = float(value)
+                others[index] = value
+        return SIPropertyReadBatch(ids, statuses, values, others)
+
+    @staticmethod
+    def concatenate(batches: List[SIPropertyReadBatch]) -> SIPropertyReadBatch:
+        ids = []
+        statuses = array('b')
+        values = array('d')
+        others = {}
+        for batch in batches:
+            offset = len(ids)
+            ids.extend(batch.ids)
+            statuses.extend(batch.statuses)
+            values.extend(batch.values)
+            others.update((offset + index, value) for index, value in batch.__others.items())
+        return SIPropertyReadBatch(tuple(ids), statuses, values, others)
+
+
+class SIPropertyUpdate:
+    """
+    The SIPropertyUpdate class represents a value change of a subscribed property as returned by
+    SIGatewayClient.poll_events().
+    """
+
+    __slots__ = ('id', 'value')
+
+    def __init__(self, id_: str, value: Optional[any]):
+        self.id = id_
+        """
+        ID of the property that changed.
+        """
+
+        self.value = value
+        """
+        New value of the property.
+        """
+
+    def to_tuple(self) -> Tuple[str, Optional[any]]:
+        return self.id, self.value
+
+
+class SIPropertyUpdateBatch:
+    """
+    The SIPropertyUpdateBatch class is a compact, column oriented alternative to a list of SIPropertyUpdate objects used
+    for batched property updates, see SIUpdateBatching.
+
+    The IDs of the properties are stored in a tuple and the values as floats in an array of doubles, NaN where a
+    property has no numeric value. Iterating or indexing the batch creates SIPropertyUpdate objects on demand.
+    """
+
+    __slots__ = ('ids', 'values', '__others')
+
+    def __init__(self, ids: Tuple[str, ...], values: array, others: Optional[Dict[int, any]] = None):
+        self.ids = ids
+        """
+        IDs of the properties that changed, in the order the updates were received.
+        """
+
+        self.values = values
+        """
+        New values as array('d'), NaN if the property has no value or the value is not numeric.
+        """
+
+        self.__others = others if others is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SIPropertyUpdate, List[SIPropertyUpdate]]:
+        if isinstance(index, slice):
+            return [self[index] for index in range(len(self.ids))[index]]
+        index = range(len(self.ids))[index]
+        if index in self.__others:
+            value = self.__others[index]
+        else:
+            value = self.values[index]
+            if value != value:
+                value = None
+        return SIPropertyUpdate(self.ids[index], value)
+
+    def __iter__(self) -> Iterator[SIPropertyUpdate]:
+        for index in range(len(self.ids)):
+            yield self[index]
+
+    def to_list(self) -> List[SIPropertyUpdate]:
+        """
+        Converts the batch to the list of updates on_properties_updated() receives without columnar batching.
+
+        :return: List of SIPropertyUpdate objects in the order the updates were received.
+        """
+
+        return list(self)
+
+    @staticmethod
+    def from_updates(ids: List[str], values: List[any]) -> SIPropertyUpdateBatch:
+        """
+        Creates a batch from the IDs and the decoded values of property updates.
+
+        :param ids: IDs of the properties that changed, in the order the updates were received.
+        :param values: New values of the properties, in the same order as the IDs.
+        :return: New batch holding the updates.
+        """
+
+        floats = array('d', [_SI_NAN]) * len(ids)
+        others = {}
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            if type(value) is float and value == value:
+                floats[index] = value
+            else:
+                if isinstance(value, (bool, int)):
+                    floats[index] = float(value)
+                others[index] = value
+        return SIPropertyUpdateBatch(tuple(ids), floats, others)
+
+
+class SIDatalogArrays:
+    """
+    The SIDatalogArrays class holds logged data of a property in columns, an alternative to the CSV text returned by
+    read_datalog_csv() for code doing computations on the data.
+
+    The times are stored as seconds since the epoch and the values as floats, each in an array of doubles, so that
+    numpy.frombuffer() can wrap them without copying. Values that can not be represented by a float are NaN in the
+    values array and kept with their row index in a list on the side.
+    """
+
+    __slots__ = ('timestamps', 'values', 'others')
+
+    def __init__(self, timestamps: array, values: array, others: Optional[List[Tuple[int, any]]] = None):
+        self.timestamps = timestamps
+        """
+        Times of the logged values in seconds since the epoch as array('d'), times without UTC offset are UTC.
+        """
+
+        self.values = values
+        """
+        Logged values as array('d'), NaN if the value is not numeric. Booleans are stored as 0.0 and 1.0.
+        """
+
+        self.others = others if others is not None else []
+        """
+        Row index and value of all values that are not numbers, in row order.
+        """
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def from_csv(csv: str) -> SIDatalogArrays:
+        """
+        Converts the CSV body of a DATALOG READ response to arrays.
+
+        :param csv: Rows of the form '{timestamp},{value}' separated by newlines, as returned by read_datalog_csv().
+        :return: New SIDatalogArrays object holding the rows, empty if the CSV has no rows.
+        :raises SIProtocolError: If a row has no value or a timestamp can not be parsed.
+        """
+
+        csv = csv.strip('\r\n')
+        if not csv:
+            return SIDatalogArrays(array('d'), array('d'))
+
+        # The whole body is split into fields at once, rows are only split one by one if a value contains a comma.
+        fields = csv.replace('\n', ',').split(',')
+        if len(fields) != 2 * (csv.count('\n') + 1):
+            fields = [field for row in csv.split('\n') for field in row.split(',', 1)]
+            if len(fields) % 2 != 0:
+                raise SIProtocolError('invalid datalog body')
+
+        # Timestamps without fraction and UTC offset are split into minute and seconds using C level maps, the start of
+        # every minute is only computed once. Other timestamps are converted one by one.
+        stamps = fields[0::2]
+        try:
+            if set(map(len, stamps)) == {19}:
+                minutes = list(map(operator.itemgetter(slice(0, 16)), stamps))
+                epochs = {minute: _si_epoch_seconds(minute) for minute in set(minutes)}
+                seconds = map(_SI_SECONDS.__getitem__, map(operator.itemgetter(slice(17, 19)), stamps))
+                timestamps = array('d', map(operator.add, map(epochs.__getitem__, minutes), seconds))
+            else:
+                timestamps = array('d', map(_si_epoch_seconds, stamps))
+        except (KeyError, ValueError):
+            raise SIProtocolError('invalid datalog body')
+
+        # All values are converted in a single call, only if one of them is not a number they are converted one by one.
+        try:
+            values = array('d', map(float, fields[1::2]))
+            others = []
+        except ValueError:
+            values = array('d', [_SI_NAN]) * len(timestamps)
+            others = []
+            for index, value in enumerate(fields[1::2]):
+                value = _si_decode_value(value.strip())
+                if type(value) is float:
+                    values[index] = value
+                else:
+                    if isinstance(value, bool):
+                        values[index] = float(value)
+                    others.append((index, value))
+        return SIDatalogArrays(timestamps, values, others)
+
+
+class _SIDatalogPager:
+    # Walks a datalog time range page by page. The gateway includes rows logged at the from time, so every page starts
+    # with the rows of the last timestamp of the previous page, those already returned are removed.
+    def __init__(self, from_: Optional[datetime.datetime], page_size: int):
+        if page_size < 1:
+            raise SIProtocolError('invalid page size: {page_size}'.format(page_size=page_size))
+        self.__from: Optional[datetime.datetime] = from_
+        self.__page_size: int = page_size
+        self.__limit: int = page_size
+        self.__last: Optional[str] = None
+        self.__returned_at_last: int = 0
+        self.__done: bool = False
+
+    def done(self) -> bool:
+        return self.__done
+
+    def next_from(self) -> Optional[datetime.datetime]:
+        return self.__from
+
+    def next_limit(self) -> int:
+        return self.__limit
+
+    def page(self, csv: str) -> str:
+        csv = csv.strip('\r\n')
+        rows = csv.split('\n') if csv else []
+        if len(rows) < self.__limit:
+            self.__done = True
+
+        # Skip the rows returned already, the timestamps are all in the same ISO 8601 format and compare as strings.
+        skip, skipped_at_last = 0, 0
+        if self.__last is not None:
+            while skip < len(rows):
+                timestamp = rows[skip].split(',', 1)[0]
+                if timestamp == self.__last and skipped_at_last < self.__returned_at_last:
+                    skipped_at_last += 1
+                elif timestamp >= self.__last:
+                    break
+                skip += 1
+        if self.__done:
+            return '\n'.join(rows[skip:])
+
+        # The next page starts at the last timestamp of this page. If there is no new row, more rows than the limit
+        # share this timestamp, so the same page is requested again with a doubled limit until there are new rows.
+        if skip == len(rows):
+            self.__limit *= 2
+            return ''
+        last = rows[-1].split(',', 1)[0]
+        if last != self.__last:
+            self.__limit = self.__page_size
+        returned_at_last = 0
+        while returned_at_last < len(rows) and rows[-1 - returned_at_last].split(',', 1)[0] == last:
+            returned_at_last += 1
+        self.__from = _si_parse_timestamp(last)
+        self.__last, self.__returned_at_last = last, returned_at_last
+        return '\n'.join(rows[skip:])
+
+
 class SIPropertySubscriptionResult:
     """
     The SIDPropertyReadResult class represents the status of a property subscription/unsubscription.
     """
 
+    __slots__ = ('status', 'id')
+
     def __init__(self, status: SIStatus, id_: str):
         self.status = status
         """
@@ -363,489 +802,3498 @@ class SIPropertySubscriptionResult:
             raise SIProtocolError('invalid json body')
 
 
-class _SIAbstractGatewayClient:
-    def __init__(self):
-        super(_SIAbstractGatewayClient, self).__init__()
+_SI_NAN = float('nan')
+_SI_MINIMAL_RECEIVE_TIMEOUT = 0.001
+_SI_SECONDS = {'{second:02}'.format(second=second): float(second) for second in range(61)}
+_SI_STATUS_ORDINALS = {string: SIStatus.from_string(string).value for string in
+                       ['Success', 'InProgress', 'Error', 'NoProperty', 'NoDevice', 'NoDeviceAccess', 'Timeout',
+                        'InvalidValue']}
 
-    @staticmethod
-    def encode_authorize_frame_without_credentials() -> str:
-        return 'AUTHORIZE\nprotocol_version:1\n\n'
 
-    @staticmethod
-    def encode_authorize_frame_with_credentials(user: str, password: str) -> str:
-        return 'AUTHORIZE\nuser:{user}\npassword:{password}\nprotocol_version:1\n\n'.format(user=user,
-                                                                                            password=password)
+def _si_concatenate_lists(lists: List[list]) -> list:
+    return list(itertools.chain.from_iterable(lists))
 
-    @staticmethod
-    def decode_authorized_frame(frame: str) -> Tuple[SIAccessLevel, str, List[str]]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'AUTHORIZED' and 'access_level' in headers and 'protocol_version' in headers and \
-                'gateway_version' in headers:
-            extensions = []
-            if 'extensions' in headers:
-                extensions = headers['extensions'].split(',')
-            if headers['protocol_version'] == '1':
-                return SIAccessLevel.from_string(headers['access_level']), headers['gateway_version'], extensions
-            else:
-                raise SIProtocolError('protocol version 1 not supported by server')
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during authorization')
 
-    @staticmethod
-    def encode_enumerate_frame() -> str:
-        return 'ENUMERATE\n\n'
+def _si_intern(value: any) -> any:
+    # Access and device IDs repeat in every message, so share a single string instance among all of them.
+    return sys.intern(value) if type(value) is str else value
 
-    @staticmethod
-    def decode_enumerated_frame(frame: str) -> Tuple[SIStatus, int]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'ENUMERATED' and 'status' in headers and 'device_count' in headers:
-            return SIStatus.from_string(headers['status']), int(headers['device_count'])
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
+
+def _si_decode_value(value: any) -> any:
+    # Generic conversion used for properties of unknown type: numbers, then booleans, then strings.
+    try:
+        return float(value)
+    except ValueError:
+        string = value.lower()
+        if string == 'true':
+            return True
+        elif string == 'false':
+            return False
         else:
-            raise SIProtocolError('unknown error during device enumeration')
+            return string
 
-    @staticmethod
-    def encode_describe_frame(device_access_id: Optional[str], device_id: Optional[str], property_id: Optional[int],
-                              flags: Optional[SIDescriptionFlags]) -> str:
-        frame = 'DESCRIBE\n'
-        if device_access_id is not None:
-            frame += 'id:{device_access_id}'.format(device_access_id=device_access_id)
-            if device_id is not None:
-                frame += '.{device_id}'.format(device_id=device_id)
-                if property_id is not None:
-                    frame += '.{property_id}'.format(property_id=property_id)
-            frame += '\n'
-        if flags is not None and isinstance(flags, SIDescriptionFlags):
-            frame += 'flags:'
-            if flags & SIDescriptionFlags.INCLUDE_ACCESS_INFORMATION:
-                frame += 'IncludeAccessInformation,'
-            if flags & SIDescriptionFlags.INCLUDE_DEVICE_INFORMATION:
-                frame += 'IncludeDeviceInformation,'
-            if flags & SIDescriptionFlags.INCLUDE_PROPERTY_INFORMATION:
-                frame += 'IncludePropertyInformation,'
-            if flags & SIDescriptionFlags.INCLUDE_DRIVER_INFORMATION:
-                frame += 'IncludeDriverInformation,'
-            frame = frame[:-1]
-            frame += '\n'
-        frame += '\n'
-        return frame
 
-    @staticmethod
-    def decode_description_frame(frame: str) -> Tuple[SIStatus, Optional[str], object]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'DESCRIPTION' and 'status' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                description = json.loads(body)
-                return status, headers.get('id', None), description
-            else:
-                return status, headers.get('id', None), {}
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
+def _si_parse_timestamp(timestamp: str) -> datetime.datetime:
+    if timestamp.endswith('Z'):
+        timestamp = timestamp[:-1] + '+00:00'
+    try:
+        return datetime.datetime.fromisoformat(timestamp)
+    except ValueError:
+        raise SIProtocolError('invalid timestamp: {timestamp}'.format(timestamp=timestamp))
+
+
+def _si_epoch_seconds(timestamp: str) -> float:
+    # ISO 8601 timestamps without UTC offset are UTC, as all timestamps sent by the gateway.
+    value = _si_parse_timestamp(timestamp)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+def _si_decode_bool(value: any) -> bool:
+    if isinstance(value, str):
+        string = value.lower()
+        if string == 'true' or string == '1':
+            return True
+        elif string == 'false' or string == '0':
+            return False
         else:
-            raise SIProtocolError('unknown error during description')
+            raise ValueError('invalid boolean value')
+    return bool(value)
 
-    @staticmethod
-    def encode_find_properties_frame(property_id: str, virtual: Optional[bool] = None,
-                                     functions: Optional[SIDeviceFunctions] = None) -> str:
-        frame = 'FIND PROPERTIES\nid:{property_id}\n'.format(property_id=property_id)
-        if virtual is not None and isinstance(virtual, bool):
-            frame += 'virtual:'
-            if virtual:
-                frame += 'true'
-            else:
-                frame += 'false'
-            frame += '\n'
-        if functions is not None and isinstance(functions, SIDeviceFunctions):
-            frame += 'functions:'
-            if functions & SIDeviceFunctions.INVERTER:
-                frame += 'inverter,'
-            if functions & SIDeviceFunctions.CHARGER:
-                frame += 'charger,'
-            if functions & SIDeviceFunctions.SOLAR:
-                frame += 'solar,'
-            if functions & SIDeviceFunctions.TRANSFER:
-                frame += 'transfer,'
-            if functions & SIDeviceFunctions.BATTERY:
-                frame += 'battery,'
-            if functions & SIDeviceFunctions.ALL:
-                frame += 'all,'
-            frame = frame[:-1]
-            frame += '\n'
-        frame += '\n'
-        return frame
 
-    @staticmethod
-    def decode_properties_found_frame(frame: str) -> (SIStatus, str, int, List[str], bool, SIDeviceFunctions):
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTIES FOUND' and 'status' in headers and 'id' in headers and 'count' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                properties = json.loads(body)
-                virtual = False
-                if 'virtual' in headers:
-                    virtual = headers.get('virtual') == 'true'
-                functions = SIDeviceFunctions.ALL
-                if 'functions' in headers:
-                    functions_str: str = headers.get('functions')
-                    functions = SIDeviceFunctions.NONE
-                    if functions_str.find('all') >= 0:
-                        functions |= SIDeviceFunctions.ALL
-                    else:
-                        if functions_str.find('inverter') >= 0:
-                            functions |= SIDeviceFunctions.INVERTER
-                        if functions_str.find('charger') >= 0:
-                            functions |= SIDeviceFunctions.CHARGER
-                        if functions_str.find('solar') >= 0:
-                            functions |= SIDeviceFunctions.SOLAR
-                        if functions_str.find('transfer') >= 0:
-                            functions |= SIDeviceFunctions.TRANSFER
-                        if functions_str.find('battery') >= 0:
-                            functions |= SIDeviceFunctions.BATTERY
-                return status, headers.get('id'), int(headers.get('count', 0)), virtual, functions, properties
-            else:
-                return status, headers.get('id'), int(headers.get('count', 0)), False, SIDeviceFunctions.ALL, []
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during finding properties')
+def _si_decode_string(value: any) -> str:
+    return str(value).lower()
 
-    @staticmethod
-    def encode_read_property_frame(property_id: str) -> str:
-        return 'READ PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
 
-    @staticmethod
-    def decode_property_read_frame(frame: str) -> SIPropertyReadResult:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTY READ' and 'status' in headers and 'id' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS and 'value' in headers:
-                try:
-                    value = float(headers['value'])
-                except ValueError:
-                    string = headers['value'].lower()
-                    if string == 'true':
-                        value = True
-                    elif string == 'false':
-                        value = False
-                    else:
-                        value = string
-                return SIPropertyReadResult(status, headers['id'], value)
-            else:
-                return SIPropertyReadResult(status, headers['id'], None)
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during property read')
+def _si_decode_signal(_: any) -> None:
+    return None
 
-    @staticmethod
-    def encode_read_properties_frame(property_ids: List[str]) -> str:
-        return 'READ PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
 
-    @staticmethod
-    def decode_properties_read_frame(frame: str) -> List[SIPropertyReadResult]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTIES READ' and 'status' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                return json.loads(body, object_hook=SIPropertyReadResult.from_dict)
-            else:
-                raise SIProtocolError(f'error during property read, status={headers["status"]}')
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during properties read')
+_SI_PROPERTY_TYPE_DECODERS = {
+    'float': float,
+    'enum': int,
+    'bool': _si_decode_bool,
+    'string': _si_decode_string,
+    'signal': _si_decode_signal
+}
 
-    @staticmethod
-    def encode_write_property_frame(property_id: str, value: Optional[any], flags: Optional[SIWriteFlags]) -> str:
-        frame = 'WRITE PROPERTY\nid:{property_id}\n'.format(property_id=property_id)
-        if flags is not None and isinstance(flags, SIWriteFlags):
-            frame += 'flags:'
-            if flags & SIWriteFlags.PERMANENT:
-                frame += 'Permanent'
-            frame += '\n'
-        if value is not None:
-            frame += 'value:{value}\n'.format(value=value)
-        frame += '\n'
-        return frame
 
-    @staticmethod
-    def decode_property_written_frame(frame: str) -> Tuple[SIStatus, str]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTY WRITTEN' and 'status' in headers and 'id' in headers:
-            return SIStatus.from_string(headers['status']), headers['id']
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during property write')
+class SIPropertySchema:
+    """
+    Registry of property types used to convert property values received from the gateway directly to the right Python
+    type. The registry is filled from description objects returned by describe() using the flag
+    SIDescriptionFlags.INCLUDE_PROPERTY_INFORMATION, or manually using register().
 
-    @staticmethod
-    def encode_subscribe_property_frame(property_id: str) -> str:
-        return 'SUBSCRIBE PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
+    Values of properties of type Float are converted to float, Enum to int, Bool to bool, String to str and Signal to
+    None. Values of properties that are not registered, or whose value does not match the registered type, are
+    converted the same way as without a schema.
+    """
 
-    @staticmethod
-    def decode_property_subscribed_frame(frame: str) -> Tuple[SIStatus, str]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTY SUBSCRIBED' and 'status' in headers and 'id' in headers:
-            return SIStatus.from_string(headers['status']), headers['id']
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during property subscribe')
+    def __init__(self):
+        self.__decoders: Dict[str, Callable[[any], any]] = {}
 
-    @staticmethod
-    def encode_subscribe_properties_frame(property_ids: List[str]) -> str:
-        return 'SUBSCRIBE PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
+    def register(self, property_id: str, type_: str) -> None:
+        """
+        Registers the type of a property. Unknown types are ignored.
 
-    @staticmethod
-    def decode_properties_subscribed_frame(frame: str) -> List[SIPropertySubscriptionResult]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTIES SUBSCRIBED' and 'status' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                return json.loads(body, object_hook=SIPropertySubscriptionResult.from_dict)
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param type_: Type name as reported by the gateway, for example 'Float', 'Enum', 'Bool', 'String' or 'Signal'.
+        """
+
+        decoder = _SI_PROPERTY_TYPE_DECODERS.get(str(type_).lower())
+        if decoder is not None:
+            self.__decoders[property_id] = decoder
+
+    def update(self, subject_id: Optional[str], description: any) -> None:
+        """
+        Registers the types of all properties contained in a description object.
+
+        :param subject_id: The ID of the description's subject, None if the subject was the gateway itself.
+        :param description: The description object as returned by describe().
+        """
+
+        self.__update(tuple(subject_id.split('.')) if subject_id else (), description)
+
+    def decode(self, property_id: str, value: any) -> any:
+        """
+        Converts a property value received from the gateway to the property's type.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param value: Value as received from the gateway.
+        :return: The converted value.
+        """
+
+        decoder = self.__decoders.get(property_id)
+        if decoder is not None:
+            try:
+                return decoder(value)
+            except (ValueError, TypeError):
+                pass
+        return _si_decode_value(value)
+
+    def clear(self) -> None:
+        """
+        Removes all registered property types.
+        """
+
+        self.__decoders.clear()
+
+    def __contains__(self, property_id: str) -> bool:
+        return property_id in self.__decoders
+
+    def __len__(self) -> int:
+        return len(self.__decoders)
+
+    def __update(self, path: Tuple[str, ...], node: any) -> None:
+        if isinstance(node, list):
+            for child in node:
+                self.__update(path, child)
+        elif isinstance(node, dict):
+            if len(path) == 3 and 'type' in node:
+                self.register('.'.join(path), node['type'])
+            for key in ('instances', 'devices', 'properties'):
+                for child in node.get(key, None) or []:
+                    if isinstance(child, dict) and 'id' in child:
+                        self.__update(path + (str(child['id']),), child)
+
+
+class SIPropertyCache:
+    """
+    Read-through cache for property values used by SIGatewayClient and SIAsyncGatewayClient, see the cache parameter
+    of their constructors.
+
+    Successful reads are kept for a time to live (TTL) that can be configured per property ID or per pattern using
+    shell-style wildcards ('demo.inv.*'). The cache holds at most max_size properties, the least recently used one is
+    evicted first. An entry is invalidated as soon as the property is written successfully or a property update for it
+    is received.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_size: int = 1024, ttls: Optional[Dict[str, float]] = None):
+        """
+        :param ttl: Default time to live in seconds of cached values.
+        :param max_size: Maximal number of properties cached.
+        :param ttls: Optional time to live in seconds by property ID or pattern, exact property IDs take precedence,
+               patterns are tried in order. A TTL of 0 disables caching for the matching properties.
+        """
+
+        self.__ttl: float = ttl
+        self.__max_size: int = max_size
+        self.__ttls: Dict[str, float] = {}
+        self.__patterns: List[Tuple[Callable[[str], any], float]] = []
+        for key, value in (ttls or {}).items():
+            if any(character in key for character in '*?['):
+                self.__patterns.append((re.compile(fnmatch.translate(key)).match, value))
             else:
-                raise SIProtocolError(f'error during properties read, status={headers["status"]}')
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during properties subscribe')
+                self.__ttls[key] = value
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def get(self, property_id: str) -> Optional[SIPropertyReadResult]:
+        """
+        Returns the cached result of a property read and counts the lookup as a hit or a miss.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :return: A new result object with the cached status and value, or None if the property is not cached or its
+                 value expired.
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(property_id)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.__entries.move_to_end(property_id)
+                    self.__hits += 1
+                    return SIPropertyReadResult(*entry[1])
+                del self.__entries[property_id]
+            self.__misses += 1
+            return None
 
-    @staticmethod
-    def encode_unsubscribe_property_frame(property_id: str) -> str:
-        return 'UNSUBSCRIBE PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
+    def put(self, result: SIPropertyReadResult) -> None:
+        """
+        Adds the result of a property read to the cache, results of failed reads are ignored.
 
-    @staticmethod
-    def decode_property_unsubscribed_frame(frame: str) -> Tuple[SIStatus, str]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTY UNSUBSCRIBED' and 'status' in headers and 'id' in headers:
-            return SIStatus.from_string(headers['status']), headers['id']
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
+        :param result: Result of the property read.
+        """
+
+        if result.status != SIStatus.SUCCESS:
+            return
+        ttl = self.ttl(result.id)
+        if ttl <= 0:
+            return
+        with self.__lock:
+            # Only the fields are kept, so that callers changing the result objects can not change the cache.
+            self.__entries[result.id] = (time.monotonic() + ttl, result.to_tuple())
+            self.__entries.move_to_end(result.id)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, property_id: str) -> None:
+        """
+        Removes a property from the cache.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        """
+
+        with self.__lock:
+            self.__entries.pop(property_id, None)
+
+    def clear(self) -> None:
+        """
+        Removes all properties from the cache, the hit and miss counters are not reset.
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+
+    def ttl(self, property_id: str) -> float:
+        """
+        Returns the time to live used for a property.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :return: Time to live in seconds.
+        """
+
+        ttl = self.__ttls.get(property_id)
+        if ttl is not None:
+            return ttl
+        for match, ttl in self.__patterns:
+            if match(property_id):
+                return ttl
+        return self.__ttl
+
+    def hits(self) -> int:
+        """
+        Returns the number of lookups answered from the cache.
+
+        :return: Number of cache hits.
+        """
+
+        return self.__hits
+
+    def misses(self) -> int:
+        """
+        Returns the number of lookups that had to be forwarded to the gateway.
+
+        :return: Number of cache misses.
+        """
+
+        return self.__misses
+
+    def __contains__(self, property_id: str) -> bool:
+        with self.__lock:
+            entry = self.__entries.get(property_id)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+
+class _SIRingBuffer:
+    __slots__ = ('timestamps', 'values', 'start', 'count')
+
+    def __init__(self, capacity: int):
+        self.timestamps: array = array('d', [0.0]) * capacity
+        self.values: array = array('d', [0.0]) * capacity
+        self.start: int = 0
+        self.count: int = 0
+
+    def append(self, timestamp: float, value: float) -> None:
+        capacity = len(self.timestamps)
+        if self.count < capacity:
+            index = (self.start + self.count) % capacity
+            self.count += 1
         else:
-            raise SIProtocolError('unknown error during property unsubscribe')
+            index = self.start
+            self.start = (self.start + 1) % capacity
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+
+    def last_timestamp(self) -> float:
+        return self.timestamps[(self.start + self.count - 1) % len(self.timestamps)]
+
+    def window(self, since: float, until: float) -> Tuple[array, array]:
+        # The samples are stored in at most two contiguous, sorted segments, each one is searched using bisection and
+        # copied using slicing.
+        capacity = len(self.timestamps)
+        end = self.start + self.count
+        if end <= capacity:
+            segments = [(self.start, end)]
+        else:
+            segments = [(self.start, capacity), (0, end - capacity)]
+        timestamps, values = array('d'), array('d')
+        for low, high in segments:
+            low = bisect.bisect_left(self.timestamps, since, low, high)
+            high = bisect.bisect_right(self.timestamps, until, low, high)
+            timestamps += self.timestamps[low:high]
+            values += self.values[low:high]
+        return timestamps, values
+
+
+# Aggregation functions of SIPropertyHistory.resample(), all of them run in C over the samples of a bucket.
+_SI_HISTORY_AGGREGATES = {
+    'mean': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'first': lambda values: values[0],
+    'last': lambda values: values[-1],
+    'count': lambda values: float(len(values))
+}
+
+
+class SIPropertyHistory:
+    """
+    Store for the recent history of property values used by SIAsyncGatewayClient and SIBluetoothGatewayClient, see the
+    history parameter of their constructors.
 
-    @staticmethod
-    def encode_unsubscribe_properties_frame(property_ids: List[str]) -> str:
-        return 'UNSUBSCRIBE PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
+    The store keeps a ring buffer of fixed capacity per property, the receive times (seconds since the epoch) and the
+    values are stored as floats in preallocated arrays of doubles, so memory does not grow once a buffer is full.
+    Values that are not numeric are not recorded, booleans are recorded as 0.0 and 1.0.
 
-    @staticmethod
-    def decode_properties_unsubscribed_frame(frame: str) -> List[SIPropertySubscriptionResult]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTIES UNSUBSCRIBED' and 'status' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                return json.loads(body, object_hook=SIPropertySubscriptionResult.from_dict)
+    window() and resample() return arrays of doubles, use numpy.frombuffer() to get NumPy arrays without copying.
+    """
+
+    def __init__(self, capacity: int = 3600, property_ids: Optional[List[str]] = None):
+        """
+        :param capacity: Number of samples kept per property.
+        :param property_ids: Optional IDs of the properties to record, None (default) records all properties updated.
+        """
+
+        self.__capacity: int = capacity
+        self.__property_ids: Optional[Dict[str, None]] = dict.fromkeys(property_ids) \
+            if property_ids is not None else None
+        self.__buffers: Dict[str, _SIRingBuffer] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def record(self, property_id: str, value: any, timestamp: Optional[float] = None) -> None:
+        """
+        Records a value of a property, the clients call this method for every property update received.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param value: Value of the property, ignored if it is not numeric.
+        :param timestamp: Time of the sample in seconds since the epoch, defaults to the current time. Timestamps
+               older than the last sample of the property are moved to the time of the last sample.
+        """
+
+        if not isinstance(value, (float, int)) or \
+                (self.__property_ids is not None and property_id not in self.__property_ids):
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        with self.__lock:
+            buffer = self.__buffers.get(property_id)
+            if buffer is None:
+                buffer = self.__buffers[property_id] = _SIRingBuffer(self.__capacity)
+            elif buffer.count > 0:
+                timestamp = max(timestamp, buffer.last_timestamp())
+            buffer.append(timestamp, float(value))
+
+    def property_ids(self) -> List[str]:
+        """
+        Returns the IDs of the properties with recorded samples.
+
+        :return: List of property IDs.
+        """
+
+        with self.__lock:
+            return list(self.__buffers)
+
+    def count(self, property_id: str) -> int:
+        """
+        Returns the number of samples recorded for a property.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :return: Number of samples, at most the capacity.
+        """
+
+        with self.__lock:
+            buffer = self.__buffers.get(property_id)
+            return buffer.count if buffer is not None else 0
+
+    def window(self, property_id: str, since: Optional[float] = None,
+               until: Optional[float] = None) -> Tuple[array, array]:
+        """
+        Returns the samples of a property recorded in the given time window.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param since: Optional start of the window in seconds since the epoch, defaults to the oldest sample.
+        :param until: Optional end of the window (inclusive) in seconds since the epoch, defaults to the newest sample.
+        :return: Timestamps and values as array('d'), in chronological order.
+        """
+
+        since = -math.inf if since is None else since
+        until = math.inf if until is None else until
+        with self.__lock:
+            buffer = self.__buffers.get(property_id)
+            if buffer is None:
+                return array('d'), array('d')
+            return buffer.window(since, until)
+
+    def resample(self, property_id: str, step: float, agg: str = 'mean', since: Optional[float] = None,
+                 until: Optional[float] = None) -> Tuple[array, array]:
+        """
+        Aggregates the samples of a property in the given time window into buckets of the given duration. Buckets are
+        aligned to multiples of step since the epoch, buckets without samples are omitted.
+
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param step: Duration of a bucket in seconds.
+        :param agg: Aggregation of the samples of a bucket, one of 'mean' (default), 'min', 'max', 'sum', 'first',
+               'last' or 'count'.
+        :param since: Optional start of the window in seconds since the epoch, defaults to the oldest sample.
+        :param until: Optional end of the window (inclusive) in seconds since the epoch, defaults to the newest sample.
+        :return: Start times of the buckets and aggregated values as array('d').
+        :raises SIProtocolError: If the aggregation is unknown.
+        """
+
+        aggregate = _SI_HISTORY_AGGREGATES.get(agg)
+        if aggregate is None:
+            raise SIProtocolError('unknown aggregation: {agg}'.format(agg=agg))
+        timestamps, values = self.window(property_id, since, until)
+
+        # Only the buckets are iterated in Python, the samples of each bucket are found using bisection.
+        starts, results = array('d'), array('d')
+        low = 0
+        while low < len(timestamps):
+            start = math.floor(timestamps[low] / step) * step
+            high = bisect.bisect_left(timestamps, start + step, low)
+            starts.append(start)
+            results.append(aggregate(values[low:high]))
+            low = high
+        return starts, results
+
+    def clear(self, property_id: Optional[str] = None) -> None:
+        """
+        Removes the samples of a property or of all properties.
+
+        :param property_id: Optional ID of the property, None (default) clears the samples of all properties.
+        """
+
+        with self.__lock:
+            if property_id is None:
+                self.__buffers.clear()
             else:
-                raise SIProtocolError(f'error during properties unsubscribe, status={headers["status"]}')
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during properties unsubscribe')
+                self.__buffers.pop(property_id, None)
+
+
+class SIReconnectPolicy:
+    """
+    Policy used by SIAsyncGatewayClient and SIBluetoothGatewayClient to reconnect automatically once the connection to
+    the gateway was lost, see the reconnect parameter of their constructors.
+
+    The delay between two connection attempts grows exponentially from initial_delay up to max_delay. A random part of
+    the delay (jitter) avoids that many clients reconnect to the same gateway at the same time.
+    """
+
+    def __init__(self, initial_delay: float = 1.0, max_delay: float = 60.0, multiplier: float = 2.0,
+                 jitter: float = 0.5, max_attempts: Optional[int] = None):
+        """
+        :param initial_delay: Delay in seconds before the first connection attempt.
+        :param max_delay: Maximal delay in seconds between two connection attempts.
+        :param multiplier: Factor the delay grows by after each failed connection attempt.
+        :param jitter: Part of the delay (0 to 1) that is randomized, 0.5 waits between 50% and 100% of the delay.
+        :param max_attempts: Maximal number of successive connection attempts, None (default) retries forever.
+        """
+
+        self.initial_delay: float = initial_delay
+        self.max_delay: float = max_delay
+        self.multiplier: float = multiplier
+        self.jitter: float = jitter
+        self.max_attempts: Optional[int] = max_attempts
+
+    def delay(self, attempt: int) -> Optional[float]:
+        """
+        Returns the time to wait before a connection attempt.
+
+        :param attempt: Number of the connection attempt since the connection was lost, starting at 1.
+        :return: Delay in seconds or None if the client should give up.
+        """
+
+        if self.max_attempts is not None and attempt > self.max_attempts:
+            return None
+        delay = min(self.initial_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        return delay * (1.0 - self.jitter * random.random())
+
+
+class SIUpdateBatching:
+    """
+    Configures the batched delivery of property updates by SIAsyncGatewayClient and SIBluetoothGatewayClient, see the
+    batching parameter of their constructors.
+
+    Property updates are collected and reported using a single call to on_properties_updated() once max_size updates
+    were received or max_delay seconds after the first update of the batch, whichever comes first. The callback is
+    called from the client's flush thread if the batch is not full, use a queuing dispatcher if the callback is not
+    thread-safe.
+    """
+
+    def __init__(self, max_size: int = 1000, max_delay: float = 0.01, columnar: bool = False):
+        """
+        :param max_size: Maximal number of updates in a batch.
+        :param max_delay: Maximal time in seconds an update is held back.
+        :param columnar: If true, batches are reported as SIPropertyUpdateBatch, otherwise as list of SIPropertyUpdate.
+        """
+
+        self.max_size: int = max_size
+        self.max_delay: float = max_delay
+        self.columnar: bool = columnar
+
+
+class _SIUpdateBatcher:
+    def __init__(self, batching: SIUpdateBatching, deliver: Callable[[any], None],
+                 schedule: Callable[[float, Callable[[], None]], None]):
+        self.__batching: SIUpdateBatching = batching
+        self.__deliver: Callable[[any], None] = deliver
+        self.__schedule: Callable[[float, Callable[[], None]], None] = schedule
+        self.__ids: List[str] = []
+        self.__values: List[any] = []
+        self.__lock: threading.Lock = threading.Lock()
+
+    def add(self, id_: str, value: any) -> None:
+        with self.__lock:
+            self.__ids.append(id_)
+            self.__values.append(value)
+            count = len(self.__ids)
+            batch = self.__take() if count >= self.__batching.max_size else None
+
+        # A full batch is delivered at once, the first update of a new batch starts the timer. A timer that fires after
+        # its batch was delivered just delivers the next batch earlier.
+        if batch is not None:
+            self.__deliver(batch)
+        elif count == 1:
+            self.__schedule(self.__batching.max_delay, self.flush)
+
+    def flush(self) -> None:
+        with self.__lock:
+            batch = self.__take() if self.__ids else None
+        if batch is not None:
+            self.__deliver(batch)
+
+    def __take(self) -> any:
+        # Must be called with the lock held.
+        ids, values = self.__ids, self.__values
+        self.__ids, self.__values = [], []
+        if self.__batching.columnar:
+            return SIPropertyUpdateBatch.from_updates(ids, values)
+        return [SIPropertyUpdate(id_, value) for id_, value in zip(ids, values)]
+
+
+class _SIFlushTimer:
+    # Calls a function once a deadline has passed from a single long-lived thread, started on first use and ended by
+    # stop(). Only the earliest pending deadline is kept, so a later batch is at worst flushed together with an earlier
+    # one, like with a timer firing after its batch was delivered.
+    def __init__(self):
+        self.__condition: threading.Condition = threading.Condition()
+        self.__deadline: Optional[float] = None
+        self.__function: Optional[Callable[[], None]] = None
+        self.__thread: Optional[Thread] = None
+
+    def start(self, delay: float, function: Callable[[], None]) -> None:
+        with self.__condition:
+            deadline = time.monotonic() + delay
+            if self.__deadline is None or deadline < self.__deadline:
+                self.__deadline, self.__function = deadline, function
+                self.__condition.notify()
+            if self.__thread is None:
+                self.__thread = Thread(target=self.__run, daemon=True)
+                self.__thread.start()
+
+    def stop(self) -> None:
+        with self.__condition:
+            self.__deadline, self.__function, self.__thread = None, None, None
+            self.__condition.notify()
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__thread is threading.current_thread():
+                    remaining = None if self.__deadline is None else self.__deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+                if self.__thread is not threading.current_thread():
+                    return
+                function, self.__deadline, self.__function = self.__function, None, None
+            function()
+
+
+class SIBackpressure(Enum):
+    """
+    Defines what a queuing callback dispatcher does when a callback is dispatched while its queue is full.
+
+    - **SIBackpressure.BLOCK**: The thread receiving the frames waits until there is space in the queue, no callback
+      is lost but frame reception stalls as long as the callbacks are slower than the gateway.
+    - **SIBackpressure.DROP_OLDEST**: The oldest queued callback is dropped to make space for the new one.
+    - **SIBackpressure.CONFLATE**: A property update replaces the queued update of the same property, so only the
+      latest value is reported. If the queue is full anyway, the oldest queued callback is dropped.
+    """
+
+    BLOCK = auto()
+    DROP_OLDEST = auto()
+    CONFLATE = auto()
+
+
+class SICallbackDispatcher:
+    """
+    Calls the callbacks of SIAsyncGatewayClient and SIBluetoothGatewayClient, see the dispatcher parameter of their
+    constructors.
+
+    This dispatcher calls the callbacks inline on the thread receiving the frames, which is the default. A slow
+    callback then delays the reception of all following frames, use one of the queuing dispatchers
+    SIQueueCallbackDispatcher, SIThreadPoolCallbackDispatcher or SIAsyncioCallbackDispatcher to decouple them.
+    """
+
+    def dispatch(self, callback: Callable, arguments: tuple, key: Optional[any] = None) -> None:
+        """
+        Calls or schedules the call of a callback.
+
+        :param callback: Callback to call.
+        :param arguments: Arguments to pass to the callback.
+        :param key: Key identifying events that can be conflated, the ID of the property for property updates, None
+               for all other callbacks.
+        """
+
+        callback(*arguments)
+
+    def dropped_events(self) -> int:
+        """
+        Returns the number of callbacks that were dropped because the queue was full, plus the number of property
+        updates that were replaced by a newer update of the same property with SIBackpressure.CONFLATE.
+
+        :return: Number of dropped and conflated callbacks.
+        """
+
+        return 0
+
+
+class SIQueueCallbackDispatcher(SICallbackDispatcher):
+    """
+    Callback dispatcher that queues the callbacks until the application calls them using run_pending(), for example
+    from its main loop.
+    """
+
+    def __init__(self, max_size: int = 1000, backpressure: SIBackpressure = SIBackpressure.BLOCK):
+        """
+        :param max_size: Maximal number of queued callbacks.
+        :param backpressure: What to do if a callback is dispatched while the queue is full, see SIBackpressure.
+        """
+
+        super(SIQueueCallbackDispatcher, self).__init__()
+        self.__max_size: int = max_size
+        self.__backpressure: SIBackpressure = backpressure
+        self.__queue: deque = deque()
+        self.__conflated: Dict[tuple, list] = {}
+        self.__dropped_events: int = 0
+        self.__closed: bool = False
+        self.__lock: threading.Condition = threading.Condition()
+
+    def dispatch(self, callback: Callable, arguments: tuple, key: Optional[any] = None) -> None:
+        with self.__lock:
+            # Replace the arguments of a queued property update of the same property.
+            if self.__backpressure == SIBackpressure.CONFLATE and key is not None:
+                entry = self.__conflated.get((callback, key))
+                if entry is not None:
+                    entry[1] = arguments
+                    self.__dropped_events += 1
+                    return
+
+            # Make space in the queue according to the backpressure policy.
+            if self.__backpressure == SIBackpressure.BLOCK:
+                while len(self.__queue) >= self.__max_size and not self.__closed:
+                    self.__lock.wait()
+            elif len(self.__queue) >= self.__max_size:
+                self.__forget(self.__queue.popleft())
+                self.__dropped_events += 1
+
+            entry = [callback, arguments, key]
+            self.__queue.append(entry)
+            if self.__backpressure == SIBackpressure.CONFLATE and key is not None:
+                self.__conflated[(callback, key)] = entry
+            self.__lock.notify_all()
+
+    def run_pending(self, timeout: Optional[float] = 0, max_count: Optional[int] = None) -> int:
+        """
+        Calls the queued callbacks on the calling thread, in the order they were dispatched.
+
+        :param timeout: Time in seconds to wait for a callback if the queue is empty, 0 (default) returns immediately
+               and None waits until a callback is dispatched or the dispatcher is closed.
+        :param max_count: Maximal number of callbacks to call, None (default) calls all queued callbacks.
+        :return: The number of callbacks called.
+        """
+
+        with self.__lock:
+            if not self.__queue and timeout != 0:
+                self.__lock.wait_for(lambda: self.__queue or self.__closed, timeout)
+        count = 0
+        while max_count is None or count < max_count:
+            with self.__lock:
+                if not self.__queue:
+                    break
+                entry = self.__queue.popleft()
+                self.__forget(entry)
+                self.__lock.notify_all()
+            entry[0](*entry[1])
+            count += 1
+        return count
+
+    def pending(self) -> int:
+        """
+        Returns the number of queued callbacks.
+
+        :return: Number of queued callbacks.
+        """
+
+        with self.__lock:
+            return len(self.__queue)
+
+    def dropped_events(self) -> int:
+        with self.__lock:
+            return self.__dropped_events
+
+    def close(self) -> None:
+        """
+        Closes the dispatcher, wakes up all threads waiting in run_pending() or for space in the queue. Callbacks
+        dispatched after closing are still queued, but never block.
+        """
+
+        with self.__lock:
+            self.__closed = True
+            self.__lock.notify_all()
+
+    def closed(self) -> bool:
+        """
+        Returns whether the dispatcher was closed.
+
+        :return: True if close() was called.
+        """
+
+        return self.__closed
+
+    def __forget(self, entry: list) -> None:
+        if entry[2] is not None and self.__conflated.get((entry[0], entry[2])) is entry:
+            del self.__conflated[(entry[0], entry[2])]
+
+
+class SIThreadPoolCallbackDispatcher(SIQueueCallbackDispatcher):
+    """
+    Callback dispatcher that queues the callbacks and calls them on a bounded pool of daemon worker threads.
+
+    With a single worker (default), the callbacks are called in the order they were dispatched. With more workers,
+    callbacks can run concurrently and out of order, they have to be thread-safe. Exceptions raised by callbacks are
+    printed using sys.excepthook() and do not stop the workers. After close(), the workers terminate once all queued
+    callbacks have been called.
+    """
+
+    def __init__(self, max_workers: int = 1, max_size: int = 1000,
+                 backpressure: SIBackpressure = SIBackpressure.BLOCK):
+        """
+        :param max_workers: Number of worker threads calling the callbacks.
+        :param max_size: Maximal number of queued callbacks.
+        :param backpressure: What to do if a callback is dispatched while the queue is full, see SIBackpressure.
+        """
+
+        super(SIThreadPoolCallbackDispatcher, self).__init__(max_size, backpressure)
+        self.__workers: List[Thread] = []
+        for _ in range(max_workers):
+            worker = Thread(target=self.__run)
+            worker.daemon = True
+            worker.start()
+            self.__workers.append(worker)
+
+    def __run(self) -> None:
+        while True:
+            try:
+                if self.run_pending(None) == 0 and self.closed():
+                    return
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+
+
+class SIAsyncioCallbackDispatcher(SIQueueCallbackDispatcher):
+    """
+    Callback dispatcher that queues the callbacks and calls them on the given asyncio event loop using
+    call_soon_threadsafe(), so that the callbacks of the gateway clients run on the application's event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int = 1000,
+                 backpressure: SIBackpressure = SIBackpressure.BLOCK):
+        """
+        :param loop: Event loop the callbacks are called on.
+        :param max_size: Maximal number of queued callbacks.
+        :param backpressure: What to do if a callback is dispatched while the queue is full, see SIBackpressure. A
+               callback dispatched on the event loop itself while the queue is full runs the queued callbacks first
+               instead of blocking.
+        """
+
+        super(SIAsyncioCallbackDispatcher, self).__init__(max_size, backpressure)
+        self.__loop: asyncio.AbstractEventLoop = loop
+        self.__max_size: int = max_size
+        self.__scheduled: bool = False
+        self.__lock: threading.Lock = threading.Lock()
+
+    def dispatch(self, callback: Callable, arguments: tuple, key: Optional[any] = None) -> None:
+        # Waiting for space on the event loop would dead-lock, as the queue is drained by the event loop.
+        if self.pending() >= self.__max_size and self.__in_loop():
+            self.run_pending()
+        super(SIAsyncioCallbackDispatcher, self).dispatch(callback, arguments, key)
+
+        # Schedule a single call to run_pending() for all callbacks dispatched until it runs.
+        with self.__lock:
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        self.__loop.call_soon_threadsafe(self.__run_pending)
+
+    def __run_pending(self) -> None:
+        with self.__lock:
+            self.__scheduled = False
+        self.run_pending()
+
+    def __in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.__loop
+        except RuntimeError:
+            return False
+
+
+_SI_JSON_DECODER = json.JSONDecoder()
+_SI_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _SIAbstractGatewayClient:
+    def __init__(self):
+        super(_SIAbstractGatewayClient, self).__init__()
+
+    @staticmethod
+    def encode_authorize_frame_without_credentials() -> str:
+        return 'AUTHORIZE\nprotocol_version:1\n\n'
+
+    @staticmethod
+    def encode_authorize_frame_with_credentials(user: str, password: str) -> str:
+        return 'AUTHORIZE\nuser:{user}\npassword:{password}\nprotocol_version:1\n\n'.format(user=user,
+                                                                                            password=password)
+
+    @staticmethod
+    def decode_authorized_frame(frame: str) -> Tuple[SIAccessLevel, str, List[str]]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'AUTHORIZED' and 'access_level' in headers and 'protocol_version' in headers and \
+                'gateway_version' in headers:
+            extensions = []
+            if 'extensions' in headers:
+                extensions = headers['extensions'].split(',')
+            if headers['protocol_version'] == '1':
+                return SIAccessLevel.from_string(headers['access_level']), headers['gateway_version'], extensions
+            else:
+                raise SIProtocolError('protocol version 1 not supported by server')
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during authorization')
+
+    @staticmethod
+    def encode_enumerate_frame() -> str:
+        return 'ENUMERATE\n\n'
+
+    @staticmethod
+    def decode_enumerated_frame(frame: str) -> Tuple[SIStatus, int]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'ENUMERATED' and 'status' in headers and 'device_count' in headers:
+            return SIStatus.from_string(headers['status']), int(headers['device_count'])
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during device enumeration')
+
+    @staticmethod
+    def encode_describe_frame(device_access_id: Optional[str], device_id: Optional[str], property_id: Optional[int],
+                              flags: Optional[SIDescriptionFlags]) -> str:
+        frame = 'DESCRIBE\n'
+        if device_access_id is not None:
+            frame += 'id:{device_access_id}'.format(device_access_id=device_access_id)
+            if device_id is not None:
+                frame += '.{device_id}'.format(device_id=device_id)
+                if property_id is not None:
+                    frame += '.{property_id}'.format(property_id=property_id)
+            frame += '\n'
+        if flags is not None and isinstance(flags, SIDescriptionFlags):
+            frame += 'flags:'
+            if flags & SIDescriptionFlags.INCLUDE_ACCESS_INFORMATION:
+                frame += 'IncludeAccessInformation,'
+            if flags & SIDescriptionFlags.INCLUDE_DEVICE_INFORMATION:
+                frame += 'IncludeDeviceInformation,'
+            if flags & SIDescriptionFlags.INCLUDE_PROPERTY_INFORMATION:
+                frame += 'IncludePropertyInformation,'
+            if flags & SIDescriptionFlags.INCLUDE_DRIVER_INFORMATION:
+                frame += 'IncludeDriverInformation,'
+            frame = frame[:-1]
+            frame += '\n'
+        frame += '\n'
+        return frame
+
+    @staticmethod
+    def decode_description_frame(frame: str, loads: Callable[[str], any] = json.loads) \
+            -> Tuple[SIStatus, Optional[str], object]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'DESCRIPTION' and 'status' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                description = loads(body)
+                return status, headers.get('id', None), description
+            else:
+                return status, headers.get('id', None), {}
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during description')
+
+    @staticmethod
+    def encode_find_properties_frame(property_id: str, virtual: Optional[bool] = None,
+                                     functions: Optional[SIDeviceFunctions] = None) -> str:
+        frame = 'FIND PROPERTIES\nid:{property_id}\n'.format(property_id=property_id)
+        if virtual is not None and isinstance(virtual, bool):
+            frame += 'virtual:'
+            if virtual:
+                frame += 'true'
+            else:
+                frame += 'false'
+            frame += '\n'
+        if functions is not None and isinstance(functions, SIDeviceFunctions):
+            frame += 'functions:'
+            if functions & SIDeviceFunctions.INVERTER:
+                frame += 'inverter,'
+            if functions & SIDeviceFunctions.CHARGER:
+                frame += 'charger,'
+            if functions & SIDeviceFunctions.SOLAR:
+                frame += 'solar,'
+            if functions & SIDeviceFunctions.TRANSFER:
+                frame += 'transfer,'
+            if functions & SIDeviceFunctions.BATTERY:
+                frame += 'battery,'
+            if functions & SIDeviceFunctions.ALL:
+                frame += 'all,'
+            frame = frame[:-1]
+            frame += '\n'
+        frame += '\n'
+        return frame
+
+    @staticmethod
+    def decode_properties_found_frame(frame: str, loads: Callable[[str], any] = json.loads) \
+            -> (SIStatus, str, int, List[str], bool, SIDeviceFunctions):
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTIES FOUND' and 'status' in headers and 'id' in headers and 'count' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                properties = loads(body)
+                virtual = False
+                if 'virtual' in headers:
+                    virtual = headers.get('virtual') == 'true'
+                functions = SIDeviceFunctions.ALL
+                if 'functions' in headers:
+                    functions_str: str = headers.get('functions')
+                    functions = SIDeviceFunctions.NONE
+                    if functions_str.find('all') >= 0:
+                        functions |= SIDeviceFunctions.ALL
+                    else:
+                        if functions_str.find('inverter') >= 0:
+                            functions |= SIDeviceFunctions.INVERTER
+                        if functions_str.find('charger') >= 0:
+                            functions |= SIDeviceFunctions.CHARGER
+                        if functions_str.find('solar') >= 0:
+                            functions |= SIDeviceFunctions.SOLAR
+                        if functions_str.find('transfer') >= 0:
+                            functions |= SIDeviceFunctions.TRANSFER
+                        if functions_str.find('battery') >= 0:
+                            functions |= SIDeviceFunctions.BATTERY
+                return status, headers.get('id'), int(headers.get('count', 0)), virtual, functions, properties
+            else:
+                return status, headers.get('id'), int(headers.get('count', 0)), False, SIDeviceFunctions.ALL, []
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during finding properties')
+
+    @staticmethod
+    def encode_read_property_frame(property_id: str) -> str:
+        return 'READ PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
+
+    @staticmethod
+    def decode_property_read_frame(frame: str, schema: Optional[SIPropertySchema] = None) -> SIPropertyReadResult:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTY READ' and 'status' in headers and 'id' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS and 'value' in headers:
+                if schema is None:
+                    value = _si_decode_value(headers['value'])
+                else:
+                    value = schema.decode(headers['id'], headers['value'])
+                return SIPropertyReadResult(status, headers['id'], value)
+            else:
+                return SIPropertyReadResult(status, headers['id'], None)
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during property read')
+
+    @staticmethod
+    def encode_read_properties_frame(property_ids: List[str]) -> str:
+        return 'READ PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
+
+    @staticmethod
+    def decode_properties_read_frame(frame: str, schema: Optional[SIPropertySchema] = None,
+                                     loads: Callable[[str], any] = json.loads) -> List[SIPropertyReadResult]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTIES READ' and 'status' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                results = _SIAbstractGatewayClient.decode_json_list(body, loads)
+                return [SIPropertyReadResult.from_dict(result, schema) for result in results]
+            else:
+                raise SIProtocolError(f'error during property read, status={headers["status"]}')
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during properties read')
+
+    @staticmethod
+    def decode_properties_read_batch_frame(frame: str, schema: Optional[SIPropertySchema] = None,
+                                           loads: Callable[[str], any] = json.loads) -> SIPropertyReadBatch:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTIES READ' and 'status' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                return SIPropertyReadBatch.from_dicts(_SIAbstractGatewayClient.decode_json_list(body, loads), schema)
+            else:
+                raise SIProtocolError(f'error during property read, status={headers["status"]}')
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during properties read')
+
+    @staticmethod
+    def encode_write_property_frame(property_id: str, value: Optional[any], flags: Optional[SIWriteFlags]) -> str:
+        frame = 'WRITE PROPERTY\nid:{property_id}\n'.format(property_id=property_id)
+        if flags is not None and isinstance(flags, SIWriteFlags):
+            frame += 'flags:'
+            if flags & SIWriteFlags.PERMANENT:
+                frame += 'Permanent'
+            frame += '\n'
+        if value is not None:
+            frame += 'value:{value}\n'.format(value=value)
+        frame += '\n'
+        return frame
+
+    @staticmethod
+    def decode_property_written_frame(frame: str) -> Tuple[SIStatus, str]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTY WRITTEN' and 'status' in headers and 'id' in headers:
+            return SIStatus.from_string(headers['status']), headers['id']
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during property write')
+
+    @staticmethod
+    def encode_subscribe_property_frame(property_id: str) -> str:
+        return 'SUBSCRIBE PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
+
+    @staticmethod
+    def decode_property_subscribed_frame(frame: str) -> Tuple[SIStatus, str]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTY SUBSCRIBED' and 'status' in headers and 'id' in headers:
+            return SIStatus.from_string(headers['status']), headers['id']
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during property subscribe')
+
+    @staticmethod
+    def encode_subscribe_properties_frame(property_ids: List[str]) -> str:
+        return 'SUBSCRIBE PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
+
+    @staticmethod
+    def decode_properties_subscribed_frame(frame: str, loads: Callable[[str], any] = json.loads) \
+            -> List[SIPropertySubscriptionResult]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTIES SUBSCRIBED' and 'status' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                return list(map(SIPropertySubscriptionResult.from_dict,
+                                _SIAbstractGatewayClient.decode_json_list(body, loads)))
+            else:
+                raise SIProtocolError(f'error during properties read, status={headers["status"]}')
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during properties subscribe')
+
+    @staticmethod
+    def encode_unsubscribe_property_frame(property_id: str) -> str:
+        return 'UNSUBSCRIBE PROPERTY\nid:{property_id}\n\n'.format(property_id=property_id)
+
+    @staticmethod
+    def decode_property_unsubscribed_frame(frame: str) -> Tuple[SIStatus, str]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTY UNSUBSCRIBED' and 'status' in headers and 'id' in headers:
+            return SIStatus.from_string(headers['status']), headers['id']
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during property unsubscribe')
+
+    @staticmethod
+    def encode_unsubscribe_properties_frame(property_ids: List[str]) -> str:
+        return 'UNSUBSCRIBE PROPERTIES\n\n{property_ids}'.format(property_ids=json.dumps(property_ids))
+
+    @staticmethod
+    def decode_properties_unsubscribed_frame(frame: str, loads: Callable[[str], any] = json.loads) \
+            -> List[SIPropertySubscriptionResult]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTIES UNSUBSCRIBED' and 'status' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                return list(map(SIPropertySubscriptionResult.from_dict,
+                                _SIAbstractGatewayClient.decode_json_list(body, loads)))
+            else:
+                raise SIProtocolError(f'error during properties unsubscribe, status={headers["status"]}')
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during properties unsubscribe')
+
+    @staticmethod
+    def decode_property_update_frame(frame: str, schema: Optional[SIPropertySchema] = None) -> Tuple[str, any]:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'PROPERTY UPDATE' and 'id' in headers and 'value' in headers:
+            if schema is None:
+                value = _si_decode_value(headers['value'])
+            else:
+                value = schema.decode(headers['id'], headers['value'])
+            return headers['id'], value
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error receiving property update')
+
+    @staticmethod
+    def encode_read_datalog_frame(property_id: Optional[str], from_: Optional[datetime.datetime],
+                                  to: Optional[datetime.datetime], limit: Optional[int]) -> str:
+        frame = 'READ DATALOG\n'
+        if property_id is not None:
+            frame += 'id:{property_id}\n'.format(property_id=property_id)
+        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('from', from_)
+        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('to', to)
+        if limit is not None:
+            frame += 'limit:{limit}\n'.format(limit=limit)
+        frame += '\n'
+        return frame
+
+    @staticmethod
+    def decode_datalog_read_frame(frame: str) -> Tuple[SIStatus, Optional[str], int, str]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'DATALOG READ' and 'status' in headers and 'count' in headers:
+            return SIStatus.from_string(headers['status']), headers.get('id'), int(headers['count']), body
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error receiving datalog read')
+
+    @staticmethod
+    def decode_datalog_read_arrays_frame(frame: str) -> Tuple[SIStatus, Optional[str], int, SIDatalogArrays]:
+        status, id_, count, values = _SIAbstractGatewayClient.decode_datalog_read_frame(frame)
+        return status, id_, count, SIDatalogArrays.from_csv(values)
+
+    @staticmethod
+    def encode_read_messages_frame(from_: Optional[datetime.datetime], to: Optional[datetime.datetime],
+                                   limit: Optional[int]) -> str:
+        frame = 'READ MESSAGES\n'
+        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('from', from_)
+        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('to', to)
+        if limit is not None:
+            frame += 'limit:{limit}\n'.format(limit=limit)
+        frame += '\n'
+        return frame
+
+    @staticmethod
+    def decode_messages_read_frame(frame: str, loads: Callable[[str], any] = json.loads) \
+            -> Tuple[SIStatus, int, List[SIDeviceMessage]]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'MESSAGES READ' and 'status' in headers and 'count' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                messages = list(map(SIDeviceMessage.from_dict, _SIAbstractGatewayClient.decode_json_list(body, loads)))
+                return status, int(headers['count']), messages
+            else:
+                return status, int(headers['count']), []
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during description')
+
+    @staticmethod
+    def iter_messages_read_frame(frame: str) -> Tuple[SIStatus, int, Iterator[SIDeviceMessage]]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'MESSAGES READ' and 'status' in headers and 'count' in headers:
+            status = SIStatus.from_string(headers['status'])
+            if status == SIStatus.SUCCESS:
+                return status, int(headers['count']), \
+                    _SIAbstractGatewayClient.iter_json_list(body, SIDeviceMessage.from_dict)
+            else:
+                return status, int(headers['count']), iter(())
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error during messages read')
+
+    @staticmethod
+    def decode_device_message_frame(frame: str) -> SIDeviceMessage:
+        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'DEVICE MESSAGE' and 'access_id' in headers and 'device_id' in headers and \
+                'message_id' in headers and 'message' in headers and 'timestamp' in headers:
+            return SIDeviceMessage.from_dict(headers)
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error receiving device message')
+
+    @staticmethod
+    def encode_call_extension_frame(extension: str, command: str, parameters: dict, body: str) -> str:
+        frame = 'CALL EXTENSION\n'
+        frame += 'extension:{extension}\n'.format(extension=extension)
+        frame += 'command:{command}\n'.format(command=command)
+        for key, value in parameters.items():
+            frame += '{key}:{value}\n'.format(key=key, value=value)
+        frame += '\n'
+        frame += body
+        return frame
+
+    @staticmethod
+    def decode_extension_called_frame(frame: str) -> Tuple[str, str, SIExtensionStatus, dict, str]:
+        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
+        if command == 'EXTENSION CALLED' and 'extension' in headers and 'command' in headers and 'status' in headers:
+            additional_headers = {}
+            for key, value in headers.items():
+                if key != 'extension' and key != 'command' and key != 'status':
+                    additional_headers[key] = value
+            return headers['extension'], headers['command'], SIExtensionStatus.from_string(headers['status']), \
+                additional_headers, body
+        elif command == 'ERROR' and 'reason' in headers:
+            raise SIProtocolError(headers['reason'])
+        else:
+            raise SIProtocolError('unknown error receiving extension called message')
+
+    @staticmethod
+    def peek_frame_command(frame: str) -> str:
+        return frame[:frame.index('\n')]
+
+    @staticmethod
+    def peek_frame_headers(frame: str) -> Tuple[str, dict]:
+        # The command is terminated by the first newline.
+        command_end = frame.find('\n')
+        if command_end < 0:
+            raise SIProtocolError('invalid frame')
+
+        # The header block is terminated by the first empty line. Searching from the command's newline on handles
+        # frames without any header.
+        headers_end = frame.find('\n\n', command_end)
+        if headers_end < 0:
+            raise SIProtocolError('invalid frame')
+
+        headers = {}
+        if headers_end > command_end:
+            for line in frame[command_end + 1:headers_end].split('\n'):
+                key, separator, value = line.partition(':')
+                if separator:
+                    headers[key] = value
+
+        return frame[:command_end], headers
+
+    @staticmethod
+    def decode_frame(frame: str) -> Tuple[str, dict, str]:
+        command, headers = _SIAbstractGatewayClient.peek_frame_headers(frame)
+
+        # The body is everything after the empty line terminating the headers, returned as a single slice no matter
+        # how many lines it contains.
+        body = frame[frame.find('\n\n', len(command)) + 2:]
+
+        return command, headers, body
+
+    @staticmethod
+    def decode_json_list(body: str, loads: Callable[[str], any]) -> List[dict]:
+        array = loads(body)
+        if not isinstance(array, list) or not all(isinstance(element, dict) for element in array):
+            raise SIProtocolError('invalid json body')
+        return array
+
+    @staticmethod
+    def iter_json_list(body: str, factory: Callable[[dict], any]) -> Iterator[any]:
+        # Decodes the objects of a JSON array one by one, so that only the current element is held in memory.
+        skip = _SI_JSON_WHITESPACE.match
+        index = skip(body).end()
+        if body[index:index + 1] != '[':
+            raise SIProtocolError('invalid json body')
+        index = skip(body, index + 1).end()
+        if body[index:index + 1] != ']':
+            while True:
+                try:
+                    element, index = _SI_JSON_DECODER.raw_decode(body, index)
+                except ValueError:
+                    raise SIProtocolError('invalid json body')
+                if not isinstance(element, dict):
+                    raise SIProtocolError('invalid json body')
+                yield factory(element)
+                index = skip(body, index).end()
+                delimiter = body[index:index + 1]
+                if delimiter == ']':
+                    break
+                elif delimiter == ',':
+                    index = skip(body, index + 1).end()
+                else:
+                    raise SIProtocolError('invalid json body')
+        if skip(body, index + 1).end() != len(body):
+            raise SIProtocolError('invalid json body')
+
+    @staticmethod
+    def get_timestamp_header_if_present(key: str, timestamp: Optional[datetime.datetime]):
+        if timestamp is not None and isinstance(timestamp, datetime.datetime):
+            return '{key}:{timestamp}\n'.format(key=key, timestamp=timestamp.replace(microsecond=0).isoformat())
+        else:
+            return ''
+
+
+class SIGatewayClient(_SIAbstractGatewayClient):
+    """
+    Simple, synchronous (blocking) OpenStuder gateway client.
+
+    This client uses a synchronous model which has the advantage to be much simpler to use than the asynchronous
+    version SIAsyncGatewayClient. Device messages and property updates of subscribed properties are not reported using
+    callbacks, they are kept in a bounded buffer instead and have to be retrieved using poll_events() or iter_events().
+
+    By default, the client must only be used by one thread at a time. In thread-safe mode, a reader thread receives all
+    frames and hands each response to the thread waiting for it, so any number of threads can share one connection.
+    """
+
+    def __init__(self, property_schema: Optional[SIPropertySchema] = None, json_codec: SIJsonCodec = SIJsonCodec.AUTO,
+                 max_events: int = 1000, timeout: Optional[float] = None, thread_safe: bool = False,
+                 max_batch: Optional[int] = None, cache: Optional[SIPropertyCache] = None):
+        """
+        :param property_schema: Optional property schema used to decode property values, it is filled automatically
+               with the property information of all descriptions retrieved using describe().
+        :param json_codec: JSON implementation used to decode frame bodies, defaults to the fastest installed one.
+        :param max_events: Maximal number of device messages and property updates kept until they are retrieved using
+               poll_events() or iter_events(), the oldest ones are dropped if more arrive.
+        :param timeout: Default time in seconds to wait for the response to a request before an SITimeoutError is
+               raised, None (default) waits forever. Can be overridden for each call using the deadline parameter.
+        :param thread_safe: If True, the client can be used by multiple threads concurrently. Responses are received by
+               a dedicated reader thread and matched to the waiting requests by command and property ID.
+        :param max_batch: Maximal number of property IDs sent in a single request by read_properties(),
+               subscribe_to_properties() and unsubscribe_from_properties(). Longer lists are split into multiple
+               requests that are sent pipelined and whose results are merged in input order. None (default) never
+               splits.
+        :param cache: Optional property cache, read_property() and read_properties() return cached values that did
+               not expire instead of asking the gateway.
+        :raises SIProtocolError: If the requested JSON implementation is not installed.
+        """
+
+        super(SIGatewayClient, self).__init__()
+        self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
+        self.__ws: Optional[websocket.WebSocket] = None
+        self.__access_level: SIAccessLevel = SIAccessLevel.NONE
+        self.__gateway_version: str = ''
+        self.__availableExtensions: List[str] = []
+        self.__property_schema: Optional[SIPropertySchema] = property_schema
+        self.__json_loads: Callable[[str], any] = json_codec.loads()
+        self.__capture: threading.local = threading.local()
+        self.__events: deque = deque(maxlen=max_events)
+        self.__dropped_events: int = 0
+        self.__timeout: Optional[float] = timeout
+        self.__stale_responses: deque = deque()
+        self.__thread_safe: bool = thread_safe
+        self.__lock: threading.Condition = threading.Condition()
+        self.__send_lock: threading.Lock = threading.Lock()
+        self.__pending: Dict[Tuple[str, Optional[str]], deque] = {}
+        self.__sequence: Iterator[int] = itertools.count()
+        self.__reader: Optional[Thread] = None
+        self.__max_batch: Optional[int] = max_batch
+        self.__cache: Optional[SIPropertyCache] = cache
+
+    def connect(self, host: str, port: int = 1987, user: str = None, password: str = None,
+                timeout: Optional[float] = None) -> SIAccessLevel:
+        """
+        Establishes the WebSocket connection to the OpenStuder gateway and executes the user authorization process once
+        the connection has been established. This method blocks the current thread until the operation (authorize) has
+        been completed or an error occurred. The method returns the access level granted to the client during
+        authorization on success or throws an **SIProtocolError** otherwise.
+
+        :param host: Hostname or IP address of the OpenStuder gateway to connect to.
+        :param port: TCP port used for the connection to the OpenStuder gateway, defaults to 1987.
+        :param user: Username send to the gateway used for authorization.
+        :param password: Password send to the gateway used for authorization.
+        :param timeout: Maximal time in seconds for establishing the connection and the authorization, defaults to the
+               client's timeout.
+        :return: Access Level granted to the client.
+        :raises SIProtocolError: If the connection could not be established, or the authorization was refused.
+        :raises SITimeoutError: If the connection or the authorization did not complete in time.
+        """
+
+        # Ensure that the client is in the DISCONNECTED state.
+        self.__ensure_in_state(SIConnectionState.DISCONNECTED)
+
+        # Connect to WebSocket server.
+        if timeout is None:
+            timeout = self.__timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.__state = SIConnectionState.CONNECTING
+        self.__stale_responses.clear()
+        try:
+            self.__ws = websocket.create_connection('ws://{host}:{port}'.format(host=host, port=port), timeout=timeout)
+        except (websocket.WebSocketTimeoutException, TimeoutError):
+            self.__state = SIConnectionState.DISCONNECTED
+            raise SITimeoutError('timeout while connecting')
+        except Exception:
+            self.__state = SIConnectionState.DISCONNECTED
+            raise
+
+        # Authorize client.
+        self.__state = SIConnectionState.AUTHORIZING
+        if user is None or password is None:
+            self.__ws.send(super(SIGatewayClient, self).encode_authorize_frame_without_credentials())
+        else:
+            self.__ws.send(super(SIGatewayClient, self).encode_authorize_frame_with_credentials(user, password))
+        try:
+            frame = self.__receive_frame(deadline)
+            if frame is None:
+                raise SITimeoutError('timeout during authorization')
+            self.__access_level, self.__gateway_version, self.__availableExtensions = \
+                super(SIGatewayClient, self).decode_authorized_frame(frame)
+        except ConnectionRefusedError:
+            self.__state = SIConnectionState.DISCONNECTED
+            raise SIProtocolError('WebSocket connection refused')
+        except SITimeoutError:
+            self.__state = SIConnectionState.DISCONNECTED
+            self.__ws.close()
+            raise
+
+        # Change state to connected.
+        self.__state = SIConnectionState.CONNECTED
+
+        # In thread-safe mode all frames are received by the reader thread from now on.
+        if self.__thread_safe:
+            self.__ws.settimeout(None)
+            self.__reader = Thread(target=self.__read_frames, args=(self.__ws,), daemon=True)
+            self.__reader.start()
+
+        # Return access level.
+        return self.__access_level
+
+    def state(self) -> SIConnectionState:
+        """
+        Returns the current state of the client. See **SIConnectionState** for details.
+
+        :return: Current state of the client.
+        """
+
+        return self.__state
+
+    def access_level(self) -> SIAccessLevel:
+        """
+        Return the access level the client has gained on the gateway connected. See **SIAccessLevel** for details.
+
+        :return: Access level granted to client.
+        """
+
+        return self.__access_level
+
+    def gateway_version(self) -> str:
+        """
+        Returns the version of the OpenStuder gateway software running on the host the client is connected to.
+
+        :return: Version of the gateway software.
+        """
+
+        return self.__gateway_version
+
+    def available_extensions(self) -> List[str]:
+        """
+        Returns the list of available protocol extensions on the connected gateway.
+
+        :return: List of available protocol extensions.
+        """
+        return self.__availableExtensions
+
+    def property_schema(self) -> Optional[SIPropertySchema]:
+        """
+        Returns the property schema used by the client to decode property values, None if no schema is used.
+
+        :return: Property schema or None.
+        """
+        return self.__property_schema
+
+    def dropped_events(self) -> int:
+        """
+        Returns the number of device messages and property updates that were dropped because the event buffer was full
+        or because they were malformed.
+
+        :return: Number of dropped events.
+        """
+
+        return self.__dropped_events
+
+    def check_connection(self) -> bool:
+        """
+        Checks whether the connection to the gateway is still open. Frames already sent by the gateway are received to
+        detect a closed connection, device messages and property updates among them are kept for poll_events().
+
+        :return: True if the client is still connected, False otherwise.
+        """
+
+        if self.__state != SIConnectionState.CONNECTED:
+            return False
+
+        # In thread-safe mode, the reader thread changes the state as soon as the connection is lost.
+        if self.__thread_safe:
+            return True
+        try:
+            frame = self.__receive_frame(time.monotonic())
+            if frame is not None:
+                self.__stash_frame(frame)
+            return True
+        except (websocket.WebSocketException, OSError):
+            return False
+
+    def enumerate(self, deadline: Optional[float] = None) -> Tuple[SIStatus, int]:
+        """
+        Instructs the gateway to scan every configured and functional device access driver for new devices and remove
+        devices that do not respond anymore. Returns the status of the operation, and the number of devices present.
+
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns two values. 1: operation status, 2: the number of devices present.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send ENUMERATE message to gateway, wait for ENUMERATED message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_enumerate_frame(), 'ENUMERATED',
+                              super(SIGatewayClient, self).decode_enumerated_frame, deadline)
+
+    def describe(self, device_access_id: str = None, device_id: str = None, property_id: int = None,
+                 flags: SIDescriptionFlags = None,
+                 deadline: Optional[float] = None) -> Tuple[SIStatus, Optional[str], object]:
+        """
+        This method can be used to retrieve information about the available devices and their properties from the
+        connected gateway. Using the optional device_access_id, device_id and property_id parameters, the method can
+        either request information about the whole topology, a particular device access instance, a device or a
+        property.
+
+        The flags control the level of detail in the gateway's response.
+
+        :param device_access_id: Device access ID for which the description should be retrieved.
+        :param device_id: Device ID for which the description should be retrieved. Note that device_access_id must be
+               present too.
+        :param property_id: Property ID for which the description should be retrieved. Note that device_access_id and
+               device_id must be present too.
+        :param flags: Flags to control level of detail of the response.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns three values. 1: Status of the operation, 2: the subject's id, 3: the description object.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send DESCRIBE message to gateway, wait for DESCRIPTION message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_describe_frame(device_access_id, device_id,
+                                                                                 property_id, flags),
+                              'DESCRIPTION', self.__decode_description_frame, deadline)
+
+    def find_properties(self, property_id: str, virtual: Optional[bool] = None,
+                        functions_mask: Optional[SIDeviceFunctions] = None, deadline: Optional[float] = None) \
+            -> Tuple[SIStatus, str, int, bool, SIDeviceFunctions, List[str]]:
+        """
+        This method is used to retrieve a list of existing properties that match the given property ID in the form
+        "<device access ID>.<device ID>.<property ID>". The wildcard character "*" is supported for <device access ID>
+        and <device ID> fields.
+
+        For example "*.inv.3136" represents all properties with ID 3136 on the device with ID "inv" connected through
+        any device access, "demo.*.3136" represents all properties with ID 3136 on any device that disposes that
+        property connected through the device access "demo" and finally "*.*.3136" represents all properties with ID
+        3136 on any device that disposes that property connected through any device access.
+
+        :param property_id: The search wildcard ID.
+        :param virtual: Optional to filter for virtual devices (true) or non-virtual devices (false, default).
+        :param functions_mask: Optional to filter for device functions. See SIDeviceFunctions for details. Defaults
+               to all functions (SIDeviceFunctions.ALL).
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns four values: 1: Status of the find operation, 2: the searched ID (including wildcard
+                 character), 3: the number of properties found,
+                 4: True if virtual devices were searched, false otherwise. 5: Functions searched for,
+                 6: List of the property IDs.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send FIND PROPERTIES message to gateway, wait for PROPERTIES FOUND message, decode it and return
+        # data.
+        return self.__request(
+            super(SIGatewayClient, self).encode_find_properties_frame(property_id, virtual, functions_mask),
+            'PROPERTIES FOUND',
+            lambda frame: super(SIGatewayClient, self).decode_properties_found_frame(frame, self.__json_loads),
+            deadline)
+
+    def read_property(self, property_id: str, deadline: Optional[float] = None) -> Tuple[SIStatus, str, Optional[any]]:
+        """
+        This method is used to retrieve the actual value of a given property from the connected gateway. The property
+        is identified by the property_id parameter.
+
+        :param property_id: The ID of the property to read in the form '{device access ID}.{device ID}.{property ID}'.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns three values: 1: Status of the read operation, 2: the ID of the property read, 3: the value
+                 read.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Return the cached value if there is one.
+        if self.__cache is not None and not self.__capturing():
+            result = self.__cache.get(property_id)
+            if result is not None:
+                return result.to_tuple()
+
+        # Encode and send READ PROPERTY message to gateway, wait for PROPERTY READ message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_read_property_frame(property_id), 'PROPERTY READ',
+                              lambda frame: self.__decode_property_read_frame(frame).to_tuple(), deadline)
+
+    def read_properties(self, property_ids: List[str],
+                        batch: bool = False,
+                        deadline: Optional[float] = None) -> Union[List[SIPropertyReadResult], SIPropertyReadBatch]:
+        """
+        This method is used to retrieve the actual value of multiple properties at the same time from the connected
+        gateway. The properties are identified by the property_ids parameter.
+
+        :param property_ids: The IDs of the properties to read in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :param batch: If True, the results are returned as a column oriented SIPropertyReadBatch instead of a list of
+               SIPropertyReadResult objects, which is considerably cheaper when polling many properties.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns one value: 1: List (or SIPropertyReadBatch) of statuses and values of all read properties.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Only read the properties that are not cached from the gateway and merge the results in input order.
+        if self.__cache is not None and not self.__capturing():
+            results = [self.__cache.get(property_id) for property_id in property_ids]
+            missing = [property_id for property_id, result in zip(property_ids, results) if result is None]
+            if missing:
+                read = iter(self.__read_properties(missing, False, deadline))
+                try:
+                    results = [result if result is not None else next(read) for result in results]
+                except StopIteration:
+                    raise SIProtocolError('missing results in response')
+            return SIPropertyReadBatch.from_results(results) if batch else results
+
+        return self.__read_properties(property_ids, batch, deadline)
+
+    def write_property(self, property_id: str, value: any = None, flags: SIWriteFlags = None,
+                       deadline: Optional[float] = None) -> Tuple[SIStatus, str]:
+        """
+        The write_property method is used to change the actual value of a given property. The property is identified by
+        the property_id parameter and the new value is passed by the optional value parameter.
+
+        This value parameter is optional as it is possible to write to properties with the data type "Signal" where
+        there is no actual value written, the write operation rather triggers an action on the device.
+
+        :param property_id: The ID of the property to write in the form
+               '{device access ID}.{<device ID}.{<property ID}'.
+        :param value: Optional value to write.
+        :param flags: Write flags, See SIWriteFlags for details, if not provided the flags are not send by the client,
+               and the gateway uses the default flags (SIWriteFlags.PERMANENT).
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns two values: 1: Status of the write operation, 2: the ID of the property written.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send WRITE PROPERTY message to gateway, wait for PROPERTY WRITTEN message, decode it and return
+        # data.
+        return self.__request(super(SIGatewayClient, self).encode_write_property_frame(property_id, value, flags),
+                              'PROPERTY WRITTEN', self.__decode_property_written_frame, deadline)
+
+    def read_datalog_properties(self, from_: datetime.datetime = None,
+                                to: datetime.datetime = None,
+                                deadline: Optional[float] = None) -> Tuple[SIStatus, List[str]]:
+        """
+        This method is used to retrieve the list of IDs of all properties for whom data is logged on the gateway. If a
+        time window is given using from and to, only data in this time windows is considered.
+
+        :param from_: Optional date and time of the start of the time window to be considered.
+        :param to: Optional date and time of the end of the time window to be considered.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns two values: 1: Status of the operation, 2: List of all properties for whom data is logged on
+                 the gateway in the optional time window.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send READ DATALOG message to gateway, wait for DATALOG READ message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_read_datalog_frame(None, from_, to, None),
+                              'DATALOG READ', self.__decode_datalog_properties_frame, deadline)
+
+    def read_datalog_csv(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                         limit: int = None, deadline: Optional[float] = None) -> Tuple[SIStatus, str, int, str]:
+        """
+        This method is used to retrieve all or a subset of logged data of a given property from the gateway.
+
+        :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
+               the form '{device access ID}.{device ID}.{property ID}'.
+        :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
+               logged.
+        :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
+               gateway.
+        :param limit: Using this optional parameter you can limit the number of results retrieved in total.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns four values: 1: Status of the operation, 2: id of the property, 3: number of entries,
+                 4: Properties data in CSV format whereas the first column is the
+        date and time in ISO 8601 extended format, and the second column contains the actual values.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send READ DATALOG message to gateway, wait for DATALOG READ message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit),
+                              'DATALOG READ', super(SIGatewayClient, self).decode_datalog_read_frame, deadline)
+
+    def read_datalog_arrays(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                            limit: int = None,
+                            deadline: Optional[float] = None) -> Tuple[SIStatus, str, int, SIDatalogArrays]:
+        """
+        This method is used to retrieve all or a subset of logged data of a given property from the gateway. Unlike
+        read_datalog_csv(), the data is decoded into arrays of times and values, see SIDatalogArrays.
+
+        :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
+               the form '{device access ID}.{device ID}.{property ID}'.
+        :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
+               logged.
+        :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
+               gateway.
+        :param limit: Using this optional parameter you can limit the number of results retrieved in total.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns four values: 1: Status of the operation, 2: id of the property, 3: number of entries,
+                 4: Properties data as SIDatalogArrays.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send READ DATALOG message to gateway, wait for DATALOG READ message, decode it and return data.
+        return self.__request(super(SIGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit),
+                              'DATALOG READ', super(SIGatewayClient, self).decode_datalog_read_arrays_frame, deadline)
+
+    def iter_datalog(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                     page_size: int = 10000) -> Iterator[str]:
+        """
+        Returns an iterator over the logged data of a given property in chunks. The time range is read using multiple
+        requests of at most page_size rows each, so the memory used does not depend on the length of the time range.
+        The next request is only sent once the previous chunk was consumed.
+
+        :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
+               the form '{device access ID}.{device ID}.{property ID}'.
+        :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
+               logged.
+        :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
+               gateway.
+        :param page_size: Number of rows requested at once. If more rows share a single timestamp, the request is
+               repeated with a larger limit until all of them have been received.
+        :return: Iterator over chunks of the data in CSV format, see read_datalog_csv(). Rows are neither repeated nor
+                 missing between chunks.
+        :raises SIProtocolError: On a connection, protocol of framing error or if the gateway reports an error.
+        :raises SITimeoutError: If a response was not received within the client's timeout.
+        """
+
+        pager = _SIDatalogPager(from_, page_size)
+        while not pager.done():
+            status, _, _, values = self.read_datalog_csv(property_id, pager.next_from(), to, pager.next_limit())
+            if status != SIStatus.SUCCESS:
+                raise SIProtocolError('error reading datalog: {status}'.format(status=status.name))
+            chunk = pager.page(values)
+            if chunk:
+                yield chunk
+
+    def read_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None,
+                      limit: int = None,
+                      deadline: Optional[float] = None) -> Tuple[SIStatus, int, List[SIDeviceMessage]]:
+        """
+        The read_messages() method can be used to retrieve all or a subset of stored messages send by devices on all
+        buses in the past from the gateway.
+
+        :param from_: Optional date and time from which the messages have to be retrieved, defaults to the oldest
+               message saved.
+        :param to: Optional date and time to which the messages have to be retrieved, defaults to the current time on
+               the gateway.
+        :param limit: Using this optional parameter you can limit the number of messages retrieved in total.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns three values. 1: the status of the operation, 2: the number of messages,
+                 3: the list of retrieved messages.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send READ MESSAGES message to gateway, wait for MESSAGES READ message, decode it and return data.
+        return self.__request(
+            super(SIGatewayClient, self).encode_read_messages_frame(from_, to, limit), 'MESSAGES READ',
+            lambda frame: super(SIGatewayClient, self).decode_messages_read_frame(frame, self.__json_loads), deadline)
+
+    def iter_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None,
+                      limit: int = None,
+                      deadline: Optional[float] = None) -> Tuple[SIStatus, int, Iterator[SIDeviceMessage]]:
+        """
+        Same as read_messages(), but instead of a list the messages are returned as an iterator that decodes the
+        messages one by one while it is consumed. Use this for large message histories in order to avoid having all
+        message objects in memory at the same time.
+
+        :param from_: Optional date and time from which the messages have to be retrieved, defaults to the oldest
+               message saved.
+        :param to: Optional date and time to which the messages have to be retrieved, defaults to the current time on
+               the gateway.
+        :param limit: Using this optional parameter you can limit the number of messages retrieved in total.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns three values. 1: the status of the operation, 2: the number of messages,
+                 3: an iterator over the retrieved messages.
+        :raises SIProtocolError: On a connection, protocol of framing error. Errors in the message list itself are
+                raised while iterating.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send READ MESSAGES message to gateway, wait for MESSAGES READ message, decode the header and
+        # return the lazy message iterator.
+        return self.__request(super(SIGatewayClient, self).encode_read_messages_frame(from_, to, limit),
+                              'MESSAGES READ', super(SIGatewayClient, self).iter_messages_read_frame, deadline)
+
+    def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None, body: str = '',
+                       deadline: Optional[float] = None) -> \
+            Tuple[SIExtensionStatus, dict, str]:
+        """
+        Runs an extension command on the gateway and returns the result of that operation. The function
+        availableExtensions() can be user to get the list of extensions that are available on the connected gateway.
+
+        :param extension: Extension to use.
+        :param command: Command to run on that extension.
+        :param parameters: Parameters (key/value) to pass to the command, see extension documentation for details.
+        :param body: Body to pass to the command, see extension documentation for details.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns three values. 1: the status of the operation, 2: the returned key/value pairs from the command,
+                 3: an optional body output of the command.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        if parameters is None:
+            parameters = {}
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send CALL EXTENSION message to gateway, wait for EXTENSION CALLED message, decode it and return
+        # data.
+        return self.__request(
+            super(SIGatewayClient, self).encode_call_extension_frame(extension, command, parameters, body),
+            'EXTENSION CALLED', self.__decode_extension_called_frame, deadline)
+
+    def subscribe_to_property(self, property_id: str, deadline: Optional[float] = None) -> Tuple[SIStatus, str]:
+        """
+        This method can be used to subscribe to a property on the connected gateway. The property is identified by the
+        property_id parameter. Value changes of the property can be retrieved using poll_events() or iter_events().
+
+        :param property_id: The ID of the property to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns two values: 1: Status of the subscribe operation, 2: the ID of the property.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send SUBSCRIBE PROPERTY message to gateway, wait for PROPERTY SUBSCRIBED message, decode it and
+        # return data.
+        return self.__request(super(SIGatewayClient, self).encode_subscribe_property_frame(property_id),
+                              'PROPERTY SUBSCRIBED', super(SIGatewayClient, self).decode_property_subscribed_frame,
+                              deadline)
+
+    def subscribe_to_properties(self, property_ids: List[str],
+                                deadline: Optional[float] = None) -> List[SIPropertySubscriptionResult]:
+        """
+        This method can be used to subscribe to multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter. Value changes of the properties can be retrieved using poll_events()
+        or iter_events().
+
+        :param property_ids: The list of IDs of the properties to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns one value: 1: List of statuses of the subscribe operations.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send SUBSCRIBE PROPERTIES message to gateway, wait for PROPERTIES SUBSCRIBED message, decode it and
+        # return data.
+        return self.__request_in_chunks(
+            property_ids, super(SIGatewayClient, self).encode_subscribe_properties_frame, 'PROPERTIES SUBSCRIBED',
+            lambda frame: super(SIGatewayClient, self).decode_properties_subscribed_frame(frame, self.__json_loads),
+            _si_concatenate_lists, deadline)
+
+    def unsubscribe_from_property(self, property_id: str, deadline: Optional[float] = None) -> Tuple[SIStatus, str]:
+        """
+        This method can be used to unsubscribe from a property on the connected gateway. The property is identified by
+        the property_id parameter.
+
+        :param property_id: The ID of the property to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns two values: 1: Status of the unsubscribe operation, 2: the ID of the property.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send UNSUBSCRIBE PROPERTY message to gateway, wait for PROPERTY UNSUBSCRIBED message, decode it and
+        # return data.
+        return self.__request(super(SIGatewayClient, self).encode_unsubscribe_property_frame(property_id),
+                              'PROPERTY UNSUBSCRIBED', super(SIGatewayClient, self).decode_property_unsubscribed_frame,
+                              deadline)
+
+    def unsubscribe_from_properties(self, property_ids: List[str],
+                                    deadline: Optional[float] = None) -> List[SIPropertySubscriptionResult]:
+        """
+        This method can be used to unsubscribe from multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter.
+
+        :param property_ids: The list of IDs of the properties to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the response, defaults to the client's timeout.
+        :return: Returns one value: 1: List of statuses of the unsubscribe operations.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received before the deadline.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send UNSUBSCRIBE PROPERTIES message to gateway, wait for PROPERTIES UNSUBSCRIBED message, decode it
+        # and return data.
+        return self.__request_in_chunks(
+            property_ids, super(SIGatewayClient, self).encode_unsubscribe_properties_frame, 'PROPERTIES UNSUBSCRIBED',
+            lambda frame: super(SIGatewayClient, self).decode_properties_unsubscribed_frame(frame, self.__json_loads),
+            _si_concatenate_lists, deadline)
+
+    def poll_events(self, timeout: Optional[float] = 0) -> List[Union[SIPropertyUpdate, SIDeviceMessage]]:
+        """
+        Returns all device messages and property updates received since the last call. If there are none, the method
+        waits for up to timeout seconds for at least one to arrive.
+
+        :param timeout: Maximal time in seconds to wait for an event if none is buffered, None waits forever. With 0
+               (default) the method does not wait in thread-safe mode, otherwise it waits for up to one millisecond for
+               frames already sent by the gateway.
+        :return: List of SIPropertyUpdate and SIDeviceMessage objects in the order they were received, can be empty.
+               Malformed events are skipped and counted by dropped_events().
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Receive frames until there is at least one event or the timeout elapsed. In thread-safe mode, the reader
+        # thread receives the frames and we only have to wait for it.
+        if self.__thread_safe:
+            with self.__lock:
+                self.__lock.wait_for(lambda: self.__events or self.__state != SIConnectionState.CONNECTED, timeout)
+                frames = list(self.__events)
+                self.__events.clear()
+        else:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while not self.__events:
+                    frame = self.__receive_frame(deadline)
+                    if frame is None:
+                        break
+                    self.__stash_frame(frame)
+            except (websocket.WebSocketException, OSError):
+                self.__state = SIConnectionState.DISCONNECTED
+                raise SIProtocolError('connection closed')
+            frames = list(self.__events)
+            self.__events.clear()
+
+        # Decode the buffered events one by one, so that a malformed event does not lose the others.
+        events = []
+        for frame in frames:
+            try:
+                events.append(self.__decode_event_frame(frame))
+            except SIProtocolError:
+                with self.__lock:
+                    self.__dropped_events += 1
+        return events
+
+    def iter_events(self, timeout: Optional[float] = None) -> Iterator[Union[SIPropertyUpdate, SIDeviceMessage]]:
+        """
+        Returns an iterator over the device messages and property updates as they are received. Other requests can be
+        made using the client while iterating.
+
+        :param timeout: The iteration ends if no event is received within timeout seconds, None (default) iterates
+               forever.
+        :return: Iterator over SIPropertyUpdate and SIDeviceMessage objects.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        """
+
+        while True:
+            events = self.poll_events(timeout)
+            if not events:
+                return
+            yield from events
+
+    def disconnect(self) -> None:
+        """
+        Disconnects the client from the gateway.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Change state to disconnected.
+        self.__state = SIConnectionState.DISCONNECTED
+        self.__stale_responses.clear()
+
+        # Close the WebSocket. The reader thread is blocked receiving, so the socket has to be aborted to wake it up.
+        if self.__reader is not None:
+            try:
+                self.__ws.send_close()
+            except (websocket.WebSocketException, OSError):
+                pass
+            self.__ws.abort()
+            self.__reader.join()
+            self.__reader = None
+            self.__ws.shutdown()
+        else:
+            self.__ws.close()
+
+    def pipeline(self, raise_on_error: bool = True) -> SIGatewayClientPipeline:
+        """
+        Creates a pipeline that can be used to send multiple requests to the gateway without waiting for the response
+        of each request. The requests are queued using the methods of the pipeline and are all sent back-to-back when
+        the pipeline is executed, so the whole batch costs only a single round-trip to the gateway:
+
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.3136')
+            pipeline.describe('demo', 'inv')
+        (status, id_, value), (status, id_, description) = pipeline.results()
+
+        :param raise_on_error: If True (default), the first error of the pipeline is raised once all responses have
+               been received, otherwise the SIProtocolError objects are returned in place of the failed results.
+        :return: The pipeline, use it as a context manager or call execute() explicitly.
+        """
+
+        return SIGatewayClientPipeline(self.__capture_request, self.__execute_requests, raise_on_error)
+
+    def __ensure_in_state(self, state: SIConnectionState) -> None:
+        if self.__state != state:
+            raise SIProtocolError("invalid client state")
+
+    def __request(self, frame: str, response_command: str, decode: Callable[[str], any],
+                  deadline: Optional[float]) -> any:
+        # Requests captured for a pipeline are only recorded, they are sent once the pipeline is executed.
+        captured_requests = getattr(self.__capture, 'requests', None)
+        if captured_requests is not None:
+            captured_requests.append((frame, response_command, decode))
+            return None
+
+        deadline = self.__deadline(deadline)
+        if self.__thread_safe:
+            with self.__send_lock:
+                future = self.__send_correlated(frame, response_command)
+            return decode(self.__wait_for_response(future, deadline))
+
+        self.__ws.send(frame)
+        response = self.__receive_frame_until_commands([response_command, 'ERROR'], deadline)
+        if response is None:
+            self.__expire_requests([response_command])
+        return decode(response)
+
+    def __read_properties(self, property_ids: List[str], batch: bool,
+                          deadline: Optional[float]) -> Union[List[SIPropertyReadResult], SIPropertyReadBatch]:
+        # Encode and send READ PROPERTIES message to gateway, wait for PROPERTIES READ message, decode it and return
+        # data.
+        if batch:
+            decode = super(SIGatewayClient, self).decode_properties_read_batch_frame
+            merge = SIPropertyReadBatch.concatenate
+        else:
+            decode = super(SIGatewayClient, self).decode_properties_read_frame
+            merge = _si_concatenate_lists
+        return self.__request_in_chunks(property_ids, super(SIGatewayClient, self).encode_read_properties_frame,
+                                        'PROPERTIES READ',
+                                        lambda frame: self.__cache_results(
+                                            decode(frame, self.__property_schema, self.__json_loads)),
+                                        merge, deadline)
+
+    def __capturing(self) -> bool:
+        # True while a method is called to capture its request for a pipeline.
+        return getattr(self.__capture, 'requests', None) is not None
+
+    def __request_in_chunks(self, property_ids: List[str], encode: Callable[[List[str]], str], response_command: str,
+                            decode: Callable[[str], any], merge: Callable[[list], any],
+                            deadline: Optional[float]) -> any:
+        # Lists longer than max_batch are split into chunks that are sent pipelined, the results are merged in input
+        # order. Requests captured for a pipeline are never split, as the pipeline expects a single request.
+        max_batch = self.__max_batch
+        if max_batch is None or len(property_ids) <= max_batch or self.__capturing():
+            return self.__request(encode(property_ids), response_command, decode, deadline)
+        results = self.__execute_requests([(encode(property_ids[index:index + max_batch]), response_command, decode)
+                                           for index in range(0, len(property_ids), max_batch)], deadline)
+        for result in results:
+            if isinstance(result, SIProtocolError):
+                raise result
+        return merge(results)
+
+    def __capture_request(self, method: str, *args) -> Tuple[str, str, Callable[[str], any]]:
+        self.__capture.requests = []
+        try:
+            getattr(self, method)(*args)
+            return self.__capture.requests[0]
+        finally:
+            self.__capture.requests = None
+
+    def __execute_requests(self, requests: List[Tuple[str, str, Callable[[str], any]]],
+                           deadline: Optional[float]) -> List[any]:
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+        deadline = self.__deadline(deadline)
+
+        # In thread-safe mode the requests are sent back-to-back and the responses are collected by the reader thread.
+        if self.__thread_safe:
+            with self.__send_lock:
+                futures = [self.__send_correlated(frame, response_command) for frame, response_command, _ in requests]
+            results = []
+            for (_, _, decode), future in zip(requests, futures):
+                frame = self.__wait_for_response(future, deadline)
+                try:
+                    results.append(decode(frame))
+                except SIProtocolError as error:
+                    results.append(error)
+            return results
+
+        # Send all requests back-to-back and remember the ID each response has to carry.
+        expected_ids = []
+        for frame, _, _ in requests:
+            self.__ws.send(frame)
+            expected_ids.append(super(SIGatewayClient, self).peek_frame_headers(frame)[1].get('id', None))
+
+        # Assign the responses to the requests: the oldest pending request with the response's command and ID wins,
+        # falling back to the oldest request with the response's command. Errors are assigned to the oldest request.
+        responses = [None] * len(requests)
+        pending = list(range(len(requests)))
+        while pending:
+            frame = self.__receive_frame(deadline)
+            if frame is None:
+                self.__expire_requests([requests[index][1] for index in pending])
+            command, headers = super(SIGatewayClient, self).peek_frame_headers(frame)
+            if self.__discard_stale_response(command):
+                continue
+            if command == 'ERROR':
+                index = pending[0]
+            else:
+                candidates = [index for index in pending if requests[index][1] == command]
+                if not candidates:
+                    self.__stash_frame(frame)
+                    continue
+                index = next((index for index in candidates if expected_ids[index] == headers.get('id', None)),
+                             candidates[0])
+            responses[index] = frame
+            pending.remove(index)
+
+        # Decode all responses in call order.
+        results = []
+        for (_, _, decode), frame in zip(requests, responses):
+            try:
+                results.append(decode(frame))
+            except SIProtocolError as error:
+                results.append(error)
+        return results
+
+    def __decode_description_frame(self, frame: str) -> Tuple[SIStatus, Optional[str], object]:
+        status, id_, description = super(SIGatewayClient, self).decode_description_frame(frame, self.__json_loads)
+        if status == SIStatus.SUCCESS and self.__property_schema is not None:
+            self.__property_schema.update(id_, description)
+        return status, id_, description
+
+    def __decode_property_read_frame(self, frame: str) -> SIPropertyReadResult:
+        result = super(SIGatewayClient, self).decode_property_read_frame(frame, self.__property_schema)
+        if self.__cache is not None:
+            self.__cache.put(result)
+        return result
+
+    def __cache_results(self, results: Union[List[SIPropertyReadResult], SIPropertyReadBatch]) \
+            -> Union[List[SIPropertyReadResult], SIPropertyReadBatch]:
+        if self.__cache is not None:
+            for result in results:
+                self.__cache.put(result)
+        return results
+
+    def __decode_property_written_frame(self, frame: str) -> Tuple[SIStatus, str]:
+        status, id_ = super(SIGatewayClient, self).decode_property_written_frame(frame)
+        if status == SIStatus.SUCCESS and self.__cache is not None:
+            self.__cache.invalidate(id_)
+        return status, id_
+
+    def __decode_datalog_properties_frame(self, frame: str) -> Tuple[SIStatus, List[str]]:
+        status, _, _, parameters = super(SIGatewayClient, self).decode_datalog_read_frame(frame)
+        return status, parameters.splitlines()
+
+    def __decode_extension_called_frame(self, frame: str) -> Tuple[SIExtensionStatus, dict, str]:
+        _, _, status, params, body = super(SIGatewayClient, self).decode_extension_called_frame(frame)
+        return status, params, body
+
+    def __stash_frame(self, frame: str) -> None:
+        # Device messages and property updates are kept for poll_events(), any other unexpected frame is dropped.
+        command = super(SIGatewayClient, self).peek_frame_command(frame)
+        if command in ('PROPERTY UPDATE', 'DEVICE MESSAGE'):
+            if command == 'PROPERTY UPDATE' and self.__cache is not None:
+                self.__cache.invalidate(super(SIGatewayClient, self).peek_frame_headers(frame)[1].get('id', None))
+            if len(self.__events) == self.__events.maxlen:
+                self.__dropped_events += 1
+            self.__events.append(frame)
+        else:
+            self.__discard_stale_response(command)
+
+    def __decode_event_frame(self, frame: str) -> Union[SIPropertyUpdate, SIDeviceMessage]:
+        if super(SIGatewayClient, self).peek_frame_command(frame) == 'PROPERTY UPDATE':
+            return SIPropertyUpdate(*super(SIGatewayClient, self).decode_property_update_frame(frame,
+                                                                                               self.__property_schema))
+        else:
+            return super(SIGatewayClient, self).decode_device_message_frame(frame)
+
+    def __send_correlated(self, frame: str, response_command: str) -> Future:
+        # Must be called with the send lock held, so that the order of the requests in the correlation table is the
+        # order in which they are sent.
+        future = Future()
+        key = (response_command, super(SIGatewayClient, self).peek_frame_headers(frame)[1].get('id', None))
+        with self.__lock:
+            self.__ensure_in_state(SIConnectionState.CONNECTED)
+            self.__pending.setdefault(key, deque()).append((next(self.__sequence), future))
+        self.__ws.send(frame)
+        return future
+
+    @staticmethod
+    def __wait_for_response(future: Future, deadline: Optional[float]) -> str:
+        # A request that timed out stays in the correlation table, so that its late response is consumed by it.
+        try:
+            return future.result(None if deadline is None else max(deadline - time.monotonic(), 0.0))
+        except FutureTimeoutError:
+            raise SITimeoutError('timeout waiting for response')
+
+    def __read_frames(self, ws: websocket.WebSocket) -> None:
+        try:
+            while True:
+                frame = ws.recv()
+                if not isinstance(frame, str) or not frame:
+                    continue
+                try:
+                    command, headers = super(SIGatewayClient, self).peek_frame_headers(frame)
+                except SIProtocolError:
+                    continue
+                with self.__lock:
+                    if command in ('PROPERTY UPDATE', 'DEVICE MESSAGE'):
+                        self.__stash_frame(frame)
+                        self.__lock.notify_all()
+                        continue
+                    future = self.__pop_pending(command, headers.get('id', None))
+                if future is not None:
+                    future.set_result(frame)
+        except (websocket.WebSocketException, OSError, ValueError):
+            pass
+        finally:
+            # The connection is gone, fail all requests still waiting for a response.
+            with self.__lock:
+                self.__state = SIConnectionState.DISCONNECTED
+                pending = [future for entries in self.__pending.values() for _, future in entries]
+                self.__pending.clear()
+                self.__lock.notify_all()
+            for future in pending:
+                if not future.done():
+                    future.set_exception(SIProtocolError('connection closed'))
+
+    def __pop_pending(self, command: str, id_: Optional[str]) -> Optional[Future]:
+        # Must be called with the lock held. The request with the response's command and ID wins, otherwise the oldest
+        # request with the response's command. Errors are attributed to the oldest request.
+        key = (command, id_)
+        if command == 'ERROR' or not self.__pending.get(key):
+            candidates = [key for key in self.__pending if command == 'ERROR' or key[0] == command]
+            if not candidates:
+                return None
+            key = min(candidates, key=lambda candidate: self.__pending[candidate][0][0])
+        entries = self.__pending[key]
+        _, future = entries.popleft()
+        if not entries:
+            del self.__pending[key]
+        return future
+
+    def __deadline(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None and self.__timeout is not None:
+            return time.monotonic() + self.__timeout
+        return deadline
+
+    def __expire_requests(self, response_commands: List[str]) -> None:
+        # The responses to requests that timed out still arrive later and have to be dropped in order to keep the
+        # connection in sync. If the gateway did not even answer the requests that timed out before, it is considered
+        # unresponsive and the connection is closed.
+        if self.__stale_responses:
+            self.__state = SIConnectionState.DISCONNECTED
+            self.__stale_responses.clear()
+            self.__ws.close()
+            raise SITimeoutError('timeout waiting for response, connection closed')
+        self.__stale_responses.extend(response_commands)
+        raise SITimeoutError('timeout waiting for response')
+
+    def __discard_stale_response(self, command: str) -> bool:
+        # The gateway answers requests in order, so the responses to requests that timed out arrive before any other
+        # response. Errors are attributed to the oldest request that timed out.
+        if not self.__stale_responses:
+            return False
+        if command == 'ERROR':
+            self.__stale_responses.popleft()
+            return True
+        if command in self.__stale_responses:
+            self.__stale_responses.remove(command)
+            return True
+        return False
+
+    def __receive_frame(self, deadline: Optional[float]) -> Optional[str]:
+        # Returns None if no frame was received before the deadline. A frame only partially received is kept by the
+        # WebSocket and completed by the next receive, so a timeout never breaks the framing.
+        if deadline is None:
+            self.__ws.settimeout(None)
+        else:
+            self.__ws.settimeout(max(deadline - time.monotonic(), _SI_MINIMAL_RECEIVE_TIMEOUT))
+        try:
+            frame = self.__ws.recv()
+        except websocket.WebSocketTimeoutException:
+            return None
+
+        # The WebSocket returns an empty frame once the gateway closed the connection.
+        if not isinstance(frame, str) or not frame:
+            self.__state = SIConnectionState.DISCONNECTED
+            raise websocket.WebSocketConnectionClosedException('connection closed')
+        return frame
+
+    def __receive_frame_until_commands(self, commands: list, deadline: Optional[float] = None) -> Optional[str]:
+        while True:
+            frame = self.__receive_frame(deadline)
+            if frame is None:
+                return None
+            command = super(SIGatewayClient, self).peek_frame_command(frame)
+            if self.__discard_stale_response(command):
+                continue
+            if command in commands:
+                return frame
+            self.__stash_frame(frame)
+
+
+class SIGatewayClientPipeline:
+    """
+    Queues requests for a SIGatewayClient and sends them all at once, see SIGatewayClient.pipeline().
+
+    The methods of the pipeline take the same parameters as the methods with the same name of SIGatewayClient, but
+    only queue the request. Once the pipeline is executed, the results are returned in the order the requests were
+    queued, each result being the same as the return value of the respective SIGatewayClient method.
+    """
+
+    def __init__(self, capture: Callable[..., tuple], execute: Callable[[list, Optional[float]], List[any]],
+                 raise_on_error: bool = True):
+        self.__capture = capture
+        self.__execute = execute
+        self.__raise_on_error = raise_on_error
+        self.__requests: list = []
+        self.__results: Optional[List[any]] = None
+
+    def __enter__(self) -> SIGatewayClientPipeline:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None and self.__results is None:
+            self.execute()
+
+    def __len__(self) -> int:
+        return len(self.__requests)
+
+    def enumerate(self) -> None:
+        """
+        Queues an enumerate request, see SIGatewayClient.enumerate().
+        """
+
+        self.__queue('enumerate')
+
+    def describe(self, device_access_id: str = None, device_id: str = None, property_id: int = None,
+                 flags: SIDescriptionFlags = None) -> None:
+        """
+        Queues a describe request, see SIGatewayClient.describe().
+        """
+
+        self.__queue('describe', device_access_id, device_id, property_id, flags)
+
+    def find_properties(self, property_id: str, virtual: Optional[bool] = None,
+                        functions_mask: Optional[SIDeviceFunctions] = None) -> None:
+        """
+        Queues a find properties request, see SIGatewayClient.find_properties().
+        """
+
+        self.__queue('find_properties', property_id, virtual, functions_mask)
+
+    def read_property(self, property_id: str) -> None:
+        """
+        Queues a read property request, see SIGatewayClient.read_property().
+        """
+
+        self.__queue('read_property', property_id)
+
+    def read_properties(self, property_ids: List[str], batch: bool = False) -> None:
+        """
+        Queues a read properties request, see SIGatewayClient.read_properties().
+        """
+
+        self.__queue('read_properties', property_ids, batch)
+
+    def write_property(self, property_id: str, value: any = None, flags: SIWriteFlags = None) -> None:
+        """
+        Queues a write property request, see SIGatewayClient.write_property().
+        """
+
+        self.__queue('write_property', property_id, value, flags)
+
+    def read_datalog_properties(self, from_: datetime.datetime = None, to: datetime.datetime = None) -> None:
+        """
+        Queues a read datalog properties request, see SIGatewayClient.read_datalog_properties().
+        """
+
+        self.__queue('read_datalog_properties', from_, to)
+
+    def read_datalog_csv(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                         limit: int = None) -> None:
+        """
+        Queues a read datalog request, see SIGatewayClient.read_datalog_csv().
+        """
+
+        self.__queue('read_datalog_csv', property_id, from_, to, limit)
+
+    def read_datalog_arrays(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                            limit: int = None) -> None:
+        """
+        Queues a read datalog request, see SIGatewayClient.read_datalog_arrays().
+        """
+
+        self.__queue('read_datalog_arrays', property_id, from_, to, limit)
+
+    def read_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None, limit: int = None) -> None:
+        """
+        Queues a read messages request, see SIGatewayClient.read_messages().
+        """
+
+        self.__queue('read_messages', from_, to, limit)
+
+    def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None, body: str = '') -> None:
+        """
+        Queues an extension call, see SIGatewayClient.call_extension().
+        """
+
+        self.__queue('call_extension', extension, command, parameters, body)
+
+    def execute(self, deadline: Optional[float] = None) -> List[any]:
+        """
+        Sends all queued requests to the gateway, waits for all responses and returns the results in the order the
+        requests were queued. Executing the pipeline is done automatically when leaving the with block.
+
+        :param deadline: Optional point in time (see time.monotonic()) after which the client stops waiting for
+               the responses, defaults to the client's timeout.
+        :return: The results of all queued requests in call order.
+        :raises SIProtocolError: If the pipeline was already executed, on a connection, protocol or framing error and if
+                raise_on_error is set, the first error returned by the gateway.
+        :raises SITimeoutError: If not all responses were received before the deadline.
+        """
+
+        if self.__results is not None:
+            raise SIProtocolError('pipeline already executed')
+        self.__results = self.__execute(self.__requests, deadline) if self.__requests else []
+        if self.__raise_on_error:
+            for result in self.__results:
+                if isinstance(result, SIProtocolError):
+                    raise result
+        return self.__results
+
+    def results(self) -> Optional[List[any]]:
+        """
+        Returns the results of the executed pipeline in call order or None if the pipeline was not executed yet.
+
+        :return: Results of all queued requests.
+        """
+
+        return self.__results
+
+    def __queue(self, method: str, *args) -> None:
+        if self.__results is not None:
+            raise SIProtocolError('pipeline already executed')
+        self.__requests.append(self.__capture(method, *args))
+
+
+class SIGatewayClientPool:
+    """
+    Thread-safe pool of connected and authorized SIGatewayClient instances.
+
+    Connections are created on demand up to max_size and are reused after they have been returned to the pool, which
+    saves the TCP connection, the WebSocket upgrade and the authorization for every checkout:
+
+    pool = SIGatewayClientPool('localhost', user='installer', password='installer', max_size=4)
+    with pool.connection() as client:
+        status, id_, value = client.read_property('demo.inv.3136')
+
+    Connections idle for longer than health_check_interval are checked before they are handed out, connections older
+    than max_age and connections that failed are closed and transparently replaced by new ones.
+    """
+
+    def __init__(self, host: str, port: int = 1987, user: str = None, password: str = None, max_size: int = 10,
+                 min_idle: int = 0, max_age: Optional[float] = None, health_check_interval: Optional[float] = 10.0,
+                 **client_options):
+        """
+        :param host: Hostname or IP address of the OpenStuder gateway to connect to.
+        :param port: TCP port used for the connection to the OpenStuder gateway, defaults to 1987.
+        :param user: Username send to the gateway used for authorization.
+        :param password: Password send to the gateway used for authorization.
+        :param max_size: Maximal number of connections, idle and checked out, of the pool.
+        :param min_idle: Number of idle connections the pool tries to keep open, they are established when the pool is
+               created and whenever a connection has been closed.
+        :param max_age: Maximal time in seconds a connection is used before it is replaced, None (default) for no
+               limit.
+        :param health_check_interval: Connections idle for longer than this time in seconds are checked before they are
+               handed out, 0 checks every time, None never.
+        :param client_options: Additional keyword arguments passed to the SIGatewayClient constructor.
+        """
+
+        self.__host: str = host
+        self.__port: int = port
+        self.__user: Optional[str] = user
+        self.__password: Optional[str] = password
+        self.__max_size: int = max_size
+        self.__min_idle: int = min(min_idle, max_size)
+        self.__max_age: Optional[float] = max_age
+        self.__health_check_interval: Optional[float] = health_check_interval
+        self.__client_options: dict = client_options
+        self.__condition: threading.Condition = threading.Condition()
+        self.__idle: deque = deque()
+        self.__checked_out: set = set()
+        self.__created: Dict[SIGatewayClient, float] = {}
+        self.__size: int = 0
+        self.__closed: bool = False
+        self.__fill()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[SIGatewayClient]:
+        """
+        Checks out a connection for the duration of a with block and returns it to the pool afterwards. If the block
+        raises a connection error, the connection is closed instead of being returned.
+
+        :param timeout: Maximal time in seconds to wait for a connection if all connections are checked out, None
+               (default) waits forever.
+        :return: Context manager providing a connected SIGatewayClient.
+        :raises SIProtocolError: If no connection could be established.
+        :raises SITimeoutError: If no connection became available in time.
+        """
+
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except (websocket.WebSocketException, OSError) as error:
+            self.release(client, discard=not isinstance(error, SIProtocolError))
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        else:
+            self.release(client)
+
+    def acquire(self, timeout: Optional[float] = None) -> SIGatewayClient:
+        """
+        Checks out a connection from the pool. The connection has to be returned using release().
+
+        :param timeout: Maximal time in seconds to wait for a connection if all connections are checked out, None
+               (default) waits forever.
+        :return: Connected SIGatewayClient.
+        :raises SIProtocolError: If the pool is closed or no connection could be established.
+        :raises SITimeoutError: If no connection became available in time.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.__condition:
+                # Wait for an idle connection or for the pool to have room for a new one.
+                while not self.__idle and self.__size >= self.__max_size and not self.__closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise SITimeoutError('no connection available')
+                    self.__condition.wait(remaining)
+                if self.__closed:
+                    raise SIProtocolError('connection pool closed')
+                if self.__idle:
+                    client, last_used = self.__idle.pop()
+                else:
+                    client, last_used = None, None
+                    self.__size += 1
+
+            # Establish a new connection or hand out the idle one if it is still usable.
+            if client is None:
+                client = self.__connect()
+            elif not self.__is_usable(client, last_used):
+                self.__close(client)
+                continue
+            with self.__condition:
+                self.__checked_out.add(client)
+            return client
+
+    def release(self, client: SIGatewayClient, discard: bool = False) -> None:
+        """
+        Returns a connection checked out using acquire() to the pool.
+
+        :param client: The connection to return.
+        :param discard: If True, the connection is closed instead of being reused.
+        :raises SIProtocolError: If the connection is not checked out from this pool.
+        """
+
+        with self.__condition:
+            if client not in self.__checked_out:
+                raise SIProtocolError('connection not checked out from this pool')
+            self.__checked_out.remove(client)
+            if not discard and not self.__closed and client.state() == SIConnectionState.CONNECTED and \
+                    not self.__expired(client):
+                self.__idle.append((client, time.monotonic()))
+                self.__condition.notify()
+                return
+        self.__close(client)
+        self.__fill()
+
+    def close(self) -> None:
+        """
+        Closes all idle connections and the connections checked out as soon as they are returned.
+        """
+
+        with self.__condition:
+            self.__closed = True
+            idle = list(self.__idle)
+            self.__idle.clear()
+            self.__condition.notify_all()
+        for client, _ in idle:
+            self.__close(client)
+
+    def size(self) -> int:
+        """
+        Returns the number of connections of the pool, idle and checked out.
+
+        :return: Number of connections.
+        """
+
+        return self.__size
+
+    def idle(self) -> int:
+        """
+        Returns the number of idle connections of the pool.
+
+        :return: Number of idle connections.
+        """
+
+        return len(self.__idle)
+
+    def __connect(self) -> SIGatewayClient:
+        try:
+            client = SIGatewayClient(**self.__client_options)
+            client.connect(self.__host, self.__port, self.__user, self.__password)
+        except BaseException:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+        with self.__condition:
+            self.__created[client] = time.monotonic()
+        return client
+
+    def __close(self, client: SIGatewayClient) -> None:
+        with self.__condition:
+            self.__created.pop(client, None)
+            self.__size -= 1
+            self.__condition.notify()
+        if client.state() == SIConnectionState.CONNECTED:
+            try:
+                client.disconnect()
+            except (websocket.WebSocketException, OSError):
+                pass
+
+    def __expired(self, client: SIGatewayClient) -> bool:
+        return self.__max_age is not None and time.monotonic() - self.__created.get(client, 0.0) > self.__max_age
+
+    def __is_usable(self, client: SIGatewayClient, last_used: float) -> bool:
+        if client.state() != SIConnectionState.CONNECTED or self.__expired(client):
+            return False
+        if self.__health_check_interval is None or time.monotonic() - last_used < self.__health_check_interval:
+            return True
+
+        # A connection closed by the gateway or the network is detected when trying to receive from it. Events that
+        # arrived while the connection was idle stay buffered for the next user of the connection.
+        return client.check_connection()
+
+    def __fill(self) -> None:
+        # Establish idle connections until min_idle is reached, failures are ignored and retried on the next occasion.
+        while True:
+            with self.__condition:
+                if self.__closed or len(self.__idle) >= self.__min_idle or self.__size >= self.__max_size:
+                    return
+                self.__size += 1
+            try:
+                client = self.__connect()
+            except (websocket.WebSocketException, OSError):
+                return
+            with self.__condition:
+                self.__idle.append((client, time.monotonic()))
+                self.__condition.notify()
+
+
+class SIAsyncGatewayClientCallbacks:
+    """
+    Base class containing all callback methods that can be called by the SIAsyncGatewayClient. You can use this as your
+    base class and register it using IAsyncGatewayClient.set_callbacks().
+    """
+
+    def on_connected(self, access_level: SIAccessLevel, gateway_version: str) -> None:
+        """
+        This method is called once the connection to the gateway could be established and the user has been
+        successfully authorized.
+
+        :param access_level: Access level that was granted to the user during authorization.
+        :param gateway_version: Version of the OpenStuder software running on the gateway.
+        """
+        pass
+
+    def on_disconnected(self) -> None:
+        """
+        Called when the connection to the OpenStuder gateway has been gracefully closed by either side or the connection
+        was lost by any other reason.
+        """
+        pass
+
+    def on_error(self, reason) -> None:
+        """
+        Called on severe errors.
+
+        :param reason: Exception that caused the erroneous behavior.
+        """
+        pass
+
+    def on_enumerated(self, status: SIStatus, device_count: int) -> None:
+        """
+        Called when the enumeration operation started using enumerate() has completed on the gateway.
+
+        :param status: Operation status.
+        :param device_count: Number of devices present.
+        """
+        pass
+
+    def on_description(self, status: SIStatus, id_: Optional[str], description: object) -> None:
+        """
+        Called when the gateway returned the description requested using the describe() method.
+
+        :param status: Status of the operation.
+        :param id_: Subject's ID.
+        :param description: Description object.
+        """
+        pass
+
+    def on_properties_found(self, status: SIStatus, id_: str, count: int, virtual: bool, functions: SIDeviceFunctions,
+                            properties: List[str]) -> None:
+        """
+        Called when the gateway returned the list of found properties requested using the find_properties() method.
+
+        The callback takes four parameters:
+        @param status: Status of the find operation,
+        @param id_: the searched ID (including wildcard character),
+        @param count: the number of properties found,
+        @param virtual: True if list contains only virtual devices, false if it contains only real devices.
+        @param functions: Function list mask.
+        @param properties: List of the property IDs.
+        """
+
+    def on_property_read(self, status: SIStatus, property_id: str, value: Optional[any]) -> None:
+        """
+        Called when the property read operation started using read_property() has completed on the gateway.
+
+        :param status: Status of the read operation.
+        :param property_id: ID of the property read.
+        :param value: The value read.
+        """
+        pass
+
+    def on_properties_read(self, results: List[SIPropertyReadResult]) -> None:
+        """
+        Called when the multiple properties read operation started using read_properties() has completed on the gateway.
+
+        :param results: List of all results of the operation.
+        """
+        pass
+
+    def on_property_written(self, status: SIStatus, property_id: str) -> None:
+        """
+        Called when the property write operation started using write_property() has completed on the gateway.
+
+        :param status: Status of the write operation.
+        :param property_id: ID of the property written.
+        """
+        pass
+
+    def on_property_subscribed(self, status: SIStatus, property_id: str) -> None:
+        """
+        Called when the gateway returned the status of the property subscription requested using the
+        subscribe_to_property() method.
+
+        :param status: The status of the subscription.
+        :param property_id: ID of the property.
+        """
+        pass
+
+    def on_properties_subscribed(self, statuses: List[SIPropertySubscriptionResult]) -> None:
+        """
+        Called when the gateway returned the status of the properties subscription requested using the
+        subscribe_to_properties() method.
+
+        :param statuses: The statuses of the individual subscriptions.
+        """
+        pass
+
+    def on_property_unsubscribed(self, status: SIStatus, property_id: str) -> None:
+        """
+        Called when the gateway returned the status of the property unsubscription requested using the
+        unsubscribe_from_property() method.
+
+        :param status: The status of the unsubscription.
+        :param property_id: ID of the property.
+        """
+        pass
+
+    def on_properties_unsubscribed(self, statuses: List[SIPropertySubscriptionResult]) -> None:
+        """
+        Called when the gateway returned the status of the properties unsubscription requested using the
+        unsubscribe_from_properties() method.
+
+        :param statuses: The statuses of the individual unsubscribe requests.
+        """
+        pass
+
+    def on_property_updated(self, property_id: str, value: any, superseded: int = 0) -> None:
+        """
+        This callback is called whenever the gateway send a property update.
+
+        :param property_id: ID of the updated property.
+        :param value: The current value of the property.
+        :param superseded: Number of older values of the property that were dropped, only passed if the client
+               conflates property updates.
+        """
+        pass
+
+    def on_properties_updated(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        """
+        This callback is called with a batch of property updates if the client batches property updates.
+
+        :param updates: The property updates in the order they were received.
+        """
+        pass
+
+    def on_datalog_properties_read(self, status: SIStatus, properties: List[str]) -> None:
+        """
+        Called when the datalog property list operation started using read_datalog_properties() has completed on the
+        gateway.
+
+        :param status: Status of the operation.
+        :param properties: List of the IDs of the properties for whom data is available in the data log.
+        """
+
+        pass
+
+    def on_datalog_read_csv(self, status: SIStatus, property_id: str, count: int, values: str) -> None:
+        """
+        Called when the datalog read operation started using read_datalog() has completed on the gateway. This version
+        of the method returns the data in CSV format suitable to
+        be written to a file.
+
+        :param status: Status of the operation.
+        :param property_id: ID of the property.
+        :param count: Number of entries.
+        :param values: Properties data in CSV format whereas the first column is the date and time in ISO 8601 extended
+               format and the second column contains the actual values.
+        """
+
+        pass
+
+    def on_datalog_read_arrays(self, status: SIStatus, property_id: str, count: int, values: SIDatalogArrays) -> None:
+        """
+        Called instead of on_datalog_read_csv() when the datalog read operation started using read_datalog() has
+        completed on the gateway, if this method is overridden. This version of the method returns the data decoded
+        into arrays of times and values.
+
+        :param status: Status of the operation.
+        :param property_id: ID of the property.
+        :param count: Number of entries.
+        :param values: Properties data as SIDatalogArrays.
+        """
+
+        pass
+
+    def on_device_message(self, message: SIDeviceMessage) -> None:
+        """
+        This callback is called whenever the gateway send a device message indication.
+
+        :param message: The device message received.
+        """
+        pass
+
+    def on_messages_read(self, status: SIStatus, count: int, messages: List[SIDeviceMessage]) -> None:
+        """
+        Called when the gateway returned the status of the read messages operation using the read_messages() method.
+
+        :param status: The status of the operation.
+        :param count: Number of messages retrieved.
+        :param messages: List of retrieved messages.
+        """
+        pass
+
+    def on_messages_read_iter(self, status: SIStatus, count: Optional[int],
+                              messages: Iterator[SIDeviceMessage]) -> None:
+        """
+        Called instead of on_messages_read() when the gateway returned the status of the read messages operation, if
+        this method is overridden. The messages are decoded one by one while the iterator is consumed, errors in the
+        message list are raised while iterating.
+
+        :param status: The status of the operation.
+        :param count: Number of messages retrieved.
+        :param messages: Iterator over the retrieved messages.
+        """
+        pass
+
+    def on_extension_called(self, extension: str, command: str, status: SIExtensionStatus, parameters: dict, body: str):
+        """
+        Called when the gateway returned the status of the call extension operation using the call_extension() method.
+
+        :param extension: Extension that did run the command.
+        :param command: The command.
+        :param status: Status of the command run.
+        :param parameters: Key/value pairs returned by the command, see extension documentation for details.
+        :param body: Optional body (output) returned by the command, see extension documentation for details.
+        :return:
+        """
+        pass
+
+
+class SIAsyncGatewayClient(_SIAbstractGatewayClient):
+    """
+    Complete, asynchronous (non-blocking) OpenStuder gateway client.
+
+    This client uses an asynchronous model which has the disadvantage to be a bit harder to use than the synchronous
+    version. The advantages are that long operations do not block the main thread as all results are reported using
+    callbacks, device message indications are supported and subscriptions to property changes are possible.
+
+    Created with futures=True, all request methods additionally return a future for their result, which allows to match
+    results to requests when many of them are in flight at the same time.
+    """
+
+    def __init__(self, property_schema: Optional[SIPropertySchema] = None, json_codec: SIJsonCodec = SIJsonCodec.AUTO,
+                 max_batch: Optional[int] = None, cache: Optional[SIPropertyCache] = None,
+                 reconnect: Optional[SIReconnectPolicy] = None, futures: bool = False,
+                 dispatcher: Optional[SICallbackDispatcher] = None, conflate_updates: bool = False,
+                 batching: Optional[SIUpdateBatching] = None, history: Optional[SIPropertyHistory] = None):
+        """
+        :param property_schema: Optional property schema used to decode property values, it is filled automatically
+               with the property information of all descriptions received.
+        :param json_codec: JSON implementation used to decode frame bodies, defaults to the fastest installed one.
+        :param max_batch: Maximal number of property IDs sent in a single request by read_properties(),
+               subscribe_to_properties() and unsubscribe_from_properties(). Longer lists are split into multiple
+               requests sent back-to-back, the results are merged in input order and reported using a single callback.
+               None (default) never splits.
+        :param cache: Optional property cache, read_property() and read_properties() report cached values that did
+               not expire immediately instead of asking the gateway.
+        :param reconnect: Optional reconnect policy. If present, the client reconnects after the connection was lost
+               and subscribes again to all properties it was subscribed to, using a single SUBSCRIBE PROPERTIES request
+               whose result is reported using on_properties_subscribed(). The client is in the CONNECTING state until
+               the connection is established again or the policy gives up.
+        :param futures: If true, every request method returns a concurrent.futures.Future that is resolved with the
+               result of the request in addition to calling the callback. Responses are matched to their request by
+               command and property ID, or in the order the requests were sent if the response has no ID. Failed
+               requests and requests pending when the connection is lost complete with an SIProtocolError.
+        :param dispatcher: Optional callback dispatcher used to call all callbacks, see SICallbackDispatcher. Defaults
+               to calling the callbacks inline on the thread receiving the frames.
+        :param conflate_updates: If true, only the newest value of each property is kept until on_property_updated()
+               is called for it, older values are dropped without being decoded. Updates are reported in the order the
+               properties first changed and on_property_updated() gets the number of dropped values as third
+               parameter. This only has an effect with a queuing dispatcher, inline callbacks are always up to date.
+        :param batching: Optional batching configuration. If present, property updates are collected and reported in
+               batches using on_properties_updated() instead of on_property_updated(), see SIUpdateBatching. Batching
+               takes precedence over conflate_updates.
+        :param history: Optional property history, the values of all property updates received are recorded in it
+               before they are reported, see SIPropertyHistory.
+        :raises SIProtocolError: If the requested JSON implementation is not installed.
+        """
+
+        super(SIAsyncGatewayClient, self).__init__()
+        self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
+        self.__ws: Optional[websocket.WebSocketApp] = None
+        self.__thread: Optional[Thread] = None
+        self.__access_level: SIAccessLevel = SIAccessLevel.NONE
+        self.__gateway_version: str = ''
+        self.__available_extensions: List[str] = []
+        self.__property_schema: Optional[SIPropertySchema] = property_schema
+        self.__json_loads: Callable[[str], any] = json_codec.loads()
+        self.__max_batch: Optional[int] = max_batch
+        self.__cache: Optional[SIPropertyCache] = cache
+        self.__reconnect_policy: Optional[SIReconnectPolicy] = reconnect
+        self.__reconnect_attempt: int = 0
+        self.__reconnect_wakeup: threading.Event = threading.Event()
+        self.__closing: bool = False
+        self.__closing_lock: threading.Lock = threading.Lock()
+        self.__url: Optional[str] = None
+        self.__subscriptions: Dict[str, None] = {}
+        self.__chunked_requests: Dict[str, deque] = {
+            'PROPERTIES READ': deque(),
+            'PROPERTIES SUBSCRIBED': deque(),
+            'PROPERTIES UNSUBSCRIBED': deque()
+        }
+        self.__futures: bool = futures
+        self.__tracked: bool = futures or max_batch is not None or cache is not None
+        self.__dispatcher: SICallbackDispatcher = dispatcher if dispatcher is not None else SICallbackDispatcher()
+        self.__conflated_updates: Optional[Dict[str, list]] = {} if conflate_updates else None
+        self.__conflated_updates_lock: threading.Lock = threading.Lock()
+        self.__update_batcher: Optional[_SIUpdateBatcher] = None
+        self.__flush_timer: _SIFlushTimer = _SIFlushTimer()
+        if batching is not None:
+            self.__update_batcher = _SIUpdateBatcher(batching, self.__deliver_update_batch, self.__flush_timer.start)
+        self.__history: Optional[SIPropertyHistory] = history
+        self.__pending: Dict[Tuple[str, Optional[str]], deque] = {}
+        self.__pending_lock: threading.Lock = threading.Lock()
+        self.__send_lock: threading.Lock = threading.Lock()
+        self.__sequence: Iterator[int] = itertools.count()
+
+        self.__user: Optional[str] = None
+        self.__password: Optional[str] = None
+
+        self.on_connected: Optional[Callable[[SIAccessLevel, str], None]] = None
+        """
+        This callback is called once the connection to the gateway could be established and the user has been 
+        successfully authorized.
+
+        The callback takes two arguments. 
+        1: the access level that was granted to the user during authorization, 
+        2: the version of the OpenStuder software running on the gateway.
+        """
+
+        self.on_disconnected: Optional[Callable[[], None]] = None
+        """
+        Called when the connection to the OpenStuder gateway has been gracefully closed by either side or the 
+        connection was lost by any other reason.
+
+        This callback has no parameters.
+        """
+
+        self.on_error: Optional[Callable[[Exception], None]] = None
+        """
+        Called on severe errors.
+
+        The single parameter passed to the callback is the exception that caused the erroneous behavior.
+        """
+
+        self.on_enumerated: Optional[Callable[[SIStatus, int], None]] = None
+        """
+        Called when the enumeration operation started using enumerate() has completed on the gateway.
+
+        The callback takes two arguments. 
+        1: operation status, 
+        2: the number of devices present.
+        """
+
+        self.on_description: Optional[Callable[[SIStatus, Optional[str], object], None]] = None
+        """
+        Called when the gateway returned the description requested using the describe() method.
+
+        The callback takes three parameters: 
+        1: Status of the operation, 
+        2: the subject's ID, 
+        3: the description object.
+        """
+
+        self.on_properties_found: Optional[Callable[[SIStatus, str, int, bool, SIDeviceFunctions, List[str]], None]] = \
+            None
+        """
+        Called when the gateway returned the list of found properties requested using the find_properties() method.
+
+        The callback takes four parameters: 
+        1: Status of the find operation, 
+        2: the searched ID (including wildcard character), 
+        3: the number of properties found,
+        4: True if list contains only virtual devices, false if it contains only real devices.
+        5: Function list mask.
+        6: List of the property IDs.
+        """
+
+        self.on_property_read: Optional[Callable[[SIStatus, str, Optional[any]], None]] = None
+        """
+        Called when the property read operation started using read_property() has completed on the gateway.
+
+        The callback takes three parameters: 
+        1: Status of the read operation, 
+        2: the ID of the property read, 
+        3: the value read.
+        """
+
+        self.on_properties_read: Optional[Callable[[List[SIPropertyReadResult]], None]] = None
+        """
+        Called when the multiple properties read operation started using read_properties() has completed on the gateway.
+
+        The callback takes one parameters: 
+        1: List of all results of the operation.
+        """
+
+        self.on_property_written: Optional[Callable[[SIStatus, str], None]] = None
+        """
+        Called when the property write operation started using write_property() has completed on the gateway.
+
+        The callback takes two parameters: 
+        1: Status of the write operation, 
+        2: the ID of the property written.
+        """
+
+        self.on_property_subscribed: Optional[Callable[[SIStatus, str], None]] = None
+        """
+        Called when the gateway returned the status of the property subscription requested using the 
+        subscribe_to_property() method.
+
+        The callback takes two parameters: 
+        1: The status of the subscription, 
+        2: The ID of the property.
+        """
+
+        self.on_properties_subscribed: Optional[Callable[[List[SIPropertySubscriptionResult]], None]] = None
+        """
+        Called when the gateway returned the status of the properties subscription requested using the 
+        subscribe_to_properties() method.
+
+        The callback takes one parameter: 
+        1: List of statuses of individual subscription requests.
+        """
+
+        self.on_property_unsubscribed: Optional[Callable[[SIStatus, str], None]] = None
+        """
+        Called when the gateway returned the status of the property unsubscription requested using the 
+        unsubscribe_from_property() method.
 
-    @staticmethod
-    def decode_property_update_frame(frame: str) -> Tuple[str, any]:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'PROPERTY UPDATE' and 'id' in headers and 'value' in headers:
-            try:
-                value = float(headers['value'])
-            except ValueError:
-                string = headers['value'].lower()
-                if string == 'true':
-                    value = True
-                elif string == 'false':
-                    value = False
-                else:
-                    value = string
-            return headers['id'], value
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error receiving property update')
+        The callback takes two parameters: 
+        1: The status of the unsubscription, 
+        2: The ID of the property.
+        """
 
-    @staticmethod
-    def encode_read_datalog_frame(property_id: Optional[str], from_: Optional[datetime.datetime],
-                                  to: Optional[datetime.datetime], limit: Optional[int]) -> str:
-        frame = 'READ DATALOG\n'
-        if property_id is not None:
-            frame += 'id:{property_id}\n'.format(property_id=property_id)
-        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('from', from_)
-        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('to', to)
-        if limit is not None:
-            frame += 'limit:{limit}\n'.format(limit=limit)
-        frame += '\n'
-        return frame
+        self.on_properties_unsubscribed: Optional[Callable[[List[SIPropertySubscriptionResult]], None]] = None
+        """
+        Called when the gateway returned the status of the properties unsubscription requested using the 
+        unsubscribe_from_properties() method.
 
-    @staticmethod
-    def decode_datalog_read_frame(frame: str) -> Tuple[SIStatus, Optional[str], int, str]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'DATALOG READ' and 'status' in headers and 'count' in headers:
-            return SIStatus.from_string(headers['status']), headers.get('id'), int(headers['count']), body
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error receiving datalog read')
+        The callback takes one parameter: 
+        1: List of statuses of individual unsubscription requests.
+        """
 
-    @staticmethod
-    def encode_read_messages_frame(from_: Optional[datetime.datetime], to: Optional[datetime.datetime],
-                                   limit: Optional[int]) -> str:
-        frame = 'READ MESSAGES\n'
-        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('from', from_)
-        frame += _SIAbstractGatewayClient.get_timestamp_header_if_present('to', to)
-        if limit is not None:
-            frame += 'limit:{limit}\n'.format(limit=limit)
-        frame += '\n'
-        return frame
+        self.on_property_updated: Optional[Callable[..., None]] = None
+        """
+        This callback is called whenever the gateway send a property update.
 
-    @staticmethod
-    def decode_messages_read_frame(frame: str) -> Tuple[SIStatus, int, List[SIDeviceMessage]]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'MESSAGES READ' and 'status' in headers and 'count' in headers:
-            status = SIStatus.from_string(headers['status'])
-            if status == SIStatus.SUCCESS:
-                messages = json.loads(body, object_hook=SIDeviceMessage.from_dict)
-                return status, int(headers['count']), messages
-            else:
-                return status, int(headers['count']), []
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error during description')
+        The callback takes two parameters: 
+        1: the ID of the property that has updated, 
+        2: the actual value.
+        If the client conflates property updates, a third parameter gives the number of older values dropped.
+        """
 
-    @staticmethod
-    def decode_device_message_frame(frame: str) -> SIDeviceMessage:
-        command, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'DEVICE MESSAGE' and 'access_id' in headers and 'device_id' in headers and \
-                'message_id' in headers and 'message' in headers and 'timestamp' in headers:
-            return SIDeviceMessage.from_dict(headers)
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error receiving device message')
+        self.on_properties_updated: Optional[Callable[[Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]], None]] \
+            = None
+        """
+        This callback is called instead of on_property_updated() if the client batches property updates.
 
-    @staticmethod
-    def encode_call_extension_frame(extension: str, command: str, parameters: dict, body: str) -> str:
-        frame = 'CALL EXTENSION\n'
-        frame += 'extension:{extension}\n'.format(extension=extension)
-        frame += 'command:{command}\n'.format(command=command)
-        for key, value in parameters.items():
-            frame += '{key}:{value}\n'.format(key=key, value=value)
-        frame += '\n'
-        frame += body
-        return frame
+        The callback takes one parameter, the list of updates (SIPropertyUpdate) in the order they were received, or
+        an SIPropertyUpdateBatch if the batches are columnar.
+        """
 
-    @staticmethod
-    def decode_extension_called_frame(frame: str) -> Tuple[str, str, SIExtensionStatus, dict, str]:
-        command, headers, body = _SIAbstractGatewayClient.decode_frame(frame)
-        if command == 'EXTENSION CALLED' and 'extension' in headers and 'command' in headers and 'status' in headers:
-            additional_headers = {}
-            for key, value in headers.items():
-                if key != 'extension' and key != 'command' and key != 'status':
-                    additional_headers[key] = value
-            return headers['extension'], headers['command'], SIExtensionStatus.from_string(headers['status']), \
-                additional_headers, body
-        elif command == 'ERROR' and 'reason' in headers:
-            raise SIProtocolError(headers['reason'])
-        else:
-            raise SIProtocolError('unknown error receiving extension called message')
+        self.on_datalog_properties_read: Optional[Callable[[SIStatus, List[str]], None]] = None
+        """
+        Called when the datalog property list operation started using read_datalog_properties() has completed on the 
+        gateway.
 
-    @staticmethod
-    def peek_frame_command(frame: str) -> str:
-        return frame[:frame.index('\n')]
+        The callback takes 2 parameters: 
+        1: Status of the operation, 
+        2: List of the IDs of the properties for whom data is available in the data log.
+        """
 
-    @staticmethod
-    def decode_frame(frame: str) -> Tuple[str, dict, str]:
-        lines = frame.split('\n')
+        self.on_datalog_read_csv: Optional[Callable[[SIStatus, str, int, str], None]] = None
+        """
+        Called when the datalog read operation started using read_datalog() has completed on the gateway. This version 
+        of the callback returns the data in CSV format suitable to be written to a file.
 
-        if len(lines) < 2:
-            raise SIProtocolError('invalid frame')
+        The callback takes four parameters: 
+        1: Status of the operation, 
+        2: ID of the property, 
+        3: number of entries, 
+        4: properties data in CSV format whereas the first column is the date and time in ISO 8601 extended format and 
+        the second column contains the actual values.
+        """
 
-        command = lines[0]
+        self.on_datalog_read_arrays: Optional[Callable[[SIStatus, str, int, SIDatalogArrays], None]] = None
+        """
+        Alternative to on_datalog_read_csv() for code doing computations on the logged data. If set, it is called 
+        instead of on_datalog_read_csv() and gets the data decoded into arrays of times and values.
 
-        line = 1
-        headers = {}
-        while line < len(lines) and lines[line]:
-            components = lines[line].split(':')
-            if len(components) >= 2:
-                headers[components[0]] = ':'.join(components[1:])
-            line += 1
-        line += 1
-
-        if line >= len(lines):
-            raise SIProtocolError('invalid frame')
+        The callback takes four parameters: 
+        1: Status of the operation, 
+        2: ID of the property, 
+        3: number of entries, 
+        4: properties data as SIDatalogArrays.
+        """
+
+        self.on_device_message: Optional[Callable[[SIDeviceMessage], None]] = None
+        """
+        This callback is called whenever the gateway send a device message indication.
 
-        body = '\n'.join(lines[line:])
+        The callback takes one parameter, the device message object.
+        """
 
-        return command, headers, body
+        self.on_messages_read: Optional[Callable[[SIStatus, Optional[int], List[SIDeviceMessage]], None]] = None
+        """
+        Called when the gateway returned the status of the read messages operation using the read_messages() method.
 
-    @staticmethod
-    def get_timestamp_header_if_present(key: str, timestamp: Optional[datetime.datetime]):
-        if timestamp is not None and isinstance(timestamp, datetime.datetime):
-            return '{key}:{timestamp}\n'.format(key=key, timestamp=timestamp.replace(microsecond=0).isoformat())
-        else:
-            return ''
+        The callback takes three parameters: 
+        1: the status of the operation, 
+        2: the number of messages retrieved, 
+        3: the list of retrieved messages.
+        """
 
+        self.on_messages_read_iter: Optional[Callable[[SIStatus, Optional[int], Iterator[SIDeviceMessage]], None]] = \
+            None
+        """
+        Alternative to on_messages_read() for large message histories. If set, it is called instead of
+        on_messages_read() and gets an iterator that decodes the messages one by one while it is consumed, so that not
+        all message objects have to be in memory at the same time. Errors in the message list are raised while
+        iterating.
 
-class SIGatewayClient(_SIAbstractGatewayClient):
-    """
-    Simple, synchronous (blocking) OpenStuder gateway client.
+        The callback takes three parameters:
+        1: the status of the operation,
+        2: the number of messages retrieved,
+        3: an iterator over the retrieved messages.
+        """
 
-    This client uses a synchronous model which has the advantage to be much simpler to use than the asynchronous
-    version SIAsyncGatewayClient. The drawback is that device message indications are ignored by this client and
-    subscriptions to property changes are not possible.
-    """
+        self.on_extension_called: Optional[Callable[[str, str, SIExtensionStatus, dict, str], None]] = None
+        """
+        Called when the gateway returned the status of the call extension operation using the call_extension() method.
 
-    def __init__(self):
-        super(SIGatewayClient, self).__init__()
-        self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
-        self.__ws: Optional[websocket.WebSocket] = None
-        self.__access_level: SIAccessLevel = SIAccessLevel.NONE
-        self.__gateway_version: str = ''
-        self.__availableExtensions: List[str] = []
+        The callback takes 5 parameters: 
+        1: Extension that did run the command.
+        2: The command.
+        3: Status of the command run.
+        4: Key/value pairs returned by the command, see extension documentation for details.
+        5: Optional body (output) returned by the command, see extension documentation for details.
+        """
+
+        # Property updates are either batched, conflated or reported one by one.
+        if batching is not None:
+            property_update_handler = self.__batch_property_update_frame
+        elif conflate_updates:
+            property_update_handler = self.__conflate_property_update_frame
+        else:
+            property_update_handler = self.__callback_frame_handler(self.__decode_property_update_frame,
+                                                                    'on_property_updated', correlated=False,
+                                                                    conflated=True)
+
+        # Frame handlers by command.
+        self.__frame_handlers: Dict[str, Callable[[str], None]] = {
+            'PROPERTY UPDATE': property_update_handler,
+            'DEVICE MESSAGE': self.__callback_frame_handler(
+                lambda frame: (super(SIAsyncGatewayClient, self).decode_device_message_frame(frame),),
+                'on_device_message', correlated=False),
+            'ERROR': self.__handle_error_frame,
+            'ENUMERATED': self.__callback_frame_handler(
+                super(SIAsyncGatewayClient, self).decode_enumerated_frame, 'on_enumerated'),
+            'DESCRIPTION': self.__callback_frame_handler(self.__decode_description_frame, 'on_description'),
+            'PROPERTIES FOUND': self.__callback_frame_handler(
+                lambda frame: super(SIAsyncGatewayClient, self).decode_properties_found_frame(
+                    frame, self.__json_loads), 'on_properties_found'),
+            'PROPERTY READ': self.__callback_frame_handler(self.__decode_property_read_frame, 'on_property_read'),
+            'PROPERTIES READ': self.__merging_frame_handler(
+                'PROPERTIES READ', self.__decode_properties_read_frame, 'on_properties_read'),
+            'PROPERTY WRITTEN': self.__callback_frame_handler(self.__decode_property_written_frame,
+                                                              'on_property_written'),
+            'PROPERTY SUBSCRIBED': self.__callback_frame_handler(self.__decode_property_subscribed_frame,
+                                                                 'on_property_subscribed'),
+            'PROPERTIES SUBSCRIBED': self.__merging_frame_handler(
+                'PROPERTIES SUBSCRIBED', self.__decode_properties_subscribed_frame, 'on_properties_subscribed'),
+            'PROPERTY UNSUBSCRIBED': self.__callback_frame_handler(self.__decode_property_unsubscribed_frame,
+                                                                   'on_property_unsubscribed'),
+            'PROPERTIES UNSUBSCRIBED': self.__merging_frame_handler(
+                'PROPERTIES UNSUBSCRIBED', self.__decode_properties_unsubscribed_frame, 'on_properties_unsubscribed'),
+            'DATALOG READ': self.__handle_datalog_read_frame,
+            'MESSAGES READ': self.__handle_messages_read_frame,
+            'EXTENSION CALLED': self.__callback_frame_handler(
+                super(SIAsyncGatewayClient, self).decode_extension_called_frame, 'on_extension_called')
+        }
 
-    def connect(self, host: str, port: int = 1987, user: str = None, password: str = None) -> SIAccessLevel:
+    def connect(self, host: str, port: int = 1987, user: str = None, password: str = None,
+                background: bool = True) -> None:
         """
         Establishes the WebSocket connection to the OpenStuder gateway and executes the user authorization process once
-        the connection has been established. This method blocks the current thread until the operation (authorize) has
-        been completed or an error occurred. The method returns the access level granted to the client during
-        authorization on success or throws an **SIProtocolError** otherwise.
+        the connection has been established in the background. This method returns immediately and does not block the
+        current thread.
+
+        The status of the connection attempt is reported either by the on_connected() callback on success or the
+        on_error() callback if the connection could not be established or the authorisation for the given user was
+        rejected by the gateway.
 
         :param host: Hostname or IP address of the OpenStuder gateway to connect to.
         :param port: TCP port used for the connection to the OpenStuder gateway, defaults to 1987.
         :param user: Username send to the gateway used for authorization.
         :param password: Password send to the gateway used for authorization.
-        :return: Access Level granted to the client.
-        :raises SIProtocolError: If the connection could not be established, or the authorization was refused.
+        :param background: If true, the handling of the WebSocket connection is done in the background, if false the
+               current thread is taken over.
+        :raises SIProtocolError: If there was an error initiating the WebSocket connection.
         """
 
         # Ensure that the client is in the DISCONNECTED state.
         self.__ensure_in_state(SIConnectionState.DISCONNECTED)
 
+        # Save parameter for later use.
+        self.__user = user
+        self.__password = password
+        self.__url = 'ws://{host}:{port}'.format(host=host, port=port)
+        self.__closing = False
+        self.__reconnect_attempt = 0
+        self.__reconnect_wakeup.clear()
+        self.__subscriptions.clear()
+
         # Connect to WebSocket server.
         self.__state = SIConnectionState.CONNECTING
-        self.__ws = websocket.create_connection('ws://{host}:{port}'.format(host=host, port=port))
+        self.__ws = self.__create_websocket_app()
 
-        # Authorize client.
-        self.__state = SIConnectionState.AUTHORIZING
-        if user is None or password is None:
-            self.__ws.send(super(SIGatewayClient, self).encode_authorize_frame_without_credentials())
+        # TODO: Start connection timeout.
+
+        # In background mode, start a daemon thread for the connection handling, otherwise take over current thread.
+        if background:
+            self.__thread = Thread(target=self.__run_forever)
+            self.__thread.setDaemon(True)
+            self.__thread.start()
         else:
-            self.__ws.send(super(SIGatewayClient, self).encode_authorize_frame_with_credentials(user, password))
-        try:
-            self.__access_level, self.__gateway_version, self.__availableExtensions = \
-                super(SIGatewayClient, self).decode_authorized_frame(self.__ws.recv())
-        except ConnectionRefusedError:
-            self.__state = SIConnectionState.DISCONNECTED
-            raise SIProtocolError('WebSocket connection refused')
+            self.__run_forever()
+
+    def set_callbacks(self, callbacks: SIAsyncGatewayClientCallbacks) -> None:
+        """
+        Configures the client to use all callbacks of the passed abstract client callback class. Using this you can set
+        all callbacks to be called on the given object and avoid having to set each callback individually.
+
+        :param callbacks: Object derived from SIAsyncGatewayClientCallbacks to be used for all callbacks.
+        """
+        if isinstance(callbacks, SIAsyncGatewayClientCallbacks):
+            self.on_connected = callbacks.on_connected
+            self.on_disconnected = callbacks.on_disconnected
+            self.on_error = callbacks.on_error
+            self.on_enumerated = callbacks.on_enumerated
+            self.on_description = callbacks.on_description
+            self.on_properties_found = callbacks.on_properties_found
+            self.on_property_read = callbacks.on_property_read
+            self.on_properties_read = callbacks.on_properties_read
+            self.on_property_written = callbacks.on_property_written
+            self.on_property_subscribed = callbacks.on_property_subscribed
+            self.on_properties_subscribed = callbacks.on_properties_subscribed
+            self.on_property_unsubscribed = callbacks.on_property_unsubscribed
+            self.on_properties_unsubscribed = callbacks.on_properties_unsubscribed
+            self.on_property_updated = callbacks.on_property_updated
+            self.on_properties_updated = callbacks.on_properties_updated
+            self.on_datalog_properties_read = callbacks.on_datalog_properties_read
+            self.on_datalog_read_csv = callbacks.on_datalog_read_csv
+            self.on_datalog_read_arrays = self.__overridden_callback(callbacks, 'on_datalog_read_arrays')
+            self.on_device_message = callbacks.on_device_message
+            self.on_messages_read = callbacks.on_messages_read
+            self.on_messages_read_iter = self.__overridden_callback(callbacks, 'on_messages_read_iter')
+            self.on_extension_called = callbacks.on_extension_called
+
+    @staticmethod
+    def __overridden_callback(callbacks: SIAsyncGatewayClientCallbacks, name: str) -> Optional[Callable]:
+        # Alternative callbacks replace the regular ones if set, so they are only used if the subclass overrides them.
+        if getattr(type(callbacks), name) is getattr(SIAsyncGatewayClientCallbacks, name):
+            return None
+        return getattr(callbacks, name)
 
-        # Change state to connected.
-        self.__state = SIConnectionState.CONNECTED
+    def register_frame_handler(self, command: str, handler: Callable[[str], None]) -> None:
+        """
+        Registers a handler for frames with the given command received from the gateway. This allows to handle frames
+        the client does not know about without modifying the library. Registering a handler for a command the client
+        already knows replaces the built-in handling of that command.
 
-        # Return access level.
-        return self.__access_level
+        The handler is called with the complete frame, use decode_frame() to split it into command, headers and body.
+        Protocol errors raised by the handler are reported using the on_error() callback.
+
+        :param command: Frame command the handler is responsible for, for example 'PROPERTY UPDATE'.
+        :param handler: Callable taking the raw frame as single parameter.
+        """
+
+        self.__frame_handlers[command] = handler
 
     def state(self) -> SIConnectionState:
         """
@@ -880,29 +4328,36 @@ class SIGatewayClient(_SIAbstractGatewayClient):
 
         :return: List of available protocol extensions.
         """
-        return self.__availableExtensions
+        return self.__available_extensions
+
+    def property_schema(self) -> Optional[SIPropertySchema]:
+        """
+        Returns the property schema used by the client to decode property values, None if no schema is used.
+
+        :return: Property schema or None.
+        """
+        return self.__property_schema
 
-    def enumerate(self) -> Tuple[SIStatus, int]:
+    def enumerate(self) -> Optional[Future]:
         """
         Instructs the gateway to scan every configured and functional device access driver for new devices and remove
-        devices that do not respond anymore. Returns the status of the operation, and the number of devices present.
+        devices that do not respond anymore.
 
-        :return: Returns two values. 1: operation status, 2: the number of devices present.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        The status of the operation and the number of devices present are reported using the on_enumerated() callback.
+
+        :return: Future resolved with the arguments of on_enumerated() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send ENUMERATE message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_enumerate_frame())
-
-        # Wait for ENUMERATED message, decode it and return data.
-        return super(SIGatewayClient, self).decode_enumerated_frame(
-            self.__receive_frame_until_commands(['ENUMERATED', 'ERROR']))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_enumerate_frame(), 'ENUMERATED')
 
     def describe(self, device_access_id: str = None, device_id: str = None, property_id: int = None,
-                 flags: SIDescriptionFlags = None) -> Tuple[SIStatus, Optional[str], object]:
+                 flags: SIDescriptionFlags = None) -> Optional[Future]:
         """
         This method can be used to retrieve information about the available devices and their properties from the
         connected gateway. Using the optional device_access_id, device_id and property_id parameters, the method can
@@ -911,30 +4366,29 @@ class SIGatewayClient(_SIAbstractGatewayClient):
 
         The flags control the level of detail in the gateway's response.
 
+        The description is reported using the on_description() callback.
+
         :param device_access_id: Device access ID for which the description should be retrieved.
         :param device_id: Device ID for which the description should be retrieved. Note that device_access_id must be
                present too.
         :param property_id: Property ID for which the description should be retrieved. Note that device_access_id and
                device_id must be present too.
         :param flags: Flags to control level of detail of the response.
-        :return: Returns three values. 1: Status of the operation, 2: the subject's id, 3: the description object.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_description() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send DESCRIBE message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_describe_frame(device_access_id, device_id,
-                                                                          property_id, flags))
-
-        # Wait for DESCRIPTION message, decode it and return data.
-        return super(SIGatewayClient, self).decode_description_frame(
-            self.__receive_frame_until_commands(['DESCRIPTION', 'ERROR']))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_describe_frame(device_access_id, device_id,
+                                                                                   property_id, flags),
+                           'DESCRIPTION')
 
     def find_properties(self, property_id: str, virtual: Optional[bool] = None,
-                        functions_mask: Optional[SIDeviceFunctions] = None) \
-            -> Tuple[SIStatus, str, int, bool, SIDeviceFunctions, List[str]]:
+                        functions_mask: Optional[SIDeviceFunctions] = None) -> Optional[Future]:
         """
         This method is used to retrieve a list of existing properties that match the given property ID in the form
         "<device access ID>.<device ID>.<property ID>". The wildcard character "*" is supported for <device access ID>
@@ -945,70 +4399,88 @@ class SIGatewayClient(_SIAbstractGatewayClient):
         property connected through the device access "demo" and finally "*.*.3136" represents all properties with ID
         3136 on any device that disposes that property connected through any device access.
 
+        The status of the read operation and the actual value of the property are reported using the
+        on_properties_found() callback.
+
         :param property_id: The search wildcard ID.
         :param virtual: Optional to filter for virtual devices (true) or non-virtual devices (false, default).
         :param functions_mask: Optional to filter for device functions. See SIDeviceFunctions for details. Defaults
                to all functions (SIDeviceFunctions.ALL).
-        :return: Returns four values: 1: Status of the find operation, 2: the searched ID (including wildcard
-                 character), 3: the number of properties found,
-                 4: True if virtual devices were searched, false otherwise. 5: Functions searched for,
-                 6: List of the property IDs.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_properties_found() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send FIND PROPERTIES message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_find_properties_frame(property_id, virtual, functions_mask))
-
-        # Wait for PROPERTIES FOUND message, decode it and return data.
-        return super(SIGatewayClient, self).decode_properties_found_frame(
-            self.__receive_frame_until_commands(['PROPERTIES FOUND', 'ERROR']))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_find_properties_frame(property_id, virtual,
+                                                                                          functions_mask),
+                           'PROPERTIES FOUND')
 
-    def read_property(self, property_id: str) -> Tuple[SIStatus, str, Optional[any]]:
+    def read_property(self, property_id: str) -> Optional[Future]:
         """
         This method is used to retrieve the actual value of a given property from the connected gateway. The property
         is identified by the property_id parameter.
 
+        The status of the read operation and the actual value of the property are reported using the on_property_read()
+        callback. If the client uses a cache and the property's value is cached, the callback is dispatched before the
+        method returns, so with the default inline dispatcher it is called on the calling thread.
+
         :param property_id: The ID of the property to read in the form '{device access ID}.{device ID}.{property ID}'.
-        :return: Returns three values: 1: Status of the read operation, 2: the ID of the property read, 3: the value
-                 read.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_property_read() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Encode and send READ PROPERTY message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_read_property_frame(property_id))
+        # Report the cached value if there is one.
+        if self.__cache is not None:
+            result = self.__cache.get(property_id)
+            if result is not None:
+                self.__dispatch(self.on_property_read, *result.to_tuple())
+                return self.__completed_future(result.to_tuple())
 
-        # Wait for PROPERTY READ message, decode it and return data.
-        return super(SIGatewayClient, self).decode_property_read_frame(
-            self.__receive_frame_until_commands(['PROPERTY READ', 'ERROR'])).to_tuple()
+        # Encode and send READ PROPERTY message to gateway.
+        return self.__send(super(SIAsyncGatewayClient, self).encode_read_property_frame(property_id), 'PROPERTY READ')
 
-    def read_properties(self, property_ids: List[str]) -> List[SIPropertyReadResult]:
+    def read_properties(self, property_ids: List[str]) -> Optional[Future]:
         """
-        This method is used to retrieve the actual value of multiple properties at the same time from the connected
+        This method is used to retrieve the actual value of multiple property at the same time from the connected
         gateway. The properties are identified by the property_ids parameter.
 
+        The status of the multiple read operations and the actual value of the properties are reported using the
+        on_properties_read() callback. If the client uses a cache, only the properties that are not cached are read from
+        the gateway. If all of them are cached, the callback is dispatched before the method returns, so with the
+        default inline dispatcher it is called on the calling thread.
+
         :param property_ids: The IDs of the properties to read in the form
                '{device access ID}.{device ID}.{property ID}'.
-        :return: Returns one value: 1: List of statuses and values of all read properties.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the list of results passed to on_properties_read() if the client uses futures,
+               None otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Encode and send READ PROPERTIES message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_read_properties_frame(property_ids))
+        # Report the cached values if all of them are cached.
+        cached = None
+        if self.__cache is not None:
+            cached = [self.__cache.get(property_id) for property_id in property_ids]
+            property_ids = [property_id for property_id, result in zip(property_ids, cached) if result is None]
+            if not property_ids:
+                self.__dispatch(self.on_properties_read, cached)
+                return self.__completed_future(cached)
 
-        # Wait for PROPERTIES READ message, decode it and return data.
-        return super(SIGatewayClient, self).decode_properties_read_frame(
-            self.__receive_frame_until_commands(['PROPERTIES READ', 'ERROR']))
+        # Encode and send READ PROPERTIES message(s) to gateway.
+        return self.__send_in_chunks(property_ids, super(SIAsyncGatewayClient, self).encode_read_properties_frame,
+                                     'PROPERTIES READ', cached)
 
-    def write_property(self, property_id: str, value: any = None, flags: SIWriteFlags = None) -> Tuple[SIStatus, str]:
+    def write_property(self, property_id: str, value: any = None, flags: SIWriteFlags = None) -> Optional[Future]:
         """
         The write_property method is used to change the actual value of a given property. The property is identified by
         the property_id parameter and the new value is passed by the optional value parameter.
@@ -1016,35 +4488,123 @@ class SIGatewayClient(_SIAbstractGatewayClient):
         This value parameter is optional as it is possible to write to properties with the data type "Signal" where
         there is no actual value written, the write operation rather triggers an action on the device.
 
+        The status of the write operation is reported using the on_property_written() callback.
+
         :param property_id: The ID of the property to write in the form
                '{device access ID}.{<device ID}.{<property ID}'.
         :param value: Optional value to write.
-        :param flags: Write flags, See SIWriteFlags for details, if not provided the flags are not send by the client,
+        :param flags: Write flags, See SIWriteFlags for details, if not provided the flags are not send by the client
                and the gateway uses the default flags (SIWriteFlags.PERMANENT).
-        :return: Returns two values: 1: Status of the write operation, 2: the ID of the property written.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_property_written() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send WRITE PROPERTY message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_write_property_frame(property_id, value, flags))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_write_property_frame(property_id, value, flags),
+                           'PROPERTY WRITTEN')
+
+    def subscribe_to_property(self, property_id: str) -> Optional[Future]:
+        """
+        This method can be used to subscribe to a property on the connected gateway. The property is identified by the
+        property_id parameter.
+
+        The status of the subscribe request is reported using the on_property_subscribed() callback.
+
+        :param property_id: The ID of the property to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Future resolved with the arguments of on_property_subscribed() as tuple if the client uses futures,
+               None otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send SUBSCRIBE PROPERTY message to gateway.
+        return self.__send(super(SIAsyncGatewayClient, self).encode_subscribe_property_frame(property_id),
+                           'PROPERTY SUBSCRIBED')
+
+    def subscribe_to_properties(self, property_ids: List[str]) -> Optional[Future]:
+        """
+        This method can be used to subscribe to multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter.
+
+        The status of the subscribe request is reported using the on_properties_subscribed() callback.
+
+        :param property_ids: The list of IDs of the properties to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Future resolved with the list of results passed to on_properties_subscribed() if the client uses
+               futures, None otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send SUBSCRIBE PROPERTIES message(s) to gateway.
+        return self.__send_in_chunks(property_ids, super(SIAsyncGatewayClient, self).encode_subscribe_properties_frame,
+                                     'PROPERTIES SUBSCRIBED')
+
+    def unsubscribe_from_property(self, property_id: str) -> Optional[Future]:
+        """
+        This method can be used to unsubscribe from a property on the connected gateway. The property is identified by
+        the property_id parameter.
 
-        # Wait for PROPERTY WRITTEN message, decode it and return data.
-        return super(SIGatewayClient, self).decode_property_written_frame(
-            self.__receive_frame_until_commands(['PROPERTY WRITTEN', 'ERROR']))
+        The status of the unsubscribe request is reported using the on_property_unsubscribed() callback.
+
+        :param property_id: The ID of the property to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Future resolved with the arguments of on_property_unsubscribed() as tuple if the client uses futures,
+               None otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send UNSUBSCRIBE PROPERTY message to gateway.
+        return self.__send(super(SIAsyncGatewayClient, self).encode_unsubscribe_property_frame(property_id),
+                           'PROPERTY UNSUBSCRIBED')
+
+    def unsubscribe_from_properties(self, property_ids: List[str]) -> Optional[Future]:
+        """
+        This method can be used to unsubscribe from multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter.
+
+        The status of the unsubscribe request is reported using the on_properties_unsubscribed() callback.
+
+        :param property_ids: The list of IDs of the properties to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Future resolved with the list of results passed to on_properties_unsubscribed() if the client uses
+               futures, None otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        """
+
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
+
+        # Encode and send UNSUBSCRIBE PROPERTIES message(s) to gateway.
+        return self.__send_in_chunks(property_ids,
+                                     super(SIAsyncGatewayClient, self).encode_unsubscribe_properties_frame,
+                                     'PROPERTIES UNSUBSCRIBED')
 
     def read_datalog_properties(self, from_: datetime.datetime = None,
-                                to: datetime.datetime = None) -> Tuple[SIStatus, List[str]]:
+                                to: datetime.datetime = None) -> Optional[Future]:
         """
         This method is used to retrieve the list of IDs of all properties for whom data is logged on the gateway. If a
         time window is given using from and to, only data in this time windows is considered.
 
+        The status of the operation is the list of properties for whom logged data is available are reported using the
+        on_datalog_properties_read() callback.
+
         :param from_: Optional date and time of the start of the time window to be considered.
         :param to: Optional date and time of the end of the time window to be considered.
-        :return: Returns two values: 1: Status of the operation, 2: List of all properties for whom data is logged on
-                 the gateway in the optional time window.
+        :return: Future resolved with the arguments of on_datalog_properties_read() as tuple if the client uses futures,
+               None otherwise.
         :raises SIProtocolError: On a connection, protocol of framing error.
         """
 
@@ -1052,18 +4612,16 @@ class SIGatewayClient(_SIAbstractGatewayClient):
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send READ DATALOG message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_read_datalog_frame(None, from_, to, None))
-
-        # Wait for DATALOG READ message, decode it and return data.
-        status, _, _, parameters = super(SIGatewayClient, self).decode_datalog_read_frame(
-            self.__receive_frame_until_commands(['DATALOG READ', 'ERROR']))
-        return status, parameters.splitlines()
+        return self.__send(super(SIAsyncGatewayClient, self).encode_read_datalog_frame(None, from_, to, None),
+                           'DATALOG READ')
 
-    def read_datalog_csv(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
-                         limit: int = None) -> Tuple[SIStatus, str, int, str]:
+    def read_datalog(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                     limit: int = None) -> Optional[Future]:
         """
         This method is used to retrieve all or a subset of logged data of a given property from the gateway.
 
+        The status of this operation and the respective values are reported using the on_datalog_read_csv() callback.
+
         :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
                the form '{device access ID}.{device ID}.{property ID}'.
         :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
@@ -1071,60 +4629,57 @@ class SIGatewayClient(_SIAbstractGatewayClient):
         :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
                gateway.
         :param limit: Using this optional parameter you can limit the number of results retrieved in total.
-        :return: Returns four values: 1: Status of the operation, 2: id of the property, 3: number of entries,
-                 4: Properties data in CSV format whereas the first column is the
-        date and time in ISO 8601 extended format, and the second column contains the actual values.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_datalog_read_csv() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send READ DATALOG message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit))
-
-        # Wait for DATALOG READ message, decode it and return data.
-        return super(SIGatewayClient, self).decode_datalog_read_frame(
-            self.__receive_frame_until_commands(['DATALOG READ', 'ERROR']))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit),
+                           'DATALOG READ')
 
     def read_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None,
-                      limit: int = None) -> Tuple[SIStatus, int, List[SIDeviceMessage]]:
+                      limit: int = None) -> Optional[Future]:
         """
-        The read_messages() method can be used to retrieve all or a subset of stored messages send by devices on all
+        The read_messages method can be used to retrieve all or a subset of stored messages send by devices on all
         buses in the past from the gateway.
 
+        The status of this operation and the retrieved messages are reported using the on_messages_read() callback.
+
         :param from_: Optional date and time from which the messages have to be retrieved, defaults to the oldest
                message saved.
         :param to: Optional date and time to which the messages have to be retrieved, defaults to the current time on
                the gateway.
         :param limit: Using this optional parameter you can limit the number of messages retrieved in total.
-        :return: Returns three values. 1: the status of the operation, 2: the number of messages,
-                 3: the list of retrieved messages.
-        :raises SIProtocolError: On a connection, protocol of framing error.
+        :return: Future resolved with the arguments of on_messages_read() as tuple if the client uses futures, None
+               otherwise.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
         # Encode and send READ MESSAGES message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_read_messages_frame(from_, to, limit))
-
-        # Wait for MESSAGES READ message, decode it and return data.
-        return super(SIGatewayClient, self).decode_messages_read_frame(
-            self.__receive_frame_until_commands(['MESSAGES READ', 'ERROR']))
+        return self.__send(super(SIAsyncGatewayClient, self).encode_read_messages_frame(from_, to, limit),
+                           'MESSAGES READ')
 
-    def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None, body: str = '') -> \
-            Tuple[SIExtensionStatus, dict, str]:
+    def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None,
+                       body: str = '') -> Optional[Future]:
         """
         Runs an extension command on the gateway and returns the result of that operation. The function
-        availableExtensions() can be user to get the list of extensions that are available on the connected gateway.
+        available_extensions() can be user to get the list of extensions that are available on the connected gateway.
+
+        The status of this operation and the command results are reported using the on_extension_called() callback.
 
         :param extension: Extension to use.
         :param command: Command to run on that extension.
         :param parameters: Parameters (key/value) to pass to the command, see extension documentation for details.
         :param body: Body to pass to the command, see extension documentation for details.
-        :return: Returns three values. 1: the status of the operation, 2: the returned key/value pairs from the command,
-                 3: an optional body output of the command.
+        :return: Future resolved with the arguments of on_extension_called() as tuple if the client uses futures, None
+               otherwise.
         :raises SIProtocolError: On a connection, protocol of framing error.
         """
 
@@ -1134,513 +4689,992 @@ class SIGatewayClient(_SIAbstractGatewayClient):
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Encode and send CALL EXTENSION message to gateway.
-        self.__ws.send(super(SIGatewayClient, self).encode_call_extension_frame(extension, command, parameters, body))
-
-        # Wait for EXTENSION CALLED message, decode it and return data.
-        _, _, status, params, body = super(SIGatewayClient, self).decode_extension_called_frame(
-            self.__receive_frame_until_commands(['EXTENSION CALLED', 'ERROR']))
-        return status, params, body
+        # Encode and send READ MESSAGES message to gateway.
+        return self.__send(super(SIAsyncGatewayClient, self).encode_call_extension_frame(extension, command,
+                                                                                         parameters, body),
+                           'EXTENSION CALLED')
 
     def disconnect(self) -> None:
         """
-        Disconnects the client from the gateway.
+        Disconnects the client from the gateway. If the client is reconnecting, the reconnection is cancelled.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Change state to disconnected.
-        self.__state = SIConnectionState.DISCONNECTED
+        # Ensure that the client is in the CONNECTED state or reconnecting.
+        if self.__reconnect_policy is None or self.__state != SIConnectionState.CONNECTING:
+            self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Close the WebSocket
-        self.__ws.close()
+        # Close the WebSocket and stop reconnecting. The WebSocket is taken holding the lock, so that it is either the
+        # one installed by a reconnect or the reconnect sees that the client is closing.
+        with self.__closing_lock:
+            self.__closing = True
+            ws = self.__ws
+        self.__reconnect_wakeup.set()
+        ws.close()
 
     def __ensure_in_state(self, state: SIConnectionState) -> None:
         if self.__state != state:
             raise SIProtocolError("invalid client state")
 
-    def __receive_frame_until_commands(self, commands: list) -> str:
+    def __create_websocket_app(self) -> websocket.WebSocketApp:
+        return websocket.WebSocketApp(self.__url,
+                                      on_open=self.__on_open,
+                                      on_message=self.__on_message,
+                                      on_error=self.__on_error,
+                                      on_close=self.__on_close
+                                      )
+
+    def __run_forever(self) -> None:
         while True:
-            frame = self.__ws.recv()
-            if super(SIGatewayClient, self).peek_frame_command(frame) in commands:
-                return frame
+            self.__ws.run_forever()
 
+            # Reconnect after the delay given by the policy unless the connection was closed on purpose.
+            if self.__reconnect_policy is None or self.__closing:
+                break
+            self.__reconnect_attempt += 1
+            delay = self.__reconnect_policy.delay(self.__reconnect_attempt)
+            if delay is None or self.__reconnect_wakeup.wait(delay):
+                break
+            ws = self.__create_websocket_app()
+            with self.__closing_lock:
+                if self.__closing:
+                    break
+                self.__state = SIConnectionState.CONNECTING
+                self.__ws = ws
 
-class SIAsyncGatewayClientCallbacks:
-    """
-    Base class containing all callback methods that can be called by the SIAsyncGatewayClient. You can use this as your
-    base class and register it using IAsyncGatewayClient.set_callbacks().
-    """
+        self.__state = SIConnectionState.DISCONNECTED
 
-    def on_connected(self, access_level: SIAccessLevel, gateway_version: str) -> None:
-        """
-        This method is called once the connection to the gateway could be established and the user has been
-        successfully authorized.
+    def __track_subscription(self, status: SIStatus, id_: str, subscribed: bool) -> None:
+        # Remember the properties the client is subscribed to in order to subscribe again after a reconnect.
+        if status == SIStatus.SUCCESS:
+            if subscribed:
+                self.__subscriptions[id_] = None
+            else:
+                self.__subscriptions.pop(id_, None)
 
-        :param access_level: Access level that was granted to the user during authorization.
-        :param gateway_version: Version of the OpenStuder software running on the gateway.
-        """
-        pass
+    def __on_open(self, _) -> None:
+        # Change state to AUTHORIZING.
+        self.__state = SIConnectionState.AUTHORIZING
 
-    def on_disconnected(self) -> None:
-        """
-        Called when the connection to the OpenStuder gateway has been gracefully closed by either side or the connection
-        was lost by any other reason.
-        """
-        pass
+        # Encode and send AUTHORIZE message to gateway.
+        if self.__user is None or self.__password is None:
+            self.__ws.send(super(SIAsyncGatewayClient, self).encode_authorize_frame_without_credentials())
+        else:
+            self.__ws.send(
+                super(SIAsyncGatewayClient, self).encode_authorize_frame_with_credentials(self.__user, self.__password))
 
-    def on_error(self, reason) -> None:
-        """
-        Called on severe errors.
+    def __on_message(self, _, frame: str) -> None:
+
+        # Determine the actual command.
+        command = super(SIAsyncGatewayClient, self).peek_frame_command(frame)
+
+        try:
+            # In AUTHORIZE state we only handle AUTHORIZED messages.
+            if self.__state == SIConnectionState.AUTHORIZING:
+                self.__access_level, self.__gateway_version, self.__available_extensions = \
+                    super(SIAsyncGatewayClient, self).decode_authorized_frame(frame)
+
+                # Change state to CONNECTED.
+                self.__state = SIConnectionState.CONNECTED
+                self.__reconnect_attempt = 0
+
+                # After a reconnect, subscribe again to all properties the client was subscribed to.
+                if self.__subscriptions:
+                    self.__send_in_chunks(list(self.__subscriptions),
+                                          super(SIAsyncGatewayClient, self).encode_subscribe_properties_frame,
+                                          'PROPERTIES SUBSCRIBED')
+
+                # Call callback if present.
+                self.__dispatch(self.on_connected, self.__access_level, self.__gateway_version)
+
+            # In CONNECTED state we handle all messages except the AUTHORIZED message.
+            else:
+                handler = self.__frame_handlers.get(command)
+                if handler is not None:
+                    handler(frame)
+                else:
+                    self.__dispatch(self.on_error,
+                                    SIProtocolError('unsupported frame command: {command}'.format(command=command)))
+        except SIProtocolError as error:
+            self.__dispatch(self.on_error, error)
+            if self.__state == SIConnectionState.AUTHORIZING:
+                self.__closing = True
+                self.__ws.close()
+                self.__state = SIConnectionState.DISCONNECTED
+
+    def __callback_frame_handler(self, decoder: Callable[[str], tuple], callback: str, correlated: bool = True,
+                                 conflated: bool = False) -> Callable[[str], None]:
+        # The callback is looked up by name on each frame, as it can be (re)assigned at any time. Conflated callbacks
+        # use their first argument, the property ID, as conflation key.
+        def handle(frame: str) -> None:
+            future = self.__pop_pending(frame) if correlated else None
+            try:
+                arguments = decoder(frame)
+            except SIProtocolError as error:
+                if future is not None:
+                    future.set_exception(error)
+                raise
+            if future is not None:
+                future.set_result(arguments[0] if len(arguments) == 1 else arguments)
+            self.__dispatch(getattr(self, callback), *arguments, key=arguments[0] if conflated else None)
+        return handle
+
+    def __dispatch(self, callback: Optional[Callable], *arguments, key: Optional[any] = None) -> None:
+        if callable(callback):
+            self.__dispatcher.dispatch(callback, arguments, key)
+
+    def __send(self, frame: str, response_command: str) -> Optional[Future]:
+        if not self.__tracked:
+            self.__ws.send(frame)
+            return None
+
+        # The request is registered and sent holding the send lock, so that the order of the requests in the correlation
+        # table is the order in which they are sent. The pending lock is released before sending, the reader thread
+        # needs it for every response and must never wait for a send blocked by the network. Without futures, requests
+        # are still registered if chunked requests are tracked, so that errors are attributed to the right request.
+        future = Future() if self.__futures else None
+        key = (response_command, super(SIAsyncGatewayClient, self).peek_frame_headers(frame)[1].get('id', None))
+        with self.__send_lock:
+            with self.__pending_lock:
+                self.__pending.setdefault(key, deque()).append((next(self.__sequence), future))
+            self.__ws.send(frame)
+        return future
+
+    def __completed_future(self, result: any) -> Optional[Future]:
+        if not self.__futures:
+            return None
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def __pop_pending(self, frame: str) -> Optional[Future]:
+        # The request with the response's command and ID wins, otherwise the oldest request with the response's
+        # command.
+        if not self.__tracked:
+            return None
+        command, headers = super(SIAsyncGatewayClient, self).peek_frame_headers(frame)
+        key = (command, headers.get('id', None))
+        with self.__pending_lock:
+            if not self.__pending.get(key):
+                candidates = [key for key in self.__pending if key[0] == command]
+                if not candidates:
+                    return None
+                key = min(candidates, key=lambda candidate: self.__pending[candidate][0][0])
+            entries = self.__pending[key]
+            _, future = entries.popleft()
+            if not entries:
+                del self.__pending[key]
+        return future
+
+    def __send_in_chunks(self, property_ids: List[str], encode: Callable[[List[str]], str], response_command: str,
+                         cached: Optional[List[Optional[SIPropertyReadResult]]] = None) -> Optional[Future]:
+        # Without max_batch, a cache and futures, the responses are reported one by one as before. Otherwise, every
+        # request is tracked with the number of responses it is waiting for, as the gateway answers in order the
+        # responses can be merged. Cached results are merged with the results received, None marks the ones to read.
+        max_batch = self.__max_batch
+        if not self.__tracked:
+            self.__ws.send(encode(property_ids))
+            return None
+        if max_batch is None:
+            chunks = [property_ids]
+        else:
+            chunks = [property_ids[index:index + max_batch] for index in range(0, len(property_ids), max_batch)] or [[]]
+        # Every chunk gets a sequence number, so that errors can be attributed to the oldest request waiting.
+        future = Future() if self.__futures else None
+        with self.__send_lock:
+            with self.__pending_lock:
+                sequences = deque(next(self.__sequence) for _ in chunks)
+                self.__chunked_requests[response_command].append([len(chunks), [], None, cached, future, sequences])
+            for chunk in chunks:
+                self.__ws.send(encode(chunk))
+        return future
+
+    def __merging_frame_handler(self, response_command: str, decoder: Callable[[str], list],
+                                callback: str) -> Callable[[str], None]:
+        def handle(frame: str) -> None:
+            requests = self.__chunked_requests[response_command]
+            if not requests:
+                results = decoder(frame)
+            else:
+                try:
+                    results, error = decoder(frame), None
+                except SIProtocolError as decoding_error:
+                    results, error = None, decoding_error
+                results = self.__receive_chunk(requests, results, error)
+                if results is None:
+                    return
+            self.__dispatch(getattr(self, callback), results)
+        return handle
+
+    @staticmethod
+    def __receive_chunk(requests: deque, results: Optional[list], error: Optional[SIProtocolError]) -> Optional[list]:
+        # Collect the results or the first error of the oldest request until all its responses have been received.
+        # Returns the merged results once the request is complete, raises its error if one of the responses failed.
+        request = requests[0]
+        request[5].popleft()
+        if error is None:
+            request[1].extend(results)
+        else:
+            request[2] = request[2] or error
+        request[0] -= 1
+        if request[0] > 0:
+            return None
+        requests.popleft()
+        results = request[1]
+        if request[2] is None and request[3] is not None:
+            received = iter(results)
+            try:
+                results = [result if result is not None else next(received) for result in request[3]]
+            except StopIteration:
+                request[2] = SIProtocolError('missing results in response')
+        if request[2] is not None:
+            if request[4] is not None:
+                request[4].set_exception(request[2])
+            raise request[2]
+        if request[4] is not None:
+            request[4].set_result(results)
+        return results
+
+    def __conflate_property_update_frame(self, frame: str) -> None:
+        # Only the newest frame of each property waits for delivery, it is decoded once the update is delivered.
+        id_ = super(SIAsyncGatewayClient, self).peek_frame_headers(frame)[1].get('id', None)
+        if id_ is None:
+            raise SIProtocolError('unknown error during property update')
+        if self.__cache is not None:
+            self.__cache.invalidate(id_)
+        # The history needs every value, so the frame is decoded immediately and the decoded update is kept instead.
+        update = frame if self.__history is None else self.__decode_property_update_frame(frame)
+        if not callable(self.on_property_updated):
+            return
+        # The delivery is dispatched again if the dispatcher dropped callbacks since, as it might have been dropped.
+        dropped_events = self.__dispatcher.dropped_events()
+        with self.__conflated_updates_lock:
+            entry = self.__conflated_updates.get(id_)
+            if entry is not None:
+                entry[0] = update
+                entry[1] += 1
+                if entry[2] == dropped_events:
+                    return
+                entry[2] = dropped_events
+            else:
+                self.__conflated_updates[id_] = [update, 0, dropped_events]
+        self.__dispatch(self.__deliver_conflated_property_update, id_)
+
+    def __batch_property_update_frame(self, frame: str) -> None:
+        id_, value = self.__decode_property_update_frame(frame)
+        if callable(self.on_properties_updated):
+            self.__update_batcher.add(id_, value)
+
+    def __deliver_update_batch(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        self.__dispatch(self.on_properties_updated, updates)
+
+    def __deliver_conflated_property_update(self, id_: str) -> None:
+        with self.__conflated_updates_lock:
+            entry = self.__conflated_updates.pop(id_, None)
+        if entry is None:
+            return
+        update, superseded, _ = entry
+        if isinstance(update, tuple):
+            id_, value = update
+        else:
+            # The frame is decoded on the dispatcher, so errors are reported here instead of by the reader thread.
+            try:
+                id_, value = super(SIAsyncGatewayClient, self).decode_property_update_frame(update,
+                                                                                            self.__property_schema)
+            except SIProtocolError as error:
+                if callable(self.on_error):
+                    self.on_error(error)
+                return
+        if callable(self.on_property_updated):
+            self.on_property_updated(id_, value, superseded)
+
+    def __handle_error_frame(self, frame: str) -> None:
+        _, headers, _ = super(SIAsyncGatewayClient, self).decode_frame(frame)
+        error = SIProtocolError(headers['reason'])
+
+        # The error answers the oldest request waiting for a response in send order, requests are only tracked if the
+        # client uses futures, max_batch or a cache. An error answering a chunk of a chunked request counts as its
+        # response, the request fails once all of its responses have been received.
+        future, chunked = None, None
+        with self.__pending_lock:
+            oldest = min([(entries[0][0], key) for key, entries in self.__pending.items()] +
+                         [(requests[0][5][0], requests) for requests in self.__chunked_requests.values() if requests],
+                         key=lambda candidate: candidate[0], default=None)
+            if oldest is not None and isinstance(oldest[1], deque):
+                chunked = oldest[1]
+            elif oldest is not None:
+                entries = self.__pending[oldest[1]]
+                _, future = entries.popleft()
+                if not entries:
+                    del self.__pending[oldest[1]]
+        if chunked is not None:
+            self.__receive_chunk(chunked, None, error)
+            return
+        if future is not None:
+            future.set_exception(error)
+        self.__dispatch(self.on_error, error)
+
+    def __decode_description_frame(self, frame: str) -> Tuple[SIStatus, Optional[str], object]:
+        status, id_, description = super(SIAsyncGatewayClient, self).decode_description_frame(frame, self.__json_loads)
+        if status == SIStatus.SUCCESS and self.__property_schema is not None:
+            self.__property_schema.update(id_, description)
+        return status, id_, description
+
+    def __decode_property_update_frame(self, frame: str) -> Tuple[str, any]:
+        id_, value = super(SIAsyncGatewayClient, self).decode_property_update_frame(frame, self.__property_schema)
+        if self.__cache is not None:
+            self.__cache.invalidate(id_)
+        if self.__history is not None:
+            self.__history.record(id_, value)
+        return id_, value
+
+    def __decode_property_read_frame(self, frame: str) -> Tuple[SIStatus, str, Optional[any]]:
+        result = super(SIAsyncGatewayClient, self).decode_property_read_frame(frame, self.__property_schema)
+        if self.__cache is not None:
+            self.__cache.put(result)
+        return result.to_tuple()
+
+    def __decode_properties_read_frame(self, frame: str) -> List[SIPropertyReadResult]:
+        results = super(SIAsyncGatewayClient, self).decode_properties_read_frame(frame, self.__property_schema,
+                                                                                 self.__json_loads)
+        if self.__cache is not None:
+            for result in results:
+                self.__cache.put(result)
+        return results
+
+    def __decode_property_written_frame(self, frame: str) -> Tuple[SIStatus, str]:
+        status, id_ = super(SIAsyncGatewayClient, self).decode_property_written_frame(frame)
+        if status == SIStatus.SUCCESS and self.__cache is not None:
+            self.__cache.invalidate(id_)
+        return status, id_
+
+    def __decode_property_subscribed_frame(self, frame: str) -> Tuple[SIStatus, str]:
+        status, id_ = super(SIAsyncGatewayClient, self).decode_property_subscribed_frame(frame)
+        self.__track_subscription(status, id_, True)
+        return status, id_
+
+    def __decode_properties_subscribed_frame(self, frame: str) -> List[SIPropertySubscriptionResult]:
+        results = super(SIAsyncGatewayClient, self).decode_properties_subscribed_frame(frame, self.__json_loads)
+        for result in results:
+            self.__track_subscription(result.status, result.id, True)
+        return results
+
+    def __decode_property_unsubscribed_frame(self, frame: str) -> Tuple[SIStatus, str]:
+        status, id_ = super(SIAsyncGatewayClient, self).decode_property_unsubscribed_frame(frame)
+        self.__track_subscription(status, id_, False)
+        return status, id_
+
+    def __decode_properties_unsubscribed_frame(self, frame: str) -> List[SIPropertySubscriptionResult]:
+        results = super(SIAsyncGatewayClient, self).decode_properties_unsubscribed_frame(frame, self.__json_loads)
+        for result in results:
+            self.__track_subscription(result.status, result.id, False)
+        return results
+
+    def __handle_messages_read_frame(self, frame: str) -> None:
+        # The iterator can only be consumed once, so the messages are decoded into a list if a future waits for them.
+        future = self.__pop_pending(frame)
+        if callable(self.on_messages_read_iter) and future is None:
+            self.__dispatch(self.on_messages_read_iter,
+                            *super(SIAsyncGatewayClient, self).iter_messages_read_frame(frame))
+            return
+        try:
+            status, count, messages = \
+                super(SIAsyncGatewayClient, self).decode_messages_read_frame(frame, self.__json_loads)
+        except SIProtocolError as error:
+            if future is not None:
+                future.set_exception(error)
+            raise
+        if future is not None:
+            future.set_result((status, count, messages))
+        if callable(self.on_messages_read_iter):
+            self.__dispatch(self.on_messages_read_iter, status, count, iter(messages))
+        else:
+            self.__dispatch(self.on_messages_read, status, count, messages)
+
+    def __handle_datalog_read_frame(self, frame: str) -> None:
+        future = self.__pop_pending(frame)
+        try:
+            status, id_, count, values = super(SIAsyncGatewayClient, self).decode_datalog_read_frame(frame)
+        except SIProtocolError as error:
+            if future is not None:
+                future.set_exception(error)
+            raise
+        if id_ is None:
+            property_ids = values.splitlines()
+            if future is not None:
+                future.set_result((status, property_ids))
+            self.__dispatch(self.on_datalog_properties_read, status, property_ids)
+        else:
+            if future is not None:
+                future.set_result((status, id_, count, values))
+            if callable(self.on_datalog_read_arrays):
+                self.__dispatch(self.on_datalog_read_arrays, status, id_, count, SIDatalogArrays.from_csv(values))
+            else:
+                self.__dispatch(self.on_datalog_read_csv, status, id_, count, values)
 
-        :param reason: Exception that caused the erroneous behavior.
-        """
-        pass
+    def __on_error(self, _, error: Exception) -> None:
+        self.__dispatch(self.on_error, SIProtocolError(error.args[1]))
 
-    def on_enumerated(self, status: SIStatus, device_count: int) -> None:
-        """
-        Called when the enumeration operation started using enumerate() has completed on the gateway.
+    def __on_close(self, *_) -> None:
+        # Change state to DISCONNECTED, or CONNECTING if the client is going to reconnect.
+        if self.__reconnect_policy is None or self.__closing:
+            self.__state = SIConnectionState.DISCONNECTED
+        else:
+            self.__state = SIConnectionState.CONNECTING
 
-        :param status: Operation status.
-        :param device_count: Number of devices present.
-        """
-        pass
+        # Change access level to NONE.
+        self.__access_level = SIAccessLevel.NONE
 
-    def on_description(self, status: SIStatus, id_: Optional[str], description: object) -> None:
-        """
-        Called when the gateway returned the description requested using the describe() method.
+        # Forget about partially received chunked requests and fail all requests still waiting for a response.
+        with self.__pending_lock:
+            pending = [future for entries in self.__pending.values() for _, future in entries]
+            self.__pending.clear()
+            for requests in self.__chunked_requests.values():
+                pending.extend(request[4] for request in requests if request[4] is not None)
+                requests.clear()
+        for future in pending:
+            if future is not None and not future.done():
+                future.set_exception(SIProtocolError('connection closed'))
+
+        # Report the property updates received so far.
+        if self.__update_batcher is not None:
+            self.__flush_timer.stop()
+            self.__update_batcher.flush()
 
-        :param status: Status of the operation.
-        :param id_: Subject's ID.
-        :param description: Description object.
-        """
-        pass
+        # Call callback.
+        self.__dispatch(self.on_disconnected)
 
-    def on_properties_found(self, status: SIStatus, id_: str, count: int, virtual: bool, functions: SIDeviceFunctions,
-                            properties: List[str]) -> None:
-        """
-        Called when the gateway returned the list of found properties requested using the find_properties() method.
 
-        The callback takes four parameters:
-        @param status: Status of the find operation,
-        @param id_: the searched ID (including wildcard character),
-        @param count: the number of properties found,
-        @param virtual: True if list contains only virtual devices, false if it contains only real devices.
-        @param functions: Function list mask.
-        @param properties: List of the property IDs.
-        """
+class SISubscriptionHandle:
+    """
+    Set of properties a single consumer is subscribed to using a SISubscriptionManager, created by
+    SISubscriptionManager.create_handle().
+    """
 
-    def on_property_read(self, status: SIStatus, property_id: str, value: Optional[any]) -> None:
-        """
-        Called when the property read operation started using read_property() has completed on the gateway.
+    def __init__(self, manager: SISubscriptionManager, on_property_updated: Callable[..., None]):
+        self.__manager: SISubscriptionManager = manager
 
-        :param status: Status of the read operation.
-        :param property_id: ID of the property read.
-        :param value: The value read.
+        self.on_property_updated: Callable[..., None] = on_property_updated
         """
-        pass
-
-    def on_properties_read(self, results: List[SIPropertyReadResult]) -> None:
+        Called for every update of a property the handle is subscribed to, takes the same parameters as the
+        on_property_updated() callback of the client.
         """
-        Called when the multiple properties read operation started using read_properties() has completed on the gateway.
 
-        :param results: List of all results of the operation.
+    def property_ids(self) -> List[str]:
         """
-        pass
+        Returns the IDs of the properties the handle is subscribed to.
 
-    def on_property_written(self, status: SIStatus, property_id: str) -> None:
+        :return: List of property IDs.
         """
-        Called when the property write operation started using write_property() has completed on the gateway.
 
-        :param status: Status of the write operation.
-        :param property_id: ID of the property written.
-        """
-        pass
+        return self.__manager.handle_properties(self)
 
-    def on_property_subscribed(self, status: SIStatus, property_id: str) -> None:
+    def subscribe(self, property_ids: List[str]) -> None:
         """
-        Called when the gateway returned the status of the property subscription requested using the
-        subscribe_to_property() method.
+        Subscribes the handle to the given properties, the gateway is only asked to subscribe to the properties no
+        other handle is subscribed to yet.
 
-        :param status: The status of the subscription.
-        :param property_id: ID of the property.
+        :param property_ids: The IDs of the properties to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
-        pass
 
-    def on_properties_subscribed(self, statuses: List[SIPropertySubscriptionResult]) -> None:
-        """
-        Called when the gateway returned the status of the properties subscription requested using the
-        subscribe_to_properties() method.
+        self.__manager.subscribe(self, property_ids)
 
-        :param statuses: The statuses of the individual subscriptions.
+    def unsubscribe(self, property_ids: List[str]) -> None:
         """
-        pass
+        Unsubscribes the handle from the given properties, the gateway is only asked to unsubscribe from the properties
+        no other handle is subscribed to.
 
-    def on_property_unsubscribed(self, status: SIStatus, property_id: str) -> None:
+        :param property_ids: The IDs of the properties to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
-        Called when the gateway returned the status of the property unsubscription requested using the
-        unsubscribe_from_property() method.
 
-        :param status: The status of the unsubscription.
-        :param property_id: ID of the property.
-        """
-        pass
+        self.__manager.unsubscribe(self, property_ids)
 
-    def on_properties_unsubscribed(self, statuses: List[SIPropertySubscriptionResult]) -> None:
+    def close(self) -> None:
         """
-        Called when the gateway returned the status of the properties unsubscription requested using the
-        unsubscribe_from_properties() method.
+        Unsubscribes the handle from all its properties.
 
-        :param statuses: The statuses of the individual unsubscribe requests.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
-        pass
 
-    def on_property_updated(self, property_id: str, value: any) -> None:
-        """
-        This callback is called whenever the gateway send a property update.
+        self.unsubscribe(self.property_ids())
 
-        :param property_id: ID of the updated property.
-        :param value: The current value of the property.
-        """
-        pass
 
-    def on_datalog_properties_read(self, status: SIStatus, properties: List[str]) -> None:
-        """
-        Called when the datalog property list operation started using read_datalog_properties() has completed on the
-        gateway.
+class SISubscriptionManager:
+    """
+    Shares the property subscriptions of a SIAsyncGatewayClient between many consumers.
 
-        :param status: Status of the operation.
-        :param properties: List of the IDs of the properties for whom data is available in the data log.
-        """
+    Every consumer gets its own SISubscriptionHandle. The manager counts the handles subscribed to each property, so
+    the gateway is only asked to subscribe to a property once the first handle subscribes to it and to unsubscribe
+    once the last handle unsubscribed. Each change is sent as a single SUBSCRIBE PROPERTIES or UNSUBSCRIBE PROPERTIES
+    request and property updates are only reported to the handles subscribed to the property.
 
-        pass
+    The manager takes over the on_property_updated(), on_properties_updated() and on_properties_subscribed() callbacks
+    of the client. Updates of properties no handle is subscribed to and all subscription results are passed on to the
+    callbacks that were set before. Properties the gateway refuses to subscribe to are removed from all handles, if
+    the client uses futures this includes the properties of subscribe requests that failed altogether.
+    """
 
-    def on_datalog_read_csv(self, status: SIStatus, property_id: str, count: int, values: str) -> None:
+    def __init__(self, client: SIAsyncGatewayClient):
         """
-        Called when the datalog read operation started using read_datalog() has completed on the gateway. This version
-        of the method returns the data in CSV format suitable to
-        be written to a file.
-
-        :param status: Status of the operation.
-        :param property_id: ID of the property.
-        :param count: Number of entries.
-        :param values: Properties data in CSV format whereas the first column is the date and time in ISO 8601 extended
-               format and the second column contains the actual values.
+        :param client: Client whose subscriptions are managed.
         """
 
-        pass
+        self.__client: SIAsyncGatewayClient = client
+        self.__handles: Dict[str, Dict[SISubscriptionHandle, None]] = {}
+        self.__handle_properties: Dict[SISubscriptionHandle, Dict[str, None]] = {}
+        self.__requested: Dict[str, int] = {}
+        self.__lock: threading.RLock = threading.RLock()
+        self.__on_property_updated: Optional[Callable[..., None]] = client.on_property_updated
+        self.__on_properties_updated: Optional[Callable[[any], None]] = client.on_properties_updated
+        self.__on_properties_subscribed: Optional[Callable[[List[SIPropertySubscriptionResult]], None]] = \
+            client.on_properties_subscribed
+        client.on_property_updated = self.__route_property_update
+        client.on_properties_updated = self.__route_property_updates
+        client.on_properties_subscribed = self.__route_properties_subscribed
 
-    def on_device_message(self, message: SIDeviceMessage) -> None:
+    def create_handle(self, on_property_updated: Callable[..., None],
+                      property_ids: Optional[List[str]] = None) -> SISubscriptionHandle:
         """
-        This callback is called whenever the gateway send a device message indication.
+        Creates a new handle and optionally subscribes it to the given properties.
 
-        :param message: The device message received.
+        :param on_property_updated: Callback called for every update of a property the handle is subscribed to.
+        :param property_ids: Optional IDs of the properties to subscribe to.
+        :return: The new handle.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
-        pass
 
-    def on_messages_read(self, status: SIStatus, count: int, messages: List[SIDeviceMessage]) -> None:
-        """
-        Called when the gateway returned the status of the read messages operation using the read_messages() method.
+        handle = SISubscriptionHandle(self, on_property_updated)
+        if property_ids:
+            handle.subscribe(property_ids)
+        return handle
 
-        :param status: The status of the operation.
-        :param count: Number of messages retrieved.
-        :param messages: List of retrieved messages.
+    def subscribed_properties(self) -> List[str]:
         """
-        pass
+        Returns the IDs of the properties at least one handle is subscribed to.
 
-    def on_extension_called(self, extension: str, command: str, status: SIExtensionStatus, parameters: dict, body: str):
+        :return: List of property IDs.
         """
-        Called when the gateway returned the status of the call extension operation using the call_extension() method.
 
-        :param extension: Extension that did run the command.
-        :param command: The command.
-        :param status: Status of the command run.
-        :param parameters: Key/value pairs returned by the command, see extension documentation for details.
-        :param body: Optional body (output) returned by the command, see extension documentation for details.
-        :return:
+        with self.__lock:
+            return list(self.__handles)
+
+    def handle_properties(self, handle: SISubscriptionHandle) -> List[str]:
         """
-        pass
+        Returns the IDs of the properties a handle is subscribed to.
 
+        :param handle: Handle created by this manager.
+        :return: List of property IDs.
+        """
 
-class SIAsyncGatewayClient(_SIAbstractGatewayClient):
-    """
-    Complete, asynchronous (non-blocking) OpenStuder gateway client.
+        with self.__lock:
+            return list(self.__handle_properties.get(handle, ()))
 
-    This client uses an asynchronous model which has the disadvantage to be a bit harder to use than the synchronous
-    version. The advantages are that long operations do not block the main thread as all results are reported using
-    callbacks, device message indications are supported and subscriptions to property changes are possible.
-    """
+    def subscribe(self, handle: SISubscriptionHandle, property_ids: List[str]) -> None:
+        """
+        Subscribes a handle to the given properties, see SISubscriptionHandle.subscribe().
 
-    def __init__(self):
-        super(SIAsyncGatewayClient, self).__init__()
-        self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
-        self.__ws: Optional[websocket.WebSocketApp] = None
-        self.__thread: Optional[Thread] = None
-        self.__access_level: SIAccessLevel = SIAccessLevel.NONE
-        self.__gateway_version: str = ''
-        self.__available_extensions: List[str] = []
+        :param handle: Handle created by this manager.
+        :param property_ids: The IDs of the properties to subscribe to.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        """
 
-        self.__user: Optional[str] = None
-        self.__password: Optional[str] = None
+        self.__update(handle, property_ids, [])
 
-        self.on_connected: Optional[Callable[[SIAccessLevel, str], None]] = None
+    def unsubscribe(self, handle: SISubscriptionHandle, property_ids: List[str]) -> None:
         """
-        This callback is called once the connection to the gateway could be established and the user has been 
-        successfully authorized.
+        Unsubscribes a handle from the given properties, see SISubscriptionHandle.unsubscribe().
 
-        The callback takes two arguments. 
-        1: the access level that was granted to the user during authorization, 
-        2: the version of the OpenStuder software running on the gateway.
+        :param handle: Handle created by this manager.
+        :param property_ids: The IDs of the properties to unsubscribe from.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
 
-        self.on_disconnected: Optional[Callable[[], None]] = None
-        """
-        Called when the connection to the OpenStuder gateway has been gracefully closed by either side or the 
-        connection was lost by any other reason.
+        self.__update(handle, [], property_ids)
 
-        This callback has no parameters.
+    def reference_count(self, property_id: str) -> int:
         """
+        Returns the number of handles subscribed to a property.
 
-        self.on_error: Optional[Callable[[Exception], None]] = None
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :return: Number of handles.
         """
-        Called on severe errors.
 
-        The single parameter passed to the callback is the exception that caused the erroneous behavior.
-        """
+        with self.__lock:
+            return len(self.__handles.get(property_id, ()))
 
-        self.on_enumerated: Optional[Callable[[SIStatus, int], None]] = None
-        """
-        Called when the enumeration operation started using enumerate() has completed on the gateway.
+    def __update(self, handle: SISubscriptionHandle, subscribe: List[str], unsubscribe: List[str]) -> None:
+        with self.__lock:
+            handle_property_ids = self.__handle_properties.get(handle, {})
 
-        The callback takes two arguments. 
-        1: operation status, 
-        2: the number of devices present.
-        """
+            # Compute the properties the gateway has to subscribe to or unsubscribe from.
+            subscribe = [id_ for id_ in dict.fromkeys(subscribe) if id_ not in handle_property_ids]
+            unsubscribe = [id_ for id_ in dict.fromkeys(unsubscribe) if id_ in handle_property_ids]
+            added = [id_ for id_ in subscribe if id_ not in self.__handles]
+            removed = [id_ for id_ in unsubscribe if len(self.__handles[id_]) == 1]
 
-        self.on_description: Optional[Callable[[SIStatus, Optional[str], object], None]] = None
-        """
-        Called when the gateway returned the description requested using the describe() method.
+            # Send the requests first, so that nothing changes if the client is not connected. The properties are
+            # counted as subscribed right away and removed again if the gateway refuses them.
+            if added:
+                future = self.__client.subscribe_to_properties(added)
+                for id_ in added:
+                    self.__requested[id_] = self.__requested.get(id_, 0) + 1
+                if future is not None:
+                    future.add_done_callback(lambda done: self.__subscribe_failed(done, added))
+            if removed:
+                self.__client.unsubscribe_from_properties(removed)
 
-        The callback takes three parameters: 
-        1: Status of the operation, 
-        2: the subject's ID, 
-        3: the description object.
-        """
+            for id_ in subscribe:
+                handle_property_ids[id_] = None
+                self.__handles.setdefault(id_, {})[handle] = None
+            for id_ in unsubscribe:
+                del handle_property_ids[id_]
+                handles = self.__handles[id_]
+                del handles[handle]
+                if not handles:
+                    del self.__handles[id_]
+            if handle_property_ids:
+                self.__handle_properties[handle] = handle_property_ids
+            else:
+                self.__handle_properties.pop(handle, None)
+
+    def __route_properties_subscribed(self, statuses: List[SIPropertySubscriptionResult]) -> None:
+        with self.__lock:
+            for status in statuses:
+                if self.__complete_request(status.id) and status.status != SIStatus.SUCCESS:
+                    self.__drop(status.id)
+        if callable(self.__on_properties_subscribed):
+            self.__on_properties_subscribed(statuses)
+
+    def __subscribe_failed(self, future: Future, property_ids: List[str]) -> None:
+        # Successful requests are reconciled by the on_properties_subscribed() callback.
+        if not future.cancelled() and future.exception() is None:
+            return
+        with self.__lock:
+            for id_ in property_ids:
+                if self.__complete_request(id_):
+                    self.__drop(id_)
+
+    def __complete_request(self, property_id: str) -> bool:
+        # Results for properties the manager did not ask the gateway to subscribe to are ignored.
+        count = self.__requested.get(property_id, 0)
+        if count == 0:
+            return False
+        if count == 1:
+            del self.__requested[property_id]
+        else:
+            self.__requested[property_id] = count - 1
+        return True
+
+    def __drop(self, property_id: str) -> None:
+        for handle in self.__handles.pop(property_id, ()):
+            handle_property_ids = self.__handle_properties[handle]
+            del handle_property_ids[property_id]
+            if not handle_property_ids:
+                del self.__handle_properties[handle]
+
+    def __route_property_update(self, id_: str, *arguments) -> None:
+        with self.__lock:
+            handles = list(self.__handles.get(id_, ()))
+        if not handles:
+            if callable(self.__on_property_updated):
+                self.__on_property_updated(id_, *arguments)
+        for handle in handles:
+            handle.on_property_updated(id_, *arguments)
+
+    def __route_property_updates(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        unmanaged = []
+        for update in updates:
+            with self.__lock:
+                handles = list(self.__handles.get(update.id, ()))
+            if not handles:
+                unmanaged.append(update)
+            for handle in handles:
+                handle.on_property_updated(update.id, update.value)
+        if unmanaged and callable(self.__on_properties_updated):
+            self.__on_properties_updated(unmanaged)
+
+
+class SIPropertyMirrorEntry:
+    """
+    The SIPropertyMirrorEntry class represents the latest known state of a property in a SIPropertyMirror. Entries are
+    never modified, a change of the property replaces its entry.
+    """
 
-        self.on_properties_found: Optional[Callable[[SIStatus, str, int, bool, SIDeviceFunctions, List[str]], None]] = \
-            None
-        """
-        Called when the gateway returned the list of found properties requested using the find_properties() method.
+    __slots__ = ('id', 'status', 'value', 'timestamp', 'version')
 
-        The callback takes four parameters: 
-        1: Status of the find operation, 
-        2: the searched ID (including wildcard character), 
-        3: the number of properties found,
-        4: True if list contains only virtual devices, false if it contains only real devices.
-        5: Function list mask.
-        6: List of the property IDs.
+    def __init__(self, id_: str, status: SIStatus, value: Optional[any], timestamp: float, version: int):
+        self.id = id_
         """
-
-        self.on_property_read: Optional[Callable[[SIStatus, str, Optional[any]], None]] = None
+        ID of the property.
         """
-        Called when the property read operation started using read_property() has completed on the gateway.
 
-        The callback takes three parameters: 
-        1: Status of the read operation, 
-        2: the ID of the property read, 
-        3: the value read.
+        self.status = status
         """
-
-        self.on_properties_read: Optional[Callable[[List[SIPropertyReadResult]], None]] = None
+        Status of the last read operation, SIStatus.SUCCESS after a property update.
         """
-        Called when the multiple properties read operation started using read_properties() has completed on the gateway.
 
-        The callback takes one parameters: 
-        1: List of all results of the operation.
+        self.value = value
         """
-
-        self.on_property_written: Optional[Callable[[SIStatus, str], None]] = None
+        Latest value of the property.
         """
-        Called when the property write operation started using write_property() has completed on the gateway.
 
-        The callback takes two parameters: 
-        1: Status of the write operation, 
-        2: the ID of the property written.
+        self.timestamp = timestamp
         """
-
-        self.on_property_subscribed: Optional[Callable[[SIStatus, str], None]] = None
+        Time (as returned by time.time()) the value was received.
         """
-        Called when the gateway returned the status of the property subscription requested using the 
-        subscribe_to_property() method.
 
-        The callback takes two parameters: 
-        1: The status of the subscription, 
-        2: The ID of the property.
+        self.version = version
         """
-
-        self.on_properties_subscribed: Optional[Callable[[List[SIPropertySubscriptionResult]], None]] = None
+        Version of the mirror at which the property changed last.
         """
-        Called when the gateway returned the status of the properties subscription requested using the 
-        subscribe_to_properties() method.
 
-        The callback takes one parameter: 
-        1: List of statuses of individual subscription requests.
-        """
 
-        self.on_property_unsubscribed: Optional[Callable[[SIStatus, str], None]] = None
-        """
-        Called when the gateway returned the status of the property unsubscription requested using the 
-        unsubscribe_from_property() method.
+class SIPropertyMirror:
+    """
+    Live in-memory copy of the values of a set of properties, fed by a SIAsyncGatewayClient.
 
-        The callback takes two parameters: 
-        1: The status of the unsubscription, 
-        2: The ID of the property.
-        """
+    The properties to mirror are added using track(), which reads them using a single READ PROPERTIES request and
+    subscribes to them, so the mirror is kept current by the property updates. Every change increments the version of
+    the mirror, changed_since() returns the properties that changed after a given version.
 
-        self.on_properties_unsubscribed: Optional[Callable[[List[SIPropertySubscriptionResult]], None]] = None
+    Reading entries using get() or value() does not lock and can be done from any thread. The mirror chains itself
+    into the on_property_read(), on_properties_read(), on_property_updated() and on_properties_updated() callbacks of
+    the client, so callbacks have to be assigned before the mirror is created.
+    """
+
+    def __init__(self, client: SIAsyncGatewayClient):
+        """
+        :param client: Client feeding the mirror.
         """
-        Called when the gateway returned the status of the properties unsubscription requested using the 
-        unsubscribe_from_properties() method.
 
-        The callback takes one parameter: 
-        1: List of statuses of individual unsubscription requests.
+        self.__client: SIAsyncGatewayClient = client
+        self.__tracked: Dict[str, None] = {}
+        self.__entries: Dict[str, SIPropertyMirrorEntry] = {}
+        self.__changes: OrderedDict = OrderedDict()
+        self.__version: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__on_property_read: Optional[Callable[[SIStatus, str, Optional[any]], None]] = client.on_property_read
+        self.__on_properties_read: Optional[Callable[[any], None]] = client.on_properties_read
+        self.__on_property_updated: Optional[Callable[..., None]] = client.on_property_updated
+        self.__on_properties_updated: Optional[Callable[[any], None]] = client.on_properties_updated
+        client.on_property_read = self.__property_read
+        client.on_properties_read = self.__properties_read
+        client.on_property_updated = self.__property_updated
+        client.on_properties_updated = self.__properties_updated
+
+    def track(self, property_ids: List[str]) -> None:
         """
+        Adds properties to the mirror. Their values are read from the gateway and the client subscribes to them.
 
-        self.on_property_updated: Optional[Callable[[str, any], None]] = None
+        :param property_ids: The IDs of the properties to mirror in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :raises SIProtocolError: If the client is not connected or not yet authorized.
         """
-        This callback is called whenever the gateway send a property update.
 
-        The callback takes two parameters: 
-        1: the ID of the property that has updated, 
-        2: the actual value.
+        with self.__lock:
+            property_ids = [id_ for id_ in dict.fromkeys(property_ids) if id_ not in self.__tracked]
+            self.__tracked.update(dict.fromkeys(property_ids))
+        if not property_ids:
+            return
+
+        # Forget about the properties again if the requests can not be sent.
+        try:
+            self.__client.read_properties(property_ids)
+            self.__client.subscribe_to_properties(property_ids)
+        except SIProtocolError:
+            with self.__lock:
+                for id_ in property_ids:
+                    self.__tracked.pop(id_, None)
+            raise
+
+    def get(self, property_id: str) -> Optional[SIPropertyMirrorEntry]:
         """
+        Returns the latest known state of a property.
 
-        self.on_datalog_properties_read: Optional[Callable[[SIStatus, List[str]], None]] = None
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :return: The entry of the property or None if nothing was received for the property yet.
         """
-        Called when the datalog property list operation started using read_datalog_properties() has completed on the 
-        gateway.
 
-        The callback takes 2 parameters: 
-        1: Status of the operation, 
-        2: List of the IDs of the properties for whom data is available in the data log.
+        return self.__entries.get(property_id)
+
+    def value(self, property_id: str, default: any = None) -> any:
         """
+        Returns the latest known value of a property.
 
-        self.on_datalog_read_csv: Optional[Callable[[SIStatus, str, int, str], None]] = None
+        :param property_id: The ID of the property in the form '{device access ID}.{device ID}.{property ID}'.
+        :param default: Value returned if nothing was received for the property yet.
+        :return: The value of the property or the default.
         """
-        Called when the datalog read operation started using read_datalog() has completed on the gateway. This version 
-        of the callback returns the data in CSV format suitable to be written to a file.
 
-        The callback takes four parameters: 
-        1: Status of the operation, 
-        2: ID of the property, 
-        3: number of entries, 
-        4: properties data in CSV format whereas the first column is the date and time in ISO 8601 extended format and 
-        the second column contains the actual values.
+        entry = self.__entries.get(property_id)
+        return entry.value if entry is not None else default
+
+    def version(self) -> int:
         """
+        Returns the current version of the mirror, 0 if nothing was received yet.
 
-        self.on_device_message: Optional[Callable[[SIDeviceMessage], None]] = None
+        :return: Version of the last change.
         """
-        This callback is called whenever the gateway send a device message indication.
 
-        The callback takes one parameter, the device message object.
+        return self.__version
+
+    def changed_since(self, version: int) -> List[SIPropertyMirrorEntry]:
         """
+        Returns the entries of the properties that changed after the given version, ordered by version.
 
-        self.on_messages_read: Optional[Callable[[SIStatus, Optional[int], List[SIDeviceMessage]], None]] = None
+        :param version: Version as returned by version() or found in an entry.
+        :return: List of entries.
         """
-        Called when the gateway returned the status of the read messages operation using the read_messages() method.
 
-        The callback takes three parameters: 
-        1: the status of the operation, 
-        2: the number of messages retrieved, 
-        3: the list of retrieved messages.
+        with self.__lock:
+            changed = []
+            for entry in reversed(self.__changes.values()):
+                if entry.version <= version:
+                    break
+                changed.append(entry)
+        changed.reverse()
+        return changed
+
+    def snapshot(self) -> Dict[str, SIPropertyMirrorEntry]:
         """
+        Returns the entries of all properties.
 
-        self.on_extension_called: Optional[Callable[[str, str, SIExtensionStatus, dict, str], None]] = None
+        :return: Dictionary of the entries by property ID.
         """
-        Called when the gateway returned the status of the call extension operation using the call_extension() method.
 
-        The callback takes 5 parameters: 
-        1: Extension that did run the command.
-        2: The command.
-        3: Status of the command run.
-        4: Key/value pairs returned by the command, see extension documentation for details.
-        5: Optional body (output) returned by the command, see extension documentation for details.
+        return dict(self.__entries)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, property_id: str) -> bool:
+        return property_id in self.__entries
+
+    def __update(self, status: SIStatus, id_: str, value: Optional[any], timestamp: float) -> None:
+        if id_ not in self.__tracked:
+            return
+        with self.__lock:
+            # Entries are replaced, never modified, so that readers do not need the lock.
+            self.__version += 1
+            entry = SIPropertyMirrorEntry(id_, status, value, timestamp, self.__version)
+            self.__entries[id_] = entry
+            self.__changes[id_] = entry
+            self.__changes.move_to_end(id_)
+
+    def __property_read(self, status: SIStatus, id_: str, value: Optional[any]) -> None:
+        self.__update(status, id_, value, time.time())
+        if callable(self.__on_property_read):
+            self.__on_property_read(status, id_, value)
+
+    def __properties_read(self, results: Union[List[SIPropertyReadResult], SIPropertyReadBatch]) -> None:
+        timestamp = time.time()
+        for result in results:
+            if result is not None:
+                self.__update(result.status, result.id, result.value, timestamp)
+        if callable(self.__on_properties_read):
+            self.__on_properties_read(results)
+
+    def __property_updated(self, id_: str, value: any, *arguments) -> None:
+        self.__update(SIStatus.SUCCESS, id_, value, time.time())
+        if callable(self.__on_property_updated):
+            self.__on_property_updated(id_, value, *arguments)
+
+    def __properties_updated(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        timestamp = time.time()
+        for update in updates:
+            self.__update(SIStatus.SUCCESS, update.id, update.value, timestamp)
+        if callable(self.__on_properties_updated):
+            self.__on_properties_updated(updates)
+
+
+# Exceptions that end the connection of SIAsyncioGatewayClient.
+_SI_ASYNCIO_CONNECTION_ERRORS = (OSError, EOFError) + \
+    ((websockets.exceptions.ConnectionClosed,) if websockets is not None else ())
+
+
+class SIAsyncioGatewayClient(_SIAbstractGatewayClient):
+    """
+    Complete OpenStuder gateway client for asyncio applications.
+
+    All operations are coroutines that return their result directly, so the client can be used from asyncio services
+    without any callbacks or threads and a single event loop can serve many gateway connections. A reader task receives
+    all frames and hands each response to the coroutine waiting for it, matched by command and property ID, so any
+    number of requests can be in flight at the same time. Device messages and property updates of subscribed properties
+    are kept in a bounded buffer and retrieved using poll_events() or iter_events().
+
+    The client requires the websockets package, install it using pip install openstuder[asyncio].
+    """
+
+    def __init__(self, property_schema: Optional[SIPropertySchema] = None, json_codec: SIJsonCodec = SIJsonCodec.AUTO,
+                 max_events: int = 1000, timeout: Optional[float] = None):
+        """
+        :param property_schema: Optional property schema used to decode property values, it is filled automatically
+               with the property information of all descriptions retrieved using describe().
+        :param json_codec: JSON implementation used to decode frame bodies, defaults to the fastest installed one.
+        :param max_events: Maximal number of device messages and property updates kept until they are retrieved using
+               poll_events() or iter_events(), the oldest ones are dropped if more arrive.
+        :param timeout: Time in seconds to wait for the response to a request before an SITimeoutError is raised, None
+               (default) waits forever. Use asyncio.wait_for() to limit the time of a single call.
+        :raises SIProtocolError: If the requested JSON implementation is not installed.
         """
 
-    def connect(self, host: str, port: int = 1987, user: str = None, password: str = None,
-                background: bool = True) -> None:
+        super(SIAsyncioGatewayClient, self).__init__()
+        self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
+        self.__ws = None
+        self.__access_level: SIAccessLevel = SIAccessLevel.NONE
+        self.__gateway_version: str = ''
+        self.__available_extensions: List[str] = []
+        self.__property_schema: Optional[SIPropertySchema] = property_schema
+        self.__json_loads: Callable[[str], any] = json_codec.loads()
+        self.__timeout: Optional[float] = timeout
+        self.__events: deque = deque(maxlen=max_events)
+        self.__dropped_events: int = 0
+        self.__events_available: Optional[asyncio.Event] = None
+        self.__pending: Dict[Tuple[str, Optional[str]], deque] = {}
+        self.__sequence: Iterator[int] = itertools.count()
+        self.__send_lock: Optional[asyncio.Lock] = None
+        self.__reader: Optional[asyncio.Task] = None
+
+    async def connect(self, host: str, port: int = 1987, user: str = None, password: str = None) -> SIAccessLevel:
         """
         Establishes the WebSocket connection to the OpenStuder gateway and executes the user authorization process once
-        the connection has been established in the background. This method returns immediately and does not block the
-        current thread.
-
-        The status of the connection attempt is reported either by the on_connected() callback on success or the
-        on_error() callback if the connection could not be established or the authorisation for the given user was
-        rejected by the gateway.
+        the connection has been established. The coroutine returns the access level granted to the client during
+        authorization on success or throws an **SIProtocolError** otherwise.
 
         :param host: Hostname or IP address of the OpenStuder gateway to connect to.
         :param port: TCP port used for the connection to the OpenStuder gateway, defaults to 1987.
         :param user: Username send to the gateway used for authorization.
         :param password: Password send to the gateway used for authorization.
-        :param background: If true, the handling of the WebSocket connection is done in the background, if false the
-               current thread is taken over.
-        :raises SIProtocolError: If there was an error initiating the WebSocket connection.
+        :return: Access Level granted to the client.
+        :raises SIProtocolError: If the websockets package is not installed, the connection could not be established,
+                or the authorization was refused.
+        :raises SITimeoutError: If the connection or the authorization did not complete within the client's timeout.
         """
 
         # Ensure that the client is in the DISCONNECTED state.
         self.__ensure_in_state(SIConnectionState.DISCONNECTED)
+        if websockets is None:
+            raise SIProtocolError('websockets package is not installed')
 
-        # Save parameter for later use.
-        self.__user = user
-        self.__password = password
-
-        # Connect to WebSocket server.
+        # Connect to WebSocket server and authorize client.
         self.__state = SIConnectionState.CONNECTING
-        self.__ws = websocket.WebSocketApp('ws://{host}:{port}'.format(host=host, port=port),
-                                           on_open=self.__on_open,
-                                           on_message=self.__on_message,
-                                           on_error=self.__on_error,
-                                           on_close=self.__on_close
-                                           )
-
-        # TODO: Start connection timeout.
-
-        # In background mode, start a daemon thread for the connection handling, otherwise take over current thread.
-        if background:
-            self.__thread = Thread(target=self.__ws.run_forever)
-            self.__thread.setDaemon(True)
-            self.__thread.start()
-        else:
-            self.__ws.run_forever()
-
-    def set_callbacks(self, callbacks: SIAsyncGatewayClientCallbacks) -> None:
-        """
-        Configures the client to use all callbacks of the passed abstract client callback class. Using this you can set
-        all callbacks to be called on the given object and avoid having to set each callback individually.
+        try:
+            ws = await asyncio.wait_for(
+                websockets.connect('ws://{host}:{port}'.format(host=host, port=port), max_size=None), self.__timeout)
+        except asyncio.TimeoutError:
+            self.__state = SIConnectionState.DISCONNECTED
+            raise SITimeoutError('timeout while connecting')
+        except Exception:
+            self.__state = SIConnectionState.DISCONNECTED
+            raise
+        await self.__authorize(ws, user, password)
 
-        :param callbacks: Object derived from SIAsyncGatewayClientCallbacks to be used for all callbacks.
-        """
-        if isinstance(callbacks, SIAsyncGatewayClientCallbacks):
-            self.on_connected = callbacks.on_connected
-            self.on_disconnected = callbacks.on_disconnected
-            self.on_error = callbacks.on_error
-            self.on_enumerated = callbacks.on_enumerated
-            self.on_description = callbacks.on_description
-            self.on_properties_found = callbacks.on_properties_found
-            self.on_property_read = callbacks.on_property_read
-            self.on_properties_read = callbacks.on_properties_read
-            self.on_property_written = callbacks.on_property_written
-            self.on_property_subscribed = callbacks.on_property_subscribed
-            self.on_properties_subscribed = callbacks.on_properties_subscribed
-            self.on_property_unsubscribed = callbacks.on_property_unsubscribed
-            self.on_properties_unsubscribed = callbacks.on_properties_unsubscribed
-            self.on_property_updated = callbacks.on_property_updated
-            self.on_datalog_properties_read = callbacks.on_datalog_properties_read
-            self.on_datalog_read_csv = callbacks.on_datalog_read_csv
-            self.on_device_message = callbacks.on_device_message
-            self.on_messages_read = callbacks.on_messages_read
-            self.on_extension_called = callbacks.on_extension_called
+        # Return access level.
+        return self.__access_level
 
     def state(self) -> SIConnectionState:
         """
@@ -1675,239 +5709,196 @@ class SIAsyncGatewayClient(_SIAbstractGatewayClient):
 
         :return: List of available protocol extensions.
         """
+
         return self.__available_extensions
 
-    def enumerate(self) -> None:
+    def property_schema(self) -> Optional[SIPropertySchema]:
         """
-        Instructs the gateway to scan every configured and functional device access driver for new devices and remove
-        devices that do not respond anymore.
+        Returns the property schema used by the client to decode property values, None if no schema is used.
 
-        The status of the operation and the number of devices present are reported using the on_enumerated() callback.
+        :return: Property schema or None.
+        """
 
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        return self.__property_schema
+
+    def dropped_events(self) -> int:
         """
+        Returns the number of device messages and property updates that were dropped because the event buffer was full
+        or because they were malformed.
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
+        :return: Number of dropped events.
+        """
 
-        # Encode and send ENUMERATE message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_enumerate_frame())
+        return self.__dropped_events
 
-    def describe(self, device_access_id: str = None, device_id: str = None, property_id: int = None,
-                 flags: SIDescriptionFlags = None) -> None:
+    async def enumerate(self) -> Tuple[SIStatus, int]:
+        """
+        Instructs the gateway to scan every configured and functional device access driver for new devices and remove
+        devices that do not respond anymore. Returns the status of the operation, and the number of devices present.
+
+        :return: Returns two values. 1: operation status, 2: the number of devices present.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(super(SIAsyncioGatewayClient, self).encode_enumerate_frame(), 'ENUMERATED',
+                                    super(SIAsyncioGatewayClient, self).decode_enumerated_frame)
+
+    async def describe(self, device_access_id: str = None, device_id: str = None, property_id: int = None,
+                       flags: SIDescriptionFlags = None) -> Tuple[SIStatus, Optional[str], object]:
         """
         This method can be used to retrieve information about the available devices and their properties from the
         connected gateway. Using the optional device_access_id, device_id and property_id parameters, the method can
         either request information about the whole topology, a particular device access instance, a device or a
         property.
 
-        The flags control the level of detail in the gateway's response.
-
-        The description is reported using the on_description() callback.
-
         :param device_access_id: Device access ID for which the description should be retrieved.
         :param device_id: Device ID for which the description should be retrieved. Note that device_access_id must be
                present too.
         :param property_id: Property ID for which the description should be retrieved. Note that device_access_id and
                device_id must be present too.
         :param flags: Flags to control level of detail of the response.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :return: Returns three values. 1: Status of the operation, 2: the subject's id, 3: the description object.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send DESCRIBE message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_describe_frame(device_access_id, device_id,
-                                                                               property_id, flags))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_describe_frame(device_access_id, device_id, property_id, flags),
+            'DESCRIPTION', self.__decode_description_frame)
 
-    def find_properties(self, property_id: str, virtual: Optional[bool] = None,
-                        functions_mask: Optional[SIDeviceFunctions] = None) -> None:
+    async def find_properties(self, property_id: str, virtual: Optional[bool] = None,
+                              functions_mask: Optional[SIDeviceFunctions] = None) \
+            -> Tuple[SIStatus, str, int, bool, SIDeviceFunctions, List[str]]:
         """
         This method is used to retrieve a list of existing properties that match the given property ID in the form
         "<device access ID>.<device ID>.<property ID>". The wildcard character "*" is supported for <device access ID>
         and <device ID> fields.
 
-        For example "*.inv.3136" represents all properties with ID 3136 on the device with ID "inv" connected through
-        any device access, "demo.*.3136" represents all properties with ID 3136 on any device that disposes that
-        property connected through the device access "demo" and finally "*.*.3136" represents all properties with ID
-        3136 on any device that disposes that property connected through any device access.
-
-        The status of the read operation and the actual value of the property are reported using the
-        on_properties_found() callback.
-
         :param property_id: The search wildcard ID.
         :param virtual: Optional to filter for virtual devices (true) or non-virtual devices (false, default).
         :param functions_mask: Optional to filter for device functions. See SIDeviceFunctions for details. Defaults
                to all functions (SIDeviceFunctions.ALL).
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :return: Returns four values: 1: Status of the find operation, 2: the searched ID (including wildcard
+                 character), 3: the number of properties found,
+                 4: True if virtual devices were searched, false otherwise. 5: Functions searched for,
+                 6: List of the property IDs.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send FIND PROPERTIES message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_find_properties_frame(property_id, virtual,
-                                                                                      functions_mask))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_find_properties_frame(property_id, virtual, functions_mask),
+            'PROPERTIES FOUND',
+            lambda frame: super(SIAsyncioGatewayClient, self).decode_properties_found_frame(frame, self.__json_loads))
 
-    def read_property(self, property_id: str) -> None:
+    async def read_property(self, property_id: str) -> Tuple[SIStatus, str, Optional[any]]:
         """
         This method is used to retrieve the actual value of a given property from the connected gateway. The property
         is identified by the property_id parameter.
 
-        The status of the read operation and the actual value of the property are reported using the on_property_read()
-        callback.
-
         :param property_id: The ID of the property to read in the form '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
-        """
-
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send READ PROPERTY message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_read_property_frame(property_id))
-
-    def read_properties(self, property_ids: List[str]) -> None:
-        """
-        This method is used to retrieve the actual value of multiple property at the same time from the connected
-        gateway. The properties are identified by the property_ids parameter.
-
-        The status of the multiple read operations and the actual value of the properties are reported using the
-        on_properties_read() callback.
-
-        :param property_ids: The IDs of the properties to read in the form
-               '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
-        """
-
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send READ PROPERTIES message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_read_properties_frame(property_ids))
-
-    def write_property(self, property_id: str, value: any = None, flags: SIWriteFlags = None) -> None:
-        """
-        The write_property method is used to change the actual value of a given property. The property is identified by
-        the property_id parameter and the new value is passed by the optional value parameter.
-
-        This value parameter is optional as it is possible to write to properties with the data type "Signal" where
-        there is no actual value written, the write operation rather triggers an action on the device.
-
-        The status of the write operation is reported using the on_property_written() callback.
-
-        :param property_id: The ID of the property to write in the form
-               '{device access ID}.{<device ID}.{<property ID}'.
-        :param value: Optional value to write.
-        :param flags: Write flags, See SIWriteFlags for details, if not provided the flags are not send by the client
-               and the gateway uses the default flags (SIWriteFlags.PERMANENT).
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
-        """
-
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send WRITE PROPERTY message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_write_property_frame(property_id, value, flags))
-
-    def subscribe_to_property(self, property_id: str) -> None:
-        """
-        This method can be used to subscribe to a property on the connected gateway. The property is identified by the
-        property_id parameter.
-
-        The status of the subscribe request is reported using the on_property_subscribed() callback.
-
-        :param property_id: The ID of the property to subscribe to in the form
-               '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
-        """
-
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send SUBSCRIBE PROPERTY message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_subscribe_property_frame(property_id))
-
-    def subscribe_to_properties(self, property_ids: List[str]) -> None:
-        """
-        This method can be used to subscribe to multiple properties on the connected gateway. The properties are
-        identified by the property_ids parameter.
-
-        The status of the subscribe request is reported using the on_properties_subscribed() callback.
-
-        :param property_ids: The list of IDs of the properties to subscribe to in the form
-               '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :return: Returns three values: 1: Status of the read operation, 2: the ID of the property read, 3: the value
+                 read.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send SUBSCRIBE PROPERTIES message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_subscribe_properties_frame(property_ids))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_read_property_frame(property_id), 'PROPERTY READ',
+            lambda frame: super(SIAsyncioGatewayClient, self).decode_property_read_frame(
+                frame, self.__property_schema).to_tuple())
 
-    def unsubscribe_from_property(self, property_id: str) -> None:
+    async def read_properties(self, property_ids: List[str], batch: bool = False) \
+            -> Union[List[SIPropertyReadResult], SIPropertyReadBatch]:
         """
-        This method can be used to unsubscribe from a property on the connected gateway. The property is identified by
-        the property_id parameter.
-
-        The status of the unsubscribe request is reported using the on_property_unsubscribed() callback.
+        This method is used to retrieve the actual value of multiple properties at the same time from the connected
+        gateway. The properties are identified by the property_ids parameter.
 
-        :param property_id: The ID of the property to unsubscribe from in the form
+        :param property_ids: The IDs of the properties to read in the form
                '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :param batch: If True, the results are returned as a column oriented SIPropertyReadBatch instead of a list of
+               SIPropertyReadResult objects, which is considerably cheaper when polling many properties.
+        :return: Returns one value: 1: List (or SIPropertyReadBatch) of statuses and values of all read properties.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send UNSUBSCRIBE PROPERTY message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_unsubscribe_property_frame(property_id))
+        if batch:
+            decode = super(SIAsyncioGatewayClient, self).decode_properties_read_batch_frame
+        else:
+            decode = super(SIAsyncioGatewayClient, self).decode_properties_read_frame
+        return await self.__request(super(SIAsyncioGatewayClient, self).encode_read_properties_frame(property_ids),
+                                    'PROPERTIES READ',
+                                    lambda frame: decode(frame, self.__property_schema, self.__json_loads))
 
-    def unsubscribe_from_properties(self, property_ids: List[str]) -> None:
+    async def write_property(self, property_id: str, value: any = None,
+                             flags: SIWriteFlags = None) -> Tuple[SIStatus, str]:
         """
-        This method can be used to unsubscribe from multiple properties on the connected gateway. The properties are
-        identified by the property_ids parameter.
-
-        The status of the unsubscribe request is reported using the on_properties_unsubscribed() callback.
+        The write_property method is used to change the actual value of a given property. The property is identified by
+        the property_id parameter and the new value is passed by the optional value parameter.
 
-        :param property_ids: The list of IDs of the properties to unsubscribe from in the form
-               '{device access ID}.{device ID}.{property ID}'.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :param property_id: The ID of the property to write in the form
+               '{device access ID}.{<device ID}.{<property ID}'.
+        :param value: Optional value to write.
+        :param flags: Write flags, See SIWriteFlags for details, if not provided the flags are not send by the client,
+               and the gateway uses the default flags (SIWriteFlags.PERMANENT).
+        :return: Returns two values: 1: Status of the write operation, 2: the ID of the property written.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send UNSUBSCRIBE PROPERTY message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_unsubscribe_properties_frame(property_ids))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_write_property_frame(property_id, value, flags),
+            'PROPERTY WRITTEN', super(SIAsyncioGatewayClient, self).decode_property_written_frame)
 
-    def read_datalog_properties(self, from_: datetime.datetime = None, to: datetime.datetime = None) -> None:
+    async def read_datalog_properties(self, from_: datetime.datetime = None,
+                                      to: datetime.datetime = None) -> Tuple[SIStatus, List[str]]:
         """
         This method is used to retrieve the list of IDs of all properties for whom data is logged on the gateway. If a
         time window is given using from and to, only data in this time windows is considered.
 
-        The status of the operation is the list of properties for whom logged data is available are reported using the
-        on_datalog_properties_read() callback.
-
         :param from_: Optional date and time of the start of the time window to be considered.
         :param to: Optional date and time of the end of the time window to be considered.
+        :return: Returns two values: 1: Status of the operation, 2: List of all properties for whom data is logged on
+                 the gateway in the optional time window.
         :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send READ DATALOG message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_read_datalog_frame(None, from_, to, None))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_read_datalog_frame(None, from_, to, None), 'DATALOG READ',
+            self.__decode_datalog_properties_frame)
 
-    def read_datalog(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
-                     limit: int = None) -> None:
+    async def read_datalog_csv(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                               limit: int = None) -> Tuple[SIStatus, str, int, str]:
         """
         This method is used to retrieve all or a subset of logged data of a given property from the gateway.
 
-        The status of this operation and the respective values are reported using the on_datalog_read_csv() callback.
+        :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
+               the form '{device access ID}.{device ID}.{property ID}'.
+        :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
+               logged.
+        :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
+               gateway.
+        :param limit: Using this optional parameter you can limit the number of results retrieved in total.
+        :return: Returns four values: 1: Status of the operation, 2: id of the property, 3: number of entries,
+                 4: Properties data in CSV format whereas the first column is the date and time in ISO 8601 extended
+                 format, and the second column contains the actual values.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit),
+            'DATALOG READ', super(SIAsyncioGatewayClient, self).decode_datalog_read_frame)
+
+    async def read_datalog_arrays(self, property_id: str, from_: datetime.datetime = None,
+                                  to: datetime.datetime = None,
+                                  limit: int = None) -> Tuple[SIStatus, str, int, SIDatalogArrays]:
+        """
+        This method is used to retrieve all or a subset of logged data of a given property from the gateway. Unlike
+        read_datalog_csv(), the data is decoded into arrays of times and values, see SIDatalogArrays.
 
         :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
                the form '{device access ID}.{device ID}.{property ID}'.
@@ -1916,61 +5907,214 @@ class SIAsyncGatewayClient(_SIAbstractGatewayClient):
         :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
                gateway.
         :param limit: Using this optional parameter you can limit the number of results retrieved in total.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :return: Returns four values: 1: Status of the operation, 2: id of the property, 3: number of entries,
+                 4: Properties data as SIDatalogArrays.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit),
+            'DATALOG READ', super(SIAsyncioGatewayClient, self).decode_datalog_read_arrays_frame)
 
-        # Encode and send READ DATALOG message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_read_datalog_frame(property_id, from_, to, limit))
+    async def iter_datalog(self, property_id: str, from_: datetime.datetime = None, to: datetime.datetime = None,
+                           page_size: int = 10000) -> AsyncIterator[str]:
+        """
+        Returns an asynchronous iterator over the logged data of a given property in chunks, use it with async for. The
+        time range is read using multiple requests of at most page_size rows each, so the memory used does not depend
+        on the length of the time range and other requests are not held up behind a single huge response. The next
+        request is only sent once the previous chunk was consumed.
 
-    def read_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None, limit: int = None) -> None:
+        :param property_id: Global ID of the property for which the logged data should be retrieved. It has to be in
+               the form '{device access ID}.{device ID}.{property ID}'.
+        :param from_: Optional date and time from which the data has to be retrieved, defaults to the oldest value
+               logged.
+        :param to: Optional date and time to which the data has to be retrieved, defaults to the current time on the
+               gateway.
+        :param page_size: Number of rows requested at once. If more rows share a single timestamp, the request is
+               repeated with a larger limit until all of them have been received.
+        :return: Asynchronous iterator over chunks of the data in CSV format, see read_datalog_csv(). Rows are neither
+                 repeated nor missing between chunks.
+        :raises SIProtocolError: On a connection, protocol of framing error or if the gateway reports an error.
+        :raises SITimeoutError: If a response was not received within the client's timeout.
+        """
+
+        pager = _SIDatalogPager(from_, page_size)
+        while not pager.done():
+            status, _, _, values = await self.read_datalog_csv(property_id, pager.next_from(), to,
+                                                               pager.next_limit())
+            if status != SIStatus.SUCCESS:
+                raise SIProtocolError('error reading datalog: {status}'.format(status=status.name))
+            chunk = pager.page(values)
+            if chunk:
+                yield chunk
+
+    async def read_messages(self, from_: datetime.datetime = None, to: datetime.datetime = None,
+                            limit: int = None) -> Tuple[SIStatus, int, List[SIDeviceMessage]]:
         """
-        The read_messages method can be used to retrieve all or a subset of stored messages send by devices on all
+        The read_messages() method can be used to retrieve all or a subset of stored messages send by devices on all
         buses in the past from the gateway.
 
-        The status of this operation and the retrieved messages are reported using the on_messages_read() callback.
-
         :param from_: Optional date and time from which the messages have to be retrieved, defaults to the oldest
                message saved.
         :param to: Optional date and time to which the messages have to be retrieved, defaults to the current time on
                the gateway.
         :param limit: Using this optional parameter you can limit the number of messages retrieved in total.
-        :raises SIProtocolError: If the client is not connected or not yet authorized.
+        :return: Returns three values. 1: the status of the operation, 2: the number of messages,
+                 3: the list of retrieved messages.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
-
-        # Encode and send READ MESSAGES message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_read_messages_frame(from_, to, limit))
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_read_messages_frame(from_, to, limit), 'MESSAGES READ',
+            lambda frame: super(SIAsyncioGatewayClient, self).decode_messages_read_frame(frame, self.__json_loads))
 
-    def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None, body: str = '') -> None:
+    async def call_extension(self, extension: str, command: str, parameters: Optional[dict] = None,
+                             body: str = '') -> Tuple[SIExtensionStatus, dict, str]:
         """
         Runs an extension command on the gateway and returns the result of that operation. The function
         available_extensions() can be user to get the list of extensions that are available on the connected gateway.
 
-        The status of this operation and the command results are reported using the on_extension_called() callback.
-
         :param extension: Extension to use.
         :param command: Command to run on that extension.
         :param parameters: Parameters (key/value) to pass to the command, see extension documentation for details.
         :param body: Body to pass to the command, see extension documentation for details.
+        :return: Returns three values. 1: the status of the operation, 2: the returned key/value pairs from the command,
+                 3: an optional body output of the command.
         :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
         """
 
         if parameters is None:
             parameters = {}
 
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_call_extension_frame(extension, command, parameters, body),
+            'EXTENSION CALLED', self.__decode_extension_called_frame)
+
+    async def subscribe_to_property(self, property_id: str) -> Tuple[SIStatus, str]:
+        """
+        This method can be used to subscribe to a property on the connected gateway. The property is identified by the
+        property_id parameter. Value changes of the property can be retrieved using poll_events() or iter_events().
+
+        :param property_id: The ID of the property to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Returns two values: 1: Status of the subscribe operation, 2: the ID of the property.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(super(SIAsyncioGatewayClient, self).encode_subscribe_property_frame(property_id),
+                                    'PROPERTY SUBSCRIBED',
+                                    super(SIAsyncioGatewayClient, self).decode_property_subscribed_frame)
+
+    async def subscribe_to_properties(self, property_ids: List[str]) -> List[SIPropertySubscriptionResult]:
+        """
+        This method can be used to subscribe to multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter. Value changes can be retrieved using poll_events() or iter_events().
+
+        :param property_ids: The list of IDs of the properties to subscribe to in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Returns one value: 1: List of statuses of the subscribe operations.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_subscribe_properties_frame(property_ids),
+            'PROPERTIES SUBSCRIBED',
+            lambda frame: super(SIAsyncioGatewayClient, self).decode_properties_subscribed_frame(frame,
+                                                                                                 self.__json_loads))
+
+    async def unsubscribe_from_property(self, property_id: str) -> Tuple[SIStatus, str]:
+        """
+        This method can be used to unsubscribe from a property on the connected gateway. The property is identified by
+        the property_id parameter.
+
+        :param property_id: The ID of the property to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Returns two values: 1: Status of the unsubscribe operation, 2: the ID of the property.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_unsubscribe_property_frame(property_id), 'PROPERTY UNSUBSCRIBED',
+            super(SIAsyncioGatewayClient, self).decode_property_unsubscribed_frame)
+
+    async def unsubscribe_from_properties(self, property_ids: List[str]) -> List[SIPropertySubscriptionResult]:
+        """
+        This method can be used to unsubscribe from multiple properties on the connected gateway. The properties are
+        identified by the property_ids parameter.
+
+        :param property_ids: The list of IDs of the properties to unsubscribe from in the form
+               '{device access ID}.{device ID}.{property ID}'.
+        :return: Returns one value: 1: List of statuses of the unsubscribe operations.
+        :raises SIProtocolError: On a connection, protocol of framing error.
+        :raises SITimeoutError: If the response was not received within the client's timeout.
+        """
+
+        return await self.__request(
+            super(SIAsyncioGatewayClient, self).encode_unsubscribe_properties_frame(property_ids),
+            'PROPERTIES UNSUBSCRIBED',
+            lambda frame: super(SIAsyncioGatewayClient, self).decode_properties_unsubscribed_frame(frame,
+                                                                                                   self.__json_loads))
+
+    async def poll_events(self, timeout: Optional[float] = 0) -> List[Union[SIPropertyUpdate, SIDeviceMessage]]:
+        """
+        Returns all device messages and property updates received since the last call. If there are none, the coroutine
+        waits for up to timeout seconds for at least one to arrive.
+
+        :param timeout: Maximal time in seconds to wait for an event if none is buffered, 0 (default) only takes the
+               frames already received into account, None waits forever.
+        :return: List of SIPropertyUpdate and SIDeviceMessage objects in the order they were received, can be empty.
+               Malformed events are skipped and counted by dropped_events().
+        :raises SIProtocolError: If the client is not connected.
+        """
+
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Encode and send READ MESSAGES message to gateway.
-        self.__ws.send(super(SIAsyncGatewayClient, self).encode_call_extension_frame(extension, command,
-                                                                                     parameters, body))
+        # Wait for the reader task to receive at least one event.
+        if not self.__events and timeout != 0:
+            try:
+                await asyncio.wait_for(self.__events_available.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        # Decode the buffered events one by one, so that a malformed event does not lose the others.
+        frames = list(self.__events)
+        self.__events.clear()
+        self.__events_available.clear()
+        events = []
+        for frame in frames:
+            try:
+                events.append(self.__decode_event_frame(frame))
+            except SIProtocolError:
+                self.__dropped_events += 1
+        return events
 
-    def disconnect(self) -> None:
+    async def iter_events(self, timeout: Optional[float] = None) \
+            -> AsyncIterator[Union[SIPropertyUpdate, SIDeviceMessage]]:
+        """
+        Returns an asynchronous iterator over the device messages and property updates as they are received, use it
+        with async for. Other requests can be made using the client while iterating. The iteration ends once the client
+        is disconnected.
+
+        :param timeout: The iteration ends if no event is received within timeout seconds, None (default) iterates
+               forever.
+        :return: Asynchronous iterator over SIPropertyUpdate and SIDeviceMessage objects.
+        """
+
+        while self.__state == SIConnectionState.CONNECTED:
+            events = await self.poll_events(timeout)
+            if not events and (timeout is not None or self.__state != SIConnectionState.CONNECTED):
+                return
+            for event in events:
+                yield event
+
+    async def disconnect(self) -> None:
         """
         Disconnects the client from the gateway.
         """
@@ -1978,141 +6122,131 @@ class SIAsyncGatewayClient(_SIAbstractGatewayClient):
         # Ensure that the client is in the CONNECTED state.
         self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Close the WebSocket
-        self.__ws.close()
+        # Close the WebSocket, the reader task ends once the connection is closed.
+        self.__state = SIConnectionState.DISCONNECTED
+        await self.__ws.close()
+        if self.__reader is not None:
+            await self.__reader
+            self.__reader = None
 
     def __ensure_in_state(self, state: SIConnectionState) -> None:
         if self.__state != state:
             raise SIProtocolError("invalid client state")
 
-    def __on_open(self, _) -> None:
-        # Change state to AUTHORIZING.
+    async def __authorize(self, ws, user: Optional[str], password: Optional[str]) -> None:
+        self.__ws = ws
         self.__state = SIConnectionState.AUTHORIZING
-
-        # Encode and send AUTHORIZE message to gateway.
-        if self.__user is None or self.__password is None:
-            self.__ws.send(super(SIAsyncGatewayClient, self).encode_authorize_frame_without_credentials())
-        else:
-            self.__ws.send(
-                super(SIAsyncGatewayClient, self).encode_authorize_frame_with_credentials(self.__user, self.__password))
-
-    def __on_message(self, _, frame: str) -> None:
-
-        # Determine the actual command.
-        command = super(SIAsyncGatewayClient, self).peek_frame_command(frame)
-
         try:
-            # In AUTHORIZE state we only handle AUTHORIZED messages.
-            if self.__state == SIConnectionState.AUTHORIZING:
-                self.__access_level, self.__gateway_version, self.__available_extensions = \
-                    super(SIAsyncGatewayClient, self).decode_authorized_frame(frame)
-
-                # Change state to CONNECTED.
-                self.__state = SIConnectionState.CONNECTED
+            if user is None or password is None:
+                await ws.send(super(SIAsyncioGatewayClient, self).encode_authorize_frame_without_credentials())
+            else:
+                await ws.send(
+                    super(SIAsyncioGatewayClient, self).encode_authorize_frame_with_credentials(user, password))
+            frame = await asyncio.wait_for(ws.recv(), self.__timeout)
+            self.__access_level, self.__gateway_version, self.__available_extensions = \
+                super(SIAsyncioGatewayClient, self).decode_authorized_frame(frame)
+        except BaseException as error:
+            self.__state = SIConnectionState.DISCONNECTED
+            await ws.close()
+            if isinstance(error, asyncio.TimeoutError):
+                raise SITimeoutError('timeout during authorization')
+            raise
 
-                # Call callback if present.
-                if callable(self.on_connected):
-                    self.on_connected(self.__access_level, self.__gateway_version)
+        # Change state to connected, all frames are received by the reader task from now on.
+        self.__state = SIConnectionState.CONNECTED
+        self.__events.clear()
+        self.__events_available = asyncio.Event()
+        self.__send_lock = asyncio.Lock()
+        self.__reader = asyncio.ensure_future(self.__read_frames(ws))
 
-            # In CONNECTED state we handle all messages except the AUTHORIZED message.
-            else:
-                if command == 'ERROR':
-                    if callable(self.on_error):
-                        _, headers, _ = super(SIAsyncGatewayClient, self).decode_frame(frame)
-                        self.on_error(SIProtocolError(headers['reason']))
-                elif command == 'ENUMERATED':
-                    status, device_count = super(SIAsyncGatewayClient, self).decode_enumerated_frame(frame)
-                    if callable(self.on_enumerated):
-                        self.on_enumerated(status, device_count)
-                elif command == 'DESCRIPTION':
-                    status, id_, description = super(SIAsyncGatewayClient, self).decode_description_frame(frame)
-                    if callable(self.on_description):
-                        self.on_description(status, id_, description)
-                elif command == 'PROPERTIES FOUND':
-                    status, id_, count, virt, func, lst = \
-                        super(SIAsyncGatewayClient, self).decode_properties_found_frame(frame)
-                    if callable(self.on_properties_found):
-                        self.on_properties_found(status, id_, count, virt, func, lst)
-                elif command == 'PROPERTY READ':
-                    result = super(SIAsyncGatewayClient, self).decode_property_read_frame(frame)
-                    if callable(self.on_property_read):
-                        self.on_property_read(result.status, result.id, result.value)
-                elif command == 'PROPERTIES READ':
-                    results = super(SIAsyncGatewayClient, self).decode_properties_read_frame(frame)
-                    if callable(self.on_properties_read):
-                        self.on_properties_read(results)
-                elif command == 'PROPERTY WRITTEN':
-                    status, id_ = super(SIAsyncGatewayClient, self).decode_property_written_frame(frame)
-                    if callable(self.on_property_written):
-                        self.on_property_written(status, id_)
-                elif command == 'PROPERTY SUBSCRIBED':
-                    status, id_ = super(SIAsyncGatewayClient, self).decode_property_subscribed_frame(frame)
-                    if callable(self.on_property_subscribed):
-                        self.on_property_subscribed(status, id_)
-                elif command == 'PROPERTIES SUBSCRIBED':
-                    statuses = super(SIAsyncGatewayClient, self).decode_properties_subscribed_frame(frame)
-                    if callable(self.on_properties_subscribed):
-                        self.on_properties_subscribed(statuses)
-                elif command == 'PROPERTY UNSUBSCRIBED':
-                    status, id_ = super(SIAsyncGatewayClient, self).decode_property_unsubscribed_frame(frame)
-                    if callable(self.on_property_unsubscribed):
-                        self.on_property_unsubscribed(status, id_)
-                elif command == 'PROPERTIES UNSUBSCRIBED':
-                    statuses = super(SIAsyncGatewayClient, self).decode_properties_unsubscribed_frame(frame)
-                    if callable(self.on_properties_unsubscribed):
-                        self.on_properties_unsubscribed(statuses)
-                elif command == 'PROPERTY UPDATE':
-                    id_, value = super(SIAsyncGatewayClient, self).decode_property_update_frame(frame)
-                    if callable(self.on_property_updated):
-                        self.on_property_updated(id_, value)
-                elif command == 'DATALOG READ':
-                    status, id_, count, values = super(SIAsyncGatewayClient, self).decode_datalog_read_frame(frame)
-                    if id_ is None:
-                        if callable(self.on_datalog_properties_read):
-                            self.on_datalog_properties_read(status, values.splitlines())
-                    else:
-                        if callable(self.on_datalog_read_csv):
-                            self.on_datalog_read_csv(status, id_, count, values)
-                elif command == 'DEVICE MESSAGE':
-                    message = super(SIAsyncGatewayClient, self).decode_device_message_frame(frame)
-                    if callable(self.on_device_message):
-                        self.on_device_message(message)
-                elif command == 'MESSAGES READ':
-                    status, count, messages = super(SIAsyncGatewayClient, self).decode_messages_read_frame(frame)
-                    if callable(self.on_messages_read):
-                        self.on_messages_read(status, count, messages)
-                elif command == 'EXTENSION CALLED':
-                    status, extension, command, parameters, body = \
-                        super(SIAsyncGatewayClient, self).decode_extension_called_frame(frame)
-                    if callable(self.on_extension_called):
-                        self.on_extension_called(status, extension, command, parameters, body)
-                else:
-                    if callable(self.on_error):
-                        self.on_error(SIProtocolError('unsupported frame command: {command}'.format(command=command)))
-        except SIProtocolError as error:
-            if callable(self.on_error):
-                self.on_error(error)
-            if self.__state == SIConnectionState.AUTHORIZING:
-                self.__ws.close()
-                self.__state = SIConnectionState.DISCONNECTED
+    async def __request(self, frame: str, response_command: str, decode: Callable[[str], any]) -> any:
+        # Ensure that the client is in the CONNECTED state.
+        self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-    def __on_error(self, _, error: Exception) -> None:
-        if callable(self.on_error):
-            self.on_error(SIProtocolError(error.args[1]))
+        # Register the request in the correlation table and send it, both under the lock so that the order of the
+        # requests in the table is the order in which they are sent.
+        future = asyncio.get_event_loop().create_future()
+        key = (response_command, super(SIAsyncioGatewayClient, self).peek_frame_headers(frame)[1].get('id', None))
+        async with self.__send_lock:
+            self.__pending.setdefault(key, deque()).append((next(self.__sequence), future))
+            await self.__ws.send(frame)
 
-    def __on_close(self, _) -> None:
-        # Change state to DISCONNECTED.
-        self.__state = SIConnectionState.DISCONNECTED
+        # Wait for the response. A request that timed out or was cancelled stays in the correlation table, so that its
+        # late response is consumed by it.
+        try:
+            response = await asyncio.wait_for(future, self.__timeout)
+        except asyncio.TimeoutError:
+            raise SITimeoutError('timeout waiting for response')
+        return decode(response)
 
-        # Change access level to NONE.
-        self.__access_level = SIAccessLevel.NONE
+    async def __read_frames(self, ws) -> None:
+        try:
+            while True:
+                frame = await ws.recv()
+                if not isinstance(frame, str) or not frame:
+                    continue
+                try:
+                    command, headers = super(SIAsyncioGatewayClient, self).peek_frame_headers(frame)
+                except SIProtocolError:
+                    continue
+                if command in ('PROPERTY UPDATE', 'DEVICE MESSAGE'):
+                    if len(self.__events) == self.__events.maxlen:
+                        self.__dropped_events += 1
+                    self.__events.append(frame)
+                    self.__events_available.set()
+                    continue
+                future = self.__pop_pending(command, headers.get('id', None))
+                if future is not None and not future.done():
+                    future.set_result(frame)
+        except _SI_ASYNCIO_CONNECTION_ERRORS:
+            pass
+        finally:
+            # The connection is gone, fail all requests still waiting for a response and wake up event consumers.
+            self.__state = SIConnectionState.DISCONNECTED
+            self.__access_level = SIAccessLevel.NONE
+            pending = [future for entries in self.__pending.values() for _, future in entries]
+            self.__pending.clear()
+            for future in pending:
+                if not future.done():
+                    future.set_exception(SIProtocolError('connection closed'))
+            self.__events_available.set()
+
+    def __pop_pending(self, command: str, id_: Optional[str]) -> Optional[asyncio.Future]:
+        # The request with the response's command and ID wins, otherwise the oldest request with the response's
+        # command. Errors are attributed to the oldest request.
+        key = (command, id_)
+        if command == 'ERROR' or not self.__pending.get(key):
+            candidates = [key for key in self.__pending if command == 'ERROR' or key[0] == command]
+            if not candidates:
+                return None
+            key = min(candidates, key=lambda candidate: self.__pending[candidate][0][0])
+        entries = self.__pending[key]
+        _, future = entries.popleft()
+        if not entries:
+            del self.__pending[key]
+        return future
+
+    def __decode_description_frame(self, frame: str) -> Tuple[SIStatus, Optional[str], object]:
+        status, id_, description = super(SIAsyncioGatewayClient, self).decode_description_frame(frame,
+                                                                                                self.__json_loads)
+        if status == SIStatus.SUCCESS and self.__property_schema is not None:
+            self.__property_schema.update(id_, description)
+        return status, id_, description
+
+    def __decode_datalog_properties_frame(self, frame: str) -> Tuple[SIStatus, List[str]]:
+        status, _, _, parameters = super(SIAsyncioGatewayClient, self).decode_datalog_read_frame(frame)
+        return status, parameters.splitlines()
 
-        # Call callback.
-        if callable(self.on_disconnected):
-            self.on_disconnected()
+    def __decode_extension_called_frame(self, frame: str) -> Tuple[SIExtensionStatus, dict, str]:
+        _, _, status, params, body = super(SIAsyncioGatewayClient, self).decode_extension_called_frame(frame)
+        return status, params, body
 
-        # Wait for the end of the thread.
-        self.__thread.join()
+    def __decode_event_frame(self, frame: str) -> Union[SIPropertyUpdate, SIDeviceMessage]:
+        if super(SIAsyncioGatewayClient, self).peek_frame_command(frame) == 'PROPERTY UPDATE':
+            return SIPropertyUpdate(*super(SIAsyncioGatewayClient, self).decode_property_update_frame(
+                frame, self.__property_schema))
+        else:
+            return super(SIAsyncioGatewayClient, self).decode_device_message_frame(frame)
 
 
 _SI_BLUETOOTH_MANUFACTURER_ID = 0x025A
@@ -2204,21 +6338,15 @@ class _SIAbstractBluetoothGatewayClient:
                cbor2.dumps(property_id)
 
     @staticmethod
-    def decode_property_read_frame(frame: bytes) -> SIPropertyReadResult:
+    def decode_property_read_frame(frame: bytes, schema: Optional[SIPropertySchema] = None) -> SIPropertyReadResult:
         command_id, sequence = _SIAbstractBluetoothGatewayClient.decode_frame(frame)
         if command_id == 0x84 and len(sequence) >= 2 and isinstance(sequence[0], int) and isinstance(sequence[1], str):
             status = SIStatus.from_ordinal(sequence[0])
             if status == SIStatus.SUCCESS and sequence[2] is not None:
-                try:
-                    value = float(sequence[2])
-                except ValueError:
-                    string = sequence[2].lower()
-                    if string == 'true':
-                        value = True
-                    elif string == 'false':
-                        value = False
-                    else:
-                        value = string
+                if schema is None:
+                    value = _si_decode_value(sequence[2])
+                else:
+                    value = schema.decode(sequence[1], sequence[2])
                 return SIPropertyReadResult(status, sequence[1], value)
             else:
                 return SIPropertyReadResult(status, sequence[1], None)
@@ -2282,19 +6410,13 @@ class _SIAbstractBluetoothGatewayClient:
             raise SIProtocolError('unknown error during property subscribe')
 
     @staticmethod
-    def decode_property_update_frame(frame: bytes) -> Tuple[str, any]:
+    def decode_property_update_frame(frame: bytes, schema: Optional[SIPropertySchema] = None) -> Tuple[str, any]:
         command_id, sequence = _SIAbstractBluetoothGatewayClient.decode_frame(frame)
         if command_id == 0xFE and len(sequence) == 2 and isinstance(sequence[0], str):
-            try:
-                value = float(sequence[1])
-            except ValueError:
-                string = sequence[1].lower()
-                if string == 'true':
-                    value = True
-                elif string == 'false':
-                    value = False
-                else:
-                    value = string
+            if schema is None:
+                value = _si_decode_value(sequence[1])
+            else:
+                value = schema.decode(sequence[0], sequence[1])
             return sequence[0], value
         elif command_id == 0xFF and len(sequence) == 1 and isinstance(sequence[0], str):
             raise SIProtocolError(sequence[0])
@@ -2507,12 +6629,22 @@ class SIBluetoothGatewayClientCallbacks:
         """
         pass
 
-    def on_property_updated(self, property_id: str, value: any) -> None:
+    def on_property_updated(self, property_id: str, value: any, superseded: int = 0) -> None:
         """
         This callback is called whenever the gateway send a property update.
 
         :param property_id: ID of the updated property.
         :param value: The current value of the property.
+        :param superseded: Number of older values of the property that were dropped, only passed if the client
+               conflates property updates.
+        """
+        pass
+
+    def on_properties_updated(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        """
+        This callback is called with a batch of property updates if the client batches property updates.
+
+        :param updates: The property updates in the order they were received.
         """
         pass
 
@@ -2583,7 +6715,31 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
     easily discovered.
     """
 
-    def __init__(self, max_fragment_size: int = _SI_BLUETOOTH_MAX_FRAGMENT_SIZE):
+    def __init__(self, max_fragment_size: int = _SI_BLUETOOTH_MAX_FRAGMENT_SIZE,
+                 property_schema: Optional[SIPropertySchema] = None, reconnect: Optional[SIReconnectPolicy] = None,
+                 dispatcher: Optional[SICallbackDispatcher] = None, conflate_updates: bool = False,
+                 batching: Optional[SIUpdateBatching] = None, history: Optional[SIPropertyHistory] = None):
+        """
+        :param max_fragment_size: Maximal size of a single Bluetooth LE fragment.
+        :param property_schema: Optional property schema used to decode property values, it is filled automatically
+               with the property information of all property descriptions received.
+        :param reconnect: Optional reconnect policy. If present, the client reconnects after the connection was lost
+               and subscribes again to all properties it was subscribed to, one SUBSCRIBE PROPERTY request per
+               property whose results are reported using on_property_subscribed(). The client is in the CONNECTING
+               state until the connection is established again or the policy gives up.
+        :param dispatcher: Optional callback dispatcher used to call all callbacks, see SICallbackDispatcher. Defaults
+               to calling the callbacks inline on the Bluetooth event loop.
+        :param conflate_updates: If true, only the newest value of each property is kept until on_property_updated()
+               is called for it. Updates are reported in the order the properties first changed and
+               on_property_updated() gets the number of dropped values as third parameter. This only has an effect
+               with a queuing dispatcher, inline callbacks are always up to date.
+        :param batching: Optional batching configuration. If present, property updates are collected and reported in
+               batches using on_properties_updated() instead of on_property_updated(), see SIUpdateBatching. Batching
+               takes precedence over conflate_updates.
+        :param history: Optional property history, the values of all property updates received are recorded in it
+               before they are reported, see SIPropertyHistory.
+        """
+
         super(SIBluetoothGatewayClient, self).__init__()
         self.on_datalog_read_csv = None
         self.__state: SIConnectionState = SIConnectionState.DISCONNECTED
@@ -2596,6 +6752,19 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
         self.__access_level: SIAccessLevel = SIAccessLevel.NONE
         self.__gateway_version: str = ''
         self.__available_extensions: List[str] = []
+        self.__property_schema: Optional[SIPropertySchema] = property_schema
+        self.__reconnect_policy: Optional[SIReconnectPolicy] = reconnect
+        self.__reconnect_attempt: int = 0
+        self.__closing: bool = False
+        self.__subscriptions: Dict[str, None] = {}
+        self.__dispatcher: SICallbackDispatcher = dispatcher if dispatcher is not None else SICallbackDispatcher()
+        self.__conflated_updates: Optional[Dict[str, list]] = {} if conflate_updates else None
+        self.__conflated_updates_lock: threading.Lock = threading.Lock()
+        self.__update_batcher: Optional[_SIUpdateBatcher] = None
+        self.__flush_timer: _SIFlushTimer = _SIFlushTimer()
+        if batching is not None:
+            self.__update_batcher = _SIUpdateBatcher(batching, self.__deliver_update_batch, self.__start_timer)
+        self.__history: Optional[SIPropertyHistory] = history
 
         self.__user: Optional[str] = None
         self.__password: Optional[str] = None
@@ -2684,13 +6853,23 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
        2: The ID of the property.
        """
 
-        self.on_property_updated: Optional[Callable[[str, any], None]] = None
+        self.on_property_updated: Optional[Callable[..., None]] = None
         """
         This callback is called whenever the gateway send a property update.
 
         The callback takes two parameters: 
         1: the ID of the property that has updated, 
         2: the actual value.
+        If the client conflates property updates, a third parameter gives the number of older values dropped.
+        """
+
+        self.on_properties_updated: Optional[Callable[[Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]], None]] \
+            = None
+        """
+        This callback is called instead of on_property_updated() if the client batches property updates.
+
+        The callback takes one parameter, the list of updates (SIPropertyUpdate) in the order they were received, or
+        an SIPropertyUpdateBatch if the batches are columnar.
         """
 
         self.on_datalog_properties_read: Optional[Callable[[SIStatus, List[str]], None]] = None
@@ -2741,6 +6920,45 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
         4: Parameters returned by the command, see extension documentation for details.
         """
 
+        # Property updates are either batched, conflated or reported one by one.
+        if batching is not None:
+            property_update_handler = self.__batch_property_update_frame
+        elif conflate_updates:
+            property_update_handler = self.__conflate_property_update_frame
+        else:
+            property_update_handler = self.__callback_frame_handler(self.__decode_property_update_frame,
+                                                                    'on_property_updated', conflated=True)
+
+        # Frame handlers by command ID.
+        self.__frame_handlers: Dict[int, Callable[[bytes], None]] = {
+            0xFE: property_update_handler,
+            0xFD: self.__callback_frame_handler(
+                lambda frame: (super(SIBluetoothGatewayClient, self).decode_device_message_frame(frame),),
+                'on_device_message'),
+            0xFF: self.__handle_error_frame,
+            0x82: self.__callback_frame_handler(
+                super(SIBluetoothGatewayClient, self).decode_enumerated_frame, 'on_enumerated'),
+            0x83: self.__callback_frame_handler(self.__decode_description_frame, 'on_description'),
+            0x84: self.__callback_frame_handler(
+                lambda frame: super(SIBluetoothGatewayClient, self).decode_property_read_frame(
+                    frame, self.__property_schema).to_tuple(), 'on_property_read'),
+            0x85: self.__callback_frame_handler(
+                super(SIBluetoothGatewayClient, self).decode_property_written_frame, 'on_property_written'),
+            0x86: self.__callback_frame_handler(
+                lambda frame: self.__track_subscription(
+                    super(SIBluetoothGatewayClient, self).decode_property_subscribed_frame(frame), True),
+                'on_property_subscribed'),
+            0x87: self.__callback_frame_handler(
+                lambda frame: self.__track_subscription(
+                    super(SIBluetoothGatewayClient, self).decode_property_unsubscribed_frame(frame), False),
+                'on_property_unsubscribed'),
+            0x88: self.__handle_datalog_read_frame,
+            0x89: self.__callback_frame_handler(
+                super(SIBluetoothGatewayClient, self).decode_messages_read_frame, 'on_messages_read'),
+            0x8B: self.__callback_frame_handler(
+                super(SIBluetoothGatewayClient, self).decode_extension_called_frame, 'on_extension_called')
+        }
+
     @staticmethod
     def discover(timeout: float = 10.0):
         """
@@ -2783,9 +7001,13 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
         # Save parameter for later use.
         self.__user = user
         self.__password = password
+        self.__closing = False
+        self.__reconnect_attempt = 0
+        self.__subscriptions.clear()
 
         # Prepare to connect to BlE peripheral.
-        self.__ble = BleakClient(address)
+        self.__state = SIConnectionState.CONNECTING
+        self.__ble = BleakClient(address, disconnected_callback=self.__on_ble_disconnected)
 
         # In background mode, start a daemon thread for the connection handling, otherwise take over current thread.
         if background:
@@ -2814,12 +7036,28 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
             self.on_property_subscribed = callbacks.on_property_subscribed
             self.on_property_unsubscribed = callbacks.on_property_unsubscribed
             self.on_property_updated = callbacks.on_property_updated
+            self.on_properties_updated = callbacks.on_properties_updated
             self.on_datalog_properties_read = callbacks.on_datalog_properties_read
             self.on_datalog_read = callbacks.on_datalog_read
             self.on_device_message = callbacks.on_device_message
             self.on_messages_read = callbacks.on_messages_read
             self.on_extension_called = callbacks.on_extension_called
 
+    def register_frame_handler(self, command_id: int, handler: Callable[[bytes], None]) -> None:
+        """
+        Registers a handler for frames with the given command ID received from the gateway. This allows to handle frames
+        the client does not know about without modifying the library. Registering a handler for a command ID the client
+        already knows replaces the built-in handling of that command.
+
+        The handler is called with the complete frame, use decode_frame() to split it into command ID and parameters.
+        Protocol errors raised by the handler are reported using the on_error() callback.
+
+        :param command_id: Frame command ID the handler is responsible for, for example 0xFE.
+        :param handler: Callable taking the raw frame as single parameter.
+        """
+
+        self.__frame_handlers[command_id] = handler
+
     def state(self) -> SIConnectionState:
         """
         Returns the current state of the client. See **SIConnectionState** for details.
@@ -2855,6 +7093,14 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
         """
         return self.__available_extensions
 
+    def property_schema(self) -> Optional[SIPropertySchema]:
+        """
+        Returns the property schema used by the client to decode property values, None if no schema is used.
+
+        :return: Property schema or None.
+        """
+        return self.__property_schema
+
     def enumerate(self) -> None:
         """
         Instructs the gateway to scan every configured and functional device access driver for new devices and remove
@@ -3061,13 +7307,15 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
 
     def disconnect(self) -> None:
         """
-        Disconnects the client from the gateway.
+        Disconnects the client from the gateway. If the client is reconnecting, the reconnection is cancelled.
         """
 
-        # Ensure that the client is in the CONNECTED state.
-        self.__ensure_in_state(SIConnectionState.CONNECTED)
+        # Ensure that the client is in the CONNECTED state or reconnecting.
+        if self.__reconnect_policy is None or self.__state != SIConnectionState.CONNECTING:
+            self.__ensure_in_state(SIConnectionState.CONNECTED)
 
-        # Close the Bluetooth connection.
+        # Close the Bluetooth connection and stop reconnecting.
+        self.__closing = True
         if threading.current_thread() == self.__thread_id:
             self.__wait_for_disconnected.cancel()
         else:
@@ -3077,10 +7325,36 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
         self.__thread_id = threading.current_thread()
         self.__loop = asyncio.get_event_loop()
 
+        while True:
+            await self.__run_connection(timeout)
+
+            # Reconnect after the delay given by the policy unless the connection was closed on purpose.
+            if self.__reconnect_policy is None or self.__closing:
+                break
+            self.__reconnect_attempt += 1
+            delay = self.__reconnect_policy.delay(self.__reconnect_attempt)
+            if delay is None:
+                break
+            self.__state = SIConnectionState.CONNECTING
+            self.__wait_for_disconnected = self.__loop.create_future()
+            await asyncio.wait([self.__wait_for_disconnected], timeout=delay)
+            if self.__closing:
+                break
+
+        self.__state = SIConnectionState.DISCONNECTED
+
+    async def __run_connection(self, timeout: int):
+        self.__wait_for_disconnected = self.__loop.create_future()
+        self.__rx_buffer.clear()
+
         # Connect to Bluetooth LE peripheral.
         self.__state = SIConnectionState.CONNECTING
-        if not await self.__ble.connect(timeout=timeout):
-            self.on_error(SIProtocolError('Can not connect to BLE peripheral'))
+        try:
+            connected = await self.__ble.connect(timeout=timeout)
+        except (BleakError, asyncio.TimeoutError, OSError):
+            connected = False
+        if not connected:
+            self.__dispatch(self.on_error, SIProtocolError('Can not connect to BLE peripheral'))
             return
 
         await self.__ble.start_notify(_SI_BLUETOOTH_RX_UUID, self.__rx_callback)
@@ -3092,15 +7366,40 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
             bytes.fromhex('00') + super(SIBluetoothGatewayClient, self).encode_authorize_frame_with_credentials(
                 self.__user, self.__password), False)
 
-        self.__wait_for_disconnected = asyncio.Future()
         await asyncio.wait([self.__wait_for_disconnected])
 
-        await self.__ble.stop_notify(_SI_BLUETOOTH_RX_UUID)
-        await self.__ble.disconnect()
+        # The link might already be gone, in which case there is nothing left to close.
+        try:
+            await self.__ble.stop_notify(_SI_BLUETOOTH_RX_UUID)
+            await self.__ble.disconnect()
+        except (BleakError, OSError):
+            pass
 
-        self.__state = SIConnectionState.DISCONNECTED
-        if callable(self.on_disconnected):
-            self.on_disconnected()
+        # Change state to DISCONNECTED, or CONNECTING if the client is going to reconnect.
+        if self.__reconnect_policy is None or self.__closing:
+            self.__state = SIConnectionState.DISCONNECTED
+        else:
+            self.__state = SIConnectionState.CONNECTING
+        self.__access_level = SIAccessLevel.NONE
+        if self.__update_batcher is not None:
+            self.__flush_timer.stop()
+            self.__update_batcher.flush()
+        self.__dispatch(self.on_disconnected)
+
+    def __on_ble_disconnected(self, _: BleakClient) -> None:
+        # Called by bleak when the link was lost, wakes up the connection task.
+        if self.__wait_for_disconnected is not None and not self.__wait_for_disconnected.done():
+            self.__wait_for_disconnected.set_result(None)
+
+    def __track_subscription(self, result: Tuple[SIStatus, str], subscribed: bool) -> Tuple[SIStatus, str]:
+        # Remember the properties the client is subscribed to in order to subscribe again after a reconnect.
+        status, id_ = result
+        if status == SIStatus.SUCCESS:
+            if subscribed:
+                self.__subscriptions[id_] = None
+            else:
+                self.__subscriptions.pop(id_, None)
+        return result
 
     def __tx_send(self, payload: bytes):
         data = bytearray(payload)
@@ -3141,80 +7440,111 @@ class SIBluetoothGatewayClient(_SIAbstractBluetoothGatewayClient):
 
                 # Change state to CONNECTED.
                 self.__state = SIConnectionState.CONNECTED
+                self.__reconnect_attempt = 0
+
+                # After a reconnect, subscribe again to all properties the client was subscribed to.
+                for property_id in self.__subscriptions:
+                    self.__tx_send(super(SIBluetoothGatewayClient, self).encode_subscribe_property_frame(property_id))
 
                 # Call callback if present.
-                if callable(self.on_connected):
-                    self.on_connected(self.__access_level, self.__gateway_version)
+                self.__dispatch(self.on_connected, self.__access_level, self.__gateway_version)
 
             # In CONNECTED state we handle all messages except the AUTHORIZED message.
             else:
-                if command == 0xFF:
-                    if callable(self.on_error):
-                        _, sequence = super(SIBluetoothGatewayClient, self).decode_frame(frame)
-                        self.on_error(SIProtocolError(sequence[0]))
-                elif command == 0x82:
-                    status, device_count = super(SIBluetoothGatewayClient, self).decode_enumerated_frame(frame)
-                    if callable(self.on_enumerated):
-                        self.on_enumerated(status, device_count)
-                elif command == 0x83:
-                    status, id_, description = super(SIBluetoothGatewayClient, self).decode_description_frame(frame)
-                    if callable(self.on_description):
-                        self.on_description(status, id_, description)
-                elif command == 0x84:
-                    result = super(SIBluetoothGatewayClient, self).decode_property_read_frame(frame)
-                    if callable(self.on_property_read):
-                        self.on_property_read(result.status, result.id, result.value)
-                elif command == 0x85:
-                    status, id_ = super(SIBluetoothGatewayClient, self).decode_property_written_frame(frame)
-                    if callable(self.on_property_written):
-                        self.on_property_written(status, id_)
-                elif command == 0x86:
-                    status, id_ = super(SIBluetoothGatewayClient, self).decode_property_subscribed_frame(frame)
-                    if callable(self.on_property_subscribed):
-                        self.on_property_subscribed(status, id_)
-                elif command == 0x87:
-                    status, id_ = super(SIBluetoothGatewayClient, self).decode_property_unsubscribed_frame(frame)
-                    if callable(self.on_property_unsubscribed):
-                        self.on_property_unsubscribed(status, id_)
-                elif command == 0xFE:
-                    id_, value = super(SIBluetoothGatewayClient, self).decode_property_update_frame(frame)
-                    if callable(self.on_property_updated):
-                        self.on_property_updated(id_, value)
-                elif command == 0x88:
-                    status, id_, count, data = \
-                        super(SIBluetoothGatewayClient, self).decode_datalog_read_frame(frame)
-                    if id_ is None:
-                        if callable(self.on_datalog_properties_read):
-                            self.on_datalog_properties_read(status, data)
-                    else:
-                        if callable(self.on_datalog_read):
-                            values = []
-                            for i in range(count):
-                                values.append((datetime.datetime.fromtimestamp(data[2 * i]), data[2 * i + 1]))
-                            self.on_datalog_read(status, id_, count, values)
-                elif command == 0xFD:
-                    message = super(SIBluetoothGatewayClient, self).decode_device_message_frame(frame)
-                    if callable(self.on_device_message):
-                        self.on_device_message(message)
-                elif command == 0x89:
-                    status, count, messages = \
-                        super(SIBluetoothGatewayClient, self).decode_messages_read_frame(frame)
-                    if callable(self.on_messages_read):
-                        self.on_messages_read(status, count, messages)
-                elif command == 0x8B:
-                    extension, command, status, parameters = \
-                        super(SIBluetoothGatewayClient, self).decode_extension_called_frame(frame)
-                    if callable(self.on_extension_called):
-                        self.on_extension_called(extension, command, status, parameters)
+                handler = self.__frame_handlers.get(command)
+                if handler is not None:
+                    handler(frame)
                 else:
-                    if callable(self.on_error):
-                        self.on_error(
-                            SIProtocolError('unsupported frame command: {command}'.format(command=command)))
+                    self.__dispatch(self.on_error,
+                                    SIProtocolError('unsupported frame command: {command}'.format(command=command)))
         except SIProtocolError as error:
-            if callable(self.on_error):
-                self.on_error(error)
+            self.__dispatch(self.on_error, error)
             if self.__state == SIConnectionState.AUTHORIZING:
-                self.__wait_for_disconnected.done()
+                self.__closing = True
+                self.__wait_for_disconnected.cancel()
+
+    def __callback_frame_handler(self, decoder: Callable[[bytes], tuple], callback: str,
+                                 conflated: bool = False) -> Callable[[bytes], None]:
+        # The callback is looked up by name on each frame, as it can be (re)assigned at any time. Conflated callbacks
+        # use their first argument, the property ID, as conflation key.
+        def handle(frame: bytes) -> None:
+            arguments = decoder(frame)
+            self.__dispatch(getattr(self, callback), *arguments, key=arguments[0] if conflated else None)
+        return handle
+
+    def __dispatch(self, callback: Optional[Callable], *arguments, key: Optional[any] = None) -> None:
+        if callable(callback):
+            self.__dispatcher.dispatch(callback, arguments, key)
+
+    def __batch_property_update_frame(self, frame: bytes) -> None:
+        id_, value = self.__decode_property_update_frame(frame)
+        if callable(self.on_properties_updated):
+            self.__update_batcher.add(id_, value)
+
+    def __deliver_update_batch(self, updates: Union[List[SIPropertyUpdate], SIPropertyUpdateBatch]) -> None:
+        self.__dispatch(self.on_properties_updated, updates)
+
+    def __start_timer(self, delay: float, function: Callable[[], None]) -> None:
+        # Batches are delivered on the Bluetooth event loop like all other callbacks, if it is running.
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__loop.call_later, delay, function)
+        else:
+            self.__flush_timer.start(delay, function)
+
+    def __conflate_property_update_frame(self, frame: bytes) -> None:
+        # Only the newest value of each property waits for delivery.
+        id_, value = self.__decode_property_update_frame(frame)
+        if not callable(self.on_property_updated):
+            return
+        # The delivery is dispatched again if the dispatcher dropped callbacks since, as it might have been dropped.
+        dropped_events = self.__dispatcher.dropped_events()
+        with self.__conflated_updates_lock:
+            entry = self.__conflated_updates.get(id_)
+            if entry is not None:
+                entry[0] = value
+                entry[1] += 1
+                if entry[2] == dropped_events:
+                    return
+                entry[2] = dropped_events
+            else:
+                self.__conflated_updates[id_] = [value, 0, dropped_events]
+        self.__dispatch(self.__deliver_conflated_property_update, id_)
+
+    def __deliver_conflated_property_update(self, id_: str) -> None:
+        with self.__conflated_updates_lock:
+            entry = self.__conflated_updates.pop(id_, None)
+        if entry is None:
+            return
+        value, superseded, _ = entry
+        if callable(self.on_property_updated):
+            self.on_property_updated(id_, value, superseded)
+
+    def __handle_error_frame(self, frame: bytes) -> None:
+        _, sequence = super(SIBluetoothGatewayClient, self).decode_frame(frame)
+        self.__dispatch(self.on_error, SIProtocolError(sequence[0]))
+
+    def __decode_property_update_frame(self, frame: bytes) -> Tuple[str, any]:
+        id_, value = super(SIBluetoothGatewayClient, self).decode_property_update_frame(frame, self.__property_schema)
+        if self.__history is not None:
+            self.__history.record(id_, value)
+        return id_, value
+
+    def __decode_description_frame(self, frame: bytes) -> Tuple[SIStatus, Optional[str], any]:
+        status, id_, description = super(SIBluetoothGatewayClient, self).decode_description_frame(frame)
+        if status == SIStatus.SUCCESS and self.__property_schema is not None:
+            self.__property_schema.update(id_, description)
+        return status, id_, description
+
+    def __handle_datalog_read_frame(self, frame: bytes) -> None:
+        status, id_, count, data = super(SIBluetoothGatewayClient, self).decode_datalog_read_frame(frame)
+        if id_ is None:
+            self.__dispatch(self.on_datalog_properties_read, status, data)
+        else:
+            if callable(self.on_datalog_read):
+                values = []
+                for i in range(count):
+                    values.append((datetime.datetime.fromtimestamp(data[2 * i]), data[2 * i + 1]))
+                self.__dispatch(self.on_datalog_read, status, id_, count, values)
 
     def __ensure_in_state(self, state: SIConnectionState) -> None:
         if self.__state != state:
@@ -6,5 +6,10 @@ setup(
 		'websocket-client==1.3.1',
 		'cbor2==5.4.2.post1',
 		'bleak==0.14.2'
-	]
+	],
+	extras_require={
+		'orjson': ['orjson'],
+		'ujson': ['ujson'],
+		'asyncio': ['websockets']
+	}
 )
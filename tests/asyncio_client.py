@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from openstuder import SIAsyncioGatewayClient, SIConnectionState, SIAccessLevel, SIStatus, SIProtocolError, SITimeoutError, SIPropertyUpdate, \
+    SIDeviceMessage
+
+
+AUTHORIZED = 'AUTHORIZED\naccess_level:Basic\nprotocol_version:1\ngateway_version:0.0.0\n\n'
+UPDATE = 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:{value}\n\n'
+MESSAGE = 'DEVICE MESSAGE\naccess_id:demo\ndevice_id:inv\nmessage_id:1\nmessage:test\ntimestamp:2020-01-01T00:00:00\n\n'
+
+
+class FakeAsyncWebSocket:
+    def __init__(self, responses: dict = None):
+        self.sent = []
+        self.responses = responses or {}
+        self.frames = asyncio.Queue()
+        self.frames.put_nowait(AUTHORIZED)
+
+    async def send(self, frame: str):
+        self.sent.append(frame)
+        for response in self.responses.get(frame, []):
+            self.frames.put_nowait(response)
+
+    async def recv(self) -> str:
+        frame = await self.frames.get()
+        if frame is None:
+            raise EOFError()
+        return frame
+
+    async def close(self):
+        self.frames.put_nowait(None)
+
+
+async def connected_asyncio_client(ws: FakeAsyncWebSocket, **kwargs) -> SIAsyncioGatewayClient:
+    client = SIAsyncioGatewayClient(**kwargs)
+    await client._SIAsyncioGatewayClient__authorize(ws, None, None)
+    return client
+
+
+class AsyncioClient(unittest.TestCase):
+    def test_connect_and_disconnect(self):
+        async def test():
+            ws = FakeAsyncWebSocket()
+            client = await connected_asyncio_client(ws)
+            self.assertEqual(SIConnectionState.CONNECTED, client.state())
+            self.assertEqual(SIAccessLevel.BASIC, client.access_level())
+            self.assertEqual(['AUTHORIZE\nprotocol_version:1\n\n'], ws.sent)
+            await client.disconnect()
+            self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+            with self.assertRaises(SIProtocolError):
+                await client.read_property('demo.inv.3136')
+        asyncio.run(test())
+
+    def test_concurrent_requests(self):
+        async def test():
+            # The gateway answers the second request first.
+            ws = FakeAsyncWebSocket({
+                'READ PROPERTY\nid:demo.inv.3136\n\n': [],
+                'READ PROPERTY\nid:demo.inv.3137\n\n': ['PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n', UPDATE.format(value=1),
+                                                        'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n'],
+                'ENUMERATE\n\n': ['ENUMERATED\nstatus:Success\ndevice_count:3\n\n']
+            })
+            client = await connected_asyncio_client(ws)
+            results = await asyncio.gather(client.read_property('demo.inv.3136'), client.read_property('demo.inv.3137'), client.enumerate())
+            self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136', 1.0), (SIStatus.SUCCESS, 'demo.inv.3137', 2.0), (SIStatus.SUCCESS, 3)], results)
+            events = await client.poll_events()
+            self.assertIsInstance(events[0], SIPropertyUpdate)
+        asyncio.run(test())
+
+    def test_error(self):
+        async def test():
+            ws = FakeAsyncWebSocket({'READ PROPERTIES\n\n["demo.inv.3136"]': ['ERROR\nreason:test\n\n']})
+            client = await connected_asyncio_client(ws)
+            with self.assertRaises(SIProtocolError):
+                await client.read_properties(['demo.inv.3136'])
+        asyncio.run(test())
+
+    def test_timeout(self):
+        async def test():
+            ws = FakeAsyncWebSocket({'READ PROPERTY\nid:demo.inv.3136\n\n': []})
+            client = await connected_asyncio_client(ws, timeout=0.01)
+            with self.assertRaises(SITimeoutError):
+                await client.read_property('demo.inv.3136')
+            ws.responses['READ PROPERTY\nid:demo.inv.3136\n\n'] = ['PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n',
+                                                                   'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:2\n\n']
+            self.assertEqual(2.0, (await client.read_property('demo.inv.3136'))[2])
+        asyncio.run(test())
+
+    def test_malformed_event(self):
+        async def test():
+            ws = FakeAsyncWebSocket({'ENUMERATE\n\n': [UPDATE.format(value=1), 'PROPERTY UPDATE\nvalue:2\n\n', UPDATE.format(value=3),
+                                                        'ENUMERATED\nstatus:Success\ndevice_count:3\n\n']})
+            client = await connected_asyncio_client(ws)
+            await client.enumerate()
+            self.assertEqual([1.0, 3.0], [event.value for event in await client.poll_events()])
+            self.assertEqual(1, client.dropped_events())
+            await client.disconnect()
+        asyncio.run(test())
+
+    def test_iter_events(self):
+        async def test():
+            ws = FakeAsyncWebSocket({'SUBSCRIBE PROPERTIES\n\n["demo.inv.3136"]': ['PROPERTIES SUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136"}]',
+                                                                                   UPDATE.format(value=1), MESSAGE, UPDATE.format(value=2)]})
+            client = await connected_asyncio_client(ws)
+            self.assertEqual(1, len(await client.subscribe_to_properties(['demo.inv.3136'])))
+            events = []
+            async for event in client.iter_events():
+                events.append(event)
+                if len(events) == 3:
+                    await client.disconnect()
+            self.assertEqual([SIPropertyUpdate, SIDeviceMessage, SIPropertyUpdate], [type(event) for event in events])
+        asyncio.run(test())
+
+    def test_connection_lost(self):
+        async def test():
+            ws = FakeAsyncWebSocket({'ENUMERATE\n\n': [None]})
+            client = await connected_asyncio_client(ws)
+            with self.assertRaises(SIProtocolError):
+                await client.enumerate()
+            self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+        asyncio.run(test())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import datetime
+import json
+import timeit
+import tracemalloc
+# noinspection PyProtectedMember
+from openstuder import _SIAbstractGatewayClient, SIDatalogArrays, SIDeviceMessage, SIJsonCodec, SIProtocolError
+from websocket_frames import legacy_decode_frame
+
+
+def datalog_frame(rows: int) -> str:
+    body = '\n'.join(f'2021-02-07T20:{i % 60:02}:00,{i * 0.001:.5f}' for i in range(rows))
+    return f'DATALOG READ\nstatus:Success\nid:demo.bat.7003\ncount:{rows}\n\n{body}'
+
+
+def messages_read_frame(count: int) -> str:
+    messages = [{'access_id': 'demo', 'device_id': 'inv', 'message': 'AUX2 relay activation', 'message_id': 200 + i % 50,
+                 'timestamp': f'2020-01-01T00:{i % 60:02}:00Z'} for i in range(count)]
+    return f'MESSAGES READ\nstatus:Success\ncount:{count}\n\n{json.dumps(messages)}'
+
+
+def properties_read_frame(count: int) -> str:
+    results = [{'status': 'Success', 'id': f'demo.inv.{3000 + i}', 'value': i * 0.25} for i in range(count)]
+    return f'PROPERTIES READ\nstatus:Success\n\n{json.dumps(results)}'
+
+
+def legacy_decode_messages_read_frame(frame: str):
+    _, _, body = _SIAbstractGatewayClient.decode_frame(frame)
+    return json.loads(body, object_hook=SIDeviceMessage.from_dict)
+
+
+def naive_decode_datalog_csv(csv: str):
+    timestamps, values = [], []
+    for line in csv.splitlines():
+        timestamp, value = line.split(',')
+        timestamps.append(datetime.datetime.fromisoformat(timestamp).replace(tzinfo=datetime.timezone.utc).timestamp())
+        values.append(float(value))
+    return timestamps, values
+
+
+def peak_memory(statement) -> int:
+    tracemalloc.start()
+    statement()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def consume_messages_iterator(frame: str):
+    for _ in _SIAbstractGatewayClient.iter_messages_read_frame(frame)[2]:
+        pass
+
+
+def benchmark(name: str, statement, number: int) -> float:
+    seconds = min(timeit.repeat(statement, number=number, repeat=5)) / number
+    print(f'  {name:<12} {seconds * 1e6:12.1f} us/frame')
+    return seconds
+
+
+if __name__ == "__main__":
+    for rows in [0, 100, 10000, 100000, 1000000]:
+        frame = datalog_frame(rows)
+        number = max(1, 100000 // max(rows, 1))
+        print(f'DATALOG READ frame with {rows} rows ({len(frame) / 1e6:.2f} MB):')
+        legacy = benchmark('legacy', lambda: legacy_decode_frame(frame), number)
+        current = benchmark('single-pass', lambda: _SIAbstractGatewayClient.decode_frame(frame), number)
+        print(f'  speedup      {legacy / current:12.1f} x')
+
+    for rows in [100, 10000, 1000000]:
+        csv = _SIAbstractGatewayClient.decode_datalog_read_frame(datalog_frame(rows))[3]
+        number = max(1, 10000 // rows)
+        print(f'DATALOG READ body with {rows} rows decoded to times and values:')
+        legacy = benchmark('naive csv', lambda: naive_decode_datalog_csv(csv), number)
+        current = benchmark('arrays', lambda: SIDatalogArrays.from_csv(csv), number)
+        print(f'  speedup      {legacy / current:12.1f} x')
+
+    for count in [100, 10000, 100000]:
+        frame = messages_read_frame(count)
+        number = max(1, 10000 // count)
+        print(f'MESSAGES READ frame with {count} messages ({len(frame) / 1e6:.2f} MB):')
+        legacy = benchmark('object_hook', lambda: legacy_decode_messages_read_frame(frame), number)
+        for codec in [SIJsonCodec.STDLIB, SIJsonCodec.ORJSON, SIJsonCodec.UJSON]:
+            try:
+                loads = codec.loads()
+            except SIProtocolError:
+                continue
+            current = benchmark(codec.name.lower(), lambda: _SIAbstractGatewayClient.decode_messages_read_frame(frame, loads), number)
+            print(f'  speedup      {legacy / current:12.1f} x')
+
+    for count in [10000, 100000]:
+        frame = messages_read_frame(count)
+        print(f'MESSAGES READ frame with {count} messages, peak memory during decoding:')
+        print(f'  list         {peak_memory(lambda: _SIAbstractGatewayClient.decode_messages_read_frame(frame)) / 1e6:12.2f} MB')
+        print(f'  iterator     {peak_memory(lambda: consume_messages_iterator(frame)) / 1e6:12.2f} MB')
+
+    for count in [100, 2000]:
+        frame = properties_read_frame(count)
+        number = max(1, 100000 // count)
+        print(f'PROPERTIES READ frame with {count} properties:')
+        legacy = benchmark('list', lambda: _SIAbstractGatewayClient.decode_properties_read_frame(frame), number)
+        current = benchmark('batch', lambda: _SIAbstractGatewayClient.decode_properties_read_batch_frame(frame), number)
+        print(f'  speedup      {legacy / current:12.1f} x')
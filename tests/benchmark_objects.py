@@ -0,0 +1,65 @@
+import datetime
+import json
+import tracemalloc
+from openstuder import SIDeviceMessage, SIPropertyReadResult, SIPropertySubscriptionResult, SIStatus
+
+
+class LegacySIDeviceMessage:
+    def __init__(self, access_id, device_id, message_id, message, timestamp):
+        self.timestamp = timestamp
+        self.access_id = access_id
+        self.device_id = device_id
+        self.message_id = message_id
+        self.message = message
+
+    @staticmethod
+    def from_dict(d: dict):
+        return LegacySIDeviceMessage(d['access_id'], d['device_id'], d['message_id'], d['message'],
+                                     datetime.datetime.fromisoformat(d['timestamp'].replace("Z", "+00:00")))
+
+
+class LegacySIPropertyReadResult:
+    def __init__(self, status, id_, value):
+        self.status = status
+        self.id = id_
+        self.value = value
+
+
+class LegacySIPropertySubscriptionResult:
+    def __init__(self, status, id_):
+        self.status = status
+        self.id = id_
+
+
+def bytes_per_object(build, count: int) -> float:
+    # Only the memory still held by the built objects is measured, temporaries freed during the build are not.
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def report(name: str, legacy: float, current: float):
+    print(f'{name}:')
+    print(f'  legacy       {legacy:12.1f} bytes/object')
+    print(f'  slotted      {current:12.1f} bytes/object')
+    print(f'  saving       {100.0 * (1.0 - current / legacy):12.1f} %')
+
+
+if __name__ == "__main__":
+    count = 100000
+
+    # Messages are decoded from JSON, so without interning every message keeps its own access and device ID strings.
+    body = json.dumps([{'access_id': 'demo', 'device_id': 'inv', 'message': 'AUX2 relay activation', 'message_id': 200 + i % 50,
+                        'timestamp': f'2020-01-01T00:{i % 60:02}:00Z'} for i in range(count)])
+    report('SIDeviceMessage', bytes_per_object(lambda: [LegacySIDeviceMessage.from_dict(d) for d in json.loads(body)], count),
+           bytes_per_object(lambda: [SIDeviceMessage.from_dict(d) for d in json.loads(body)], count))
+
+    ids = [f'demo.inv.{3000 + i}' for i in range(count)]
+    report('SIPropertyReadResult', bytes_per_object(lambda: [LegacySIPropertyReadResult(SIStatus.SUCCESS, id_, 0.5) for id_ in ids], count),
+           bytes_per_object(lambda: [SIPropertyReadResult(SIStatus.SUCCESS, id_, 0.5) for id_ in ids], count))
+    report('SIPropertySubscriptionResult', bytes_per_object(lambda: [LegacySIPropertySubscriptionResult(SIStatus.SUCCESS, id_) for id_ in ids], count),
+           bytes_per_object(lambda: [SIPropertySubscriptionResult(SIStatus.SUCCESS, id_) for id_ in ids], count))
@@ -0,0 +1,218 @@
+import asyncio
+import threading
+import unittest
+import cbor2
+from openstuder import SIAsyncGatewayClient, SIBackpressure, SICallbackDispatcher, SIQueueCallbackDispatcher, \
+    SIThreadPoolCallbackDispatcher, SIAsyncioCallbackDispatcher
+from dispatch import connected_async_client, connected_bluetooth_client, receive_bluetooth_frame, receive_update
+
+
+class SICallbackDispatcherTest(unittest.TestCase):
+    def test_inline(self):
+        calls = []
+        dispatcher = SICallbackDispatcher()
+        dispatcher.dispatch(lambda a, b: calls.append((a, b)), (1, 2))
+        self.assertEqual([(1, 2)], calls)
+        self.assertEqual(0, dispatcher.dropped_events())
+
+
+class SIQueueCallbackDispatcherTest(unittest.TestCase):
+    def test_run_pending(self):
+        calls = []
+        dispatcher = SIQueueCallbackDispatcher()
+        for i in range(3):
+            dispatcher.dispatch(calls.append, (i,))
+        self.assertEqual([], calls)
+        self.assertEqual(2, dispatcher.run_pending(max_count=2))
+        self.assertEqual(1, dispatcher.run_pending())
+        self.assertEqual([0, 1, 2], calls)
+        self.assertEqual(0, dispatcher.run_pending())
+
+    def test_drop_oldest(self):
+        calls = []
+        dispatcher = SIQueueCallbackDispatcher(max_size=2, backpressure=SIBackpressure.DROP_OLDEST)
+        for i in range(5):
+            dispatcher.dispatch(calls.append, (i,))
+        dispatcher.run_pending()
+        self.assertEqual([3, 4], calls)
+        self.assertEqual(3, dispatcher.dropped_events())
+
+    def test_conflate(self):
+        calls = []
+        dispatcher = SIQueueCallbackDispatcher(max_size=2, backpressure=SIBackpressure.CONFLATE)
+        dispatcher.dispatch(lambda id_, value: calls.append((id_, value)), ('a', 1), 'a')
+        dispatcher.dispatch(lambda id_, value: calls.append((id_, value)), ('b', 1), 'b')
+        self.assertEqual(2, dispatcher.pending())
+        callback = lambda id_, value: calls.append((id_, value))
+        dispatcher.dispatch(callback, ('c', 1), 'c')
+        dispatcher.dispatch(callback, ('c', 2), 'c')
+        dispatcher.run_pending()
+        self.assertEqual([('b', 1), ('c', 2)], calls)
+        self.assertEqual(2, dispatcher.dropped_events())
+
+    def test_block(self):
+        calls = []
+        dispatcher = SIQueueCallbackDispatcher(max_size=1)
+        dispatcher.dispatch(calls.append, (0,))
+        producer = threading.Thread(target=lambda: dispatcher.dispatch(calls.append, (1,)))
+        producer.start()
+        producer.join(0.05)
+        self.assertTrue(producer.is_alive())
+        dispatcher.run_pending(max_count=1)
+        producer.join(1)
+        self.assertFalse(producer.is_alive())
+        dispatcher.run_pending()
+        self.assertEqual([0, 1], calls)
+        self.assertEqual(0, dispatcher.dropped_events())
+
+    def test_close_wakes_up(self):
+        dispatcher = SIQueueCallbackDispatcher()
+        threading.Timer(0.05, dispatcher.close).start()
+        self.assertEqual(0, dispatcher.run_pending(None))
+
+
+class SIThreadPoolCallbackDispatcherTest(unittest.TestCase):
+    def test_workers(self):
+        calls = []
+        done = threading.Event()
+        dispatcher = SIThreadPoolCallbackDispatcher()
+        for i in range(10):
+            dispatcher.dispatch(calls.append, (i,))
+        dispatcher.dispatch(done.set, ())
+        self.assertTrue(done.wait(1))
+        self.assertEqual(list(range(10)), calls)
+        dispatcher.close()
+
+
+class SIAsyncioCallbackDispatcherTest(unittest.TestCase):
+    def test_callbacks_on_loop(self):
+        async def run():
+            loop = asyncio.get_event_loop()
+            dispatcher = SIAsyncioCallbackDispatcher(loop, max_size=2)
+            threads = []
+            producer = threading.Thread(target=lambda: [
+                dispatcher.dispatch(lambda: threads.append(threading.get_ident()), ()) for _ in range(3)])
+            producer.start()
+            while len(threads) < 3:
+                await asyncio.sleep(0.01)
+            producer.join()
+            return threads
+
+        loop = asyncio.new_event_loop()
+        try:
+            threads = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        self.assertEqual({threading.get_ident()}, set(threads))
+
+    def test_full_queue_on_loop(self):
+        async def run():
+            dispatcher = SIAsyncioCallbackDispatcher(asyncio.get_event_loop(), max_size=1)
+            calls = []
+            for i in range(3):
+                dispatcher.dispatch(calls.append, (i,))
+            await asyncio.sleep(0)
+            return calls
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual([0, 1, 2], loop.run_until_complete(run()))
+        finally:
+            loop.close()
+
+
+class ClientDispatch(unittest.TestCase):
+    def test_async_client(self):
+        dispatcher = SIQueueCallbackDispatcher(backpressure=SIBackpressure.CONFLATE)
+        client = connected_async_client(dispatcher=dispatcher)
+        updates, written = [], []
+        client.on_property_updated = lambda id_, value: updates.append((id_, value))
+        client.on_property_written = lambda status, id_: written.append(id_)
+        for value in ['1', '2', '3']:
+            client._SIAsyncGatewayClient__on_message(None, f'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:{value}\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n')
+        self.assertEqual([], updates)
+        dispatcher.run_pending()
+        self.assertEqual([('demo.inv.3136', 3.0)], updates)
+        self.assertEqual(['demo.inv.1415'], written)
+        self.assertEqual(2, dispatcher.dropped_events())
+
+    def test_bluetooth_client(self):
+        dispatcher = SIQueueCallbackDispatcher(backpressure=SIBackpressure.CONFLATE)
+        client = connected_bluetooth_client(dispatcher=dispatcher)
+        updates = []
+        client.on_property_updated = lambda id_, value: updates.append((id_, value))
+        for value in [1, 2]:
+            frame = cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.3136') + cbor2.dumps(value)
+            receive_bluetooth_frame(client, frame)
+        dispatcher.run_pending()
+        self.assertEqual([('demo.inv.3136', 2)], updates)
+
+
+def conflating_async_client(dispatcher: SICallbackDispatcher) -> SIAsyncGatewayClient:
+    return connected_async_client(dispatcher=dispatcher, conflate_updates=True)
+
+
+class ConflatedUpdates(unittest.TestCase):
+    def test_latest_value_in_arrival_order(self):
+        dispatcher = SIQueueCallbackDispatcher()
+        client = conflating_async_client(dispatcher)
+        updates = []
+        client.on_property_updated = lambda id_, value, superseded: updates.append((id_, value, superseded))
+        for id_, value in [('demo.inv.3136', '1'), ('demo.inv.3137', '1'), ('demo.inv.3136', '2'),
+                           ('demo.inv.3136', '3')]:
+            receive_update(client, id_, value)
+        self.assertEqual(2, dispatcher.pending())
+        dispatcher.run_pending()
+        self.assertEqual([('demo.inv.3136', 3.0, 2), ('demo.inv.3137', 1.0, 0)], updates)
+        receive_update(client, 'demo.inv.3136', '4')
+        dispatcher.run_pending()
+        self.assertEqual(('demo.inv.3136', 4.0, 0), updates[-1])
+
+    def test_inline(self):
+        client = conflating_async_client(SICallbackDispatcher())
+        updates = []
+        client.on_property_updated = lambda id_, value, superseded: updates.append((value, superseded))
+        receive_update(client, 'demo.inv.3136', '1')
+        receive_update(client, 'demo.inv.3136', '2')
+        self.assertEqual([(1.0, 0), (2.0, 0)], updates)
+
+    def test_dropped_delivery(self):
+        dispatcher = SIQueueCallbackDispatcher(max_size=1, backpressure=SIBackpressure.DROP_OLDEST)
+        client = conflating_async_client(dispatcher)
+        updates = []
+        client.on_property_updated = lambda id_, value, superseded: updates.append((value, superseded))
+        receive_update(client, 'demo.inv.3136', '1')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n')
+        receive_update(client, 'demo.inv.3136', '2')
+        dispatcher.run_pending()
+        self.assertEqual([(2.0, 1)], updates)
+
+    def test_malformed_update(self):
+        dispatcher = SIQueueCallbackDispatcher()
+        client = conflating_async_client(dispatcher)
+        updates, errors, written = [], [], []
+        client.on_property_updated = lambda id_, value, superseded: updates.append(value)
+        client.on_property_written = lambda status, id_: written.append(id_)
+        client.on_error = errors.append
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY UPDATE\nid:demo.inv.3136\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n')
+        dispatcher.run_pending()
+        self.assertEqual([], updates)
+        self.assertEqual(1, len(errors))
+        self.assertEqual(['demo.inv.1415'], written)
+
+    def test_bluetooth_client(self):
+        dispatcher = SIQueueCallbackDispatcher()
+        client = connected_bluetooth_client(dispatcher=dispatcher, conflate_updates=True)
+        updates = []
+        client.on_property_updated = lambda id_, value, superseded: updates.append((id_, value, superseded))
+        for value in [1, 2, 3]:
+            frame = cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.3136') + cbor2.dumps(value)
+            receive_bluetooth_frame(client, frame)
+        dispatcher.run_pending()
+        self.assertEqual([('demo.inv.3136', 3, 2)], updates)
+
+
+if __name__ == '__main__':
+    unittest.main()
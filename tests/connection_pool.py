@@ -0,0 +1,136 @@
+import threading
+import unittest
+from unittest import mock
+import websocket
+from openstuder import SIGatewayClientPool, SIConnectionState, SIProtocolError, SITimeoutError
+from sync_requests import FakeWebSocket
+
+
+AUTHORIZED = 'AUTHORIZED\naccess_level:Basic\nprotocol_version:1\ngateway_version:0.0.0\n\n'
+
+
+class ClosingWebSocket(FakeWebSocket):
+    def __init__(self):
+        super().__init__([AUTHORIZED])
+        self.closed = False
+
+    def recv(self) -> str:
+        if self.closed:
+            raise websocket.WebSocketConnectionClosedException('closed')
+        return super().recv()
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.sockets = []
+
+        def create_connection(url, timeout=None):
+            self.sockets.append(ClosingWebSocket())
+            return self.sockets[-1]
+
+        patcher = mock.patch('openstuder.websocket.create_connection', side_effect=create_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reuse(self):
+        pool = SIGatewayClientPool('localhost', max_size=2)
+        with pool.connection() as client:
+            self.assertEqual(SIConnectionState.CONNECTED, client.state())
+        with pool.connection() as second:
+            self.assertIs(client, second)
+        self.assertEqual(1, len(self.sockets))
+        self.assertEqual((1, 1), (pool.size(), pool.idle()))
+
+    def test_min_idle(self):
+        pool = SIGatewayClientPool('localhost', max_size=4, min_idle=2)
+        self.assertEqual((2, 2), (pool.size(), pool.idle()))
+
+    def test_max_size(self):
+        pool = SIGatewayClientPool('localhost', max_size=1)
+        client = pool.acquire()
+        with self.assertRaises(SITimeoutError):
+            pool.acquire(timeout=0.01)
+        threading.Timer(0.01, pool.release, [client]).start()
+        self.assertIs(client, pool.acquire(timeout=1.0))
+
+    def test_replace_broken(self):
+        pool = SIGatewayClientPool('localhost', health_check_interval=0)
+        with pool.connection() as client:
+            pass
+        self.sockets[0].closed = True
+        with pool.connection() as second:
+            self.assertIsNot(client, second)
+        self.assertEqual(1, pool.size())
+
+    def test_replace_closed_by_gateway(self):
+        pool = SIGatewayClientPool('localhost', health_check_interval=0)
+        with pool.connection() as client:
+            pass
+        self.sockets[0].responses = ['']
+        with pool.connection() as second:
+            self.assertIsNot(client, second)
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+        self.assertEqual(1, pool.size())
+
+    def test_health_check_keeps_events(self):
+        pool = SIGatewayClientPool('localhost', health_check_interval=0)
+        with pool.connection():
+            pass
+        self.sockets[0].responses.append('PROPERTY UPDATE\nid:demo.inv.3136\nvalue:1\n\n')
+        with pool.connection() as client:
+            self.assertEqual(['demo.inv.3136'], [event.id for event in client.poll_events()])
+
+    def test_release_unknown(self):
+        pool = SIGatewayClientPool('localhost', max_size=2)
+        client = pool.acquire()
+        pool.release(client)
+        with self.assertRaises(SIProtocolError):
+            pool.release(client)
+        self.assertEqual((1, 1), (pool.size(), pool.idle()))
+        with self.assertRaises(SIProtocolError):
+            SIGatewayClientPool('localhost').release(client)
+
+    def test_release_after_close(self):
+        pool = SIGatewayClientPool('localhost')
+        client = pool.acquire()
+        pool.close()
+        pool.release(client)
+        self.assertEqual((0, 0), (pool.size(), pool.idle()))
+        self.assertTrue(self.sockets[0].closed)
+
+    def test_discard_on_connection_error(self):
+        pool = SIGatewayClientPool('localhost')
+        with self.assertRaises(websocket.WebSocketConnectionClosedException):
+            with pool.connection():
+                raise websocket.WebSocketConnectionClosedException('closed')
+        self.assertEqual((0, 0), (pool.size(), pool.idle()))
+        self.assertTrue(self.sockets[0].closed)
+
+    def test_keep_on_protocol_error(self):
+        pool = SIGatewayClientPool('localhost')
+        with self.assertRaises(SIProtocolError):
+            with pool.connection():
+                raise SIProtocolError('no property')
+        self.assertEqual((1, 1), (pool.size(), pool.idle()))
+
+    def test_max_age(self):
+        pool = SIGatewayClientPool('localhost', max_age=0)
+        with pool.connection() as client:
+            pass
+        self.assertEqual(0, pool.size())
+        with pool.connection() as second:
+            self.assertIsNot(client, second)
+
+    def test_close(self):
+        pool = SIGatewayClientPool('localhost', min_idle=1)
+        pool.close()
+        self.assertTrue(self.sockets[0].closed)
+        with self.assertRaises(SIProtocolError):
+            pool.acquire()
+
+
+if __name__ == '__main__':
+    unittest.main()
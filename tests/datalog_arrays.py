@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import unittest
+from openstuder import SIAsyncGatewayClient, SIAsyncGatewayClientCallbacks, SIConnectionState, SIDatalogArrays, \
+    SIProtocolError, SIStatus
+from asyncio_client import FakeAsyncWebSocket, connected_asyncio_client
+from sync_requests import connected_sync_client
+
+
+CSV = '2021-02-07T20:18:00,0.03145\n2021-02-07T20:18:30,1\n2021-02-07T20:19:00,-2.5'
+FRAME = f'DATALOG READ\nstatus:Success\nid:demo.bat.7003\ncount:3\n\n{CSV}'
+EPOCH = datetime.datetime(2021, 2, 7, 20, 18, tzinfo=datetime.timezone.utc).timestamp()
+
+
+class SIDatalogArraysTest(unittest.TestCase):
+    def test_from_csv(self):
+        arrays = SIDatalogArrays.from_csv(CSV + '\n')
+        self.assertEqual(3, len(arrays))
+        self.assertEqual([EPOCH, EPOCH + 30, EPOCH + 60], list(arrays.timestamps))
+        self.assertEqual([0.03145, 1.0, -2.5], list(arrays.values))
+        self.assertEqual([], arrays.others)
+
+    def test_empty(self):
+        self.assertEqual(0, len(SIDatalogArrays.from_csv('')))
+
+    def test_timestamp_formats(self):
+        arrays = SIDatalogArrays.from_csv('2021-02-07T20:18:00Z,1\n2021-02-07T21:18:00.500+01:00,2')
+        self.assertEqual([EPOCH, EPOCH + 0.5], list(arrays.timestamps))
+
+    def test_non_numeric_values(self):
+        arrays = SIDatalogArrays.from_csv('2021-02-07T20:18:00,1\n2021-02-07T20:18:01,true\n2021-02-07T20:18:02,a,b')
+        self.assertEqual(1.0, arrays.values[0])
+        self.assertEqual(1.0, arrays.values[1])
+        self.assertNotEqual(arrays.values[2], arrays.values[2])
+        self.assertEqual([(1, True), (2, 'a,b')], arrays.others)
+
+    def test_invalid(self):
+        with self.assertRaises(SIProtocolError):
+            SIDatalogArrays.from_csv('yesterday,1')
+        with self.assertRaises(SIProtocolError):
+            SIDatalogArrays.from_csv('2021-02-07T20:18:00')
+
+
+class ClientDatalogArrays(unittest.TestCase):
+    def test_sync_client(self):
+        client = connected_sync_client([FRAME])
+        status, id_, count, arrays = client.read_datalog_arrays('demo.bat.7003', limit=3)
+        self.assertEqual((SIStatus.SUCCESS, 'demo.bat.7003', 3), (status, id_, count))
+        self.assertEqual([0.03145, 1.0, -2.5], list(arrays.values))
+        self.assertEqual(['READ DATALOG\nid:demo.bat.7003\nlimit:3\n\n'], client._SIGatewayClient__ws.sent)
+
+    def test_async_client(self):
+        client = SIAsyncGatewayClient()
+        client._SIAsyncGatewayClient__state = SIConnectionState.CONNECTED
+        csv, arrays = [], []
+        client.on_datalog_read_csv = lambda status, id_, count, values: csv.append(values)
+        client._SIAsyncGatewayClient__on_message(None, FRAME)
+        client.on_datalog_read_arrays = lambda status, id_, count, values: arrays.append(values)
+        client._SIAsyncGatewayClient__on_message(None, FRAME)
+        self.assertEqual([CSV], csv)
+        self.assertEqual([EPOCH, EPOCH + 30, EPOCH + 60], list(arrays[0].timestamps))
+
+    def test_async_client_callbacks(self):
+        class CsvCallbacks(SIAsyncGatewayClientCallbacks):
+            def __init__(self):
+                self.received = []
+
+            def on_datalog_read_csv(self, status, property_id, count, values):
+                self.received.append(values)
+
+        class ArraysCallbacks(CsvCallbacks):
+            def on_datalog_read_arrays(self, status, property_id, count, values):
+                self.received.append(list(values.values))
+
+        for callbacks, expected in [(CsvCallbacks(), CSV), (ArraysCallbacks(), [0.03145, 1.0, -2.5])]:
+            client = SIAsyncGatewayClient()
+            client._SIAsyncGatewayClient__state = SIConnectionState.CONNECTED
+            client.set_callbacks(callbacks)
+            client._SIAsyncGatewayClient__on_message(None, FRAME)
+            self.assertEqual([expected], callbacks.received)
+
+    def test_asyncio_client(self):
+        async def test():
+            ws = FakeAsyncWebSocket({
+                'READ DATALOG\nid:demo.bat.7003\n\n': [FRAME]
+            })
+            client = await connected_asyncio_client(ws)
+            status, id_, count, arrays = await client.read_datalog_arrays('demo.bat.7003')
+            self.assertEqual(SIStatus.SUCCESS, status)
+            self.assertEqual([0.03145, 1.0, -2.5], list(arrays.values))
+            await client.disconnect()
+        asyncio.run(test())
+
+
+if __name__ == '__main__':
+    unittest.main()
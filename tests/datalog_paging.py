@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+import unittest
+# noinspection PyProtectedMember
+from openstuder import _SIAbstractGatewayClient, SIProtocolError
+from asyncio_client import FakeAsyncWebSocket, connected_asyncio_client
+from sync_requests import FakeWebSocket, connected_sync_client
+
+
+def datalog_rows(seconds: list) -> list:
+    return [f'{datetime.datetime(2021, 2, 7, 20, 0) + datetime.timedelta(seconds=second):%Y-%m-%dT%H:%M:%S},{index}'
+            for index, second in enumerate(seconds)]
+
+
+def datalog_response(rows: list, frame: str) -> str:
+    # The gateway returns the rows logged at or after the from time, at most limit of them.
+    _, headers, _ = _SIAbstractGatewayClient.decode_frame(frame)
+    selected = [row for row in rows if 'from' not in headers or row.split(',')[0] >= headers['from']]
+    selected = selected[:int(headers['limit'])]
+    return f'DATALOG READ\nstatus:Success\nid:{headers["id"]}\ncount:{len(selected)}\n\n' + '\n'.join(selected)
+
+
+class FakeDatalogWebSocket(FakeWebSocket):
+    def __init__(self, rows: list):
+        super().__init__()
+        self.rows = rows
+
+    def send(self, frame: str):
+        super().send(frame)
+        self.responses.append(datalog_response(self.rows, frame))
+
+
+class FakeAsyncDatalogWebSocket(FakeAsyncWebSocket):
+    def __init__(self, rows: list):
+        super().__init__()
+        self.rows = rows
+
+    async def send(self, frame: str):
+        await super().send(frame)
+        if frame.startswith('READ DATALOG'):
+            self.frames.put_nowait(datalog_response(self.rows, frame))
+
+
+def iter_sync(rows: list, page_size: int, **kwargs) -> tuple:
+    client = connected_sync_client()
+    ws = client._SIGatewayClient__ws = FakeDatalogWebSocket(rows)
+    chunks = list(client.iter_datalog('demo.bat.7003', page_size=page_size, **kwargs))
+    return chunks, ws.sent
+
+
+class SyncDatalogPaging(unittest.TestCase):
+    def test_pages(self):
+        rows = datalog_rows(range(10))
+        chunks, sent = iter_sync(rows, 4)
+        self.assertEqual(['\n'.join(rows[0:4]), '\n'.join(rows[4:7]), '\n'.join(rows[7:10])], chunks)
+        self.assertEqual(['READ DATALOG\nid:demo.bat.7003\nlimit:4\n\n',
+                          'READ DATALOG\nid:demo.bat.7003\nfrom:2021-02-07T20:00:03\nlimit:4\n\n',
+                          'READ DATALOG\nid:demo.bat.7003\nfrom:2021-02-07T20:00:06\nlimit:4\n\n',
+                          'READ DATALOG\nid:demo.bat.7003\nfrom:2021-02-07T20:00:09\nlimit:4\n\n'], sent)
+
+    def test_boundary_rows_with_same_timestamp(self):
+        rows = datalog_rows([0, 1, 1, 1, 2, 2, 3])
+        chunks, _ = iter_sync(rows, 3)
+        self.assertEqual(rows, '\n'.join(chunks).split('\n'))
+
+    def test_more_rows_with_same_timestamp_than_page_size(self):
+        rows = datalog_rows([0, 1, 1, 1, 1, 1, 2, 3, 4, 5, 6])
+        chunks, sent = iter_sync(rows, 2)
+        self.assertEqual(rows, '\n'.join(chunks).split('\n'))
+        self.assertIn('READ DATALOG\nid:demo.bat.7003\nfrom:2021-02-07T20:00:01\nlimit:8\n\n', sent)
+        self.assertTrue(sent[-1].endswith('limit:2\n\n'))
+
+    def test_range(self):
+        rows = datalog_rows(range(5))
+        chunks, sent = iter_sync(rows, 10, from_=datetime.datetime(2021, 2, 7, 20, 0, 2),
+                                 to=datetime.datetime(2021, 2, 7, 21))
+        self.assertEqual(['\n'.join(rows[2:])], chunks)
+        self.assertEqual(['READ DATALOG\nid:demo.bat.7003\nfrom:2021-02-07T20:00:02\nto:2021-02-07T21:00:00\n'
+                          'limit:10\n\n'], sent)
+
+    def test_empty_and_errors(self):
+        self.assertEqual(([], ['READ DATALOG\nid:demo.bat.7003\nlimit:5\n\n']), iter_sync([], 5))
+        with self.assertRaises(SIProtocolError):
+            iter_sync([], 0)
+        client = connected_sync_client(['DATALOG READ\nstatus:Error\nid:demo.bat.7003\ncount:0\n\n'])
+        with self.assertRaises(SIProtocolError):
+            list(client.iter_datalog('demo.bat.7003'))
+
+
+class AsyncioDatalogPaging(unittest.TestCase):
+    def test_pages(self):
+        async def test():
+            rows = datalog_rows([0, 1, 1, 2, 3, 3, 3, 4])
+            ws = FakeAsyncDatalogWebSocket(rows)
+            client = await connected_asyncio_client(ws)
+            chunks = [chunk async for chunk in client.iter_datalog('demo.bat.7003', page_size=3)]
+            self.assertEqual(rows, '\n'.join(chunks).split('\n'))
+            self.assertTrue(all(len(chunk.split('\n')) <= 3 for chunk in chunks))
+            await client.disconnect()
+        asyncio.run(test())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+import unittest
+import cbor2
+# noinspection PyProtectedMember
+from openstuder import SIAsyncGatewayClient, SIAsyncGatewayClientCallbacks, SIBluetoothGatewayClient, \
+    SIConnectionState, SIStatus, SIProtocolError, SIPropertyCache, SIPropertyReadResult
+
+
+def connected_async_client(**kwargs) -> SIAsyncGatewayClient:
+    client = SIAsyncGatewayClient(**kwargs)
+    client._SIAsyncGatewayClient__state = SIConnectionState.CONNECTED
+    client._SIAsyncGatewayClient__ws = SentFrames()
+    return client
+
+
+def connected_futures_client(**kwargs) -> SIAsyncGatewayClient:
+    return connected_async_client(futures=True, **kwargs)
+
+
+def receive_update(client: SIAsyncGatewayClient, id_: str, value: str):
+    client._SIAsyncGatewayClient__on_message(None, f'PROPERTY UPDATE\nid:{id_}\nvalue:{value}\n\n')
+
+
+def connected_bluetooth_client(**kwargs) -> SIBluetoothGatewayClient:
+    client = SIBluetoothGatewayClient(**kwargs)
+    client._SIBluetoothGatewayClient__state = SIConnectionState.CONNECTED
+    return client
+
+
+def receive_bluetooth_frame(client: SIBluetoothGatewayClient, frame: bytes):
+    client._SIBluetoothGatewayClient__rx_callback(0, bytearray(b'\x00' + frame))
+
+
+class SentFrames(list):
+    def send(self, frame: str):
+        self.append(frame)
+
+
+class AsyncDispatch(unittest.TestCase):
+    def test_property_update(self):
+        client = connected_async_client()
+        updates = []
+        client.on_property_updated = lambda id_, value: updates.append((id_, value))
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:0.5\n\n')
+        self.assertEqual([('demo.inv.3136', 0.5)], updates)
+
+    def test_property_read(self):
+        client = connected_async_client()
+        reads = []
+        client.on_property_read = lambda status, id_, value: reads.append((status, id_, value))
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:true\n\n')
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136', True)], reads)
+
+    def test_datalog_read(self):
+        client = connected_async_client()
+        properties, csv = [], []
+        client.on_datalog_properties_read = lambda status, ids: properties.append((status, ids))
+        client.on_datalog_read_csv = lambda status, id_, count, values: csv.append((status, id_, count, values))
+        client._SIAsyncGatewayClient__on_message(None, 'DATALOG READ\nstatus:Success\ncount:2\n\ndemo.bat.7003\ndemo.inv.3136')
+        client._SIAsyncGatewayClient__on_message(None, 'DATALOG READ\nstatus:Success\nid:demo.bat.7003\ncount:1\n\n2021-02-07T20:18:00,0.03145')
+        self.assertEqual([(SIStatus.SUCCESS, ['demo.bat.7003', 'demo.inv.3136'])], properties)
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.bat.7003', 1, '2021-02-07T20:18:00,0.03145')], csv)
+
+    def test_messages_read_iter(self):
+        client = connected_async_client()
+        lists, iterated = [], []
+        client.on_messages_read = lambda status, count, messages: lists.append(messages)
+        frame = 'MESSAGES READ\nstatus:Success\ncount:1\n\n[{"access_id": "demo", "device_id": "inv", "message": "a", "message_id": 1, "timestamp": "2020-01-01T00:00:00Z"}]'
+        client._SIAsyncGatewayClient__on_message(None, frame)
+        client.on_messages_read_iter = lambda status, count, messages: iterated.extend(message.message_id for message in messages)
+        client._SIAsyncGatewayClient__on_message(None, frame)
+        self.assertEqual(1, len(lists))
+        self.assertEqual([1], iterated)
+
+    def test_messages_read_iter_callbacks(self):
+        class Callbacks(SIAsyncGatewayClientCallbacks):
+            def __init__(self):
+                self.iterated = []
+
+            def on_messages_read_iter(self, status, count, messages):
+                self.iterated.extend(message.message_id for message in messages)
+
+        client = connected_async_client()
+        callbacks = Callbacks()
+        client.set_callbacks(callbacks)
+        client._SIAsyncGatewayClient__on_message(None, 'MESSAGES READ\nstatus:Success\ncount:1\n\n'
+                                                       '[{"access_id": "demo", "device_id": "inv", "message": "a", '
+                                                       '"message_id": 1, "timestamp": "2020-01-01T00:00:00Z"}]')
+        self.assertEqual([1], callbacks.iterated)
+        client.set_callbacks(SIAsyncGatewayClientCallbacks())
+        self.assertIsNone(client.on_messages_read_iter)
+
+    def test_callback_assigned_after_construction(self):
+        client = connected_async_client()
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n')
+        written = []
+        client.on_property_written = lambda status, id_: written.append((status, id_))
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n')
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.1415')], written)
+
+    def test_error_frame(self):
+        client = connected_async_client()
+        errors = []
+        client.on_error = errors.append
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:test\n\n')
+        self.assertEqual(1, len(errors))
+        self.assertEqual('test', errors[0].reason())
+
+    def test_unsupported_frame(self):
+        client = connected_async_client()
+        errors = []
+        client.on_error = errors.append
+        client._SIAsyncGatewayClient__on_message(None, 'NEW FRAME\nkey:value\n\n')
+        self.assertEqual(1, len(errors))
+        self.assertEqual('unsupported frame command: NEW FRAME', errors[0].reason())
+
+    def test_registered_handler(self):
+        client = connected_async_client()
+        frames, errors = [], []
+        client.on_error = errors.append
+        client.register_frame_handler('NEW FRAME', frames.append)
+        client._SIAsyncGatewayClient__on_message(None, 'NEW FRAME\nkey:value\n\n')
+        self.assertEqual(['NEW FRAME\nkey:value\n\n'], frames)
+        self.assertEqual([], errors)
+
+    def test_registered_handler_protocol_error(self):
+        client = connected_async_client()
+        errors = []
+        client.on_error = errors.append
+
+        def handler(_):
+            raise SIProtocolError('invalid')
+
+        client.register_frame_handler('NEW FRAME', handler)
+        client._SIAsyncGatewayClient__on_message(None, 'NEW FRAME\n\n')
+        self.assertEqual(['invalid'], [error.reason() for error in errors])
+
+    def test_chunked_properties_read(self):
+        client = connected_async_client(max_batch=2)
+        reads, errors = [], []
+        client.on_properties_read = reads.append
+        client.on_error = errors.append
+        client.read_properties(['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138'])
+        client.read_properties(['demo.inv.3139'])
+        self.assertEqual(3, len(client._SIAsyncGatewayClient__ws))
+        for ids in [['demo.inv.3136', 'demo.inv.3137'], ['demo.inv.3138'], ['demo.inv.3139']]:
+            results = ', '.join('{"status": "Success", "id": "%s", "value": 1}' % id_ for id_ in ids)
+            client._SIAsyncGatewayClient__on_message(None, f'PROPERTIES READ\nstatus:Success\n\n[{results}]')
+        self.assertEqual([['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138'], ['demo.inv.3139']], [[result.id for result in results] for results in reads])
+        self.assertEqual([], errors)
+
+    def test_chunked_properties_subscribed_error(self):
+        client = connected_async_client(max_batch=1)
+        subscribed, errors = [], []
+        client.on_properties_subscribed = subscribed.append
+        client.on_error = errors.append
+        client.subscribe_to_properties(['demo.inv.3136', 'demo.inv.3137'])
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES SUBSCRIBED\nstatus:Error\n\n')
+        self.assertEqual([], errors)
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES SUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3137"}]')
+        self.assertEqual([], subscribed)
+        self.assertEqual(1, len(errors))
+
+    def test_chunked_properties_read_error_frame(self):
+        client = connected_async_client(max_batch=1)
+        reads, errors = [], []
+        client.on_properties_read = lambda results: reads.append([result.id for result in results])
+        client.on_error = errors.append
+        client.read_properties(['a.b.1', 'a.b.2'])
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "a.b.1", "value": 1}]')
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:bad\n\n')
+        self.assertEqual(['bad'], [error.reason() for error in errors])
+        client.read_properties(['a.b.3'])
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "a.b.3", "value": 1}]')
+        self.assertEqual([['a.b.3']], reads)
+
+    def test_error_answers_earlier_single_request(self):
+        client = connected_async_client(max_batch=2)
+        reads, errors = [], []
+        client.on_properties_read = lambda results: reads.append([result.id for result in results])
+        client.on_error = errors.append
+        client.read_property('a.b.1')
+        client.read_properties(['a.b.10', 'a.b.11', 'a.b.12'])
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:no property\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n'
+                                                       '[{"status": "Success", "id": "a.b.10", "value": 1}, '
+                                                       '{"status": "Success", "id": "a.b.11", "value": 1}]')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n'
+                                                       '[{"status": "Success", "id": "a.b.12", "value": 1}]')
+        self.assertEqual(['no property'], [error.reason() for error in errors])
+        self.assertEqual([['a.b.10', 'a.b.11', 'a.b.12']], reads)
+        self.assertEqual({}, client._SIAsyncGatewayClient__pending)
+
+    def test_cached_properties_read_missing_results(self):
+        cache = SIPropertyCache()
+        cache.put(SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3136', 0.5))
+        client = SIAsyncGatewayClient(cache=cache)
+        client._SIAsyncGatewayClient__state = SIConnectionState.CONNECTED
+        client._SIAsyncGatewayClient__ws = SentFrames()
+        errors = []
+        client.on_error = errors.append
+        client.read_properties(['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138'])
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3137", "value": 1}]')
+        self.assertEqual(['missing results in response'], [error.reason() for error in errors])
+
+
+class AsyncFutures(unittest.TestCase):
+    def test_without_futures(self):
+        client = connected_async_client()
+        self.assertIsNone(client.read_property('demo.inv.3136'))
+        self.assertIsNone(client.read_properties(['demo.inv.3136']))
+
+    def test_correlated_by_id(self):
+        client = connected_futures_client()
+        reads = []
+        client.on_property_read = lambda status, id_, value: reads.append(id_)
+        first = client.read_property('demo.inv.3136')
+        second = client.read_property('demo.inv.3137')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n')
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136', 1.0), first.result(0))
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3137', 2.0), second.result(0))
+        self.assertEqual(['demo.inv.3137', 'demo.inv.3136'], reads)
+
+    def test_correlated_in_order(self):
+        client = connected_futures_client()
+        first = client.enumerate()
+        second = client.enumerate()
+        client._SIAsyncGatewayClient__on_message(None, 'ENUMERATED\nstatus:Success\ndevice_count:1\n\n')
+        self.assertEqual((SIStatus.SUCCESS, 1), first.result(0))
+        self.assertFalse(second.done())
+
+    def test_properties_read(self):
+        client = connected_futures_client(max_batch=1)
+        future = client.read_properties(['demo.inv.3136', 'demo.inv.3137'])
+        for id_ in ['demo.inv.3136', 'demo.inv.3137']:
+            client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "%s", "value": 1}]' % id_)
+        self.assertEqual(['demo.inv.3136', 'demo.inv.3137'], [result.id for result in future.result(0)])
+
+    def test_datalog_and_messages(self):
+        client = connected_futures_client()
+        datalog = client.read_datalog_properties()
+        messages = client.read_messages()
+        iterated = []
+        client.on_messages_read_iter = lambda status, count, messages_: iterated.extend(messages_)
+        client._SIAsyncGatewayClient__on_message(None, 'DATALOG READ\nstatus:Success\ncount:1\n\ndemo.bat.7003')
+        client._SIAsyncGatewayClient__on_message(None, 'MESSAGES READ\nstatus:Success\ncount:1\n\n[{"access_id": "demo", "device_id": "inv", "message": "a", "message_id": 1, "timestamp": "2020-01-01T00:00:00Z"}]')
+        self.assertEqual((SIStatus.SUCCESS, ['demo.bat.7003']), datalog.result(0))
+        self.assertEqual(1, len(messages.result(0)[2]))
+        self.assertEqual(1, len(iterated))
+
+    def test_error(self):
+        client = connected_futures_client()
+        client.on_error = lambda error: None
+        future = client.write_property('demo.inv.1415')
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:no write access\n\n')
+        self.assertEqual('no write access', future.exception(0).reason())
+
+    def test_error_in_send_order(self):
+        client = connected_futures_client()
+        client.on_error = lambda error: None
+        first = client.read_property('demo.inv.3136')
+        second = client.read_properties(['demo.inv.3137'])
+        third = client.read_property('demo.inv.3138')
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:first\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:second\n\n')
+        self.assertEqual('first', first.exception(0).reason())
+        self.assertEqual('second', second.exception(0).reason())
+        self.assertFalse(third.done())
+
+    def test_connection_closed(self):
+        client = connected_futures_client(max_batch=1)
+        futures = [client.describe(), client.subscribe_to_properties(['demo.inv.3136', 'demo.inv.3137'])]
+        client._SIAsyncGatewayClient__on_close()
+        self.assertEqual(['connection closed'] * 2, [future.exception(0).reason() for future in futures])
+
+
+class BluetoothDispatch(unittest.TestCase):
+    def test_property_update(self):
+        client = connected_bluetooth_client()
+        updates = []
+        client.on_property_updated = lambda id_, value: updates.append((id_, value))
+        receive_bluetooth_frame(client, cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.3136') + cbor2.dumps(0.5))
+        self.assertEqual([('demo.inv.3136', 0.5)], updates)
+
+    def test_property_written(self):
+        client = connected_bluetooth_client()
+        written = []
+        client.on_property_written = lambda status, id_: written.append((status, id_))
+        receive_bluetooth_frame(client, cbor2.dumps(0x85) + cbor2.dumps(0) + cbor2.dumps('demo.inv.1415'))
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.1415')], written)
+
+    def test_unsupported_frame(self):
+        client = connected_bluetooth_client()
+        errors = []
+        client.on_error = errors.append
+        receive_bluetooth_frame(client, cbor2.dumps(0x9A))
+        self.assertEqual(['unsupported frame command: 154'], [error.reason() for error in errors])
+
+    def test_registered_handler(self):
+        client = connected_bluetooth_client()
+        frames = []
+        client.register_frame_handler(0x9A, frames.append)
+        receive_bluetooth_frame(client, cbor2.dumps(0x9A) + cbor2.dumps('test'))
+        self.assertEqual([cbor2.dumps(0x9A) + cbor2.dumps('test')], [bytes(frame) for frame in frames])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import time
+import unittest
+from openstuder import SIPropertyCache, SIPropertyReadResult, SIPropertyReadBatch, SIProtocolError, SIStatus
+from dispatch import connected_async_client
+from sync_requests import connected_sync_client, properties_frame
+
+
+READ = 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:{value}\n\n'
+WRITTEN = 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.3136\n\n'
+UPDATE = 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:3\n\n'
+
+
+class SIPropertyCacheTest(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = SIPropertyCache()
+        self.assertIsNone(cache.get('demo.inv.3136'))
+        cache.put(SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3136', 0.5))
+        cache.put(SIPropertyReadResult(SIStatus.NO_PROPERTY, 'demo.inv.9999', None))
+        self.assertEqual(0.5, cache.get('demo.inv.3136').value)
+        self.assertIsNone(cache.get('demo.inv.9999'))
+        self.assertEqual(1, cache.hits())
+        self.assertEqual(2, cache.misses())
+
+    def test_get_returns_copy(self):
+        cache = SIPropertyCache()
+        result = SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3136', 0.5)
+        cache.put(result)
+        result.value = 1.0
+        cached = cache.get('demo.inv.3136')
+        cached.value = 2.0
+        self.assertEqual(0.5, cache.get('demo.inv.3136').value)
+        self.assertIsNot(cached, cache.get('demo.inv.3136'))
+
+    def test_expiry(self):
+        cache = SIPropertyCache(ttl=0.01)
+        cache.put(SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3136', 0.5))
+        self.assertIn('demo.inv.3136', cache)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('demo.inv.3136'))
+        self.assertEqual(0, len(cache))
+
+    def test_ttls(self):
+        cache = SIPropertyCache(ttl=1.0, ttls={'demo.inv.3136': 5.0, 'demo.inv.*': 2.0, 'demo.bat.*': 0})
+        self.assertEqual(5.0, cache.ttl('demo.inv.3136'))
+        self.assertEqual(2.0, cache.ttl('demo.inv.3137'))
+        self.assertEqual(1.0, cache.ttl('demo.sol.11004'))
+        cache.put(SIPropertyReadResult(SIStatus.SUCCESS, 'demo.bat.7003', 0.5))
+        self.assertNotIn('demo.bat.7003', cache)
+
+    def test_lru_eviction(self):
+        cache = SIPropertyCache(max_size=2)
+        for property_id in ['demo.inv.3136', 'demo.inv.3137']:
+            cache.put(SIPropertyReadResult(SIStatus.SUCCESS, property_id, 1.0))
+        cache.get('demo.inv.3136')
+        cache.put(SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3138', 1.0))
+        self.assertIn('demo.inv.3136', cache)
+        self.assertNotIn('demo.inv.3137', cache)
+        cache.invalidate('demo.inv.3136')
+        self.assertEqual(1, len(cache))
+
+
+class SyncClientCache(unittest.TestCase):
+    def test_read_property(self):
+        cache = SIPropertyCache()
+        client = connected_sync_client([READ.format(value=1), WRITTEN, READ.format(value=2), UPDATE, READ.format(value=3)], cache=cache)
+        self.assertEqual(1.0, client.read_property('demo.inv.3136')[2])
+        self.assertEqual(1.0, client.read_property('demo.inv.3136')[2])
+        self.assertEqual(SIStatus.SUCCESS, client.write_property('demo.inv.3136', 2)[0])
+        self.assertEqual(2.0, client.read_property('demo.inv.3136')[2])
+        self.assertEqual(1, len(client.poll_events()))
+        self.assertEqual(3.0, client.read_property('demo.inv.3136')[2])
+        self.assertEqual(1, cache.hits())
+        self.assertEqual(3, len([frame for frame in client._SIGatewayClient__ws.sent if frame.startswith('READ PROPERTY')]))
+
+    def test_read_properties(self):
+        cache = SIPropertyCache()
+        client = connected_sync_client([properties_frame('PROPERTIES READ', ['demo.inv.3136', 'demo.inv.3137']), properties_frame('PROPERTIES READ', ['demo.inv.3138'])],
+                                       cache=cache)
+        client.read_properties(['demo.inv.3136', 'demo.inv.3137'])
+        batch = client.read_properties(['demo.inv.3137', 'demo.inv.3138', 'demo.inv.3136'], batch=True)
+        self.assertIsInstance(batch, SIPropertyReadBatch)
+        self.assertEqual(('demo.inv.3137', 'demo.inv.3138', 'demo.inv.3136'), batch.ids)
+        self.assertEqual('READ PROPERTIES\n\n["demo.inv.3138"]', client._SIGatewayClient__ws.sent[-1])
+        self.assertEqual([result.id for result in client.read_properties(['demo.inv.3138'])], ['demo.inv.3138'])
+        self.assertEqual(2, len(client._SIGatewayClient__ws.sent))
+
+    def test_read_properties_missing_results(self):
+        client = connected_sync_client([properties_frame('PROPERTIES READ', ['demo.inv.3136'])], cache=SIPropertyCache())
+        with self.assertRaises(SIProtocolError):
+            client.read_properties(['demo.inv.3136', 'demo.inv.3137'])
+
+    def test_pipeline_bypasses_lookup(self):
+        client = connected_sync_client([READ.format(value=1), READ.format(value=2)], cache=SIPropertyCache())
+        client.read_property('demo.inv.3136')
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.3136')
+        self.assertEqual(2.0, pipeline.results()[0][2])
+        self.assertEqual(2.0, client.read_property('demo.inv.3136')[2])
+
+
+class AsyncClientCache(unittest.TestCase):
+    def test_read_property(self):
+        client = connected_async_client(cache=SIPropertyCache())
+        reads = []
+        client.on_property_read = lambda status, id_, value: reads.append(value)
+        client.read_property('demo.inv.3136')
+        client._SIAsyncGatewayClient__on_message(None, READ.format(value=1))
+        client.read_property('demo.inv.3136')
+        client._SIAsyncGatewayClient__on_message(None, UPDATE)
+        client.read_property('demo.inv.3136')
+        self.assertEqual([1.0, 1.0], reads)
+        self.assertEqual(2, len(client._SIAsyncGatewayClient__ws))
+
+    def test_read_properties(self):
+        client = connected_async_client(cache=SIPropertyCache())
+        reads = []
+        client.on_properties_read = lambda results: reads.append([result.id for result in results])
+        client._SIAsyncGatewayClient__on_message(None, READ.format(value=1))
+        client.read_properties(['demo.inv.3137', 'demo.inv.3136'])
+        self.assertEqual(['READ PROPERTIES\n\n["demo.inv.3137"]'], client._SIAsyncGatewayClient__ws)
+        client._SIAsyncGatewayClient__on_message(None, properties_frame('PROPERTIES READ', ['demo.inv.3137']))
+        client.read_properties(['demo.inv.3136', 'demo.inv.3137'])
+        self.assertEqual([['demo.inv.3137', 'demo.inv.3136'], ['demo.inv.3136', 'demo.inv.3137']], reads)
+        self.assertEqual(1, len(client._SIAsyncGatewayClient__ws))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import cbor2
+from openstuder import SIPropertyHistory, SIProtocolError, SIQueueCallbackDispatcher, SIUpdateBatching
+from dispatch import connected_async_client, connected_bluetooth_client, receive_bluetooth_frame, receive_update
+
+
+class SIPropertyHistoryTest(unittest.TestCase):
+    def test_ring_buffer(self):
+        history = SIPropertyHistory(capacity=4)
+        for index in range(6):
+            history.record('demo.inv.3136', index, 100.0 + index)
+        history.record('demo.inv.3136', 'On', 106.0)
+        self.assertEqual(4, history.count('demo.inv.3136'))
+        timestamps, values = history.window('demo.inv.3136')
+        self.assertEqual([102.0, 103.0, 104.0, 105.0], list(timestamps))
+        self.assertEqual([2.0, 3.0, 4.0, 5.0], list(values))
+
+    def test_window(self):
+        history = SIPropertyHistory(capacity=5)
+        for index in range(7):
+            history.record('demo.inv.3136', float(index), 100.0 + index)
+        self.assertEqual([3.0, 4.0, 5.0], list(history.window('demo.inv.3136', since=103.0, until=105.0)[1]))
+        self.assertEqual([5.0, 6.0], list(history.window('demo.inv.3136', since=104.5)[1]))
+        self.assertEqual([], list(history.window('demo.inv.3136', since=107.0)[0]))
+        self.assertEqual([], list(history.window('demo.inv.3137')[0]))
+
+    def test_out_of_order_timestamps(self):
+        history = SIPropertyHistory()
+        history.record('demo.inv.3136', 1, 100.0)
+        history.record('demo.inv.3136', 2, 99.0)
+        self.assertEqual([100.0, 100.0], list(history.window('demo.inv.3136')[0]))
+
+    def test_resample(self):
+        history = SIPropertyHistory(capacity=10)
+        for timestamp, value in [(100.0, 1), (101.0, 3), (109.0, 5), (125.0, 7), (129.5, 1)]:
+            history.record('demo.inv.3136', value, timestamp)
+        starts, values = history.resample('demo.inv.3136', 10.0)
+        self.assertEqual([100.0, 120.0], list(starts))
+        self.assertEqual([3.0, 4.0], list(values))
+        self.assertEqual([5.0, 7.0], list(history.resample('demo.inv.3136', 10.0, 'max')[1]))
+        self.assertEqual([3.0, 2.0], list(history.resample('demo.inv.3136', 10.0, 'count')[1]))
+        self.assertEqual([5.0, 1.0], list(history.resample('demo.inv.3136', 10.0, 'last', since=101.0)[1]))
+        with self.assertRaises(SIProtocolError):
+            history.resample('demo.inv.3136', 10.0, 'median')
+
+    def test_property_filter(self):
+        history = SIPropertyHistory(property_ids=['demo.inv.3136'])
+        history.record('demo.inv.3136', 1)
+        history.record('demo.inv.3137', 1)
+        self.assertEqual(['demo.inv.3136'], history.property_ids())
+        history.clear()
+        self.assertEqual([], history.property_ids())
+
+
+class ClientHistory(unittest.TestCase):
+    def test_async_client(self):
+        for kwargs in [{}, {'batching': SIUpdateBatching(max_size=2)},
+                       {'conflate_updates': True, 'dispatcher': SIQueueCallbackDispatcher()}]:
+            history = SIPropertyHistory()
+            client = connected_async_client(history=history, **kwargs)
+            updates = []
+            client.on_property_updated = lambda id_, value, *superseded: updates.append(value)
+            for value in ['1', '2', '3']:
+                receive_update(client, 'demo.inv.3136', value)
+            self.assertEqual([1.0, 2.0, 3.0], list(history.window('demo.inv.3136')[1]))
+            if 'dispatcher' in kwargs:
+                kwargs['dispatcher'].run_pending()
+                self.assertEqual([3.0], updates)
+
+    def test_bluetooth_client(self):
+        history = SIPropertyHistory()
+        client = connected_bluetooth_client(history=history)
+        for value in [1, 2]:
+            frame = cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.3136') + cbor2.dumps(value)
+            receive_bluetooth_frame(client, frame)
+        self.assertEqual([1.0, 2.0], list(history.window('demo.inv.3136')[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from openstuder import SIAsyncGatewayClient, SIPropertyMirror, SIProtocolError, SIStatus, SIUpdateBatching
+from dispatch import connected_async_client
+
+
+def receive(client: SIAsyncGatewayClient, frame: str):
+    client._SIAsyncGatewayClient__on_message(None, frame)
+
+
+class SIPropertyMirrorTest(unittest.TestCase):
+    def test_seed_and_update(self):
+        client = connected_async_client()
+        reads, updates = [], []
+        client.on_properties_read = reads.append
+        client.on_property_updated = lambda id_, value: updates.append(id_)
+        mirror = SIPropertyMirror(client)
+        mirror.track(['demo.inv.3136', 'demo.inv.3137'])
+        self.assertEqual(['READ PROPERTIES\n\n["demo.inv.3136", "demo.inv.3137"]',
+                          'SUBSCRIBE PROPERTIES\n\n["demo.inv.3136", "demo.inv.3137"]'], client._SIAsyncGatewayClient__ws)
+        self.assertIsNone(mirror.get('demo.inv.3136'))
+
+        receive(client, 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136", "value": 1}, '
+                        '{"status": "NoProperty", "id": "demo.inv.3137"}]')
+        self.assertEqual(2, mirror.version())
+        self.assertEqual(1.0, mirror.value('demo.inv.3136'))
+        self.assertEqual(SIStatus.NO_PROPERTY, mirror.get('demo.inv.3137').status)
+        self.assertEqual(1, len(reads))
+
+        receive(client, 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:2\n\n')
+        receive(client, 'PROPERTY UPDATE\nid:demo.inv.3138\nvalue:2\n\n')
+        entry = mirror.get('demo.inv.3136')
+        self.assertEqual((2.0, 3), (entry.value, entry.version))
+        self.assertNotIn('demo.inv.3138', mirror)
+        self.assertEqual(['demo.inv.3136', 'demo.inv.3138'], updates)
+
+    def test_changed_since(self):
+        client = connected_async_client()
+        mirror = SIPropertyMirror(client)
+        mirror.track(['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138'])
+        for id_ in ['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138', 'demo.inv.3136']:
+            receive(client, f'PROPERTY UPDATE\nid:{id_}\nvalue:1\n\n')
+        self.assertEqual([('demo.inv.3138', 3), ('demo.inv.3136', 4)],
+                         [(entry.id, entry.version) for entry in mirror.changed_since(2)])
+        self.assertEqual([], mirror.changed_since(4))
+        self.assertEqual(3, len(mirror.changed_since(0)))
+        self.assertEqual(3, len(mirror.snapshot()))
+
+    def test_batched_updates(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_size=2))
+        mirror = SIPropertyMirror(client)
+        mirror.track(['demo.inv.3136'])
+        receive(client, 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:1\n\n')
+        receive(client, 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:2\n\n')
+        self.assertEqual(2.0, mirror.value('demo.inv.3136'))
+
+    def test_not_connected(self):
+        mirror = SIPropertyMirror(SIAsyncGatewayClient())
+        with self.assertRaises(SIProtocolError):
+            mirror.track(['demo.inv.3136'])
+        client = connected_async_client()
+        SIPropertyMirror(client).track(['demo.inv.3136'])
+        self.assertEqual(2, len(client._SIAsyncGatewayClient__ws))
+
+
+if __name__ == '__main__':
+    unittest.main()
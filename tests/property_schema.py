@@ -0,0 +1,121 @@
+import unittest
+import cbor2
+# noinspection PyProtectedMember
+from openstuder import SIPropertySchema, _SIAbstractGatewayClient, _SIAbstractBluetoothGatewayClient
+
+
+DESCRIPTION = {
+    'instances': [
+        {
+            'id': 'demo',
+            'driver': 'Demo',
+            'devices': [
+                {
+                    'id': 'inv',
+                    'model': 'Xtender',
+                    'properties': [
+                        {'id': 3136, 'type': 'Float', 'description': 'Output power', 'unit': 'kW'},
+                        {'id': 1107, 'type': 'Enum', 'values': {'0': 'Off', '1': 'On'}},
+                        {'id': 1124, 'type': 'Bool'},
+                        {'id': 1415, 'type': 'Signal'},
+                        {'id': 5000, 'type': 'String'},
+                        {'id': 6000, 'type': 'TimeOfDay'}
+                    ]
+                }
+            ]
+        }
+    ]
+}
+
+
+class SIPropertySchemaTest(unittest.TestCase):
+    def test_update_from_gateway_description(self):
+        schema = SIPropertySchema()
+        schema.update(None, DESCRIPTION)
+        self.assertEqual(5, len(schema))
+        self.assertIn('demo.inv.3136', schema)
+        self.assertNotIn('demo.inv.6000', schema)
+
+    def test_update_from_device_access_description(self):
+        schema = SIPropertySchema()
+        schema.update('demo', DESCRIPTION['instances'][0])
+        self.assertEqual(5, len(schema))
+        self.assertIn('demo.inv.1107', schema)
+
+    def test_update_from_device_description(self):
+        schema = SIPropertySchema()
+        schema.update('demo.inv', DESCRIPTION['instances'][0]['devices'][0])
+        self.assertEqual(5, len(schema))
+        self.assertIn('demo.inv.1124', schema)
+
+    def test_update_from_property_description(self):
+        schema = SIPropertySchema()
+        schema.update('demo.inv.3136', {'type': 'Float', 'unit': 'kW'})
+        self.assertEqual(1, len(schema))
+        self.assertIn('demo.inv.3136', schema)
+
+    def test_update_without_property_information(self):
+        schema = SIPropertySchema()
+        schema.update('demo.inv', [3136, 1107])
+        schema.update(None, {'instances': [{'id': 'demo', 'devices': [{'id': 'inv'}]}]})
+        self.assertEqual(0, len(schema))
+
+    def test_decode(self):
+        schema = SIPropertySchema()
+        schema.update(None, DESCRIPTION)
+        self.assertEqual(0.5, schema.decode('demo.inv.3136', '0.5'))
+        self.assertIsInstance(schema.decode('demo.inv.1107', '1'), int)
+        self.assertEqual(1, schema.decode('demo.inv.1107', '1'))
+        self.assertIs(True, schema.decode('demo.inv.1124', 'true'))
+        self.assertIs(False, schema.decode('demo.inv.1124', '0'))
+        self.assertIs(True, schema.decode('demo.inv.1124', True))
+        self.assertIsNone(schema.decode('demo.inv.1415', ''))
+        self.assertEqual('hello', schema.decode('demo.inv.5000', 'Hello'))
+        self.assertEqual('42', schema.decode('demo.inv.5000', '42'))
+
+    def test_decode_fallback(self):
+        schema = SIPropertySchema()
+        schema.update(None, DESCRIPTION)
+        self.assertEqual(12.5, schema.decode('demo.inv.6000', '12.5'))
+        self.assertEqual(True, schema.decode('demo.bat.7000', 'true'))
+        self.assertEqual('abc', schema.decode('demo.inv.3136', 'ABC'))
+        self.assertEqual(2.5, schema.decode('demo.inv.1124', '2.5'))
+
+    def test_register_and_clear(self):
+        schema = SIPropertySchema()
+        schema.register('demo.inv.1107', 'Enum')
+        schema.register('demo.inv.1108', 'Unknown')
+        self.assertEqual(1, len(schema))
+        schema.clear()
+        self.assertEqual(0, len(schema))
+
+
+class SchemaFrameDecoding(unittest.TestCase):
+    def setUp(self):
+        self.schema = SIPropertySchema()
+        self.schema.update(None, DESCRIPTION)
+
+    def test_decode_property_read(self):
+        result = _SIAbstractGatewayClient.decode_property_read_frame('PROPERTY READ\nstatus:Success\nid:demo.inv.1107\nvalue:1\n\n', self.schema)
+        self.assertIsInstance(result.value, int)
+        self.assertEqual(1, result.value)
+
+    def test_decode_properties_read(self):
+        results = _SIAbstractGatewayClient.decode_properties_read_frame('PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.1124", "value": true}, '
+                                                                        '{"status": "Success", "id": "demo.inv.3136", "value": 0.25}]', self.schema)
+        self.assertIs(True, results[0].value)
+        self.assertEqual(0.25, results[1].value)
+
+    def test_decode_property_update(self):
+        id_, value = _SIAbstractGatewayClient.decode_property_update_frame('PROPERTY UPDATE\nid:demo.inv.1124\nvalue:false\n\n', self.schema)
+        self.assertEqual('demo.inv.1124', id_)
+        self.assertIs(False, value)
+
+    def test_decode_bluetooth_property_update(self):
+        id_, value = _SIAbstractBluetoothGatewayClient.decode_property_update_frame(cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.1107') + cbor2.dumps(2), self.schema)
+        self.assertEqual('demo.inv.1107', id_)
+        self.assertIsInstance(value, int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import cbor2
+from openstuder import SIReconnectPolicy, SIConnectionState, SIAsyncGatewayClient, SIBluetoothGatewayClient
+from dispatch import connected_async_client, connected_bluetooth_client, receive_bluetooth_frame, SentFrames
+
+
+AUTHORIZED = 'AUTHORIZED\naccess_level:Basic\nprotocol_version:1\ngateway_version:0.0.0\n\n'
+
+
+class FakeWebSocketApp(SentFrames):
+    def __init__(self, client: SIAsyncGatewayClient, frames: list):
+        super(FakeWebSocketApp, self).__init__()
+        self.client = client
+        self.frames = frames
+        self.ran = False
+
+    def run_forever(self):
+        self.ran = True
+        self.client._SIAsyncGatewayClient__on_open(self)
+        for frame in self.frames:
+            self.client._SIAsyncGatewayClient__on_message(self, frame)
+        self.client._SIAsyncGatewayClient__on_close(self)
+
+    def close(self):
+        pass
+
+
+class SIReconnectPolicyTest(unittest.TestCase):
+    def test_exponential_backoff(self):
+        policy = SIReconnectPolicy(initial_delay=1.0, max_delay=5.0, jitter=0)
+        self.assertEqual([1.0, 2.0, 4.0, 5.0, 5.0], [policy.delay(attempt) for attempt in range(1, 6)])
+
+    def test_jitter_and_max_attempts(self):
+        policy = SIReconnectPolicy(initial_delay=2.0, jitter=0.5, max_attempts=3)
+        for attempt in range(1, 4):
+            self.assertTrue(1.0 * 2 ** (attempt - 1) <= policy.delay(attempt) <= 2.0 * 2 ** (attempt - 1))
+        self.assertIsNone(policy.delay(4))
+
+
+class AsyncReconnect(unittest.TestCase):
+    def test_subscriptions_replayed(self):
+        client = connected_async_client()
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY SUBSCRIBED\nstatus:Success\nid:demo.inv.3136\n\n')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES SUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3137"}, '
+                                                       '{"status": "NoProperty", "id": "demo.inv.9999"}, {"status": "Success", "id": "demo.inv.3138"}]')
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTY UNSUBSCRIBED\nstatus:Success\nid:demo.inv.3138\n\n')
+        client._SIAsyncGatewayClient__state = SIConnectionState.AUTHORIZING
+        client._SIAsyncGatewayClient__on_message(None, AUTHORIZED)
+        self.assertEqual('SUBSCRIBE PROPERTIES\n\n["demo.inv.3136", "demo.inv.3137"]', client._SIAsyncGatewayClient__ws[-1])
+
+    def test_reconnect_until_policy_gives_up(self):
+        client = SIAsyncGatewayClient(reconnect=SIReconnectPolicy(initial_delay=0.001, max_attempts=2))
+        apps, states, disconnects = [], [], []
+        client.on_connected = lambda access_level, version: states.append(client.state())
+        client.on_disconnected = lambda: disconnects.append(client.state())
+
+        def create_websocket_app():
+            apps.append(FakeWebSocketApp(client, [AUTHORIZED] if len(apps) < 2 else []))
+            return apps[-1]
+
+        client._SIAsyncGatewayClient__create_websocket_app = create_websocket_app
+        client.connect('localhost', background=False)
+        self.assertEqual(4, len(apps))
+        self.assertEqual([SIConnectionState.CONNECTED] * 2, states)
+        self.assertEqual([SIConnectionState.CONNECTING] * 4, disconnects)
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+    def test_no_reconnect_on_disconnect(self):
+        client = SIAsyncGatewayClient(reconnect=SIReconnectPolicy(initial_delay=0.001))
+        apps = []
+
+        def create_websocket_app():
+            apps.append(FakeWebSocketApp(client, [AUTHORIZED]))
+            client.on_connected = lambda access_level, version: client.disconnect()
+            return apps[-1]
+
+        client._SIAsyncGatewayClient__create_websocket_app = create_websocket_app
+        client.connect('localhost', background=False)
+        self.assertEqual(1, len(apps))
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+    def test_disconnect_while_creating_websocket(self):
+        client = SIAsyncGatewayClient(reconnect=SIReconnectPolicy(initial_delay=0.001))
+        apps = []
+
+        def create_websocket_app():
+            # The second application is created after the reconnect delay, the user disconnects meanwhile.
+            if apps:
+                client.disconnect()
+            apps.append(FakeWebSocketApp(client, [AUTHORIZED]))
+            return apps[-1]
+
+        client._SIAsyncGatewayClient__create_websocket_app = create_websocket_app
+        client.connect('localhost', background=False)
+        self.assertEqual([True, False], [app.ran for app in apps])
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+
+class BluetoothReconnect(unittest.TestCase):
+    def test_subscriptions_replayed(self):
+        client = connected_bluetooth_client()
+        sent = []
+        client._SIBluetoothGatewayClient__tx_send = sent.append
+        receive_bluetooth_frame(client, cbor2.dumps(0x86) + cbor2.dumps(0) + cbor2.dumps('demo.inv.3136'))
+        receive_bluetooth_frame(client, cbor2.dumps(0x86) + cbor2.dumps(0) + cbor2.dumps('demo.inv.3137'))
+        receive_bluetooth_frame(client, cbor2.dumps(0x86) + cbor2.dumps(-2) + cbor2.dumps('demo.inv.9999'))
+        receive_bluetooth_frame(client, cbor2.dumps(0x87) + cbor2.dumps(0) + cbor2.dumps('demo.inv.3136'))
+        client._SIBluetoothGatewayClient__state = SIConnectionState.AUTHORIZING
+        receive_bluetooth_frame(client, cbor2.dumps(0x81) + cbor2.dumps(1) + cbor2.dumps(1) + cbor2.dumps('0.0.0'))
+        self.assertEqual(SIConnectionState.CONNECTED, client.state())
+        self.assertEqual([SIBluetoothGatewayClient.encode_subscribe_property_frame('demo.inv.3137')], sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from openstuder import SIAsyncGatewayClient, SIProtocolError, SISubscriptionManager, SIUpdateBatching
+from dispatch import connected_async_client, receive_update
+
+
+class SISubscriptionManagerTest(unittest.TestCase):
+    def test_reference_counting(self):
+        client = connected_async_client()
+        manager = SISubscriptionManager(client)
+        first = manager.create_handle(lambda id_, value: None, ['demo.inv.3136', 'demo.inv.3137'])
+        second = manager.create_handle(lambda id_, value: None, ['demo.inv.3137', 'demo.inv.3138', 'demo.inv.3138'])
+        self.assertEqual(['SUBSCRIBE PROPERTIES\n\n["demo.inv.3136", "demo.inv.3137"]',
+                          'SUBSCRIBE PROPERTIES\n\n["demo.inv.3138"]'], client._SIAsyncGatewayClient__ws)
+        self.assertEqual(2, manager.reference_count('demo.inv.3137'))
+
+        client._SIAsyncGatewayClient__ws.clear()
+        first.close()
+        self.assertEqual(['UNSUBSCRIBE PROPERTIES\n\n["demo.inv.3136"]'], client._SIAsyncGatewayClient__ws)
+        self.assertEqual([], first.property_ids())
+        self.assertEqual(['demo.inv.3137', 'demo.inv.3138'], manager.subscribed_properties())
+
+        client._SIAsyncGatewayClient__ws.clear()
+        second.subscribe(['demo.inv.3137'])
+        second.unsubscribe(['demo.inv.3136'])
+        self.assertEqual([], client._SIAsyncGatewayClient__ws)
+
+    def test_routing(self):
+        client = connected_async_client()
+        unmanaged = []
+        client.on_property_updated = lambda id_, value: unmanaged.append(id_)
+        manager = SISubscriptionManager(client)
+        first, second = [], []
+        manager.create_handle(lambda id_, value: first.append(id_), ['demo.inv.3136', 'demo.inv.3137'])
+        manager.create_handle(lambda id_, value: second.append(id_), ['demo.inv.3137'])
+        for id_ in ['demo.inv.3136', 'demo.inv.3137', 'demo.inv.3138']:
+            receive_update(client, id_, '1')
+        self.assertEqual(['demo.inv.3136', 'demo.inv.3137'], first)
+        self.assertEqual(['demo.inv.3137'], second)
+        self.assertEqual(['demo.inv.3138'], unmanaged)
+
+    def test_batched_routing(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_size=2))
+        unmanaged = []
+        client.on_properties_updated = lambda updates: unmanaged.extend(update.id for update in updates)
+        manager = SISubscriptionManager(client)
+        updates = []
+        manager.create_handle(lambda id_, value: updates.append((id_, value)), ['demo.inv.3136'])
+        receive_update(client, 'demo.inv.3136', '1')
+        receive_update(client, 'demo.inv.3138', '2')
+        self.assertEqual([('demo.inv.3136', 1.0)], updates)
+        self.assertEqual(['demo.inv.3138'], unmanaged)
+
+    def test_refused_properties(self):
+        client = connected_async_client()
+        subscribed = []
+        client.on_properties_subscribed = lambda statuses: subscribed.extend(status.id for status in statuses)
+        manager = SISubscriptionManager(client)
+        first = manager.create_handle(lambda id_, value: None, ['demo.inv.3136', 'demo.inv.9999'])
+        second = manager.create_handle(lambda id_, value: None, ['demo.inv.9999'])
+        client._SIAsyncGatewayClient__on_message(None, 'PROPERTIES SUBSCRIBED\nstatus:Success\n\n'
+                                                       '[{"status": "Success", "id": "demo.inv.3136"}, '
+                                                       '{"status": "NoProperty", "id": "demo.inv.9999"}]')
+        self.assertEqual(['demo.inv.3136', 'demo.inv.9999'], subscribed)
+        self.assertEqual(['demo.inv.3136'], manager.subscribed_properties())
+        self.assertEqual(0, manager.reference_count('demo.inv.9999'))
+        self.assertEqual(['demo.inv.3136'], first.property_ids())
+        self.assertEqual([], second.property_ids())
+
+        client._SIAsyncGatewayClient__ws.clear()
+        first.close()
+        self.assertEqual(['UNSUBSCRIBE PROPERTIES\n\n["demo.inv.3136"]'], client._SIAsyncGatewayClient__ws)
+
+    def test_failed_request(self):
+        client = connected_async_client(futures=True)
+        manager = SISubscriptionManager(client)
+        handle = manager.create_handle(lambda id_, value: None, ['demo.inv.3136'])
+        client._SIAsyncGatewayClient__on_message(None, 'ERROR\nreason:no device\n\n')
+        self.assertEqual([], manager.subscribed_properties())
+        self.assertEqual([], handle.property_ids())
+
+    def test_not_connected(self):
+        client = SIAsyncGatewayClient()
+        manager = SISubscriptionManager(client)
+        handle = manager.create_handle(lambda id_, value: None)
+        with self.assertRaises(SIProtocolError):
+            handle.subscribe(['demo.inv.3136'])
+        self.assertEqual([], manager.subscribed_properties())
+        self.assertEqual([], handle.property_ids())
+
+
+if __name__ == '__main__':
+    unittest.main()
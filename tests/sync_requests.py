@@ -0,0 +1,259 @@
+import time
+import unittest
+import websocket
+# noinspection PyProtectedMember
+from openstuder import SIGatewayClient, SIConnectionState, SIStatus, SIProtocolError, SIPropertyReadBatch, \
+    SIPropertyUpdate, SIDeviceMessage, SITimeoutError
+
+
+class FakeWebSocket:
+    def __init__(self, responses: list = None):
+        self.sent = []
+        self.responses = list(responses or [])
+        self.timeout = None
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def send(self, frame: str):
+        self.sent.append(frame)
+
+    def recv(self) -> str:
+        if not self.responses:
+            if self.timeout is not None:
+                raise websocket.WebSocketTimeoutException('timeout')
+            raise ConnectionError('no more frames')
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def connected_sync_client(responses: list = None, **kwargs) -> SIGatewayClient:
+    client = SIGatewayClient(**kwargs)
+    client._SIGatewayClient__ws = FakeWebSocket(responses)
+    client._SIGatewayClient__state = SIConnectionState.CONNECTED
+    return client
+
+
+class Requests(unittest.TestCase):
+    def test_read_property(self):
+        client = connected_sync_client(['PROPERTY UPDATE\nid:demo.inv.3137\nvalue:1\n\n', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:0.5\n\n'])
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136', 0.5), client.read_property('demo.inv.3136'))
+        self.assertEqual(['READ PROPERTY\nid:demo.inv.3136\n\n'], client._SIGatewayClient__ws.sent)
+
+    def test_error(self):
+        client = connected_sync_client(['ERROR\nreason:test\n\n'])
+        with self.assertRaises(SIProtocolError):
+            client.read_property('demo.inv.3136')
+
+
+class Pipeline(unittest.TestCase):
+    def test_results_in_call_order(self):
+        client = connected_sync_client([
+            'DESCRIPTION\nstatus:Success\nid:demo.inv\n\n{"id": "inv"}',
+            'PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n',
+            'DEVICE MESSAGE\naccess_id:demo\ndevice_id:inv\nmessage_id:1\nmessage:test\ntimestamp:2020-01-01T00:00:00\n\n',
+            'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n',
+            'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136", "value": 1}]'
+        ])
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.3136')
+            pipeline.read_property('demo.inv.3137')
+            pipeline.describe('demo', 'inv')
+            pipeline.read_properties(['demo.inv.3136'], batch=True)
+            self.assertEqual(4, len(pipeline))
+            self.assertEqual([], client._SIGatewayClient__ws.sent)
+        self.assertEqual(4, len(client._SIGatewayClient__ws.sent))
+        results = pipeline.results()
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136', 1.0), results[0])
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3137', 2.0), results[1])
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv', {'id': 'inv'}), results[2])
+        self.assertIsInstance(results[3], SIPropertyReadBatch)
+
+    def test_same_id_fifo(self):
+        client = connected_sync_client(['PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:2\n\n'])
+        pipeline = client.pipeline()
+        pipeline.read_property('demo.inv.3136')
+        pipeline.read_property('demo.inv.3136')
+        self.assertEqual([1.0, 2.0], [value for _, _, value in pipeline.execute()])
+
+    def test_errors(self):
+        client = connected_sync_client(['ERROR\nreason:test\n\n', 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n'])
+        with client.pipeline(raise_on_error=False) as pipeline:
+            pipeline.read_property('demo.inv.3136')
+            pipeline.write_property('demo.inv.1415')
+        self.assertEqual('test', pipeline.results()[0].reason())
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.1415'), pipeline.results()[1])
+
+        client = connected_sync_client(['ERROR\nreason:test\n\n'])
+        pipeline = client.pipeline()
+        pipeline.read_property('demo.inv.3136')
+        with self.assertRaises(SIProtocolError):
+            pipeline.execute()
+        with self.assertRaises(SIProtocolError):
+            pipeline.read_property('demo.inv.3136')
+
+    def test_client_usable_while_queueing(self):
+        client = connected_sync_client(['PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n'])
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.3136')
+            self.assertEqual(2.0, client.read_property('demo.inv.3137')[2])
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136', 1.0)], pipeline.results())
+
+    def test_empty(self):
+        client = connected_sync_client()
+        with client.pipeline() as pipeline:
+            pass
+        self.assertEqual([], pipeline.results())
+
+
+UPDATE = 'PROPERTY UPDATE\nid:demo.inv.3136\nvalue:{value}\n\n'
+MESSAGE = 'DEVICE MESSAGE\naccess_id:demo\ndevice_id:inv\nmessage_id:1\nmessage:test\ntimestamp:2020-01-01T00:00:00\n\n'
+
+
+class Events(unittest.TestCase):
+    def test_events_received_during_requests(self):
+        client = connected_sync_client([UPDATE.format(value=1), MESSAGE, 'PROPERTY SUBSCRIBED\nstatus:Success\nid:demo.inv.3136\n\n', UPDATE.format(value=2)])
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136'), client.subscribe_to_property('demo.inv.3136'))
+        events = client.poll_events()
+        self.assertEqual(2, len(events))
+        self.assertIsInstance(events[0], SIPropertyUpdate)
+        self.assertEqual(('demo.inv.3136', 1.0), events[0].to_tuple())
+        self.assertIsInstance(events[1], SIDeviceMessage)
+        self.assertEqual([('demo.inv.3136', 2.0)], [event.to_tuple() for event in client.poll_events(1.0)])
+        self.assertEqual([], client.poll_events(0.01))
+
+    def test_events_received_during_pipeline(self):
+        client = connected_sync_client([UPDATE.format(value=1), 'PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n'])
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.3137')
+        self.assertEqual([('demo.inv.3136', 1.0)], [event.to_tuple() for event in client.poll_events()])
+
+    def test_bounded(self):
+        client = connected_sync_client([UPDATE.format(value=i) for i in range(5)] + ['PROPERTIES SUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136"}]'],
+                                       max_events=3)
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136')], [result.to_tuple() for result in client.subscribe_to_properties(['demo.inv.3136'])])
+        self.assertEqual(2, client.dropped_events())
+        self.assertEqual([2.0, 3.0, 4.0], [event.value for event in client.poll_events()])
+
+    def test_malformed_event(self):
+        client = connected_sync_client([UPDATE.format(value=1), 'PROPERTY UPDATE\nvalue:2\n\n', UPDATE.format(value=3),
+                                        'PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n'])
+        client.read_property('demo.inv.3137')
+        self.assertEqual([1.0, 3.0], [event.value for event in client.poll_events()])
+        self.assertEqual(1, client.dropped_events())
+
+    def test_closed_by_gateway(self):
+        client = connected_sync_client([''])
+        with self.assertRaises(SIProtocolError):
+            client.poll_events()
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+    def test_iter_events(self):
+        client = connected_sync_client([UPDATE.format(value=i) for i in range(3)] + ['PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n'])
+        self.assertEqual([0.0, 1.0, 2.0], [event.value for event in client.iter_events(0.01)])
+
+    def test_unsubscribe(self):
+        client = connected_sync_client(['PROPERTY UNSUBSCRIBED\nstatus:Success\nid:demo.inv.3136\n\n',
+                                        'PROPERTIES UNSUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136"}]'])
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136'), client.unsubscribe_from_property('demo.inv.3136'))
+        self.assertEqual(1, len(client.unsubscribe_from_properties(['demo.inv.3136'])))
+
+
+class Timeouts(unittest.TestCase):
+    def test_resynchronise_after_timeout(self):
+        client = connected_sync_client(timeout=0.01)
+        with self.assertRaises(SITimeoutError):
+            client.read_property('demo.inv.3136')
+        self.assertEqual(SIConnectionState.CONNECTED, client.state())
+        client._SIGatewayClient__ws.responses += ['PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:2\n\n']
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136', 2.0), client.read_property('demo.inv.3136'))
+
+    def test_stale_error_and_events(self):
+        client = connected_sync_client(timeout=0.01)
+        with self.assertRaises(SIProtocolError):
+            client.write_property('demo.inv.1415')
+        client._SIGatewayClient__ws.responses += ['ERROR\nreason:late\n\n', UPDATE.format(value=1), 'PROPERTY WRITTEN\nstatus:Success\nid:demo.inv.1415\n\n']
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.1415'), client.write_property('demo.inv.1415'))
+        self.assertEqual(1, len(client.poll_events()))
+
+    def test_close_when_unresponsive(self):
+        client = connected_sync_client(timeout=0.01)
+        with self.assertRaises(SITimeoutError):
+            client.enumerate()
+        with self.assertRaises(SITimeoutError):
+            client.enumerate()
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+    def test_deadline(self):
+        client = connected_sync_client()
+        with self.assertRaises(SITimeoutError):
+            client.read_properties(['demo.inv.3136'], deadline=time.monotonic())
+        client._SIGatewayClient__ws.responses += ['PROPERTIES READ\nstatus:Success\n\n[]', 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136", "value": 1}]']
+        self.assertEqual(1, len(client.read_properties(['demo.inv.3136'], deadline=time.monotonic() + 1)))
+
+    def test_pipeline_timeout(self):
+        client = connected_sync_client(['PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:1\n\n'], timeout=0.01)
+        pipeline = client.pipeline()
+        pipeline.read_property('demo.inv.3136')
+        pipeline.describe('demo')
+        pipeline.read_property('demo.inv.3137')
+        with self.assertRaises(SITimeoutError):
+            pipeline.execute()
+        client._SIGatewayClient__ws.responses += ['DESCRIPTION\nstatus:Success\nid:demo\n\n{}', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3137\nvalue:2\n\n',
+                                                  'PROPERTY READ\nstatus:Success\nid:demo.inv.3138\nvalue:3\n\n']
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3138', 3.0), client.read_property('demo.inv.3138'))
+
+
+def properties_frame(command: str, ids: list, value: bool = True) -> str:
+    results = ', '.join('{"status": "Success", "id": "%s"%s}' % (id_, ', "value": 1' if value else '') for id_ in ids)
+    return f'{command}\nstatus:Success\n\n[{results}]'
+
+
+class Chunking(unittest.TestCase):
+    IDS = [f'demo.inv.{3000 + i}' for i in range(5)]
+
+    def test_read_properties(self):
+        client = connected_sync_client([properties_frame('PROPERTIES READ', self.IDS[:2]), UPDATE.format(value=1),
+                                        properties_frame('PROPERTIES READ', self.IDS[2:4]), properties_frame('PROPERTIES READ', self.IDS[4:])],
+                                       max_batch=2)
+        results = client.read_properties(self.IDS)
+        self.assertEqual(self.IDS, [result.id for result in results])
+        self.assertEqual(3, len(client._SIGatewayClient__ws.sent))
+        self.assertEqual(1, len(client.poll_events()))
+
+    def test_read_properties_batch(self):
+        client = connected_sync_client([properties_frame('PROPERTIES READ', self.IDS[:3]),
+                                        'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3003", "value": "a"}, {"status": "NoProperty", "id": "demo.inv.3004"}]'],
+                                       max_batch=3)
+        batch = client.read_properties(self.IDS, batch=True)
+        self.assertEqual(tuple(self.IDS), batch.ids)
+        self.assertEqual('a', batch[3].value)
+        self.assertEqual(SIStatus.NO_PROPERTY, batch[4].status)
+
+    def test_subscribe_and_unsubscribe(self):
+        client = connected_sync_client([properties_frame('PROPERTIES SUBSCRIBED', self.IDS[:4], False), properties_frame('PROPERTIES SUBSCRIBED', self.IDS[4:], False),
+                                        properties_frame('PROPERTIES UNSUBSCRIBED', self.IDS[:4], False)], max_batch=4)
+        self.assertEqual(self.IDS, [result.id for result in client.subscribe_to_properties(self.IDS)])
+        self.assertEqual(4, len(client.unsubscribe_from_properties(self.IDS[:4])))
+
+    def test_short_list_and_pipeline_not_split(self):
+        client = connected_sync_client([properties_frame('PROPERTIES READ', self.IDS[:2]), properties_frame('PROPERTIES READ', self.IDS)], max_batch=2)
+        self.assertEqual(2, len(client.read_properties(self.IDS[:2])))
+        with client.pipeline() as pipeline:
+            pipeline.read_properties(self.IDS)
+        self.assertEqual(5, len(pipeline.results()[0]))
+        self.assertEqual(2, len(client._SIGatewayClient__ws.sent))
+
+    def test_error(self):
+        client = connected_sync_client([properties_frame('PROPERTIES READ', self.IDS[:3]), 'ERROR\nreason:test\n\n'], max_batch=3)
+        with self.assertRaises(SIProtocolError):
+            client.read_properties(self.IDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import queue
+import threading
+import unittest
+from unittest import mock
+import websocket
+from openstuder import SIGatewayClient, SIConnectionState, SIStatus, SIProtocolError, SITimeoutError
+
+
+AUTHORIZED = 'AUTHORIZED\naccess_level:Basic\nprotocol_version:1\ngateway_version:0.0.0\n\n'
+
+
+class ThreadedFakeWebSocket:
+    """
+    Answers READ PROPERTY requests with the property ID's last number as value, releasing the responses of every batch
+    of requests in reverse order.
+    """
+
+    def __init__(self, batch: int = 1):
+        self.batch = batch
+        self.frames = queue.Queue()
+        self.frames.put(AUTHORIZED)
+        self.held = []
+        self.lock = threading.Lock()
+        self.silent = False
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, frame: str):
+        if frame.startswith('AUTHORIZE') or self.silent:
+            return
+        id_ = frame.split('\n')[1][3:]
+        if frame.startswith('READ PROPERTY'):
+            response = f'PROPERTY READ\nstatus:Success\nid:{id_}\nvalue:{id_.split(".")[-1]}\n\n'
+        else:
+            response = f'PROPERTY WRITTEN\nstatus:Success\nid:{id_}\n\n'
+        with self.lock:
+            self.held.append(response)
+            if len(self.held) >= self.batch:
+                for response in reversed(self.held):
+                    self.frames.put(response)
+                self.held = []
+
+    def recv(self) -> str:
+        frame = self.frames.get()
+        if frame is None:
+            raise websocket.WebSocketConnectionClosedException('closed')
+        return frame
+
+    def send_close(self):
+        pass
+
+    def abort(self):
+        self.frames.put(None)
+
+    def shutdown(self):
+        pass
+
+
+def thread_safe_client(ws: ThreadedFakeWebSocket, **kwargs) -> SIGatewayClient:
+    client = SIGatewayClient(thread_safe=True, **kwargs)
+    with mock.patch('openstuder.websocket.create_connection', return_value=ws):
+        client.connect('localhost')
+    return client
+
+
+class ThreadSafeClient(unittest.TestCase):
+    def test_concurrent_reads(self):
+        ws = ThreadedFakeWebSocket(batch=4)
+        client = thread_safe_client(ws)
+        results = {}
+
+        def read(index: int):
+            results[index] = client.read_property(f'demo.inv.{index}')
+
+        threads = [threading.Thread(target=read, args=(index,)) for index in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual({index: (SIStatus.SUCCESS, f'demo.inv.{index}', float(index)) for index in range(32)}, results)
+        client.disconnect()
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+    def test_events(self):
+        ws = ThreadedFakeWebSocket()
+        client = thread_safe_client(ws)
+        threading.Timer(0.01, ws.frames.put, ['PROPERTY UPDATE\nid:demo.inv.3136\nvalue:1\n\n']).start()
+        self.assertEqual([('demo.inv.3136', 1.0)], [event.to_tuple() for event in client.poll_events(1.0)])
+        self.assertEqual([], client.poll_events(0))
+        client.disconnect()
+
+    def test_pipeline(self):
+        ws = ThreadedFakeWebSocket(batch=3)
+        client = thread_safe_client(ws)
+        with client.pipeline() as pipeline:
+            pipeline.read_property('demo.inv.1')
+            pipeline.write_property('demo.inv.2')
+            pipeline.read_property('demo.inv.3')
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.1', 1.0), (SIStatus.SUCCESS, 'demo.inv.2'), (SIStatus.SUCCESS, 'demo.inv.3', 3.0)], pipeline.results())
+        client.disconnect()
+
+    def test_timeout(self):
+        ws = ThreadedFakeWebSocket()
+        client = thread_safe_client(ws, timeout=0.01)
+        ws.silent = True
+        with self.assertRaises(SITimeoutError):
+            client.read_property('demo.inv.1')
+        ws.silent = False
+        ws.frames.put('PROPERTY READ\nstatus:Success\nid:demo.inv.1\nvalue:1\n\n')
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.1', 1.0), client.read_property('demo.inv.1'))
+        client.disconnect()
+
+    def test_connection_lost(self):
+        ws = ThreadedFakeWebSocket()
+        client = thread_safe_client(ws)
+        ws.silent = True
+        threading.Timer(0.01, ws.abort).start()
+        with self.assertRaises(SIProtocolError):
+            client.read_property('demo.inv.1')
+        self.assertEqual(SIConnectionState.DISCONNECTED, client.state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import unittest
+import cbor2
+from openstuder import SIPropertyUpdateBatch, SIUpdateBatching
+from dispatch import connected_async_client, connected_bluetooth_client, receive_bluetooth_frame, receive_update
+
+
+class SIPropertyUpdateBatchTest(unittest.TestCase):
+    def test_from_updates(self):
+        batch = SIPropertyUpdateBatch.from_updates(['a', 'b', 'c', 'd'], [0.5, None, 'On', True])
+        self.assertEqual(4, len(batch))
+        self.assertEqual(('a', 'b', 'c', 'd'), batch.ids)
+        self.assertEqual(0.5, batch.values[0])
+        self.assertNotEqual(batch.values[1], batch.values[1])
+        self.assertEqual([0.5, None, 'On', True], [update.value for update in batch])
+        self.assertEqual('d', batch[-1].id)
+
+    def test_slice(self):
+        batch = SIPropertyUpdateBatch.from_updates(['a', 'b', 'c', 'd'], [0.5, None, 'On', True])
+        self.assertEqual([('b', None), ('c', 'On')], [update.to_tuple() for update in batch[1:3]])
+        self.assertEqual(['d', 'b'], [update.id for update in batch[::-2]])
+        self.assertEqual([], batch[4:])
+
+
+class AsyncBatching(unittest.TestCase):
+    def test_full_batch(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_size=2, max_delay=60))
+        batches, single = [], []
+        client.on_properties_updated = batches.append
+        client.on_property_updated = lambda id_, value: single.append(id_)
+        for index in range(5):
+            receive_update(client, f'demo.inv.{3000 + index}', str(index))
+        self.assertEqual([[('demo.inv.3000', 0.0), ('demo.inv.3001', 1.0)],
+                          [('demo.inv.3002', 2.0), ('demo.inv.3003', 3.0)]],
+                         [[update.to_tuple() for update in batch] for batch in batches])
+        self.assertEqual([], single)
+
+    def test_delay(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_delay=0.01))
+        delivered = threading.Event()
+        batches = []
+        client.on_properties_updated = lambda updates: (batches.append(updates), delivered.set())
+        receive_update(client, 'demo.inv.3136', '1')
+        receive_update(client, 'demo.inv.3136', '2')
+        self.assertTrue(delivered.wait(1))
+        self.assertEqual([[1.0, 2.0]], [[update.value for update in batch] for batch in batches])
+
+    def test_single_flush_thread(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_delay=0.01))
+        delivered = threading.Semaphore(0)
+        threads = []
+        client.on_properties_updated = lambda updates: (threads.append(threading.current_thread()), delivered.release())
+        for value in ['1', '2', '3']:
+            receive_update(client, 'demo.inv.3136', value)
+            self.assertTrue(delivered.acquire(timeout=1))
+        self.assertEqual(3, len(threads))
+        self.assertEqual(1, len(set(threads)))
+        client._SIAsyncGatewayClient__on_close()
+        threads[0].join(1)
+        self.assertFalse(threads[0].is_alive())
+
+    def test_columnar(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_size=2, columnar=True))
+        batches = []
+        client.on_properties_updated = batches.append
+        receive_update(client, 'demo.inv.3136', '1')
+        receive_update(client, 'demo.inv.1107', 'true')
+        self.assertIsInstance(batches[0], SIPropertyUpdateBatch)
+        self.assertEqual(('demo.inv.3136', 'demo.inv.1107'), batches[0].ids)
+        self.assertEqual([1.0, 1.0], list(batches[0].values))
+
+    def test_flush_on_close(self):
+        client = connected_async_client(batching=SIUpdateBatching(max_delay=60))
+        batches = []
+        client.on_properties_updated = batches.append
+        receive_update(client, 'demo.inv.3136', '1')
+        client._SIAsyncGatewayClient__on_close()
+        self.assertEqual(1, len(batches))
+
+
+class BluetoothBatching(unittest.TestCase):
+    def test_full_batch(self):
+        client = connected_bluetooth_client(batching=SIUpdateBatching(max_size=2, max_delay=60))
+        batches = []
+        client.on_properties_updated = batches.append
+        for value in [1, 2]:
+            frame = cbor2.dumps(0xFE) + cbor2.dumps('demo.inv.3136') + cbor2.dumps(value)
+            receive_bluetooth_frame(client, frame)
+        self.assertEqual([[1, 2]], [[update.value for update in batch] for batch in batches])
+
+
+if __name__ == '__main__':
+    unittest.main()
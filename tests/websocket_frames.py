@@ -1,10 +1,13 @@
 import datetime
+import json
+import math
 import random
 import string
 import unittest
 # noinspection PyProtectedMember
 from openstuder import _SIAbstractGatewayClient, SIAccessLevel, SIStatus, SIDescriptionFlags, SIWriteFlags, \
-    SIProtocolError, SIDeviceFunctions, SIExtensionStatus
+    SIProtocolError, SIDeviceFunctions, SIExtensionStatus, SIJsonCodec, SIDeviceMessage, SIPropertyReadResult, \
+    SIPropertySubscriptionResult
 
 
 def random_int(start: int, end: int) -> int:
@@ -461,6 +464,44 @@ class PROPERTIESREADFrame(unittest.TestCase):
             _SIAbstractGatewayClient.decode_properties_read_frame('PROPERTIES READ')
 
 
+class PROPERTIESREADBatchFrame(unittest.TestCase):
+    def test_decode_batch(self):
+        batch = _SIAbstractGatewayClient.decode_properties_read_batch_frame("""PROPERTIES READ
+status:Success
+
+[{"status": "Success", "id": "demo.inv.3136", "value": 0.25}, {"status": "NoProperty", "id": "demo.inv.3137"}, {"status": "Success", "id": "demo.inv.1124", "value": true},
+ {"status": "Success", "id": "demo.inv.5000", "value": "Text"}, {"status": "Success", "id": "demo.inv.3138", "value": "1.5"}]""")
+        self.assertEqual(('demo.inv.3136', 'demo.inv.3137', 'demo.inv.1124', 'demo.inv.5000', 'demo.inv.3138'), batch.ids)
+        self.assertEqual('b', batch.statuses.typecode)
+        self.assertEqual([0, -2, 0, 0, 0], list(batch.statuses))
+        self.assertEqual('d', batch.values.typecode)
+        self.assertEqual(0.25, batch.values[0])
+        self.assertTrue(math.isnan(batch.values[1]))
+        self.assertEqual(1.0, batch.values[2])
+        self.assertTrue(math.isnan(batch.values[3]))
+        self.assertEqual(1.5, batch.values[4])
+        self.assertEqual(5, len(batch))
+        self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136', 0.25), (SIStatus.NO_PROPERTY, 'demo.inv.3137', None), (SIStatus.SUCCESS, 'demo.inv.1124', True),
+                          (SIStatus.SUCCESS, 'demo.inv.5000', 'text'), (SIStatus.SUCCESS, 'demo.inv.3138', 1.5)], [result.to_tuple() for result in batch])
+        self.assertEqual(1.0, batch[-3].value)
+        self.assertEqual([(SIStatus.NO_PROPERTY, 'demo.inv.3137', None), (SIStatus.SUCCESS, 'demo.inv.1124', True)],
+                         [result.to_tuple() for result in batch[1:3]])
+        self.assertEqual(['demo.inv.3138', 'demo.inv.1124', 'demo.inv.3136'], [result.id for result in batch[::-2]])
+
+    def test_decode_batch_matches_list(self):
+        frame = 'PROPERTIES READ\nstatus:Success\n\n[' + ', '.join(f'{{"status": "Success", "id": "demo.inv.{i}", "value": {i * 0.5}}}' for i in range(100)) + ']'
+        self.assertEqual([result.to_tuple() for result in _SIAbstractGatewayClient.decode_properties_read_frame(frame)],
+                         [result.to_tuple() for result in _SIAbstractGatewayClient.decode_properties_read_batch_frame(frame).to_list()])
+
+    def test_decode_batch_errors(self):
+        with self.assertRaises(SIProtocolError):
+            _SIAbstractGatewayClient.decode_properties_read_batch_frame('PROPERTIES READ\nstatus:Error\n\n')
+        with self.assertRaises(SIProtocolError):
+            _SIAbstractGatewayClient.decode_properties_read_batch_frame('PROPERTIES READ\nstatus:Success\n\n[{"id": "demo.inv.3136"}]')
+        with self.assertRaises(SIProtocolError):
+            _SIAbstractGatewayClient.decode_properties_read_batch_frame('ERROR\nreason:test\n\n')
+
+
 class WRITEPROPERTYFrame(unittest.TestCase):
     def test_encode_without_value(self):
         frame = _SIAbstractGatewayClient.encode_write_property_frame('demo.inv.1415', None, None)
@@ -1285,5 +1326,159 @@ class EXTENSIONCALLEDFrame(unittest.TestCase):
         self.assertEqual("HELLO STUDER", body)
 
 
+def legacy_decode_frame(frame: str):
+    # Line based reference implementation the single-pass frame parser has to match exactly.
+    lines = frame.split('\n')
+    if len(lines) < 2:
+        raise SIProtocolError('invalid frame')
+    command = lines[0]
+    line = 1
+    headers = {}
+    while line < len(lines) and lines[line]:
+        components = lines[line].split(':')
+        if len(components) >= 2:
+            headers[components[0]] = ':'.join(components[1:])
+        line += 1
+    line += 1
+    if line >= len(lines):
+        raise SIProtocolError('invalid frame')
+    return command, headers, '\n'.join(lines[line:])
+
+
+class FRAMEDecoding(unittest.TestCase):
+    def assertSameAsLegacy(self, frame: str):
+        try:
+            expected = legacy_decode_frame(frame)
+        except SIProtocolError:
+            with self.assertRaises(SIProtocolError):
+                _SIAbstractGatewayClient.decode_frame(frame)
+        else:
+            self.assertEqual(expected, _SIAbstractGatewayClient.decode_frame(frame))
+
+    def test_decode_fixtures(self):
+        for frame in ['', '\n', '\n\n', '\n\n\n', 'A', 'A\n', 'A\n\n', 'A\n\n\n', 'A\nb:c', 'A\nb:c\n', 'A\nb:c\n\n',
+                      'A\nb:c:d\n\n', 'A\nb\n\n', 'A\n:\n\n', 'A\nb:\n\n', 'A\nb:c\nb:d\n\n', 'A\nb:c\n\nbody',
+                      'A\nb:c\n\nbody\n\nmore\n', 'A\n\n[1,\n2]', 'PROPERTY READ\nstatus:Success\nid:demo.inv.3136\nvalue:0.123\n\n',
+                      'DATALOG READ\nstatus:Success\nid:demo.bat.7003\ncount:2\n\n2021-02-07T20:18:00,0.03145\n2021-02-07T20:17:00,0.84634',
+                      'DEVICE MESSAGE\ntimestamp:2020-01-01T00:00:00\naccess_id:A303\ndevice_id:11\nmessage_id:210\nmessage:AUX2 relay deactivation\n']:
+            self.assertSameAsLegacy(frame)
+
+    def test_decode_random(self):
+        for _ in range(5000):
+            self.assertSameAsLegacy(''.join(random.choice('ab:\n') for _ in range(random_int(0, 24))))
+
+    def test_decode_large_body(self):
+        body = '\n'.join(f'2021-02-07T20:{i % 60:02}:00,{i}.5' for i in range(10000))
+        command, headers, decoded_body = _SIAbstractGatewayClient.decode_frame(f'DATALOG READ\nstatus:Success\ncount:10000\n\n{body}')
+        self.assertEqual('DATALOG READ', command)
+        self.assertEqual({'status': 'Success', 'count': '10000'}, headers)
+        self.assertEqual(body, decoded_body)
+
+
+class JSONCodecs(unittest.TestCase):
+    def installed_codecs(self):
+        codecs = []
+        for codec in SIJsonCodec:
+            try:
+                codecs.append(codec.loads())
+            except SIProtocolError:
+                pass
+        return codecs
+
+    def test_auto_codec_available(self):
+        self.assertTrue(callable(SIJsonCodec.AUTO.loads()))
+        self.assertTrue(callable(SIJsonCodec.STDLIB.loads()))
+
+    def test_decode_properties_read(self):
+        frame = 'PROPERTIES READ\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136", "value": 0.123}, {"status": "NoProperty", "id": "demo.inv.3137"}]'
+        for loads in self.installed_codecs():
+            results = _SIAbstractGatewayClient.decode_properties_read_frame(frame, None, loads)
+            self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136', 0.123), (SIStatus.NO_PROPERTY, 'demo.inv.3137', None)], [result.to_tuple() for result in results])
+
+    def test_decode_properties_subscribed(self):
+        frame = 'PROPERTIES SUBSCRIBED\nstatus:Success\n\n[{"status": "Success", "id": "demo.inv.3136"}, {"status": "NoProperty", "id": "demo.inv.3137"}]'
+        for loads in self.installed_codecs():
+            results = _SIAbstractGatewayClient.decode_properties_subscribed_frame(frame, loads)
+            self.assertEqual([(SIStatus.SUCCESS, 'demo.inv.3136'), (SIStatus.NO_PROPERTY, 'demo.inv.3137')], [result.to_tuple() for result in results])
+
+    def test_decode_messages_read(self):
+        frame = 'MESSAGES READ\nstatus:Success\ncount:1\n\n[{"access_id": "demo", "device_id": "inv", "message": "AUX2 relay activation", "message_id": 209, "timestamp": "2020-01-01T00:00:00Z"}]'
+        for loads in self.installed_codecs():
+            status, count, messages = _SIAbstractGatewayClient.decode_messages_read_frame(frame, loads)
+            self.assertEqual(1, len(messages))
+            self.assertEqual(datetime.datetime(year=2020, month=1, day=1, tzinfo=datetime.timezone.utc), messages[0].timestamp)
+            self.assertEqual(209, messages[0].message_id)
+
+    def test_decode_description(self):
+        for loads in self.installed_codecs():
+            status, id_, description = _SIAbstractGatewayClient.decode_description_frame('DESCRIPTION\nstatus:Success\nid:demo\n\n{"a": ["b", 1, 2.5, true, null]}', loads)
+            self.assertEqual({"a": ["b", 1, 2.5, True, None]}, description)
+
+    def test_decode_invalid_body(self):
+        for loads in self.installed_codecs():
+            with self.assertRaises(SIProtocolError):
+                _SIAbstractGatewayClient.decode_properties_read_frame('PROPERTIES READ\nstatus:Success\n\n{"status": "Success", "id": "demo.inv.3136"}', None, loads)
+            with self.assertRaises(SIProtocolError):
+                _SIAbstractGatewayClient.decode_messages_read_frame('MESSAGES READ\nstatus:Success\ncount:1\n\n["message"]', loads)
+
+
+class CompactResultObjects(unittest.TestCase):
+    def test_no_instance_dict(self):
+        for obj in [SIDeviceMessage('demo', 'inv', 209, 'message', None), SIPropertyReadResult(SIStatus.SUCCESS, 'demo.inv.3136', 0.5),
+                    SIPropertySubscriptionResult(SIStatus.SUCCESS, 'demo.inv.3136')]:
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_attributes(self):
+        result = SIPropertyReadResult.from_dict({'status': 'Success', 'id': 'demo.inv.3136', 'value': '0.5'})
+        self.assertEqual((SIStatus.SUCCESS, 'demo.inv.3136', 0.5), result.to_tuple())
+        result.value = 1.0
+        self.assertEqual(1.0, result.value)
+        with self.assertRaises(AttributeError):
+            result.other = 1
+
+    def test_ids_interned(self):
+        status, count, messages = _SIAbstractGatewayClient.decode_messages_read_frame(
+            'MESSAGES READ\nstatus:Success\ncount:2\n\n[{"access_id": "demo", "device_id": "inv", "message": "a", "message_id": 1, "timestamp": "2020-01-01T00:00:00Z"}, '
+            '{"access_id": "demo", "device_id": "inv", "message": "b", "message_id": 2, "timestamp": "2020-01-01T00:00:00Z"}]')
+        self.assertIs(messages[0].access_id, messages[1].access_id)
+        self.assertIs(messages[0].device_id, messages[1].device_id)
+
+
+class MESSAGESREADIteration(unittest.TestCase):
+    def messages_read_frame(self, messages: list) -> str:
+        return f'MESSAGES READ\nstatus:Success\ncount:{len(messages)}\n\n' + json.dumps(messages, indent=2)
+
+    def test_iterate_matches_list_decoding(self):
+        frame = self.messages_read_frame([{'access_id': 'demo', 'device_id': 'inv', 'message': f'message {i}', 'message_id': i,
+                                           'timestamp': '2020-01-01T00:00:00Z'} for i in range(100)])
+        status, count, messages = _SIAbstractGatewayClient.iter_messages_read_frame(frame)
+        self.assertEqual(SIStatus.SUCCESS, status)
+        self.assertEqual(100, count)
+        self.assertEqual([(m.access_id, m.device_id, m.message_id, m.message, m.timestamp) for m in _SIAbstractGatewayClient.decode_messages_read_frame(frame)[2]],
+                         [(m.access_id, m.device_id, m.message_id, m.message, m.timestamp) for m in messages])
+
+    def test_iterate_lazily(self):
+        frame = 'MESSAGES READ\nstatus:Success\ncount:2\n\n[{"access_id": "demo", "device_id": "inv", "message": "a", "message_id": 1, "timestamp": "2020-01-01T00:00:00Z"}, 42]'
+        _, _, messages = _SIAbstractGatewayClient.iter_messages_read_frame(frame)
+        self.assertEqual(1, next(messages).message_id)
+        with self.assertRaises(SIProtocolError):
+            next(messages)
+
+    def test_iterate_empty(self):
+        for frame in ['MESSAGES READ\nstatus:Success\ncount:0\n\n[]', 'MESSAGES READ\nstatus:Success\ncount:0\n\n [ ] ', 'MESSAGES READ\nstatus:Error\ncount:0\n\n']:
+            status, count, messages = _SIAbstractGatewayClient.iter_messages_read_frame(frame)
+            self.assertEqual(0, count)
+            self.assertEqual([], list(messages))
+
+    def test_iterate_invalid(self):
+        for body in ['', '{}', '[', '[{}', '[{"a": 1},]', '[{"a": 1}] x', '[{"a": 1} {"a": 2}]']:
+            with self.assertRaises(SIProtocolError):
+                list(_SIAbstractGatewayClient.iter_messages_read_frame('MESSAGES READ\nstatus:Success\ncount:1\n\n' + body)[2])
+        with self.assertRaises(SIProtocolError):
+            _SIAbstractGatewayClient.iter_messages_read_frame('ERROR\nreason:test\n\n')
+        with self.assertRaisesRegex(SIProtocolError, 'messages read'):
+            _SIAbstractGatewayClient.iter_messages_read_frame('MESSAGES READ\nstatus:Success\n\n[]')
+
+
 if __name__ == '__main__':
     unittest.main()